@@ -13,6 +13,13 @@ from typing import Any, Dict, List, Optional
 import httpx
 from pydantic import BaseModel
 
+try:
+    from elf_automations.shared.utils.http_transport import create_http_client
+
+    SHARED_TRANSPORT_AVAILABLE = True
+except ImportError:
+    SHARED_TRANSPORT_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 
@@ -36,7 +43,11 @@ class GatewayClient:
         self.gateway_url = gateway_url or os.getenv("A2A_GATEWAY_URL", "http://localhost:8080")
         self.registration_token = registration_token or os.getenv("GATEWAY_REGISTRATION_TOKEN", "")
         self.timeout = timeout
-        self.http_client = httpx.AsyncClient(timeout=timeout)
+        if SHARED_TRANSPORT_AVAILABLE:
+            # Share pooled connections with the team's other A2A/MCP clients
+            self.http_client = create_http_client(timeout=timeout)
+        else:
+            self.http_client = httpx.AsyncClient(timeout=timeout)
         
         # Remove trailing slash from gateway URL
         self.gateway_url = self.gateway_url.rstrip("/")
@@ -8,6 +8,7 @@ using the Google A2A protocol.
 Features:
 - Team registration and discovery
 - Intelligent routing based on capabilities
+- Load-aware selection (in-flight requests, EWMA latency)
 - Health monitoring and circuit breaking
 - Request/response logging
 - Load balancing across team instances
@@ -32,6 +33,11 @@ from supabase import create_client, Client
 # A2A types
 from a2a.types import AgentCard, Task, Message
 
+try:
+    from .routing_engine import RoutingEngine
+except ImportError:  # run as a script: python src/gateway_server.py
+    from routing_engine import RoutingEngine
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -74,6 +80,9 @@ class TeamHealth(BaseModel):
 class TeamInstance:
     """Represents a registered team with health tracking"""
     
+    # Weight of the newest sample in the latency moving average
+    EWMA_ALPHA = 0.2
+    
     def __init__(self, registration: TeamRegistration):
         self.team_id = registration.team_id
         self.team_name = registration.team_name
@@ -92,6 +101,10 @@ class TeamInstance:
         self.success_count = 0
         self.total_response_time = 0.0
         
+        # Load tracking for routing
+        self.in_flight = 0
+        self.ewma_response_time: Optional[float] = None
+        
         # Circuit breaker
         self.circuit_open = False
         self.circuit_opened_at: Optional[datetime] = None
@@ -123,6 +136,11 @@ class TeamInstance:
         self.total_response_time += response_time
         self.consecutive_failures = 0
         
+        if self.ewma_response_time is None:
+            self.ewma_response_time = response_time
+        else:
+            self.ewma_response_time += self.EWMA_ALPHA * (response_time - self.ewma_response_time)
+        
     def record_failure(self):
         """Record failed request"""
         self.error_count += 1
@@ -150,6 +168,9 @@ class TeamInstance:
                 "error_count": self.error_count,
                 "success_count": self.success_count,
                 "average_response_time_ms": round(self.average_response_time, 2),
+                "ewma_response_time_ms": round(self.ewma_response_time, 2)
+                    if self.ewma_response_time is not None else None,
+                "in_flight": self.in_flight,
                 "circuit_breaker_open": self.circuit_open
             },
             "metadata": self.metadata
@@ -162,7 +183,7 @@ class A2AGateway:
     def __init__(self, supabase_url: Optional[str] = None, supabase_key: Optional[str] = None):
         # Team registry
         self.teams: Dict[str, TeamInstance] = {}
-        self.capability_index: Dict[str, Set[str]] = {}  # capability -> team_ids
+        self.router = RoutingEngine()
         
         # HTTP client for team communication
         self.http_client = httpx.AsyncClient(timeout=30.0)
@@ -175,6 +196,16 @@ class A2AGateway:
         
         # Background tasks
         self.health_check_task: Optional[asyncio.Task] = None
+    
+    @property
+    def capability_index(self) -> Dict[str, Set[str]]:
+        """capability -> team_ids"""
+        return self.router.capability_index
+    
+    def _add_team(self, team: TeamInstance):
+        """Add a team to the registry and routing index"""
+        self.teams[team.team_id] = team
+        self.router.add_team(team.team_id, team.capabilities)
         
     async def startup(self):
         """Initialize gateway on startup"""
@@ -206,17 +237,9 @@ class A2AGateway:
         """Register a team with the gateway"""
         logger.info(f"Registering team: {registration.team_id}")
         
-        # Create team instance
+        # Create team instance and add to registry and routing index
         team = TeamInstance(registration)
-        
-        # Add to registry
-        self.teams[registration.team_id] = team
-        
-        # Update capability index
-        for capability in registration.capabilities:
-            if capability not in self.capability_index:
-                self.capability_index[capability] = set()
-            self.capability_index[capability].add(registration.team_id)
+        self._add_team(team)
         
         # Persist to Supabase
         if self.supabase:
@@ -250,16 +273,8 @@ class A2AGateway:
         if team_id not in self.teams:
             raise HTTPException(status_code=404, detail=f"Team {team_id} not found")
         
-        team = self.teams[team_id]
-        
-        # Remove from capability index
-        for capability in team.capabilities:
-            if capability in self.capability_index:
-                self.capability_index[capability].discard(team_id)
-                if not self.capability_index[capability]:
-                    del self.capability_index[capability]
-        
-        # Remove from registry
+        # Remove from routing index and registry
+        self.router.remove_team(team_id)
         del self.teams[team_id]
         
         # Remove from Supabase
@@ -276,7 +291,13 @@ class A2AGateway:
         logger.info(f"Routing task from {request.from_team}: {request.task_description[:50]}...")
         
         # Find target team
-        target_team = await self._find_target_team(request)
+        decision = self.router.select(
+            self.teams,
+            to_team=request.to_team,
+            required_capabilities=request.required_capabilities,
+            task_description=request.task_description
+        )
+        target_team = self.teams.get(decision.team_id) if decision.team_id else None
         if not target_team:
             raise HTTPException(
                 status_code=503,
@@ -298,6 +319,7 @@ class A2AGateway:
         
         # Forward request to target team
         start_time = datetime.now()
+        target_team.in_flight += 1
         try:
             response = await self.http_client.post(
                 f"{target_team.endpoint}/task",
@@ -321,6 +343,7 @@ class A2AGateway:
             result = response.json()
             result["routed_to"] = target_team.team_id
             result["routing_time_ms"] = round(response_time, 2)
+            result["routing_decision"] = decision.to_dict()
             
             return result
             
@@ -338,6 +361,8 @@ class A2AGateway:
                 status_code=502,
                 detail=f"Failed to execute task on team {target_team.team_id}: {str(e)}"
             )
+        finally:
+            target_team.in_flight -= 1
     
     async def get_teams(self, capability: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get list of registered teams"""
@@ -358,66 +383,6 @@ class A2AGateway:
         
         return self.teams[team_id].to_dict()
     
-    async def _find_target_team(self, request: TaskRouteRequest) -> Optional[TeamInstance]:
-        """Find best team for routing"""
-        candidates: List[TeamInstance] = []
-        
-        if request.to_team:
-            # Specific team requested
-            if request.to_team in self.teams and self.teams[request.to_team].is_available:
-                return self.teams[request.to_team]
-            return None
-        
-        # Find by capabilities
-        if request.required_capabilities:
-            # Find teams with ALL required capabilities
-            matching_teams = None
-            for capability in request.required_capabilities:
-                if capability.startswith("not:"):
-                    # Exclude specific team
-                    continue
-                    
-                teams_with_cap = self.capability_index.get(capability, set())
-                if matching_teams is None:
-                    matching_teams = teams_with_cap.copy()
-                else:
-                    matching_teams &= teams_with_cap
-            
-            if matching_teams:
-                for team_id in matching_teams:
-                    if team_id in self.teams and self.teams[team_id].is_available:
-                        # Exclude teams marked with "not:"
-                        if any(cap == f"not:{team_id}" for cap in request.required_capabilities):
-                            continue
-                        candidates.append(self.teams[team_id])
-        
-        # If no capability match, try to infer from task description
-        if not candidates:
-            task_lower = request.task_description.lower()
-            
-            # Simple keyword matching (can be enhanced with NLP)
-            keyword_capabilities = {
-                "sales": ["sales", "customer-engagement", "proposal-generation"],
-                "marketing": ["marketing", "content-creation", "campaign-management"],
-                "technical": ["technical", "architecture", "development"],
-                "product": ["product-management", "feature-planning", "roadmap"],
-                "support": ["customer-support", "issue-resolution", "help-desk"]
-            }
-            
-            for keyword, caps in keyword_capabilities.items():
-                if keyword in task_lower:
-                    for cap in caps:
-                        if cap in self.capability_index:
-                            for team_id in self.capability_index[cap]:
-                                if team_id in self.teams and self.teams[team_id].is_available:
-                                    candidates.append(self.teams[team_id])
-        
-        if not candidates:
-            return None
-        
-        # Select team with best performance (lowest average response time)
-        return min(candidates, key=lambda t: t.average_response_time)
-    
     async def _check_team_health(self, team: TeamInstance):
         """Check health of a single team"""
         try:
@@ -478,14 +443,7 @@ class A2AGateway:
                     metadata=record.get("metadata", {})
                 )
                 
-                team = TeamInstance(registration)
-                self.teams[registration.team_id] = team
-                
-                # Rebuild capability index
-                for capability in registration.capabilities:
-                    if capability not in self.capability_index:
-                        self.capability_index[capability] = set()
-                    self.capability_index[capability].add(registration.team_id)
+                self._add_team(TeamInstance(registration))
             
             logger.info(f"Loaded {len(self.teams)} teams from storage")
             
@@ -588,6 +546,7 @@ async def proxy_task(team_id: str, request: Request):
     # Forward request
     body = await request.json()
     
+    team.in_flight += 1
     try:
         start_time = datetime.now()
         response = await gateway.http_client.post(
@@ -605,6 +564,8 @@ async def proxy_task(team_id: str, request: Request):
     except Exception as e:
         team.record_failure()
         raise HTTPException(status_code=502, detail=str(e))
+    finally:
+        team.in_flight -= 1
 
 
 # Gateway statistics
@@ -625,6 +586,7 @@ async def get_statistics():
             "total_errors": total_errors,
             "success_rate": round(total_successes / total_requests * 100, 2) if total_requests > 0 else 0
         },
+        "routing_stats": gateway.router.get_stats(),
         "team_stats": [
             {
                 "team_id": team.team_id,
@@ -632,7 +594,10 @@ async def get_statistics():
                 "requests": team.success_count + team.error_count,
                 "success_rate": round(team.success_count / (team.success_count + team.error_count) * 100, 2) 
                     if (team.success_count + team.error_count) > 0 else 0,
-                "avg_response_time_ms": round(team.average_response_time, 2)
+                "avg_response_time_ms": round(team.average_response_time, 2),
+                "ewma_response_time_ms": round(team.ewma_response_time, 2)
+                    if team.ewma_response_time is not None else None,
+                "in_flight": team.in_flight
             }
             for team in gateway.teams.values()
         ]
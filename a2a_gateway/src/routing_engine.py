@@ -0,0 +1,260 @@
+"""
+A2A Routing Engine
+
+Indexed, load-aware team selection for the gateway.
+
+- Capabilities and teams are assigned bit positions; each capability keeps a
+  bitset of the teams that provide it, so matching ALL required capabilities
+  is a handful of integer ANDs
+- Register/unregister update the index incrementally
+- Selection uses power-of-two-choices over in-flight requests and EWMA
+  latency, so equally capable teams share load instead of herding onto the
+  historically fastest one
+- Every decision is timed
+"""
+
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+# Keyword fallback used when a task names no (matching) capabilities
+KEYWORD_CAPABILITIES = {
+    "sales": ["sales", "customer-engagement", "proposal-generation"],
+    "marketing": ["marketing", "content-creation", "campaign-management"],
+    "technical": ["technical", "architecture", "development"],
+    "product": ["product-management", "feature-planning", "roadmap"],
+    "support": ["customer-support", "issue-resolution", "help-desk"],
+}
+
+
+@dataclass
+class RoutingDecision:
+    """Outcome and timing of a single routing decision"""
+
+    team_id: Optional[str]
+    strategy: str  # direct, capability, keyword, none
+    candidate_count: int
+    decision_time_us: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "team_id": self.team_id,
+            "strategy": self.strategy,
+            "candidate_count": self.candidate_count,
+            "decision_time_us": round(self.decision_time_us, 2),
+        }
+
+
+class RoutingEngine:
+    """Capability bitset index with power-of-two-choices selection"""
+
+    def __init__(
+        self, default_latency_ms: float = 100.0, rng: Optional[random.Random] = None
+    ):
+        """
+        Args:
+            default_latency_ms: Latency assumed for teams with no samples yet
+            rng: Random source for candidate sampling
+        """
+        self.default_latency_ms = default_latency_ms
+        self.rng = rng or random.Random()
+
+        # capability -> team_ids (kept for the discovery endpoints)
+        self.capability_index: Dict[str, Set[str]] = {}
+
+        # Team slots: bit i of a team bitset refers to self._slots[i]
+        self._slots: List[Optional[str]] = []
+        self._free_slots: List[int] = []
+        self._slot_of: Dict[str, int] = {}
+        self._capability_teams: Dict[str, int] = {}  # capability -> team bitset
+        self._team_capabilities: Dict[str, Set[str]] = {}
+
+        # Decision statistics
+        self.decisions = 0
+        self.total_decision_time_us = 0.0
+        self.max_decision_time_us = 0.0
+        self.strategy_counts: Dict[str, int] = {}
+
+    # Index maintenance
+
+    def add_team(self, team_id: str, capabilities: Iterable[str]):
+        """Index a team, replacing any previous registration"""
+        if team_id in self._slot_of:
+            self.remove_team(team_id)
+
+        slot = self._free_slots.pop() if self._free_slots else len(self._slots)
+        if slot == len(self._slots):
+            self._slots.append(team_id)
+        else:
+            self._slots[slot] = team_id
+        self._slot_of[team_id] = slot
+
+        bit = 1 << slot
+        capabilities = set(capabilities)
+        self._team_capabilities[team_id] = capabilities
+        for capability in capabilities:
+            self._capability_teams[capability] = (
+                self._capability_teams.get(capability, 0) | bit
+            )
+            self.capability_index.setdefault(capability, set()).add(team_id)
+
+    def remove_team(self, team_id: str):
+        """Drop a team from the index"""
+        slot = self._slot_of.pop(team_id, None)
+        if slot is None:
+            return
+
+        bit = 1 << slot
+        for capability in self._team_capabilities.pop(team_id, set()):
+            remaining = self._capability_teams.get(capability, 0) & ~bit
+            if remaining:
+                self._capability_teams[capability] = remaining
+                self.capability_index[capability].discard(team_id)
+            else:
+                self._capability_teams.pop(capability, None)
+                self.capability_index.pop(capability, None)
+
+        self._slots[slot] = None
+        self._free_slots.append(slot)
+
+    def _teams_in(self, bitset: int) -> List[str]:
+        """Expand a team bitset into team ids"""
+        team_ids = []
+        while bitset:
+            low = bitset & -bitset
+            team_ids.append(self._slots[low.bit_length() - 1])
+            bitset ^= low
+        return team_ids
+
+    def _bitset_for(self, team_ids: Iterable[str]) -> int:
+        bitset = 0
+        for team_id in team_ids:
+            slot = self._slot_of.get(team_id)
+            if slot is not None:
+                bitset |= 1 << slot
+        return bitset
+
+    def match_capabilities(self, capabilities: Iterable[str]) -> int:
+        """Bitset of teams having ALL of the given capabilities"""
+        matched = None
+        for capability in capabilities:
+            teams = self._capability_teams.get(capability, 0)
+            matched = teams if matched is None else matched & teams
+            if not matched:
+                return 0
+        return matched or 0
+
+    def match_keywords(self, text: str) -> int:
+        """Bitset of teams with a capability implied by keywords in the text"""
+        text = text.lower()
+        matched = 0
+        for keyword, capabilities in KEYWORD_CAPABILITIES.items():
+            if keyword in text:
+                for capability in capabilities:
+                    matched |= self._capability_teams.get(capability, 0)
+        return matched
+
+    # Selection
+
+    def _score(self, team) -> float:
+        """Expected wait on a team: queue depth times typical latency"""
+        latency = team.ewma_response_time
+        if latency is None:
+            latency = self.default_latency_ms
+        return (team.in_flight + 1) * max(latency, 1.0)
+
+    def _pick(self, team_ids: List[str], teams: Dict[str, Any]) -> Optional[Any]:
+        """Power-of-two-choices among available teams"""
+        pool = list(team_ids)
+        chosen: List[Any] = []
+
+        # Sample lazily so availability is only checked for sampled teams
+        while pool and len(chosen) < 2:
+            index = self.rng.randrange(len(pool))
+            pool[index], pool[-1] = pool[-1], pool[index]
+            team = teams.get(pool.pop())
+            if team is not None and team.is_available:
+                chosen.append(team)
+
+        if not chosen:
+            return None
+        return min(chosen, key=self._score)
+
+    def select(
+        self,
+        teams: Dict[str, Any],
+        to_team: Optional[str] = None,
+        required_capabilities: Optional[List[str]] = None,
+        task_description: str = "",
+    ) -> RoutingDecision:
+        """
+        Choose a team for a task.
+
+        Capabilities prefixed with "not:" exclude that team id.
+        """
+        started = time.perf_counter()
+        team = None
+        candidates: List[str] = []
+
+        if to_team:
+            strategy = "direct"
+            target = teams.get(to_team)
+            if target is not None and target.is_available:
+                team = target
+                candidates = [to_team]
+        else:
+            required = []
+            excluded = []
+            for capability in required_capabilities or []:
+                if capability.startswith("not:"):
+                    excluded.append(capability[4:])
+                else:
+                    required.append(capability)
+            exclude_mask = ~self._bitset_for(excluded)
+
+            strategy = "capability"
+            matched = (
+                self.match_capabilities(required) & exclude_mask if required else 0
+            )
+            candidates = self._teams_in(matched)
+            team = self._pick(candidates, teams)
+
+            if team is None:
+                # If no capability match, try to infer from task description
+                strategy = "keyword"
+                candidates = self._teams_in(
+                    self.match_keywords(task_description) & exclude_mask
+                )
+                team = self._pick(candidates, teams)
+
+        if team is None:
+            strategy = "none"
+
+        elapsed_us = (time.perf_counter() - started) * 1_000_000
+        self.decisions += 1
+        self.total_decision_time_us += elapsed_us
+        self.max_decision_time_us = max(self.max_decision_time_us, elapsed_us)
+        self.strategy_counts[strategy] = self.strategy_counts.get(strategy, 0) + 1
+
+        return RoutingDecision(
+            team_id=team.team_id if team else None,
+            strategy=strategy,
+            candidate_count=len(candidates),
+            decision_time_us=elapsed_us,
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Routing decision statistics"""
+        return {
+            "decisions": self.decisions,
+            "avg_decision_time_us": (
+                round(self.total_decision_time_us / self.decisions, 2)
+                if self.decisions
+                else 0
+            ),
+            "max_decision_time_us": round(self.max_decision_time_us, 2),
+            "strategies": dict(self.strategy_counts),
+            "indexed_teams": len(self._slot_of),
+            "indexed_capabilities": len(self._capability_teams),
+        }
@@ -14,7 +14,9 @@ Key Technologies:
 
 import asyncio
 import json
+import os
 import uuid
+import weakref
 from abc import ABC, abstractmethod
 from datetime import datetime
 from enum import Enum
@@ -56,6 +58,25 @@ class MCPToolCall(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
 
+# One connection pool per event loop, shared by every AgentGatewayClient
+_shared_connectors: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def get_shared_connector() -> aiohttp.TCPConnector:
+    """Get the process-wide pooled connector for the running event loop."""
+    loop = asyncio.get_running_loop()
+    connector = _shared_connectors.get(loop)
+    if connector is None or connector.closed:
+        connector = aiohttp.TCPConnector(
+            limit=int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "100")),
+            limit_per_host=int(os.getenv("HTTP_PER_HOST_CONCURRENCY", "64")),
+            keepalive_timeout=float(os.getenv("HTTP_POOL_KEEPALIVE_EXPIRY", "30")),
+            ttl_dns_cache=300,
+        )
+        _shared_connectors[loop] = connector
+    return connector
+
+
 class AgentGatewayClient:
     """Client for communicating with local AgentGateway for MCP access."""
 
@@ -76,8 +97,12 @@ class AgentGatewayClient:
         if self.api_key:
             headers["Authorization"] = f"Bearer {self.api_key}"
 
+        # Sessions share pooled connections; closing one keeps the pool open
         self.session = aiohttp.ClientSession(
-            headers=headers, timeout=aiohttp.ClientTimeout(total=30)
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=30),
+            connector=get_shared_connector(),
+            connector_owner=False,
         )
         return self
 
@@ -3,22 +3,22 @@ RAG Processor Team Agents
 Each agent handles a specific aspect of the document processing pipeline.
 """
 
-from .document_classifier import DocumentClassifierAgent
-from .embedding_generator import EmbeddingGeneratorAgent
-from .entity_extractor import EntityExtractorAgent
-from .graph_builder import GraphBuilderAgent
-from .queue_monitor import QueueMonitorAgent
-from .smart_chunker import SmartChunkerAgent
-from .storage_coordinator import StorageCoordinatorAgent
+from .document_classifier import RAGDocumentClassifierAgent
+from .embedding_generator import RAGEmbeddingGeneratorAgent
+from .entity_extractor import RAGEntityExtractorAgent
+from .graph_builder import RAGGraphBuilderAgent
+from .queue_monitor import RAGQueueMonitorAgent
+from .smart_chunker import RAGSmartChunkerAgent
+from .storage_coordinator import RAGStorageCoordinatorAgent
 
 # Agent instances
-queue_monitor = QueueMonitorAgent()
-document_classifier = DocumentClassifierAgent()
-entity_extractor = EntityExtractorAgent()
-smart_chunker = SmartChunkerAgent()
-embedding_generator = EmbeddingGeneratorAgent()
-graph_builder = GraphBuilderAgent()
-storage_coordinator = StorageCoordinatorAgent()
+queue_monitor = RAGQueueMonitorAgent()
+document_classifier = RAGDocumentClassifierAgent()
+entity_extractor = RAGEntityExtractorAgent()
+smart_chunker = RAGSmartChunkerAgent()
+embedding_generator = RAGEmbeddingGeneratorAgent()
+graph_builder = RAGGraphBuilderAgent()
+storage_coordinator = RAGStorageCoordinatorAgent()
 
 __all__ = [
     "queue_monitor",
@@ -3,14 +3,12 @@ Embedding Generator Agent
 Generates high-quality embeddings for document chunks using OpenAI's embedding models.
 """
 
-import asyncio
 import logging
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-import openai
+from shared.rag.embedding_scheduler import get_embedding_scheduler
 from shared.utils import get_supabase_client
-from tenacity import retry, stop_after_attempt, wait_exponential
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +32,9 @@ class RAGEmbeddingGeneratorAgent:
         # Default model
         self.default_model = "text-embedding-3-large"
 
+        # Shared limiter, pooled client and embedding cache
+        self.scheduler = get_embedding_scheduler()
+
     async def generate(
         self, chunks: List[Dict[str, Any]], model: Optional[str] = None
     ) -> Dict[str, Any]:
@@ -70,60 +71,41 @@ class RAGEmbeddingGeneratorAgent:
             logger.error(f"Embedding generation error: {str(e)}")
             raise
 
-    @retry(
-        stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10)
-    )
     async def _generate_embeddings_batch(
         self, chunks: List[Dict[str, Any]], model: str
     ) -> List[Dict[str, Any]]:
-        """Generate embeddings with retry logic"""
+        """Generate embeddings through the shared rate-limited scheduler"""
+        texts = [self._clean_text_for_embedding(chunk["content"]) for chunk in chunks]
+
+        # Batches are sized by tokens and run concurrently; identical chunk
+        # texts are embedded once and served from the content-addressed cache
+        vectors, errors = await self.scheduler.embed_with_errors(texts, model)
+
         embeddings = []
-        batch_size = 20  # OpenAI recommends batches of 20 or fewer
-
-        for i in range(0, len(chunks), batch_size):
-            batch = chunks[i : i + batch_size]
-            texts = [chunk["content"] for chunk in batch]
-
-            try:
-                # Call OpenAI API
-                response = await self._call_openai_embeddings(texts, model)
-
-                # Process response
-                for j, embedding_data in enumerate(response.data):
-                    embeddings.append(
-                        {
-                            "chunk_index": batch[j]["chunk_index"],
-                            "embedding": embedding_data.embedding,
-                            "index": embedding_data.index,
-                        }
-                    )
-
-            except openai.RateLimitError:
-                logger.warning("Rate limit hit, waiting before retry")
-                await asyncio.sleep(20)
-                raise
-            except Exception as e:
-                logger.error(f"Error in batch {i//batch_size}: {str(e)}")
-                # Continue with next batch instead of failing entirely
-                for j, chunk in enumerate(batch):
-                    embeddings.append(
-                        {
-                            "chunk_index": chunk["chunk_index"],
-                            "embedding": None,
-                            "error": str(e),
-                        }
-                    )
+        for chunk, vector, error in zip(chunks, vectors, errors):
+            if vector is None:
+                embeddings.append(
+                    {
+                        "chunk_index": chunk["chunk_index"],
+                        "embedding": None,
+                        "error": error or "embedding request failed",
+                    }
+                )
+            else:
+                embeddings.append(
+                    {"chunk_index": chunk["chunk_index"], "embedding": vector}
+                )
 
         return embeddings
 
     async def _call_openai_embeddings(self, texts: List[str], model: str):
-        """Call OpenAI embeddings API"""
-        client = openai.AsyncOpenAI()
-
+        """Call OpenAI embeddings API with the pooled client"""
         # Clean texts
         cleaned_texts = [self._clean_text_for_embedding(text) for text in texts]
 
-        response = await client.embeddings.create(input=cleaned_texts, model=model)
+        response = await self.scheduler.client.embeddings.create(
+            input=cleaned_texts, model=model
+        )
 
         return response
 
@@ -236,10 +218,12 @@ class RAGEmbeddingGeneratorAgent:
         model = model or self.default_model
 
         try:
-            response = await self._call_openai_embeddings([query], model)
+            vectors = await self.scheduler.embed(
+                [self._clean_text_for_embedding(query)], model
+            )
 
-            if response.data:
-                return response.data[0].embedding
+            if vectors[0] is not None:
+                return vectors[0]
 
         except Exception as e:
             logger.error(f"Query embedding error: {str(e)}")
@@ -1,15 +1,18 @@
 """
 Graph Builder Agent
 Builds Neo4j knowledge graph from extracted entities and relationships.
+Each document is written in one transaction with batched UNWIND statements.
 """
 
 import asyncio
 import logging
 import os
+from collections import defaultdict
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from neo4j import AsyncGraphDatabase
+from shared.rag import GraphBatchWriter, label_expression, quote_label
 from shared.utils import get_supabase_client
 
 logger = logging.getLogger(__name__)
@@ -32,6 +35,9 @@ class RAGGraphBuilderAgent:
         self.neo4j_password = os.getenv("NEO4J_PASSWORD")
         self.driver = None
 
+        # Parameterized UNWIND writes, batch size scaled by document size
+        self.writer = GraphBatchWriter()
+
     async def initialize(self):
         """Initialize Neo4j connection"""
         if not self.driver:
@@ -56,26 +62,47 @@ class RAGGraphBuilderAgent:
         try:
             await self.initialize()
 
-            # Create document node
-            doc_node_id = await self._create_document_node(document_id)
-
-            # Create entity nodes
-            entity_node_ids = await self._create_entity_nodes(entities, document_id)
-
-            # Create relationships
-            relationship_ids = await self._create_relationships(
-                relationships, entity_node_ids, document_id
+            # One batch size for the whole document, scaled by its volume
+            batch_size = self.writer.batch_size(
+                len(entities) + len(relationships) + len(chunks)
             )
 
-            # Create chunk nodes and relationships
-            chunk_node_ids = await self._create_chunk_graph(
-                chunks, chunk_relationships, document_id
-            )
+            async def write_document(tx):
+                doc_node_id = await self._write_document_node(tx, document_id)
+                entity_node_ids, entity_refs = await self._write_entity_nodes(
+                    tx, entities, document_id, batch_size
+                )
+                relationship_ids, relationship_refs = await self._write_relationships(
+                    tx, relationships, entity_node_ids, document_id, batch_size
+                )
+                chunk_node_ids = await self._write_chunk_graph(
+                    tx, chunks, chunk_relationships, document_id, batch_size
+                )
+                await self._write_entity_chunk_links(
+                    tx, entities, chunks, entity_node_ids, chunk_node_ids, batch_size
+                )
+                return (
+                    doc_node_id,
+                    entity_node_ids,
+                    entity_refs,
+                    relationship_ids,
+                    relationship_refs,
+                    chunk_node_ids,
+                )
 
-            # Link entities to chunks
-            await self._link_entities_to_chunks(
-                entities, chunks, entity_node_ids, chunk_node_ids
-            )
+            # The whole document is written in a single transaction
+            async with self.driver.session() as session:
+                (
+                    doc_node_id,
+                    entity_node_ids,
+                    entity_refs,
+                    relationship_ids,
+                    relationship_refs,
+                    chunk_node_ids,
+                ) = await session.execute_write(write_document)
+
+            # Record Neo4j references only once the graph has committed
+            await self._store_graph_refs(entity_refs, relationship_refs)
 
             logger.info(
                 f"Built graph with {len(entity_node_ids)} entity nodes "
@@ -97,79 +124,142 @@ class RAGGraphBuilderAgent:
             logger.error(f"Graph building error: {str(e)}")
             raise
 
+    async def _run_write(self, work):
+        """Run work(tx) in its own write transaction"""
+        await self.initialize()
+        async with self.driver.session() as session:
+            return await session.execute_write(work)
+
+    async def _store_graph_refs(
+        self,
+        entity_refs: List[Dict[str, Any]],
+        relationship_refs: List[Dict[str, Any]],
+    ) -> None:
+        """Write Neo4j ids back to Supabase in one bulk call"""
+        if not entity_refs and not relationship_refs:
+            return
+
+        try:
+            await asyncio.to_thread(
+                lambda: self.supabase.rpc(
+                    "rag_set_graph_refs",
+                    {"p_entities": entity_refs, "p_relationships": relationship_refs},
+                ).execute()
+            )
+        except Exception as e:
+            # The graph itself is committed; only the back-references are missing
+            logger.error(f"Error storing Neo4j references: {str(e)}")
+
     async def _create_document_node(self, document_id: str) -> str:
         """Create document node in Neo4j"""
-        async with self.driver.session() as session:
-            query = """
-            MERGE (d:Document {id: $document_id})
-            ON CREATE SET
-                d.created_at = datetime(),
-                d.node_type = 'document'
-            RETURN id(d) as node_id
-            """
+        return await self._run_write(
+            lambda tx: self._write_document_node(tx, document_id)
+        )
 
-            result = await session.run(query, document_id=document_id)
-            record = await result.single()
+    async def _write_document_node(self, tx, document_id: str) -> str:
+        query = """
+        MERGE (d:Document {id: $document_id})
+        ON CREATE SET
+            d.created_at = datetime(),
+            d.node_type = 'document'
+        RETURN id(d) as node_id
+        """
+
+        result = await tx.run(query, document_id=document_id)
+        record = await result.single()
 
-            return str(record["node_id"])
+        return str(record["node_id"])
 
     async def _create_entity_nodes(
         self, entities: List[Dict[str, Any]], document_id: str
     ) -> Dict[str, str]:
         """Create entity nodes in Neo4j"""
-        entity_node_ids = {}
+        entity_node_ids, entity_refs = await self._run_write(
+            lambda tx: self._write_entity_nodes(tx, entities, document_id)
+        )
+        await self._store_graph_refs(entity_refs, [])
+        return entity_node_ids
 
-        async with self.driver.session() as session:
-            for entity in entities:
-                # Determine node labels based on entity type
-                labels = self._get_entity_labels(entity["type"])
+    async def _write_entity_nodes(
+        self,
+        tx,
+        entities: List[Dict[str, Any]],
+        document_id: str,
+        batch_size: Optional[int] = None,
+    ) -> Tuple[Dict[str, str], List[Dict[str, Any]]]:
+        """
+        MERGE entity nodes with one UNWIND statement per label set
+
+        Returns node ids by entity value and the Supabase back-references.
+        """
+        rows_by_labels: Dict[Tuple[str, ...], List[Dict[str, Any]]] = defaultdict(list)
+        entity_labels = []
+
+        for index, entity in enumerate(entities):
+            # Determine node labels based on entity type
+            labels = self._get_entity_labels(entity["type"])
+            entity_labels.append(labels)
+
+            # Build properties
+            properties = {
+                "value": entity["value"],
+                "normalized_value": entity.get("normalized_value", entity["value"]),
+                "type": entity["type"],
+                "confidence": entity.get("confidence", 1.0),
+                "source_document": document_id,
+            }
+
+            # Add custom properties
+            if entity.get("properties"):
+                for key, value in entity["properties"].items():
+                    if isinstance(value, (str, int, float, bool)):
+                        properties[key] = value
 
-                # Build properties
-                properties = {
-                    "value": entity["value"],
-                    "normalized_value": entity.get("normalized_value", entity["value"]),
+            rows_by_labels[tuple(labels)].append(
+                {
+                    "idx": index,
+                    "normalized_value": properties["normalized_value"],
                     "type": entity["type"],
-                    "confidence": entity.get("confidence", 1.0),
-                    "source_document": document_id,
+                    "properties": properties,
                 }
+            )
 
-                # Add custom properties
-                if entity.get("properties"):
-                    for key, value in entity["properties"].items():
-                        if isinstance(value, (str, int, float, bool)):
-                            properties[key] = value
-
-                # Create node
-                query = f"""
-                MERGE (e:{':'.join(labels)} {{normalized_value: $normalized_value, type: $type}})
-                ON CREATE SET e = $properties
-                ON MATCH SET e.last_seen = datetime(), e.occurrence_count = coalesce(e.occurrence_count, 0) + 1
-                WITH e
-                MATCH (d:Document {{id: $document_id}})
-                MERGE (e)-[:EXTRACTED_FROM]->(d)
-                RETURN id(e) as node_id
-                """
-
-                result = await session.run(
-                    query,
-                    normalized_value=properties["normalized_value"],
-                    type=entity["type"],
-                    properties=properties,
-                    document_id=document_id,
-                )
+        node_ids: Dict[int, str] = {}
+        for labels, rows in rows_by_labels.items():
+            query = f"""
+            UNWIND $rows AS row
+            MERGE (e{label_expression(labels)} {{normalized_value: row.normalized_value, type: row.type}})
+            ON CREATE SET e = row.properties
+            ON MATCH SET e.last_seen = datetime(), e.occurrence_count = coalesce(e.occurrence_count, 0) + 1
+            WITH e, row
+            MATCH (d:Document {{id: $document_id}})
+            MERGE (e)-[:EXTRACTED_FROM]->(d)
+            RETURN row.idx AS idx, id(e) AS node_id
+            """
 
-                record = await result.single()
-                if record:
-                    node_id = str(record["node_id"])
-                    entity_node_ids[entity["value"]] = node_id
+            records = await self.writer.write(
+                tx, query, rows, batch_size, document_id=document_id
+            )
+            for record in records:
+                node_ids[record["idx"]] = str(record["node_id"])
 
-                    # Update Supabase with Neo4j reference
-                    if entity.get("id"):
-                        self.supabase.table("rag_extracted_entities").update(
-                            {"neo4j_node_id": node_id, "neo4j_labels": labels}
-                        ).eq("id", entity["id"]).execute()
+        entity_node_ids = {}
+        entity_refs = []
+        for index, entity in enumerate(entities):
+            node_id = node_ids.get(index)
+            if node_id is None:
+                continue
+            entity_node_ids[entity["value"]] = node_id
+            if entity.get("id"):
+                entity_refs.append(
+                    {
+                        "id": entity["id"],
+                        "neo4j_node_id": node_id,
+                        "neo4j_labels": entity_labels[index],
+                    }
+                )
 
-        return entity_node_ids
+        return entity_node_ids, entity_refs
 
     def _get_entity_labels(self, entity_type: str) -> List[str]:
         """Get Neo4j labels for entity type"""
@@ -210,62 +300,95 @@ class RAGGraphBuilderAgent:
         document_id: str,
     ) -> List[str]:
         """Create relationships between entities"""
-        relationship_ids = []
+        relationship_ids, relationship_refs = await self._run_write(
+            lambda tx: self._write_relationships(
+                tx, relationships, entity_node_ids, document_id
+            )
+        )
+        await self._store_graph_refs([], relationship_refs)
+        return relationship_ids
 
-        async with self.driver.session() as session:
-            for rel in relationships:
-                source_id = entity_node_ids.get(rel["source_entity"])
-                target_id = entity_node_ids.get(rel["target_entity"])
-
-                if not source_id or not target_id:
-                    logger.warning(
-                        f"Skipping relationship - missing nodes: "
-                        f"{rel['source_entity']} -> {rel['target_entity']}"
-                    )
-                    continue
-
-                # Create relationship
-                rel_type = self._normalize_relationship_type(rel["relationship_type"])
+    async def _write_relationships(
+        self,
+        tx,
+        relationships: List[Dict[str, Any]],
+        entity_node_ids: Dict[str, str],
+        document_id: str,
+        batch_size: Optional[int] = None,
+    ) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """
+        MERGE entity relationships with one UNWIND statement per type
+
+        Returns the relationship ids in input order and the Supabase
+        back-references.
+        """
+        rows_by_type: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+
+        for index, rel in enumerate(relationships):
+            source_id = entity_node_ids.get(rel["source_entity"])
+            target_id = entity_node_ids.get(rel["target_entity"])
+
+            if not source_id or not target_id:
+                logger.warning(
+                    f"Skipping relationship - missing nodes: "
+                    f"{rel['source_entity']} -> {rel['target_entity']}"
+                )
+                continue
+
+            rel_type = self._normalize_relationship_type(rel["relationship_type"])
+
+            properties = {
+                "type": rel["relationship_type"],
+                "confidence": rel.get("confidence", 1.0),
+                "source_document": document_id,
+            }
+
+            # Add custom properties
+            if rel.get("properties"):
+                for key, value in rel["properties"].items():
+                    if isinstance(value, (str, int, float, bool)):
+                        properties[key] = value
 
-                properties = {
-                    "type": rel["relationship_type"],
-                    "confidence": rel.get("confidence", 1.0),
-                    "source_document": document_id,
+            rows_by_type[rel_type].append(
+                {
+                    "idx": index,
+                    "source_id": source_id,
+                    "target_id": target_id,
+                    "properties": properties,
                 }
+            )
 
-                # Add custom properties
-                if rel.get("properties"):
-                    for key, value in rel["properties"].items():
-                        if isinstance(value, (str, int, float, bool)):
-                            properties[key] = value
-
-                query = f"""
-                MATCH (s) WHERE id(s) = toInteger($source_id)
-                MATCH (t) WHERE id(t) = toInteger($target_id)
-                MERGE (s)-[r:{rel_type}]->(t)
-                SET r = $properties
-                RETURN id(r) as rel_id
-                """
-
-                result = await session.run(
-                    query,
-                    source_id=source_id,
-                    target_id=target_id,
-                    properties=properties,
-                )
+        rel_ids: Dict[int, str] = {}
+        for rel_type, rows in rows_by_type.items():
+            query = f"""
+            UNWIND $rows AS row
+            MATCH (s) WHERE id(s) = toInteger(row.source_id)
+            MATCH (t) WHERE id(t) = toInteger(row.target_id)
+            MERGE (s)-[r:{quote_label(rel_type)}]->(t)
+            SET r = row.properties
+            RETURN row.idx AS idx, id(r) AS rel_id
+            """
 
-                record = await result.single()
-                if record:
-                    rel_id = str(record["rel_id"])
-                    relationship_ids.append(rel_id)
+            for record in await self.writer.write(tx, query, rows, batch_size):
+                rel_ids[record["idx"]] = str(record["rel_id"])
 
-                    # Update Supabase with Neo4j reference
-                    if rel.get("id"):
-                        self.supabase.table("rag_entity_relationships").update(
-                            {"neo4j_edge_id": rel_id, "neo4j_type": rel_type}
-                        ).eq("id", rel["id"]).execute()
+        relationship_ids = []
+        relationship_refs = []
+        for index in sorted(rel_ids):
+            rel = relationships[index]
+            relationship_ids.append(rel_ids[index])
+            if rel.get("id"):
+                relationship_refs.append(
+                    {
+                        "id": rel["id"],
+                        "neo4j_edge_id": rel_ids[index],
+                        "neo4j_type": self._normalize_relationship_type(
+                            rel["relationship_type"]
+                        ),
+                    }
+                )
 
-        return relationship_ids
+        return relationship_ids, relationship_refs
 
     def _normalize_relationship_type(self, rel_type: str) -> str:
         """Normalize relationship type for Neo4j"""
@@ -282,54 +405,75 @@ class RAGGraphBuilderAgent:
         document_id: str,
     ) -> List[str]:
         """Create chunk nodes and relationships"""
-        chunk_node_ids = []
+        return await self._run_write(
+            lambda tx: self._write_chunk_graph(
+                tx, chunks, chunk_relationships, document_id
+            )
+        )
 
-        async with self.driver.session() as session:
-            # Create chunk nodes
-            for chunk in chunks:
-                query = """
-                CREATE (c:Chunk {
-                    index: $index,
-                    type: $type,
-                    token_count: $token_count,
-                    document_id: $document_id
-                })
-                WITH c
-                MATCH (d:Document {id: $document_id})
-                MERGE (c)-[:PART_OF]->(d)
-                RETURN id(c) as node_id
-                """
-
-                result = await session.run(
-                    query,
-                    index=chunk["chunk_index"],
-                    type=chunk.get("type", "unknown"),
-                    token_count=chunk.get("token_count", 0),
-                    document_id=document_id,
+    async def _write_chunk_graph(
+        self,
+        tx,
+        chunks: List[Dict[str, Any]],
+        chunk_relationships: List[Dict[str, Any]],
+        document_id: str,
+        batch_size: Optional[int] = None,
+    ) -> List[str]:
+        """Create chunk nodes, then chunk relationships grouped by type"""
+        query = """
+        UNWIND $rows AS row
+        CREATE (c:Chunk {
+            index: row.index,
+            type: row.type,
+            token_count: row.token_count,
+            document_id: $document_id
+        })
+        WITH c, row
+        MATCH (d:Document {id: $document_id})
+        MERGE (c)-[:PART_OF]->(d)
+        RETURN row.idx AS idx, id(c) AS node_id
+        """
+
+        rows = [
+            {
+                "idx": position,
+                "index": chunk["chunk_index"],
+                "type": chunk.get("type", "unknown"),
+                "token_count": chunk.get("token_count", 0),
+            }
+            for position, chunk in enumerate(chunks)
+        ]
+        records = await self.writer.write(
+            tx, query, rows, batch_size, document_id=document_id
+        )
+        chunk_node_ids = [
+            str(record["node_id"])
+            for record in sorted(records, key=lambda record: record["idx"])
+        ]
+
+        # Create chunk relationships
+        rows_by_type: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for rel in chunk_relationships:
+            if rel["source_chunk_index"] < len(chunk_node_ids) and rel[
+                "target_chunk_index"
+            ] < len(chunk_node_ids):
+                rel_type = self._normalize_relationship_type(rel["relationship_type"])
+                rows_by_type[rel_type].append(
+                    {
+                        "source_id": chunk_node_ids[rel["source_chunk_index"]],
+                        "target_id": chunk_node_ids[rel["target_chunk_index"]],
+                    }
                 )
 
-                record = await result.single()
-                if record:
-                    chunk_node_ids.append(str(record["node_id"]))
-
-            # Create chunk relationships
-            for rel in chunk_relationships:
-                if rel["source_chunk_index"] < len(chunk_node_ids) and rel[
-                    "target_chunk_index"
-                ] < len(chunk_node_ids):
-                    source_id = chunk_node_ids[rel["source_chunk_index"]]
-                    target_id = chunk_node_ids[rel["target_chunk_index"]]
-                    rel_type = self._normalize_relationship_type(
-                        rel["relationship_type"]
-                    )
-
-                    query = f"""
-                    MATCH (s) WHERE id(s) = toInteger($source_id)
-                    MATCH (t) WHERE id(t) = toInteger($target_id)
-                    MERGE (s)-[:{rel_type}]->(t)
-                    """
-
-                    await session.run(query, source_id=source_id, target_id=target_id)
+        for rel_type, rows in rows_by_type.items():
+            query = f"""
+            UNWIND $rows AS row
+            MATCH (s) WHERE id(s) = toInteger(row.source_id)
+            MATCH (t) WHERE id(t) = toInteger(row.target_id)
+            MERGE (s)-[:{quote_label(rel_type)}]->(t)
+            """
+
+            await self.writer.write(tx, query, rows, batch_size)
 
         return chunk_node_ids
 
@@ -341,30 +485,52 @@ class RAGGraphBuilderAgent:
         chunk_node_ids: List[str],
     ) -> None:
         """Create relationships between entities and chunks they appear in"""
-        async with self.driver.session() as session:
-            for i, chunk in enumerate(chunks):
-                if i >= len(chunk_node_ids):
-                    continue
-
-                chunk_node_id = chunk_node_ids[i]
-
-                # Find entities in this chunk
-                for entity in entities:
-                    if (
-                        entity["value"] in chunk["content"]
-                        or entity.get("source_text", "") in chunk["content"]
-                    ):
-                        entity_node_id = entity_node_ids.get(entity["value"])
-                        if entity_node_id:
-                            query = """
-                            MATCH (e) WHERE id(e) = toInteger($entity_id)
-                            MATCH (c) WHERE id(c) = toInteger($chunk_id)
-                            MERGE (e)-[:APPEARS_IN]->(c)
-                            """
-
-                            await session.run(
-                                query, entity_id=entity_node_id, chunk_id=chunk_node_id
-                            )
+        await self._run_write(
+            lambda tx: self._write_entity_chunk_links(
+                tx, entities, chunks, entity_node_ids, chunk_node_ids
+            )
+        )
+
+    async def _write_entity_chunk_links(
+        self,
+        tx,
+        entities: List[Dict[str, Any]],
+        chunks: List[Dict[str, Any]],
+        entity_node_ids: Dict[str, str],
+        chunk_node_ids: List[str],
+        batch_size: Optional[int] = None,
+    ) -> None:
+        # Ordered set of (entity, chunk) pairs; MERGE would dedupe them anyway
+        links: Dict[Tuple[str, str], None] = {}
+
+        for i, chunk in enumerate(chunks):
+            if i >= len(chunk_node_ids):
+                continue
+
+            chunk_node_id = chunk_node_ids[i]
+
+            # Find entities in this chunk
+            for entity in entities:
+                if (
+                    entity["value"] in chunk["content"]
+                    or entity.get("source_text", "") in chunk["content"]
+                ):
+                    entity_node_id = entity_node_ids.get(entity["value"])
+                    if entity_node_id:
+                        links[(entity_node_id, chunk_node_id)] = None
+
+        query = """
+        UNWIND $rows AS row
+        MATCH (e) WHERE id(e) = toInteger(row.entity_id)
+        MATCH (c) WHERE id(c) = toInteger(row.chunk_id)
+        MERGE (e)-[:APPEARS_IN]->(c)
+        """
+
+        rows = [
+            {"entity_id": entity_id, "chunk_id": chunk_id}
+            for entity_id, chunk_id in links
+        ]
+        await self.writer.write(tx, query, rows, batch_size)
 
     async def query_entity_relationships(
         self,
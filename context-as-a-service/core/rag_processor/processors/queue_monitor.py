@@ -1,14 +1,19 @@
 """
 Queue Monitor Agent
 Monitors the document processing queue and manages document status updates.
+Documents are claimed in batches under leases, so several workers can share
+one queue without processing the same document twice.
 """
 
 import asyncio
 import logging
+import os
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from shared.mcp import MCPClient
+from shared.rag import LeaseHeartbeat, QueueItem, SupabaseWorkQueue, WorkQueue
+from shared.storage import get_minio_manager
 from shared.utils import get_supabase_client
 
 logger = logging.getLogger(__name__)
@@ -17,60 +22,109 @@ logger = logging.getLogger(__name__)
 class RAGQueueMonitorAgent:
     """Agent responsible for monitoring document processing queue"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        work_queue: Optional[WorkQueue] = None,
+        worker_id: Optional[str] = None,
+        lease_seconds: Optional[int] = None,
+    ):
         self.supabase = get_supabase_client()
         self.mcp_client = MCPClient()
         self.name = "queue_monitor"
         self.role = "Queue Monitor"
         self.backstory = "An efficient coordinator that ensures documents flow smoothly through the pipeline"
 
-    async def get_next_document(self) -> Optional[Dict[str, Any]]:
-        """Get the next document from the processing queue"""
+        lease_seconds = lease_seconds or int(
+            os.getenv("RAG_QUEUE_LEASE_SECONDS", "300")
+        )
+        self.work_queue = work_queue or SupabaseWorkQueue(
+            self.supabase,
+            worker_id=worker_id or os.getenv("RAG_WORKER_ID"),
+            lease_seconds=lease_seconds,
+        )
+        self.heartbeat = LeaseHeartbeat(self.work_queue, on_lost=self._on_lease_lost)
+        # Leases held by this worker, by document id
+        self.leases: Dict[str, QueueItem] = {}
+
+    async def claim_documents(self, batch_size: int = 1) -> List[Dict[str, Any]]:
+        """
+        Lease up to batch_size documents from the processing queue
+
+        The claim is atomic, so concurrent workers never receive the same
+        document. Leases are renewed in the background until the document is
+        completed, failed or requeued.
+        """
         try:
-            # Get highest priority pending document
-            result = (
-                self.supabase.table("rag_processing_queue")
-                .select("*, rag_documents!inner(*)")
-                .eq("status", "pending")
-                .order("priority", desc=True)
-                .order("created_at")
-                .limit(1)
+            items = await self.work_queue.claim(batch_size)
+            if not items:
+                return []
+
+            # One lookup for the whole batch
+            result = await asyncio.to_thread(
+                lambda: self.supabase.table("rag_documents")
+                .select("*")
+                .in_("id", [item.document_id for item in items])
                 .execute()
             )
-
-            if result.data and len(result.data) > 0:
-                queue_item = result.data[0]
-                document = queue_item["rag_documents"]
-
-                # Mark as processing
-                self.supabase.table("rag_processing_queue").update(
+            documents = {str(doc["id"]): doc for doc in result.data or []}
+
+            claimed = []
+            for item in items:
+                document = documents.get(item.document_id)
+                if document is None:
+                    await self.work_queue.fail(item, "Document not found")
+                    continue
+
+                self.leases[item.document_id] = item
+                self.heartbeat.add(item)
+                claimed.append(
                     {
-                        "status": "processing",
-                        "started_at": datetime.now().isoformat(),
-                        "attempts": queue_item["attempts"] + 1,
+                        "id": document["id"],
+                        "tenant_id": document["tenant_id"],
+                        "source_path": document["source_path"],
+                        "source_type": document["source_type"],
+                        "source_id": document["source_id"],
+                        "filename": document["filename"],
+                        "mime_type": document["mime_type"],
+                        "queue_id": item.id,
+                        "priority": item.priority,
+                        "processor_type": item.processor_type,
                     }
-                ).eq("id", queue_item["id"]).execute()
+                )
 
-                logger.info(f"Retrieved document {document['id']} from queue")
-
-                return {
-                    "id": document["id"],
-                    "tenant_id": document["tenant_id"],
-                    "source_path": document["source_path"],
-                    "source_type": document["source_type"],
-                    "source_id": document["source_id"],
-                    "filename": document["filename"],
-                    "mime_type": document["mime_type"],
-                    "queue_id": queue_item["id"],
-                    "priority": queue_item["priority"],
-                    "processor_type": queue_item["processor_type"],
-                }
-
-            return None
+            logger.info(
+                f"Claimed {len(claimed)} document(s) from queue "
+                f"as {self.work_queue.worker_id}"
+            )
+            return claimed
 
         except Exception as e:
-            logger.error(f"Error getting next document: {str(e)}")
-            return None
+            logger.error(f"Error claiming documents: {str(e)}")
+            return []
+
+    async def get_next_document(self) -> Optional[Dict[str, Any]]:
+        """Get the next document from the processing queue"""
+        documents = await self.claim_documents(1)
+        return documents[0] if documents else None
+
+    def _on_lease_lost(self, item: QueueItem):
+        if self.leases.get(item.document_id) is item:
+            del self.leases[item.document_id]
+
+    def _release_lease(self, document_id: str) -> Optional[QueueItem]:
+        item = self.leases.pop(document_id, None)
+        if item is not None:
+            self.heartbeat.discard(item.id)
+        return item
+
+    async def close(self) -> None:
+        """Stop renewing leases and hand unfinished documents back to the queue"""
+        await self.heartbeat.stop()
+        for document_id in list(self.leases):
+            item = self._release_lease(document_id)
+            await self.work_queue.release(
+                item, "Worker shut down", consume_attempt=False
+            )
 
     async def fetch_document(self, document_id: str) -> Dict[str, Any]:
         """Fetch document content and metadata"""
@@ -93,7 +147,7 @@ class RAGQueueMonitorAgent:
 
             elif document["source_type"] == "minio":
                 # Fetch from MinIO
-                content = await self._fetch_from_minio(document["source_path"])
+                content = await self._fetch_from_minio(document)
 
             else:
                 raise ValueError(f"Unknown source type: {document['source_type']}")
@@ -140,10 +194,17 @@ class RAGQueueMonitorAgent:
             logger.error(f"Error fetching from Google Drive: {str(e)}")
             raise
 
-    async def _fetch_from_minio(self, path: str) -> str:
+    async def _fetch_from_minio(self, document: Dict[str, Any]) -> str:
         """Fetch document content from MinIO"""
-        # TODO: Implement MinIO fetch
-        raise NotImplementedError("MinIO fetch not yet implemented")
+        data = await asyncio.to_thread(
+            get_minio_manager().get_document,
+            document["tenant_id"],
+            document["id"],
+            document["filename"],
+        )
+        if data is None:
+            raise FileNotFoundError(f"Document {document['id']} not found in MinIO")
+        return data.decode("utf-8", errors="replace")
 
     async def update_status(
         self, document_id: str, status: str, metadata: Dict[str, Any] = None
@@ -168,68 +229,67 @@ class RAGQueueMonitorAgent:
                 "id", document_id
             ).execute()
 
-            # Update queue status if we have queue_id
-            if metadata and "queue_id" in metadata:
-                queue_update = {
-                    "status": "completed" if status == "completed" else status,
-                    "completed_at": datetime.now().isoformat()
-                    if status == "completed"
-                    else None,
-                }
-
-                if status == "failed":
-                    queue_update["last_error"] = str(
-                        metadata.get("error", "Unknown error")
-                    )
+            # Settle the lease if this worker holds one, otherwise fall back
+            # to the queue row named in the metadata
+            if status in ("completed", "failed"):
+                item = self._release_lease(document_id)
+                error = str((metadata or {}).get("error", "Unknown error"))
+                if item is not None:
+                    if status == "completed":
+                        await self.work_queue.complete(item)
+                    else:
+                        await self.work_queue.fail(item, error)
+                elif metadata and "queue_id" in metadata:
+                    queue_update = {
+                        "status": status,
+                        "completed_at": (
+                            datetime.now().isoformat()
+                            if status == "completed"
+                            else None
+                        ),
+                        "lease_owner": None,
+                        "lease_expires_at": None,
+                    }
 
-                self.supabase.table("rag_processing_queue").update(queue_update).eq(
-                    "id", metadata["queue_id"]
-                ).execute()
+                    if status == "failed":
+                        queue_update["last_error"] = error
+
+                    (
+                        self.supabase.table("rag_processing_queue")
+                        .update(queue_update)
+                        .eq("id", metadata["queue_id"])
+                        .execute()
+                    )
 
             logger.info(f"Updated document {document_id} status to {status}")
 
         except Exception as e:
             logger.error(f"Error updating status: {str(e)}")
 
-    async def requeue_document(self, document_id: str, reason: str) -> None:
+    async def requeue_document(
+        self, document_id: str, reason: str, delay_seconds: float = 0
+    ) -> None:
         """Requeue a document for processing"""
         try:
-            # Find the queue item
-            queue_result = (
-                self.supabase.table("rag_processing_queue")
-                .select("*")
-                .eq("document_id", document_id)
-                .eq("status", "processing")
-                .single()
-                .execute()
-            )
-
-            if queue_result.data:
-                queue_item = queue_result.data
-
-                # Check if we've exceeded max attempts
-                if queue_item["attempts"] >= queue_item["max_attempts"]:
-                    await self.update_status(
-                        document_id,
-                        "failed",
-                        {
-                            "error": f"Max attempts exceeded. Last error: {reason}",
-                            "queue_id": queue_item["id"],
-                        },
-                    )
-                else:
-                    # Requeue
-                    self.supabase.table("rag_processing_queue").update(
-                        {
-                            "status": "pending",
-                            "last_error": reason,
-                            "scheduled_at": datetime.now().isoformat(),
-                        }
-                    ).eq("id", queue_item["id"]).execute()
-
-                    logger.info(
-                        f"Requeued document {document_id} (attempt {queue_item['attempts'] + 1})"
-                    )
+            item = self._release_lease(document_id)
+            if item is None:
+                logger.warning(
+                    f"Not requeuing document {document_id}: no lease held by "
+                    f"{self.work_queue.worker_id}"
+                )
+                return
+
+            status = await self.work_queue.release(item, reason, delay_seconds)
+            if status == "failed":
+                await self.update_status(
+                    document_id,
+                    "failed",
+                    {"error": f"Max attempts exceeded. Last error: {reason}"},
+                )
+            elif status == "pending":
+                logger.info(
+                    f"Requeued document {document_id} (attempt {item.attempts + 1})"
+                )
 
         except Exception as e:
             logger.error(f"Error requeuing document: {str(e)}")
@@ -3,10 +3,23 @@ Smart Chunker Agent
 Splits documents into optimal chunks while preserving context and entity boundaries.
 """
 
+import asyncio
+import codecs
 import logging
+import os
 import re
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import tiktoken
 from shared.utils import get_supabase_client
@@ -27,6 +40,185 @@ class RAGChunkConfig:
     max_chunk_size: int = 2000
 
 
+# Anything chunk_stream can read a document from
+DocumentSource = Union[str, os.PathLike, Any, Iterable[Any], AsyncIterable[Any]]
+
+# Last whitespace run plus any partial word after it
+_TRAILING_WORD = re.compile(r"\s+\S*\Z")
+
+# Rough characters per token, used to bound text carried between reads
+_CHARS_PER_TOKEN = 4
+
+# Headings recognised by structural chunking
+HEADING_PATTERN = re.compile(
+    r"^#+\s+.+$|^.+\n[=-]+$|^[A-Z][A-Z\s]+:$|^\d+\.?\s+[A-Z]", re.MULTILINE
+)
+
+
+class _SemanticPacker:
+    """Packs paragraphs into chunks, one paragraph at a time"""
+
+    def __init__(self, tokenizer, config: RAGChunkConfig):
+        self.tokenizer = tokenizer
+        self.config = config
+        self.chunk_index = 0
+        self.current_chunk: List[str] = []
+        self.current_tokens = 0
+
+    def _emit(self) -> Dict[str, Any]:
+        chunk = {
+            "chunk_index": self.chunk_index,
+            "content": "\n\n".join(self.current_chunk),
+            "token_count": self.current_tokens,
+            "type": "semantic",
+        }
+        self.chunk_index += 1
+        return chunk
+
+    def add(self, para: str) -> List[Dict[str, Any]]:
+        para_tokens = len(self.tokenizer.encode(para))
+
+        # Check if adding this paragraph exceeds chunk size
+        if self.current_tokens + para_tokens > self.config.chunk_size and (
+            self.current_chunk
+        ):
+            chunk = self._emit()
+
+            # Start new chunk with overlap
+            if self.config.overlap > 0 and len(self.current_chunk) > 1:
+                # Keep last paragraph for overlap
+                self.current_chunk = [self.current_chunk[-1], para]
+                self.current_tokens = len(
+                    self.tokenizer.encode("\n\n".join(self.current_chunk))
+                )
+            else:
+                self.current_chunk = [para]
+                self.current_tokens = para_tokens
+            return [chunk]
+
+        self.current_chunk.append(para)
+        self.current_tokens += para_tokens
+        return []
+
+    def finish(self) -> List[Dict[str, Any]]:
+        return [self._emit()] if self.current_chunk else []
+
+
+class _StructuralPacker:
+    """Packs lines into heading-delimited sections, one line at a time"""
+
+    def __init__(self, tokenizer, config: RAGChunkConfig):
+        self.tokenizer = tokenizer
+        self.config = config
+        self.chunk_index = 0
+        self.current_section: List[str] = []
+        self.current_tokens = 0
+        self.current_heading: Optional[str] = None
+
+    def _emit(self) -> Dict[str, Any]:
+        chunk = {
+            "chunk_index": self.chunk_index,
+            "content": "\n".join(self.current_section),
+            "token_count": self.current_tokens,
+            "heading": self.current_heading,
+            "type": "structural",
+        }
+        self.chunk_index += 1
+        return chunk
+
+    def add(self, line: str) -> List[Dict[str, Any]]:
+        line_tokens = len(self.tokenizer.encode(line))
+
+        if HEADING_PATTERN.match(line) and self.current_section:
+            # Save current section and start a new one at the heading
+            chunk = self._emit()
+            self.current_section = [line]
+            self.current_heading = line.strip()
+            self.current_tokens = line_tokens
+            return [chunk]
+
+        # Check size limit
+        if self.current_tokens + line_tokens > self.config.chunk_size and (
+            self.current_section
+        ):
+            chunk = self._emit()
+            self.current_section = [line]
+            self.current_tokens = line_tokens
+            return [chunk]
+
+        self.current_section.append(line)
+        self.current_tokens += line_tokens
+        return []
+
+    def finish(self) -> List[Dict[str, Any]]:
+        return [self._emit()] if self.current_section else []
+
+
+class _TokenWindower:
+    """Sliding token windows over a text stream with carry-over at boundaries"""
+
+    # Force a cut if this much text arrives without any whitespace
+    MAX_CARRY_CHARS = 1 << 20
+
+    def __init__(self, tokenizer, config: RAGChunkConfig, clean_boundaries):
+        self.tokenizer = tokenizer
+        self.config = config
+        self.clean_boundaries = clean_boundaries
+        self.step = max(1, config.chunk_size - config.overlap)
+        self.chunk_index = 0
+        self.buffer: List[int] = []
+        self.offset = 0  # Document token position of buffer[0]
+        self.carry = ""
+
+    def add(self, piece: str) -> List[Dict[str, Any]]:
+        text = self.carry + piece
+
+        # Only tokenize up to the start of the last whitespace run so no word
+        # is split across two tokenizer calls; the tail is carried over
+        tail = _TRAILING_WORD.search(text)
+        cut = tail.start() if tail else 0
+        if cut <= 0:
+            if len(text) < self.MAX_CARRY_CHARS:
+                self.carry = text
+                return []
+            cut = len(text)
+
+        self.buffer.extend(self.tokenizer.encode(text[:cut]))
+        self.carry = text[cut:]
+        return self._drain(final=False)
+
+    def _drain(self, final: bool) -> List[Dict[str, Any]]:
+        chunks = []
+        # Without `final` a full window is only cut once more tokens follow it,
+        # matching the in-memory sliding window exactly
+        while len(self.buffer) > self.config.chunk_size or (final and self.buffer):
+            window = self.buffer[: self.config.chunk_size]
+            chunks.append(
+                {
+                    "chunk_index": self.chunk_index,
+                    "content": self.clean_boundaries(self.tokenizer.decode(window)),
+                    "token_count": len(window),
+                    "start_position": self.offset,
+                    "end_position": self.offset + len(window),
+                    "type": "sliding_window",
+                }
+            )
+            self.chunk_index += 1
+
+            if len(self.buffer) <= self.config.chunk_size:
+                self.buffer = []
+                break
+            del self.buffer[: self.step]
+            self.offset += self.step
+        return chunks
+
+    def finish(self) -> List[Dict[str, Any]]:
+        if self.carry:
+            self.buffer.extend(self.tokenizer.encode(self.carry))
+            self.carry = ""
+        return self._drain(final=True)
+
+
 class RAGSmartChunkerAgent:
     """Agent responsible for intelligent document chunking"""
 
@@ -47,13 +239,7 @@ class RAGSmartChunkerAgent:
         """Chunk document using specified strategy"""
         try:
             # Create chunk configuration
-            config = ChunkConfig(
-                strategy=strategy.get("primary_strategy", "sliding_window"),
-                chunk_size=strategy.get("chunk_size", 1000),
-                overlap=strategy.get("overlap", 200),
-                preserve_entities=strategy.get("preserve_entities", preserve_entities),
-                respect_boundaries=strategy.get("respect_boundaries", []),
-            )
+            config = self._make_config(strategy, preserve_entities)
 
             # Choose chunking method
             chunks = []
@@ -81,10 +267,11 @@ class RAGSmartChunkerAgent:
                 "relationships": relationships,
                 "metadata": {
                     "strategy": config.strategy,
-                    "avg_chunk_size": sum(c["token_count"] for c in chunks)
-                    / len(chunks)
-                    if chunks
-                    else 0,
+                    "avg_chunk_size": (
+                        sum(c["token_count"] for c in chunks) / len(chunks)
+                        if chunks
+                        else 0
+                    ),
                     "total_chunks": len(chunks),
                 },
             }
@@ -94,8 +281,144 @@ class RAGSmartChunkerAgent:
             # Fallback to simple chunking
             return self._fallback_chunking(content)
 
+    def _make_config(
+        self, strategy: Dict[str, Any], preserve_entities: bool = True
+    ) -> RAGChunkConfig:
+        """Build chunk configuration from a strategy dict"""
+        return RAGChunkConfig(
+            strategy=strategy.get("primary_strategy", "sliding_window"),
+            chunk_size=strategy.get("chunk_size", 1000),
+            overlap=strategy.get("overlap", 200),
+            preserve_entities=strategy.get("preserve_entities", preserve_entities),
+            respect_boundaries=strategy.get("respect_boundaries", []),
+        )
+
+    async def chunk_stream(
+        self,
+        source: DocumentSource,
+        strategy: Dict[str, Any],
+        entities: List[Dict[str, Any]] = None,
+        preserve_entities: bool = True,
+        read_size: int = 1 << 16,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Chunk a document incrementally, yielding chunks as they are formed.
+
+        The source is read `read_size` characters at a time, so peak memory
+        stays flat with document size and the first chunks are available
+        while the rest is still being read. Chunks carry the same fields as
+        chunk(); NEXT/PREVIOUS relationships follow from chunk_index order.
+
+        Args:
+            source: File path, file-like object (including a MinIO
+                get_object response), or a sync/async iterable of str/bytes
+            strategy: Same strategy dict accepted by chunk()
+            entities: Optional extracted entities to attach to chunks
+            preserve_entities: Keep paragraphs containing entities intact
+            read_size: Characters (or bytes) read from the source per step
+        """
+        config = self._make_config(strategy, preserve_entities)
+        pieces = self._read_source(source, read_size)
+
+        max_unit_chars = config.max_chunk_size * _CHARS_PER_TOKEN
+
+        if config.strategy == "structural":
+            packer = _StructuralPacker(self.tokenizer, config)
+            units = self._split_stream(pieces, "\n", max_unit_chars)
+        elif config.strategy in ("semantic", "entity_aware"):
+            # Entity-aware streaming packs whole paragraphs, so an entity is
+            # never split unless a single paragraph exceeds the chunk size
+            packer = _SemanticPacker(self.tokenizer, config)
+            units = self._split_stream(pieces, "\n\n", max_unit_chars)
+        else:
+            packer = _TokenWindower(
+                self.tokenizer, config, self._clean_chunk_boundaries
+            )
+            units = pieces
+
+        count = 0
+        async for unit in units:
+            for chunk in packer.add(unit):
+                count += 1
+                yield self._enrich_chunks([chunk], entities)[0]
+        for chunk in packer.finish():
+            count += 1
+            yield self._enrich_chunks([chunk], entities)[0]
+
+        logger.info(f"Streamed {count} chunks using {config.strategy} strategy")
+
+    async def _read_source(
+        self, source: DocumentSource, read_size: int
+    ) -> AsyncIterator[str]:
+        """Yield decoded text pieces from any supported document source"""
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+        def decode(piece: Union[str, bytes]) -> str:
+            return decoder.decode(piece) if isinstance(piece, bytes) else piece
+
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, "r", encoding="utf-8", errors="replace") as f:
+                while True:
+                    piece = await asyncio.to_thread(f.read, read_size)
+                    if not piece:
+                        break
+                    yield piece
+            return
+
+        if hasattr(source, "read"):
+            # File-like objects and MinIO/urllib3 responses
+            try:
+                while True:
+                    piece = await asyncio.to_thread(source.read, read_size)
+                    if not piece:
+                        break
+                    yield decode(piece)
+            finally:
+                if hasattr(source, "close"):
+                    source.close()
+                if hasattr(source, "release_conn"):
+                    source.release_conn()
+        elif hasattr(source, "__aiter__"):
+            async for piece in source:
+                yield decode(piece)
+        else:
+            for piece in source:
+                yield decode(piece)
+
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+    async def _split_stream(
+        self, pieces: AsyncIterable[str], separator: str, max_chars: int
+    ) -> AsyncIterator[str]:
+        """
+        Re-split a text stream on a separator, carrying partial units over.
+
+        A unit that grows past max_chars without a separator is cut at its
+        last whitespace (or hard-cut if it has none), so the carry stays
+        bounded on documents without paragraph or line breaks.
+        """
+        carry = ""
+        pattern = re.compile(r"\n\n+") if separator == "\n\n" else None
+        async for piece in pieces:
+            carry += piece
+            parts = pattern.split(carry) if pattern else carry.split(separator)
+            # The last part may continue in the next piece
+            carry = parts.pop()
+            for part in parts:
+                yield part
+
+            while len(carry) > max_chars:
+                tail = _TRAILING_WORD.search(carry, 0, max_chars)
+                cut = tail.start() if tail and tail.start() > 0 else max_chars
+                yield carry[:cut]
+                carry = carry[cut:].lstrip()
+        # Always emit the remainder, as str.split would on the full text
+        yield carry
+
     async def _sliding_window_chunking(
-        self, content: str, config: ChunkConfig
+        self, content: str, config: RAGChunkConfig
     ) -> List[Dict[str, Any]]:
         """Traditional sliding window chunking with token awareness"""
         chunks = []
@@ -133,144 +456,40 @@ class RAGSmartChunkerAgent:
         return chunks
 
     async def _semantic_chunking(
-        self, content: str, config: ChunkConfig, entities: List[Dict[str, Any]] = None
+        self,
+        content: str,
+        config: RAGChunkConfig,
+        entities: List[Dict[str, Any]] = None,
     ) -> List[Dict[str, Any]]:
         """Chunk based on semantic boundaries (paragraphs, sections)"""
+        packer = _SemanticPacker(self.tokenizer, config)
         chunks = []
-        chunk_index = 0
 
         # Split by double newlines (paragraphs)
-        paragraphs = re.split(r"\n\n+", content)
-
-        current_chunk = []
-        current_tokens = 0
-
-        for para in paragraphs:
-            para_tokens = len(self.tokenizer.encode(para))
-
-            # Check if adding this paragraph exceeds chunk size
-            if current_tokens + para_tokens > config.chunk_size and current_chunk:
-                # Save current chunk
-                chunk_text = "\n\n".join(current_chunk)
-                chunks.append(
-                    {
-                        "chunk_index": chunk_index,
-                        "content": chunk_text,
-                        "token_count": current_tokens,
-                        "type": "semantic",
-                    }
-                )
-                chunk_index += 1
-
-                # Start new chunk with overlap
-                if config.overlap > 0 and len(current_chunk) > 1:
-                    # Keep last paragraph for overlap
-                    current_chunk = [current_chunk[-1], para]
-                    current_tokens = len(
-                        self.tokenizer.encode("\n\n".join(current_chunk))
-                    )
-                else:
-                    current_chunk = [para]
-                    current_tokens = para_tokens
-            else:
-                current_chunk.append(para)
-                current_tokens += para_tokens
-
-        # Add final chunk
-        if current_chunk:
-            chunk_text = "\n\n".join(current_chunk)
-            chunks.append(
-                {
-                    "chunk_index": chunk_index,
-                    "content": chunk_text,
-                    "token_count": current_tokens,
-                    "type": "semantic",
-                }
-            )
+        for para in re.split(r"\n\n+", content):
+            chunks.extend(packer.add(para))
+        chunks.extend(packer.finish())
 
         return chunks
 
     async def _structural_chunking(
-        self, content: str, config: ChunkConfig
+        self, content: str, config: RAGChunkConfig
     ) -> List[Dict[str, Any]]:
         """Chunk based on document structure (headings, sections)"""
+        packer = _StructuralPacker(self.tokenizer, config)
         chunks = []
-        chunk_index = 0
-
-        # Patterns for structural elements
-        heading_pattern = r"^#+\s+.+$|^.+\n[=-]+$|^[A-Z][A-Z\s]+:$|^\d+\.?\s+[A-Z]"
 
-        # Split content into lines
-        lines = content.split("\n")
-
-        current_section = []
-        current_tokens = 0
-        current_heading = None
-
-        for i, line in enumerate(lines):
-            is_heading = bool(re.match(heading_pattern, line, re.MULTILINE))
-
-            if is_heading and current_section:
-                # Save current section
-                section_text = "\n".join(current_section)
-                chunks.append(
-                    {
-                        "chunk_index": chunk_index,
-                        "content": section_text,
-                        "token_count": current_tokens,
-                        "heading": current_heading,
-                        "type": "structural",
-                    }
-                )
-                chunk_index += 1
-
-                # Start new section
-                current_section = [line]
-                current_heading = line.strip()
-                current_tokens = len(self.tokenizer.encode(line))
-            else:
-                # Add to current section
-                line_tokens = len(self.tokenizer.encode(line))
-
-                # Check size limit
-                if current_tokens + line_tokens > config.chunk_size and current_section:
-                    # Save current section
-                    section_text = "\n".join(current_section)
-                    chunks.append(
-                        {
-                            "chunk_index": chunk_index,
-                            "content": section_text,
-                            "token_count": current_tokens,
-                            "heading": current_heading,
-                            "type": "structural",
-                        }
-                    )
-                    chunk_index += 1
-
-                    # Start new section
-                    current_section = [line]
-                    current_tokens = line_tokens
-                else:
-                    current_section.append(line)
-                    current_tokens += line_tokens
-
-        # Add final section
-        if current_section:
-            section_text = "\n".join(current_section)
-            chunks.append(
-                {
-                    "chunk_index": chunk_index,
-                    "content": section_text,
-                    "token_count": current_tokens,
-                    "heading": current_heading,
-                    "type": "structural",
-                }
-            )
+        for line in content.split("\n"):
+            chunks.extend(packer.add(line))
+        chunks.extend(packer.finish())
 
         return chunks
 
     async def _entity_aware_chunking(
-        self, content: str, config: ChunkConfig, entities: List[Dict[str, Any]] = None
+        self,
+        content: str,
+        config: RAGChunkConfig,
+        entities: List[Dict[str, Any]] = None,
     ) -> List[Dict[str, Any]]:
         """Chunk while preserving entity boundaries"""
         if not entities:
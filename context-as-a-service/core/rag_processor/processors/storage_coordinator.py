@@ -1,27 +1,99 @@
 """
 Storage Coordinator Agent
 Manages storage across multiple systems (Qdrant, Neo4j, Supabase) and ensures consistency.
+Large point sets are upserted in concurrent batches and chunk -> vector
+mappings are written back to Supabase in bulk. Storing a document invalidates
+the tenant's cached search results.
 """
 
 import asyncio
 import json
 import logging
 import os
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from qdrant_client import QdrantClient
+from qdrant_client import AsyncQdrantClient
 from qdrant_client.models import Distance, PointStruct, VectorParams
+from shared.rag import invalidate_retrieval_cache
 from shared.utils import get_supabase_client
 
 logger = logging.getLogger(__name__)
 
+PAYLOAD_TRUNCATION_MODES = ("chars", "word", "none")
+
+
+@dataclass
+class StorageConfig:
+    """Batching and payload limits for vector storage"""
+
+    # Points per Qdrant upsert request and how many requests run at once
+    upsert_batch_size: int = 256
+    upsert_concurrency: int = 4
+    # Rows per Supabase request when syncing chunk -> vector mappings
+    chunk_sync_page_size: int = 1000
+    # How chunk text is cut down for the Qdrant payload: "chars" cuts at
+    # payload_content_chars, "word" backs up to the last whitespace before
+    # it, "none" stores the full text
+    payload_truncation: str = "chars"
+    payload_content_chars: int = 1000
+    # Entities copied into the payload; 0 keeps them all
+    payload_max_entities: int = 0
+
+    @classmethod
+    def from_env(cls) -> "StorageConfig":
+        return cls(
+            upsert_batch_size=int(
+                os.getenv("RAG_QDRANT_BATCH_SIZE", cls.upsert_batch_size)
+            ),
+            upsert_concurrency=int(
+                os.getenv("RAG_QDRANT_CONCURRENCY", cls.upsert_concurrency)
+            ),
+            chunk_sync_page_size=int(
+                os.getenv("RAG_CHUNK_SYNC_PAGE_SIZE", cls.chunk_sync_page_size)
+            ),
+            payload_truncation=os.getenv(
+                "RAG_PAYLOAD_TRUNCATION", cls.payload_truncation
+            ),
+            payload_content_chars=int(
+                os.getenv("RAG_PAYLOAD_CONTENT_CHARS", cls.payload_content_chars)
+            ),
+            payload_max_entities=int(
+                os.getenv("RAG_PAYLOAD_MAX_ENTITIES", cls.payload_max_entities)
+            ),
+        )
+
+    def truncate_content(self, content: str) -> Tuple[str, bool]:
+        """Apply the payload truncation policy; returns (text, truncated)"""
+        limit = self.payload_content_chars
+        if self.payload_truncation == "none" or len(content) <= limit:
+            return content, False
+
+        truncated = content[:limit]
+        if self.payload_truncation == "word":
+            # Drop the trailing partial word, whatever whitespace precedes it
+            words = truncated.rstrip().rsplit(None, 1)
+            if len(words) == 2:
+                truncated = words[0]
+        return truncated, True
+
+    def truncate_entities(self, entities: List[Any]) -> List[Any]:
+        if self.payload_max_entities > 0:
+            return entities[: self.payload_max_entities]
+        return entities
+
 
 class RAGStorageCoordinatorAgent:
     """Agent responsible for coordinating storage across multiple systems"""
 
-    def __init__(self):
+    def __init__(self, config: Optional[StorageConfig] = None):
         self.supabase = get_supabase_client()
+        self.config = config or StorageConfig.from_env()
+        if self.config.payload_truncation not in PAYLOAD_TRUNCATION_MODES:
+            raise ValueError(
+                f"Unknown payload truncation mode: {self.config.payload_truncation}"
+            )
         self.name = "storage_coordinator"
         self.role = "Storage Coordinator"
         self.backstory = "A meticulous organizer who ensures nothing is lost and everything is findable"
@@ -40,7 +112,7 @@ class RAGStorageCoordinatorAgent:
     async def initialize(self):
         """Initialize connections"""
         if not self.qdrant_client:
-            self.qdrant_client = QdrantClient(
+            self.qdrant_client = AsyncQdrantClient(
                 url=self.qdrant_url, api_key=self.qdrant_api_key
             )
 
@@ -85,23 +157,31 @@ class RAGStorageCoordinatorAgent:
             # Prepare points for Qdrant
             points = []
             vector_ids = []
+            created_at = datetime.now().isoformat()
 
             for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
                 # Generate unique ID
                 point_id = f"{document_id}_{chunk['chunk_index']}"
                 vector_ids.append(point_id)
 
+                content, content_truncated = self.config.truncate_content(
+                    chunk["content"]
+                )
+
                 # Prepare payload with metadata
                 payload = {
                     "tenant_id": tenant_id,
                     "document_id": document_id,
                     "chunk_index": chunk["chunk_index"],
                     "chunk_type": chunk.get("type", "unknown"),
-                    "content": chunk["content"][:1000],  # Truncate for storage
+                    "content": content,
+                    "content_truncated": content_truncated,
                     "token_count": chunk.get("token_count", 0),
-                    "entities": chunk.get("entities", []),
+                    "entities": self.config.truncate_entities(
+                        chunk.get("entities", [])
+                    ),
                     "entity_count": chunk.get("entity_count", 0),
-                    "created_at": datetime.now().isoformat(),
+                    "created_at": created_at,
                 }
 
                 # Add heading for structural chunks
@@ -117,16 +197,12 @@ class RAGStorageCoordinatorAgent:
 
             # Batch upload to Qdrant
             collection_name = self.collections["documents"]
-            await self.qdrant_client.upsert(
-                collection_name=collection_name, points=points
-            )
+            await self._upsert_points(collection_name, points)
 
-            # Update chunk records in Supabase
-            for chunk, vector_id in zip(chunks, vector_ids):
-                if "id" in chunk:
-                    self.supabase.table("rag_document_chunks").update(
-                        {"vector_id": vector_id, "collection_name": collection_name}
-                    ).eq("id", chunk["id"]).execute()
+            # Record chunk -> vector mappings in Supabase
+            await self._sync_chunk_vectors(
+                tenant_id, document_id, chunks, vector_ids, collection_name
+            )
 
             logger.info(f"Stored {len(points)} embeddings in Qdrant")
 
@@ -139,6 +215,70 @@ class RAGStorageCoordinatorAgent:
         except Exception as e:
             logger.error(f"Error storing embeddings: {str(e)}")
             raise
+        finally:
+            # Even a partial write changes what searches return
+            invalidate_retrieval_cache(tenant_id, document_id)
+
+    async def _upsert_points(
+        self, collection_name: str, points: List[PointStruct]
+    ) -> None:
+        """Upsert points, split into concurrent batches for large sets"""
+        batch_size = max(1, self.config.upsert_batch_size)
+        if len(points) <= batch_size:
+            await self.qdrant_client.upsert(
+                collection_name=collection_name, points=points
+            )
+            return
+
+        semaphore = asyncio.Semaphore(max(1, self.config.upsert_concurrency))
+
+        async def upsert_batch(batch: List[PointStruct]):
+            async with semaphore:
+                await self.qdrant_client.upsert(
+                    collection_name=collection_name, points=batch
+                )
+
+        await asyncio.gather(
+            *(
+                upsert_batch(points[start : start + batch_size])
+                for start in range(0, len(points), batch_size)
+            )
+        )
+
+    async def _sync_chunk_vectors(
+        self,
+        tenant_id: str,
+        document_id: str,
+        chunks: List[Dict[str, Any]],
+        vector_ids: List[str],
+        collection_name: str,
+    ) -> None:
+        """Upsert vector ids onto chunk records in bulk, off the event loop"""
+        rows = [
+            {
+                "id": chunk["id"],
+                "document_id": document_id,
+                "tenant_id": tenant_id,
+                "chunk_index": chunk["chunk_index"],
+                "content": chunk["content"],
+                "vector_id": vector_id,
+                "collection_name": collection_name,
+            }
+            for chunk, vector_id in zip(chunks, vector_ids)
+            if "id" in chunk
+        ]
+        if not rows:
+            return
+
+        page_size = max(1, self.config.chunk_sync_page_size)
+
+        def upsert_rows():
+            for start in range(0, len(rows), page_size):
+                self.supabase.table("rag_document_chunks").upsert(
+                    rows[start : start + page_size], on_conflict="id"
+                ).execute()
+
+        await asyncio.to_thread(upsert_rows)
 
     async def store_entity_embeddings(
         self, tenant_id: str, entity_embeddings: List[Dict[str, Any]]
@@ -201,8 +341,14 @@ class RAGStorageCoordinatorAgent:
         tenant_id: str,
         limit: int = 10,
         filters: Optional[Dict[str, Any]] = None,
+        raise_errors: bool = False,
     ) -> List[Dict[str, Any]]:
-        """Search for similar chunks in Qdrant"""
+        """
+        Search for similar chunks in Qdrant
+
+        Errors are logged and give an empty result, unless raise_errors is
+        set so the caller can tell a failed search from one without hits.
+        """
         try:
             await self.initialize()
 
@@ -239,6 +385,8 @@ class RAGStorageCoordinatorAgent:
 
         except Exception as e:
             logger.error(f"Error searching chunks: {str(e)}")
+            if raise_errors:
+                raise
             return []
 
     async def coordinate_storage(
@@ -6,12 +6,13 @@ Exposes HTTP endpoints for A2A communication and health checks.
 import asyncio
 import logging
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import uvicorn
 from fastapi import BackgroundTasks, FastAPI, HTTPException
 from main import health_check
 from pydantic import BaseModel
+from shared.rag import HybridRetriever
 from workflows.document_pipeline import workflow
 
 # Setup logging
@@ -53,6 +54,8 @@ class SearchRequest(BaseModel):
     limit: Optional[int] = 10
     filters: Optional[Dict[str, Any]] = {}
     include_entities: Optional[bool] = True
+    expand_graph: Optional[bool] = None
+    use_cache: Optional[bool] = True
 
 
 class StatusResponse(BaseModel):
@@ -68,6 +71,19 @@ class StatusResponse(BaseModel):
 # Background task queue for document processing
 processing_tasks = {}
 
+# Hybrid retriever shared by all search requests, so its caches persist
+retriever: Optional[HybridRetriever] = None
+
+
+def get_retriever() -> HybridRetriever:
+    """Create the shared retriever on first use"""
+    global retriever
+    if retriever is None:
+        from processors import embedding_generator, storage_coordinator
+
+        retriever = HybridRetriever(embedding_generator, storage_coordinator)
+    return retriever
+
 
 @app.get("/")
 async def root():
@@ -221,9 +237,9 @@ async def get_status(document_id: str):
                     "processing_started_at": doc.get("processing_started_at"),
                     "processing_completed_at": doc.get("processing_completed_at"),
                 },
-                errors=[doc.get("processing_error")]
-                if doc.get("processing_error")
-                else [],
+                errors=(
+                    [doc.get("processing_error")] if doc.get("processing_error") else []
+                ),
                 completed_at=doc.get("processing_completed_at"),
             )
         else:
@@ -238,17 +254,14 @@ async def get_status(document_id: str):
 async def search_documents(request: SearchRequest):
     """Search processed documents"""
     try:
-        from agents.embedding_generator import EmbeddingGeneratorAgent
-        from agents.storage_coordinator import StorageCoordinatorAgent
-
-        # Generate query embedding
-        embedding_agent = EmbeddingGeneratorAgent()
-        query_embedding = await embedding_agent.generate_query_embedding(request.query)
-
-        # Search in Qdrant
-        storage_agent = StorageCoordinatorAgent()
-        results = await storage_agent.search_similar_chunks(
-            query_embedding, request.tenant_id, request.limit, request.filters
+        # Vector + keyword search, cached per tenant
+        response = await get_retriever().search(
+            request.query,
+            request.tenant_id,
+            request.limit,
+            request.filters,
+            expand_graph=request.expand_graph,
+            use_cache=request.use_cache,
         )
 
         # Enrich with entities if requested
@@ -256,7 +269,7 @@ async def search_documents(request: SearchRequest):
             # TODO: Add entity enrichment from Neo4j
             pass
 
-        return {"query": request.query, "results": results, "total": len(results)}
+        return response
 
     except Exception as e:
         logger.error(f"Search error: {str(e)}")
@@ -315,7 +328,8 @@ async def shutdown_event():
     logger.info("Shutting down RAG Processor Team API")
 
     # Cleanup connections
-    # TODO: Add cleanup logic
+    if retriever is not None:
+        await retriever.close()
 
 
 async def process_queue_background():
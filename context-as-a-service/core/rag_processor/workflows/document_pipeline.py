@@ -6,6 +6,9 @@ queue monitoring through entity extraction, chunking, embedding, and storage.
 
 import asyncio
 import logging
+import os
+import random
+import time
 from datetime import datetime
 from enum import Enum
 from typing import Any, Dict, List, Optional, TypedDict
@@ -15,7 +18,7 @@ from langgraph.graph import END, StateGraph
 from langgraph.prebuilt import ToolNode
 
 # Import our agents
-from agents import (
+from processors import (
     document_classifier,
     embedding_generator,
     entity_extractor,
@@ -24,11 +27,44 @@ from agents import (
     smart_chunker,
     storage_coordinator,
 )
+from shared.storage import get_minio_manager
+from workflows.pipeline_executor import StagedPipelineExecutor, StageSpec
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Default worker count per pipeline stage; override with RAG_STAGE_WORKERS,
+# e.g. "classify=6,extract=6,store=4"
+DEFAULT_STAGE_WORKERS = {
+    "fetch": 2,
+    "classify": 4,
+    "extract": 4,
+    "chunk": 2,
+    "embed": 2,
+    "store": 4,
+    "complete": 2,
+}
+
+# Delay before the queue offers a failed document to a worker again
+QUEUE_RETRY_DELAY_SECONDS = 60
+
+# MinIO documents at least this large are chunked from a stream instead of
+# from the in-memory content
+STREAM_CHUNKING_MIN_BYTES = int(
+    os.getenv("RAG_STREAM_CHUNKING_MIN_BYTES", str(8 * 1024 * 1024))
+)
+
+
+def _stage_workers_from_env() -> Dict[str, int]:
+    """Parse per-stage worker counts from the environment"""
+    workers = dict(DEFAULT_STAGE_WORKERS)
+    for entry in os.getenv("RAG_STAGE_WORKERS", "").split(","):
+        if "=" in entry:
+            name, count = entry.split("=", 1)
+            workers[name.strip()] = max(1, int(count))
+    return workers
+
 
 class ProcessingState(str, Enum):
     """Document processing states"""
@@ -250,13 +286,31 @@ class RAGProcessingWorkflow:
             )
             state["chunking_strategy"] = strategy["primary_strategy"]
 
-            # Chunk document
-            chunking_result = await smart_chunker.chunk(
-                content=state["content"],
-                strategy=strategy,
-                entities=state["extracted_entities"],
-                preserve_entities=strategy.get("preserve_entities", True),
-            )
+            # Chunk document, streaming large documents straight from storage
+            document_stream = await self._open_document_stream(state)
+            if document_stream is not None:
+                chunks = [
+                    chunk
+                    async for chunk in smart_chunker.chunk_stream(
+                        document_stream,
+                        strategy=strategy,
+                        entities=state["extracted_entities"],
+                        preserve_entities=strategy.get("preserve_entities", True),
+                    )
+                ]
+                chunking_result = {
+                    "chunks": chunks,
+                    "relationships": await smart_chunker.create_chunk_relationships(
+                        chunks
+                    ),
+                }
+            else:
+                chunking_result = await smart_chunker.chunk(
+                    content=state["content"],
+                    strategy=strategy,
+                    entities=state["extracted_entities"],
+                    preserve_entities=strategy.get("preserve_entities", True),
+                )
 
             state["chunks"] = chunking_result["chunks"]
             state["chunk_relationships"] = chunking_result["relationships"]
@@ -274,6 +328,21 @@ class RAGProcessingWorkflow:
 
         return state
 
+    async def _open_document_stream(self, state: DocumentState):
+        """Open a MinIO stream for documents large enough to chunk incrementally"""
+        metadata = state["metadata"]
+        if metadata.get("source_type") != "minio":
+            return None
+        if (metadata.get("size_bytes") or 0) < STREAM_CHUNKING_MIN_BYTES:
+            return None
+
+        return await asyncio.to_thread(
+            get_minio_manager().get_document_stream,
+            state["tenant_id"],
+            state["document_id"],
+            metadata["filename"],
+        )
+
     async def generate_embeddings_node(self, state: DocumentState) -> DocumentState:
         """Generate embeddings for chunks"""
         logger.info(f"Generating embeddings for document {state['document_id']}")
@@ -410,11 +479,60 @@ class RAGProcessingWorkflow:
             logger.error(f"Max retries reached for document {state['document_id']}")
             return "fail"
 
-    async def process_document(
+    def build_pipeline_executor(
+        self,
+        stage_workers: Optional[Dict[str, int]] = None,
+        queue_size: int = 8,
+    ) -> StagedPipelineExecutor:
+        """
+        Build a staged executor that runs many documents concurrently.
+
+        Each node becomes a stage with its own worker pool and a bounded
+        input queue, so different documents can be classified, extracted
+        and stored at the same time.
+        """
+        workers = {**_stage_workers_from_env(), **(stage_workers or {})}
+        nodes = [
+            ("fetch", self.monitor_queue_node),
+            ("classify", self.classify_document_node),
+            ("extract", self.extract_entities_node),
+            ("chunk", self.chunk_document_node),
+            ("embed", self.generate_embeddings_node),
+            ("store", self.store_results_node),
+            ("complete", self.complete_processing_node),
+        ]
+        stages = [
+            StageSpec(
+                name=name,
+                handler=handler,
+                workers=workers.get(name, 1),
+                queue_size=queue_size,
+            )
+            for name, handler in nodes
+        ]
+        return StagedPipelineExecutor(stages, on_failure=self._on_pipeline_failure)
+
+    async def _on_pipeline_failure(self, state: DocumentState) -> Optional[str]:
+        """Record a stage failure and decide whether to retry the document"""
+        await self.handle_error_node(state)
+        if self.should_retry(state) == "retry":
+            return "fetch"
+
+        # Out of in-process retries: hand the lease back so the queue can
+        # retry later (or fail the document once its attempts are used up)
+        latest_error = state["errors"][-1] if state["errors"] else {}
+        await queue_monitor.requeue_document(
+            state["document_id"],
+            str(latest_error.get("error", "Unknown error")),
+            delay_seconds=QUEUE_RETRY_DELAY_SECONDS,
+        )
+        return None
+
+    def _initial_state(
         self, document_id: str, tenant_id: str, source_path: str
-    ) -> Dict[str, Any]:
-        """Process a single document through the pipeline"""
-        initial_state: DocumentState = {
+    ) -> DocumentState:
+        """Create the starting state for a document"""
+        return {
             "document_id": document_id,
             "tenant_id": tenant_id,
             "source_path": source_path,
@@ -441,6 +559,12 @@ class RAGProcessingWorkflow:
             "max_retries": 3,
         }
 
+    async def process_document(
+        self, document_id: str, tenant_id: str, source_path: str
+    ) -> Dict[str, Any]:
+        """Process a single document through the pipeline"""
+        initial_state = self._initial_state(document_id, tenant_id, source_path)
+
         # Run the workflow
         result = await self.workflow.ainvoke(
             initial_state, {"configurable": {"thread_id": document_id}}
@@ -453,36 +577,59 @@ class RAGProcessingWorkflow:
 workflow = RAGProcessingWorkflow()
 
 
-async def process_document_queue():
+async def process_document_queue(
+    stage_workers: Optional[Dict[str, int]] = None,
+    stats_interval: float = 60.0,
+    batch_size: Optional[int] = None,
+    poll_interval: float = 10.0,
+):
     """Main entry point - continuously process documents from queue"""
     logger.info("Starting RAG document processor")
 
-    while True:
-        try:
-            # Get next document from queue
-            next_doc = await queue_monitor.get_next_document()
-
-            if next_doc:
-                logger.info(f"Processing document: {next_doc['id']}")
-
-                # Process through workflow
-                result = await workflow.process_document(
-                    document_id=next_doc["id"],
-                    tenant_id=next_doc["tenant_id"],
-                    source_path=next_doc["source_path"],
-                )
-
-                if result["current_state"] == ProcessingState.COMPLETED:
-                    logger.info(f"Successfully processed document {next_doc['id']}")
-                else:
-                    logger.error(f"Failed to process document {next_doc['id']}")
-            else:
-                # No documents in queue, wait
-                await asyncio.sleep(10)
-
-        except Exception as e:
-            logger.error(f"Queue processing error: {str(e)}")
-            await asyncio.sleep(30)
+    executor = workflow.build_pipeline_executor(stage_workers)
+    await executor.start()
+    first_stage = executor.queues[executor.stages[0].name]
+    batch_size = batch_size or int(
+        os.getenv("RAG_QUEUE_BATCH_SIZE", str(first_stage.maxsize))
+    )
+    last_stats = time.monotonic()
+
+    try:
+        while True:
+            try:
+                # Claim only what the first stage can take, so leased
+                # documents do not sit idle while other workers go hungry
+                free_slots = first_stage.maxsize - first_stage.qsize()
+                capacity = max(1, min(batch_size, free_slots))
+                documents = await queue_monitor.claim_documents(capacity)
+
+                for doc in documents:
+                    logger.info(f"Queueing document: {doc['id']}")
+
+                    # Blocks while the first stage is full (backpressure)
+                    await executor.submit(
+                        workflow._initial_state(
+                            document_id=doc["id"],
+                            tenant_id=doc["tenant_id"],
+                            source_path=doc["source_path"],
+                        )
+                    )
+
+                if not documents:
+                    # No documents in queue; jitter the wait so idle workers
+                    # do not poll in lock-step
+                    await asyncio.sleep(poll_interval * random.uniform(0.5, 1.5))
+
+                if time.monotonic() - last_stats >= stats_interval:
+                    logger.info(f"Pipeline stage stats: {executor.get_stats()}")
+                    last_stats = time.monotonic()
+
+            except Exception as e:
+                logger.error(f"Queue processing error: {str(e)}")
+                await asyncio.sleep(30)
+    finally:
+        await executor.stop()
+        await queue_monitor.close()
 
 
 if __name__ == "__main__":
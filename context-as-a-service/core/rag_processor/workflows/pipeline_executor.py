@@ -0,0 +1,210 @@
+"""
+Staged Pipeline Executor
+Runs many documents through the processing stages concurrently.
+
+Each stage has its own worker pool and a bounded input queue. A document
+moves to the next stage's queue as soon as its current stage finishes, so
+LLM-bound stages (classify, extract) and I/O-bound stages (store) work on
+different documents at the same time. Full queues block upstream workers,
+which gives natural backpressure all the way back to the queue poller.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+StageHandler = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+@dataclass
+class StageSpec:
+    """Definition of a pipeline stage"""
+
+    name: str
+    handler: StageHandler
+    workers: int = 1
+    queue_size: int = 8
+
+
+@dataclass
+class StageStats:
+    """Latency and throughput counters for one stage"""
+
+    processed: int = 0
+    failed: int = 0
+    busy_seconds: float = 0.0
+    wait_seconds: float = 0.0
+    max_latency: float = 0.0
+    started_at: float = field(default_factory=time.monotonic)
+
+    def record(self, latency: float, waited: float, failed: bool):
+        self.processed += 1
+        if failed:
+            self.failed += 1
+        self.busy_seconds += latency
+        self.wait_seconds += waited
+        self.max_latency = max(self.max_latency, latency)
+
+    def snapshot(self, queue_depth: int, workers: int) -> Dict[str, Any]:
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        return {
+            "processed": self.processed,
+            "failed": self.failed,
+            "queue_depth": queue_depth,
+            "workers": workers,
+            "avg_latency_seconds": (
+                self.busy_seconds / self.processed if self.processed else 0.0
+            ),
+            "max_latency_seconds": self.max_latency,
+            "avg_queue_wait_seconds": (
+                self.wait_seconds / self.processed if self.processed else 0.0
+            ),
+            "throughput_per_minute": self.processed * 60 / elapsed,
+            "utilization": self.busy_seconds / (elapsed * workers),
+        }
+
+
+class StagedPipelineExecutor:
+    """Bounded-queue, multi-worker executor for a linear chain of stages"""
+
+    def __init__(
+        self,
+        stages: List[StageSpec],
+        on_failure: Optional[
+            Callable[[Dict[str, Any]], Awaitable[Optional[str]]]
+        ] = None,
+        on_complete: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+    ):
+        """
+        Args:
+            stages: Stages in processing order. A stage fails an item by
+                raising or by appending to the item's "errors" list.
+            on_failure: Called with a failed item; may return the name of a
+                stage to re-enqueue it at (retry), or None to drop it
+            on_complete: Called with each item that passed every stage
+        """
+        self.stages = stages
+        self.on_failure = on_failure
+        self.on_complete = on_complete
+
+        self.queues: Dict[str, asyncio.Queue] = {}
+        self.stats: Dict[str, StageStats] = {}
+        self._workers: List[asyncio.Task] = []
+        self._retries: Set[asyncio.Task] = set()
+        self._in_flight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    async def start(self):
+        """Create queues and start every stage's worker pool"""
+        for spec in self.stages:
+            self.queues[spec.name] = asyncio.Queue(maxsize=spec.queue_size)
+            self.stats[spec.name] = StageStats()
+
+        for index, spec in enumerate(self.stages):
+            for worker_id in range(spec.workers):
+                self._workers.append(
+                    asyncio.create_task(
+                        self._run_worker(index, spec),
+                        name=f"pipeline-{spec.name}-{worker_id}",
+                    )
+                )
+
+        logger.info(
+            "Started pipeline: "
+            + ", ".join(f"{s.name}x{s.workers}" for s in self.stages)
+        )
+
+    async def submit(self, item: Dict[str, Any]):
+        """Add an item at the first stage; waits while that queue is full"""
+        self._in_flight += 1
+        self._idle.clear()
+        await self.queues[self.stages[0].name].put((item, time.monotonic()))
+
+    async def join(self):
+        """Wait until every submitted item has finished or failed"""
+        await self._idle.wait()
+
+    async def stop(self):
+        """Cancel all workers and pending retry hand-offs"""
+        tasks = self._workers + list(self._retries)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._retries.clear()
+
+    def _finish_item(self):
+        self._in_flight -= 1
+        if self._in_flight == 0:
+            self._idle.set()
+
+    async def _run_worker(self, index: int, spec: StageSpec):
+        queue = self.queues[spec.name]
+        stats = self.stats[spec.name]
+        next_queue = (
+            self.queues[self.stages[index + 1].name]
+            if index + 1 < len(self.stages)
+            else None
+        )
+
+        while True:
+            item, enqueued_at = await queue.get()
+            started = time.monotonic()
+            errors_before = len(item.get("errors", []))
+            failed = False
+
+            try:
+                item = await spec.handler(item)
+                failed = len(item.get("errors", [])) > errors_before
+            except Exception as e:
+                logger.error(f"Stage {spec.name} raised: {str(e)}")
+                item.setdefault("errors", []).append(
+                    {"stage": spec.name, "error": str(e)}
+                )
+                failed = True
+            finally:
+                latency = time.monotonic() - started
+                stats.record(latency, started - enqueued_at, failed)
+                queue.task_done()
+
+            try:
+                if failed:
+                    await self._handle_failure(item)
+                elif next_queue is not None:
+                    # Blocks while the next stage is saturated (backpressure)
+                    await next_queue.put((item, time.monotonic()))
+                else:
+                    if self.on_complete:
+                        await self.on_complete(item)
+                    self._finish_item()
+            except Exception as e:
+                logger.error(f"Pipeline hand-off after {spec.name} failed: {e}")
+                self._finish_item()
+
+    async def _handle_failure(self, item: Dict[str, Any]):
+        retry_stage = await self.on_failure(item) if self.on_failure else None
+        if retry_stage:
+            # Re-enqueue without blocking this worker: waiting on an upstream
+            # queue from downstream could deadlock a saturated pipeline
+            task = asyncio.create_task(
+                self.queues[retry_stage].put((item, time.monotonic()))
+            )
+            self._retries.add(task)
+            task.add_done_callback(self._retries.discard)
+        else:
+            self._finish_item()
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-stage latency, throughput, utilization and queue depth"""
+        return {
+            spec.name: self.stats[spec.name].snapshot(
+                self.queues[spec.name].qsize(), spec.workers
+            )
+            for spec in self.stages
+            if spec.name in self.stats
+        }
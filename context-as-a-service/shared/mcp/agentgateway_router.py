@@ -4,16 +4,14 @@ AgentGateway MCP Router
 Handles routing of MCP requests through AgentGateway with:
 - Dynamic server discovery
 - Protocol translation (stdio/http/sse)
+- Multiplexed stdio sessions with optional worker pools
 - Credential injection
 - Load balancing
 - Health checking
 """
 
-import asyncio
-import json
 import logging
 import os
-import subprocess
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -22,6 +20,7 @@ from typing import Any, Dict, List, Optional, Tuple
 import httpx
 
 from .discovery import MCPServerInfo
+from .stdio_transport import StdioProcessPool
 
 logger = logging.getLogger(__name__)
 
@@ -31,7 +30,7 @@ class MCPServerInstance:
     """Running instance of an MCP server"""
 
     server_info: MCPServerInfo
-    process: Optional[subprocess.Popen] = None
+    stdio_pool: Optional[StdioProcessPool] = None
     endpoint: Optional[str] = None
     started_at: Optional[datetime] = None
     last_health_check: Optional[datetime] = None
@@ -57,6 +56,8 @@ class MCPRouter:
         self,
         gateway_config: Optional[Dict] = None,
         credential_resolver: Optional[Any] = None,
+        stdio_workers: int = 1,
+        stdio_request_timeout: float = 30.0,
     ):
         """
         Initialize MCP Router
@@ -64,9 +65,14 @@ class MCPRouter:
         Args:
             gateway_config: AgentGateway configuration
             credential_resolver: Function to resolve credential placeholders
+            stdio_workers: Default number of processes per stdio server; a
+                target can override it with "workers" in its stdio config
+            stdio_request_timeout: Seconds to wait for a stdio response
         """
         self.config = gateway_config or {}
         self.credential_resolver = credential_resolver
+        self.stdio_workers = stdio_workers
+        self.stdio_request_timeout = stdio_request_timeout
         self._instances: Dict[str, MCPServerInstance] = {}
         self._http_client = httpx.AsyncClient(timeout=30.0)
 
@@ -98,7 +104,9 @@ class MCPRouter:
             )
 
             # Start stdio server
-            instance = await self._start_stdio_server(server_info)
+            instance = await self._start_stdio_server(
+                server_info, stdio_config.get("workers", self.stdio_workers)
+            )
 
         elif "http" in target_config:
             http_config = target_config["http"]
@@ -129,9 +137,9 @@ class MCPRouter:
         logger.info(f"Started MCP server: {name} ({server_info.protocol})")
 
     async def _start_stdio_server(
-        self, server_info: MCPServerInfo
+        self, server_info: MCPServerInfo, workers: int = 1
     ) -> MCPServerInstance:
-        """Start a stdio-based MCP server"""
+        """Start a stdio-based MCP server as a pool of worker processes"""
         instance = MCPServerInstance(server_info=server_info)
 
         # Resolve environment variables
@@ -153,29 +161,21 @@ class MCPRouter:
         # Build command
         cmd = [server_info.command] + server_info.args
 
-        # Start process
+        # Start processes
         try:
-            process = subprocess.Popen(
+            pool = StdioProcessPool(
+                server_info.name,
                 cmd,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                env={**os.environ, **env},
-                text=True,
+                {**os.environ, **env},
+                size=workers,
+                request_timeout=self.stdio_request_timeout,
             )
+            await pool.start()
 
-            instance.process = process
+            instance.stdio_pool = pool
             instance.started_at = datetime.now()
             instance.health_status = "healthy"  # Assume healthy on start
 
-            # Give it a moment to start
-            await asyncio.sleep(0.5)
-
-            # Check if it's still running
-            if process.poll() is not None:
-                stderr = process.stderr.read() if process.stderr else ""
-                raise Exception(f"Process exited immediately: {stderr}")
-
         except Exception as e:
             logger.error(f"Failed to start stdio server {server_info.name}: {e}")
             instance.health_status = "unhealthy"
@@ -231,28 +231,11 @@ class MCPRouter:
         self, instance: MCPServerInstance, method: str, params: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Route request to stdio-based MCP server"""
-        if not instance.process:
+        if not instance.stdio_pool:
             raise Exception("No process for stdio server")
 
-        # Build JSON-RPC request
-        request = {
-            "jsonrpc": "2.0",
-            "method": method,
-            "params": params,
-            "id": f"{instance.server_info.name}-{instance.request_count}",
-        }
-
-        # Send request
-        request_json = json.dumps(request) + "\n"
-        instance.process.stdin.write(request_json)
-        instance.process.stdin.flush()
-
-        # Read response
-        response_line = instance.process.stdout.readline()
-        if not response_line:
-            raise Exception("No response from stdio server")
-
-        response = json.loads(response_line.strip())
+        # Dispatched to the least-loaded worker; other calls proceed meanwhile
+        response = await instance.stdio_pool.request(method, params)
 
         # Extract result or error
         if "error" in response:
@@ -290,8 +273,10 @@ class MCPRouter:
 
         try:
             if instance.server_info.protocol == "stdio":
-                # Check if process is still running
-                if instance.process and instance.process.poll() is None:
+                # Replace crashed workers, healthy while any is running
+                if instance.stdio_pool:
+                    await instance.stdio_pool.restart_dead()
+                if instance.stdio_pool and instance.stdio_pool.is_healthy:
                     instance.health_status = "healthy"
                 else:
                     instance.health_status = "unhealthy"
@@ -323,6 +308,9 @@ class MCPRouter:
                     "status": instance.health_status,
                     "requests": instance.request_count,
                     "errors": instance.error_count,
+                    "in_flight": instance.stdio_pool.in_flight
+                    if instance.stdio_pool
+                    else 0,
                     "uptime": str(datetime.now() - instance.started_at)
                     if instance.started_at
                     else "N/A",
@@ -343,13 +331,9 @@ class MCPRouter:
     async def shutdown(self):
         """Shutdown all MCP servers"""
         for name, instance in self._instances.items():
-            if instance.process:
+            if instance.stdio_pool:
                 logger.info(f"Stopping MCP server: {name}")
-                instance.process.terminate()
-                try:
-                    instance.process.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    instance.process.kill()
+                await instance.stdio_pool.close()
 
         await self._http_client.aclose()
 
@@ -17,7 +17,8 @@ from typing import Any, Dict, List, Optional
 import httpx
 
 from ..credentials.credential_manager import CredentialManager, CredentialType
-from .discovery import MCPDiscovery, MCPServerInfo
+from ..utils.http_transport import create_http_client, run_sync
+from .discovery import MCPServerInfo, get_shared_discovery
 
 logger = logging.getLogger(__name__)
 
@@ -69,10 +70,11 @@ class MCPClient:
         if team_id:
             headers["X-Team-ID"] = team_id
 
-        self.client = httpx.AsyncClient(timeout=timeout, headers=headers)
+        # Lightweight client over the process-wide connection pools
+        self.client = create_http_client(timeout=timeout, headers=headers)
 
-        # Initialize discovery service
-        self.discovery = MCPDiscovery(use_agentgateway=True)
+        # Process-wide discovery snapshot, shared by every client
+        self.discovery = get_shared_discovery()
         self._available_servers: Dict[str, MCPServerInfo] = {}
 
         if auto_discover:
@@ -182,11 +184,11 @@ class MCPClient:
         logger.warning("Could not auto-discover AgentGateway, using default")
         return "http://agentgateway.dev"
 
-    async def _async_discover(self):
+    async def _async_discover(self, force: bool = False):
         """Run server discovery asynchronously"""
         try:
             self._available_servers = await asyncio.to_thread(
-                self.discovery.discover_all
+                self.discovery.discover_all, force
             )
             logger.info(f"Discovered {len(self._available_servers)} MCP servers")
         except Exception as e:
@@ -194,7 +196,7 @@ class MCPClient:
 
     async def refresh_servers(self) -> Dict[str, MCPServerInfo]:
         """Manually refresh the list of available servers"""
-        await self._async_discover()
+        await self._async_discover(force=True)
         return self._available_servers
 
     def get_available_servers(self) -> List[str]:
@@ -260,29 +262,34 @@ class MCPClient:
 
 # Synchronous wrapper for teams that aren't async
 class SyncMCPClient:
-    """Synchronous wrapper for MCPClient"""
+    """
+    Synchronous wrapper for MCPClient
+
+    Calls run on the shared background event loop, so every sync client in
+    the process reuses one loop and its pooled connections.
+    """
 
     def __init__(self, *args, **kwargs):
-        self._client = MCPClient(*args, **kwargs)
-        self._loop = asyncio.new_event_loop()
+        async def create() -> MCPClient:
+            # Constructed on the loop so background discovery can start
+            return MCPClient(*args, **kwargs)
+
+        self._client = run_sync(create())
 
     def call_tool(
         self, server: str, tool: str, arguments: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Synchronous version of call_tool"""
-        return self._loop.run_until_complete(
-            self._client.call_tool(server, tool, arguments)
-        )
+        return run_sync(self._client.call_tool(server, tool, arguments))
 
     def list_tools(self, server: str) -> List[Dict[str, Any]]:
         """Synchronous version of list_tools"""
-        return self._loop.run_until_complete(self._client.list_tools(server))
+        return run_sync(self._client.list_tools(server))
 
     def list_servers(self) -> List[str]:
         """Synchronous version of list_servers"""
-        return self._loop.run_until_complete(self._client.list_servers())
+        return run_sync(self._client.list_servers())
 
     def close(self):
         """Close the client"""
-        self._loop.run_until_complete(self._client.close())
-        self._loop.close()
+        run_sync(self._client.close())
@@ -0,0 +1,223 @@
+"""
+Async stdio transport for MCP servers
+
+Talks JSON-RPC to stdio MCP servers without blocking the event loop:
+- Non-blocking pipes via asyncio subprocesses
+- A reader task per process that matches responses to requests by id
+- Many requests in flight per process
+- Optional pool of worker processes per server with least-loaded dispatch
+"""
+
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Large tool results arrive on a single line; raise asyncio's 64 KiB default
+STREAM_LIMIT = 16 * 1024 * 1024
+
+
+class StdioConnection:
+    """One stdio MCP server process with multiplexed JSON-RPC requests"""
+
+    def __init__(
+        self,
+        name: str,
+        command: List[str],
+        env: Dict[str, str],
+        request_timeout: float = 30.0,
+    ):
+        self.name = name
+        self.command = command
+        self.env = env
+        self.request_timeout = request_timeout
+
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._next_id = 0
+        self._write_lock = asyncio.Lock()
+        self._reader_task: Optional[asyncio.Task] = None
+        self._stderr_task: Optional[asyncio.Task] = None
+        self._stderr_tail: Deque[str] = deque(maxlen=50)
+
+    @property
+    def is_alive(self) -> bool:
+        return (
+            self.process is not None
+            and self.process.returncode is None
+            and self._reader_task is not None
+            and not self._reader_task.done()
+        )
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    @property
+    def stderr_tail(self) -> str:
+        return "\n".join(self._stderr_tail)
+
+    async def start(self):
+        """Spawn the process and start the reader tasks"""
+        self.process = await asyncio.create_subprocess_exec(
+            *self.command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=self.env,
+            limit=STREAM_LIMIT,
+        )
+        self._reader_task = asyncio.create_task(self._read_responses())
+        # Keep stderr drained so a chatty server can't fill the pipe and stall
+        self._stderr_task = asyncio.create_task(self._drain_stderr())
+
+    async def request(
+        self, method: str, params: Dict[str, Any], timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Send a JSON-RPC request and wait for the matching response"""
+        if not self.is_alive:
+            raise ConnectionError(f"stdio server {self.name} is not running")
+
+        self._next_id += 1
+        request_id = f"{self.name}-{self._next_id}"
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+
+        request = {
+            "jsonrpc": "2.0",
+            "method": method,
+            "params": params,
+            "id": request_id,
+        }
+
+        try:
+            async with self._write_lock:
+                self.process.stdin.write((json.dumps(request) + "\n").encode())
+                await self.process.stdin.drain()
+            return await asyncio.wait_for(
+                future, timeout if timeout is not None else self.request_timeout
+            )
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _read_responses(self):
+        """Resolve pending requests as responses arrive, in any order"""
+        try:
+            while True:
+                line = await self.process.stdout.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    logger.debug(f"Ignoring non-JSON output from {self.name}")
+                    continue
+
+                # Notifications and server-initiated requests have no pending id
+                future = self._pending.get(str(message.get("id")))
+                if future and not future.done():
+                    future.set_result(message)
+        except Exception as e:
+            logger.error(f"Reader for stdio server {self.name} failed: {e}")
+        finally:
+            error = ConnectionError(f"stdio server {self.name} closed its output")
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
+
+    async def _drain_stderr(self):
+        while True:
+            line = await self.process.stderr.readline()
+            if not line:
+                return
+            self._stderr_tail.append(line.decode(errors="replace").rstrip())
+
+    async def close(self, timeout: float = 5.0):
+        """Terminate the process, killing it if it does not exit in time"""
+        if self.process and self.process.returncode is None:
+            self.process.terminate()
+            try:
+                await asyncio.wait_for(self.process.wait(), timeout)
+            except asyncio.TimeoutError:
+                self.process.kill()
+                await self.process.wait()
+
+        for task in (self._reader_task, self._stderr_task):
+            if task and not task.done():
+                task.cancel()
+
+
+class StdioProcessPool:
+    """Pool of identical stdio server processes with least-loaded dispatch"""
+
+    def __init__(
+        self,
+        name: str,
+        command: List[str],
+        env: Dict[str, str],
+        size: int = 1,
+        request_timeout: float = 30.0,
+    ):
+        self.name = name
+        self.connections = [
+            StdioConnection(
+                f"{name}-{index}" if size > 1 else name,
+                command,
+                env,
+                request_timeout,
+            )
+            for index in range(max(1, size))
+        ]
+
+    @property
+    def is_healthy(self) -> bool:
+        return any(connection.is_alive for connection in self.connections)
+
+    @property
+    def in_flight(self) -> int:
+        return sum(connection.in_flight for connection in self.connections)
+
+    async def start(self, startup_grace: float = 0.5):
+        """Start every worker and fail if any exits immediately"""
+        await asyncio.gather(*(c.start() for c in self.connections))
+
+        # Give them a moment to start
+        await asyncio.sleep(startup_grace)
+
+        for connection in self.connections:
+            if connection.process.returncode is not None:
+                await self.close()
+                raise Exception(f"Process exited immediately: {connection.stderr_tail}")
+
+    async def restart_dead(self) -> int:
+        """Restart workers whose process has exited; returns how many"""
+        restarted = 0
+        for connection in self.connections:
+            if connection.is_alive:
+                continue
+            logger.warning(f"Restarting stdio worker {connection.name}")
+            await connection.close()
+            try:
+                await connection.start()
+                restarted += 1
+            except Exception as e:
+                logger.error(f"Failed to restart stdio worker {connection.name}: {e}")
+        return restarted
+
+    async def request(
+        self, method: str, params: Dict[str, Any], timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Send a request to the live worker with the fewest requests in flight"""
+        alive = [c for c in self.connections if c.is_alive]
+        if not alive:
+            raise ConnectionError(f"No running workers for stdio server {self.name}")
+        connection = min(alive, key=lambda c: c.in_flight)
+        return await connection.request(method, params, timeout)
+
+    async def close(self):
+        await asyncio.gather(
+            *(c.close() for c in self.connections), return_exceptions=True
+        )
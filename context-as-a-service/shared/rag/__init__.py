@@ -2,6 +2,51 @@
 RAG (Retrieval-Augmented Generation) shared utilities
 """
 
+from .embedding_scheduler import (
+    EmbeddingCache,
+    EmbeddingScheduler,
+    SchedulerConfig,
+    TokenBucket,
+    get_embedding_scheduler,
+)
+from .graph_writer import GraphBatchWriter, label_expression, quote_label
 from .rag_health_monitor import Alert, ComponentHealth, HealthStatus, RAGHealthMonitor
+from .retrieval import (
+    BM25Index,
+    HybridRetriever,
+    ResultCache,
+    RetrievalConfig,
+    invalidate_retrieval_cache,
+)
+from .work_queue import (
+    LeaseHeartbeat,
+    QueueItem,
+    SQLiteWorkQueue,
+    SupabaseWorkQueue,
+    WorkQueue,
+)
 
-__all__ = ["RAGHealthMonitor", "HealthStatus", "ComponentHealth", "Alert"]
+__all__ = [
+    "RAGHealthMonitor",
+    "HealthStatus",
+    "ComponentHealth",
+    "Alert",
+    "EmbeddingScheduler",
+    "EmbeddingCache",
+    "SchedulerConfig",
+    "TokenBucket",
+    "get_embedding_scheduler",
+    "WorkQueue",
+    "SupabaseWorkQueue",
+    "SQLiteWorkQueue",
+    "QueueItem",
+    "LeaseHeartbeat",
+    "GraphBatchWriter",
+    "label_expression",
+    "quote_label",
+    "HybridRetriever",
+    "RetrievalConfig",
+    "ResultCache",
+    "BM25Index",
+    "invalidate_retrieval_cache",
+]
@@ -0,0 +1,306 @@
+"""
+Embedding Scheduler
+Rate-limit-aware, concurrent embedding requests for the RAG pipeline.
+
+Features:
+- Token-bucket limiting on both requests/minute and tokens/minute, shared by
+  every caller in the process
+- Batches sized by token count instead of chunk count
+- Several batches in flight at once under a concurrency limit
+- One pooled AsyncOpenAI client per event loop, reused for every request
+- Content-addressed cache so identical texts are embedded once
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import random
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _for_running_loop(store: "weakref.WeakKeyDictionary", factory):
+    """Return the object in `store` for the running event loop, creating it"""
+    loop = asyncio.get_running_loop()
+    value = store.get(loop)
+    if value is None:
+        value = store[loop] = factory()
+    return value
+
+
+class TokenBucket:
+    """Async token bucket refilled continuously at a per-minute rate"""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        # asyncio locks bind to the loop that first uses them
+        self._locks: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+    def _refill(self, now: float):
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+    async def acquire(self, amount: float = 1.0):
+        """Wait until `amount` tokens are available, then take them"""
+        # A single request larger than the bucket can never fit; cap it
+        amount = min(amount, self.capacity)
+        async with _for_running_loop(self._locks, asyncio.Lock):
+            while True:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        """Stop handing out tokens for a while (e.g. after a 429)"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+
+class EmbeddingCache:
+    """Content-addressed LRU of embeddings keyed by model and text"""
+
+    def __init__(self, max_entries: int = 50_000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\0{text}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[List[float]]:
+        embedding = self._entries.get(key)
+        if embedding is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return embedding
+
+    def put(self, key: str, embedding: List[float]):
+        self._entries[key] = embedding
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+@dataclass
+class SchedulerConfig:
+    """Limits for the embedding scheduler"""
+
+    requests_per_minute: float = 3000
+    tokens_per_minute: float = 1_000_000
+    max_concurrency: int = 8
+    max_batch_tokens: int = 8000
+    max_batch_items: int = 256
+    max_retries: int = 5
+    cache_size: int = 50_000
+
+    @classmethod
+    def from_env(cls) -> "SchedulerConfig":
+        return cls(
+            requests_per_minute=float(
+                os.getenv("EMBEDDING_RPM", cls.requests_per_minute)
+            ),
+            tokens_per_minute=float(os.getenv("EMBEDDING_TPM", cls.tokens_per_minute)),
+            max_concurrency=int(
+                os.getenv("EMBEDDING_CONCURRENCY", cls.max_concurrency)
+            ),
+            max_batch_tokens=int(
+                os.getenv("EMBEDDING_BATCH_TOKENS", cls.max_batch_tokens)
+            ),
+        )
+
+
+class EmbeddingScheduler:
+    """Schedules embedding batches under shared rate limits"""
+
+    def __init__(self, config: Optional[SchedulerConfig] = None, client=None):
+        self.config = config or SchedulerConfig.from_env()
+        self.request_bucket = TokenBucket(self.config.requests_per_minute)
+        self.token_bucket = TokenBucket(self.config.tokens_per_minute)
+        self.cache = EmbeddingCache(self.config.cache_size)
+        self._client = client
+        # Semaphores and pooled clients are bound to one event loop, so each
+        # loop that uses the scheduler gets its own; the limits stay shared
+        self._semaphores: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        self._clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        self._encoder = None
+        self.stats = {"batches": 0, "rate_limited": 0, "failed_batches": 0}
+
+    @property
+    def client(self):
+        """Pooled AsyncOpenAI client for the running loop, created on first use"""
+        if self._client is not None:
+            return self._client
+        import openai
+
+        return _for_running_loop(
+            self._clients, lambda: openai.AsyncOpenAI(max_retries=0)
+        )
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """Concurrency limit for batches sent from the running loop"""
+        return _for_running_loop(
+            self._semaphores, lambda: asyncio.Semaphore(self.config.max_concurrency)
+        )
+
+    def count_tokens(self, text: str) -> int:
+        """Count tokens with tiktoken when available, else estimate"""
+        if self._encoder is None:
+            try:
+                import tiktoken
+
+                self._encoder = tiktoken.get_encoding("cl100k_base")
+            except Exception:
+                self._encoder = False
+        if self._encoder:
+            return len(self._encoder.encode(text, disallowed_special=()))
+        # Rough estimate: 1 token ≈ 4 characters
+        return len(text) // 4 + 1
+
+    def _make_batches(self, texts: Sequence[str]) -> List[Tuple[List[int], int]]:
+        """Group text indices into batches bounded by token count"""
+        batches: List[Tuple[List[int], int]] = []
+        current: List[int] = []
+        current_tokens = 0
+        for i, text in enumerate(texts):
+            tokens = self.count_tokens(text)
+            if current and (
+                current_tokens + tokens > self.config.max_batch_tokens
+                or len(current) >= self.config.max_batch_items
+            ):
+                batches.append((current, current_tokens))
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            batches.append((current, current_tokens))
+        return batches
+
+    async def embed(
+        self, texts: Sequence[str], model: str
+    ) -> List[Optional[List[float]]]:
+        """
+        Embed texts, returning one embedding (or None on failure) per text.
+
+        Identical texts and texts embedded earlier are served from the cache.
+        """
+        embeddings, _ = await self.embed_with_errors(texts, model)
+        return embeddings
+
+    async def embed_with_errors(
+        self, texts: Sequence[str], model: str
+    ) -> Tuple[List[Optional[List[float]]], List[Optional[str]]]:
+        """Like `embed`, also returning the error message for each failed text"""
+        keys = [EmbeddingCache.key(model, text) for text in texts]
+        results: Dict[str, Optional[List[float]]] = {}
+        errors: Dict[str, str] = {}
+        unique: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key in results or key in unique:
+                continue
+            cached = self.cache.get(key)
+            if cached is not None:
+                results[key] = cached
+            else:
+                unique[key] = text
+
+        pending_keys = list(unique.keys())
+        pending_texts = list(unique.values())
+        batches = self._make_batches(pending_texts)
+
+        async def run(batch: List[int], tokens: int):
+            batch_texts = [pending_texts[i] for i in batch]
+            embeddings, error = await self._embed_batch(batch_texts, model, tokens)
+            for i, embedding in zip(batch, embeddings):
+                results[pending_keys[i]] = embedding
+                if embedding is not None:
+                    self.cache.put(pending_keys[i], embedding)
+                elif error:
+                    errors[pending_keys[i]] = error
+
+        await asyncio.gather(*(run(batch, tokens) for batch, tokens in batches))
+
+        logger.info(
+            f"Embedded {len(texts)} texts ({len(pending_texts)} unique uncached) "
+            f"in {len(batches)} batches"
+        )
+        return [results.get(key) for key in keys], [errors.get(key) for key in keys]
+
+    async def _embed_batch(
+        self, texts: List[str], model: str, tokens: int
+    ) -> Tuple[List[Optional[List[float]]], Optional[str]]:
+        """Send one batch, retrying rate limits with shared backoff"""
+        import openai
+
+        for attempt in range(self.config.max_retries):
+            await self.request_bucket.acquire(1)
+            await self.token_bucket.acquire(tokens)
+            try:
+                async with self.semaphore:
+                    response = await self.client.embeddings.create(
+                        input=texts, model=model
+                    )
+                self.stats["batches"] += 1
+                data = sorted(response.data, key=lambda item: item.index)
+                return [item.embedding for item in data], None
+
+            except openai.RateLimitError as e:
+                self.stats["rate_limited"] += 1
+                delay = self._retry_after(e) or min(60, 2**attempt) + random.random()
+                logger.warning(f"Rate limit hit, pausing all batches for {delay:.1f}s")
+                # Pause the shared limiter so other in-flight batches back off too
+                self.request_bucket.pause(delay)
+                self.token_bucket.pause(delay)
+
+            except Exception as e:
+                self.stats["failed_batches"] += 1
+                logger.error(f"Embedding batch of {len(texts)} failed: {str(e)}")
+                return [None] * len(texts), str(e)
+
+        self.stats["failed_batches"] += 1
+        message = f"Embedding batch still rate limited after {attempt + 1} tries"
+        logger.error(message)
+        return [None] * len(texts), message
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        """Read the Retry-After header from a rate limit error, if present"""
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None) or {}
+        try:
+            return float(headers.get("retry-after"))
+        except (TypeError, ValueError):
+            return None
+
+
+_scheduler: Optional[EmbeddingScheduler] = None
+
+
+def get_embedding_scheduler() -> EmbeddingScheduler:
+    """Process-wide scheduler so every agent shares one limiter and client"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = EmbeddingScheduler()
+    return _scheduler
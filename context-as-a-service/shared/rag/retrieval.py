@@ -0,0 +1,815 @@
+"""
+Hybrid Retrieval
+Query-time layer over the RAG vector store.
+
+Features:
+- Memoized query embeddings keyed by normalized query text, with concurrent
+  identical queries sharing one embedding call
+- Tenant-scoped result cache, invalidated when a tenant's documents are
+  (re)stored; responses from a search where a retrieval step failed are not
+  cached
+- BM25 keyword scoring over chunk text, fused with vector scores
+- Optional graph expansion through Neo4j chunk and shared-entity neighbors
+- Per-stage latency timings on every response
+
+Invalidation only reaches retrievers in the process that stored the
+documents. Other processes (e.g. more server replicas) see a write once
+their cached results expire and their keyword index is refreshed, i.e.
+within result_cache_ttl + index_refresh_seconds; keep both short when
+documents are stored by a separate worker.
+"""
+
+import asyncio
+import hashlib
+import heapq
+import json
+import logging
+import math
+import os
+import re
+import time
+import weakref
+from collections import Counter, OrderedDict, defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+from .embedding_scheduler import EmbeddingCache
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+# (document_id, chunk_index) identifies a chunk across Qdrant, Supabase and Neo4j
+ChunkKey = Tuple[str, int]
+
+GRAPH_NEIGHBORS_QUERY = """
+UNWIND $seeds AS seed
+MATCH (c:Chunk {document_id: seed.document_id, index: seed.chunk_index})
+CALL {
+    WITH c
+    MATCH (c)-[r]-(n:Chunk)
+    RETURN n, type(r) AS via
+    UNION ALL
+    WITH c
+    MATCH (c)<-[:APPEARS_IN]-(:Entity)-[:APPEARS_IN]->(n:Chunk)
+    RETURN n, "SHARED_ENTITY" AS via
+}
+WITH seed, n.document_id AS document_id, n.index AS chunk_index,
+     count(*) AS weight, collect(DISTINCT via) AS via
+WHERE document_id <> seed.document_id OR chunk_index <> seed.chunk_index
+WITH seed, document_id, chunk_index, weight, via
+ORDER BY weight DESC
+WITH seed, collect({document_id: document_id, chunk_index: chunk_index, via: via})[..$per_seed] AS neighbors
+RETURN seed.position AS position, neighbors
+"""
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens used for BM25"""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def normalize_query(query: str) -> str:
+    """Collapse case and whitespace so trivially different queries share cache"""
+    return " ".join(query.lower().split())
+
+
+class BM25Index:
+    """Incremental Okapi BM25 over tokenized text"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[Hashable, int]] = defaultdict(dict)
+        self._lengths: Dict[Hashable, int] = {}
+        self._terms: Dict[Hashable, Tuple[str, ...]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._lengths
+
+    def add(self, key: Hashable, text: str):
+        """Index text under key, replacing anything indexed there before"""
+        self.remove(key)
+        counts = Counter(tokenize(text))
+        for term, frequency in counts.items():
+            self._postings[term][key] = frequency
+        self._terms[key] = tuple(counts)
+        self._lengths[key] = sum(counts.values())
+        self._total_length += self._lengths[key]
+
+    def remove(self, key: Hashable):
+        terms = self._terms.pop(key, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(key, None)
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._lengths.pop(key)
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        accept: Optional[Callable[[Hashable], bool]] = None,
+    ) -> List[Tuple[Hashable, float]]:
+        """Top `limit` (key, score) pairs, optionally restricted by `accept`"""
+        count = len(self._lengths)
+        if not count:
+            return []
+
+        average_length = self._total_length / count or 1.0
+        scores: Dict[Hashable, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for key, frequency in postings.items():
+                norm = self.k1 * (
+                    1 - self.b + self.b * self._lengths[key] / average_length
+                )
+                scores[key] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+        items = scores.items()
+        if accept is not None:
+            items = [(key, score) for key, score in items if accept(key)]
+        return heapq.nlargest(limit, items, key=lambda item: item[1])
+
+
+class ResultCache:
+    """
+    Tenant-scoped LRU of search responses with a TTL
+
+    Each tenant has a generation counter that invalidation bumps. A search
+    records the generation it started under and its result is only stored
+    if nothing was invalidated in the meantime.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl_seconds: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._tenant_keys: Dict[str, Set[str]] = defaultdict(set)
+        self._generations: Dict[str, int] = defaultdict(int)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(*parts: Any) -> str:
+        encoded = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(encoded.encode()).hexdigest()
+
+    def generation(self, tenant_id: str) -> int:
+        return self._generations[tenant_id]
+
+    def get(self, tenant_id: str, key: str) -> Optional[Any]:
+        entry = self._entries.get((tenant_id, key))
+        if entry is None or entry[0] < self.clock():
+            if entry is not None:
+                self._drop((tenant_id, key))
+            self.misses += 1
+            return None
+        self._entries.move_to_end((tenant_id, key))
+        self.hits += 1
+        return entry[1]
+
+    def put(
+        self, tenant_id: str, key: str, value: Any, generation: Optional[int] = None
+    ):
+        if generation is not None and generation != self._generations[tenant_id]:
+            return
+        self._entries[(tenant_id, key)] = (self.clock() + self.ttl_seconds, value)
+        self._entries.move_to_end((tenant_id, key))
+        self._tenant_keys[tenant_id].add(key)
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+
+    def invalidate(self, tenant_id: str) -> int:
+        """Drop every cached response for a tenant; returns how many"""
+        self._generations[tenant_id] += 1
+        keys = self._tenant_keys.pop(tenant_id, set())
+        for key in keys:
+            self._entries.pop((tenant_id, key), None)
+        return len(keys)
+
+    def _drop(self, entry_key: Tuple[str, str]):
+        self._entries.pop(entry_key, None)
+        tenant_id, key = entry_key
+        keys = self._tenant_keys.get(tenant_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._tenant_keys[tenant_id]
+
+
+@dataclass
+class RetrievalConfig:
+    """Candidate pools, fusion weights and cache limits for hybrid retrieval"""
+
+    # Candidates taken from each retriever per requested result
+    candidate_multiplier: int = 4
+    # Weight of the normalized vector score; the keyword score gets the rest
+    vector_weight: float = 0.7
+    keyword_search: bool = True
+    bm25_k1: float = 1.5
+    bm25_b: float = 0.75
+    # Graph expansion: neighbors of the top seeds, scored at seed score * decay
+    graph_expansion: bool = False
+    graph_seeds: int = 5
+    graph_neighbors: int = 3
+    graph_decay: float = 0.5
+    result_cache_size: int = 10_000
+    # Also bounds how stale a result can be when documents are stored in
+    # another process, which invalidation does not reach
+    result_cache_ttl: float = 60.0
+    query_cache_size: int = 10_000
+    # Tenants whose keyword index is kept in memory at once, and how long an
+    # index is trusted before a rebuild picks up writes from other processes
+    max_indexed_tenants: int = 32
+    index_refresh_seconds: float = 300.0
+    index_page_size: int = 1000
+
+    @classmethod
+    def from_env(cls) -> "RetrievalConfig":
+        return cls(
+            vector_weight=float(
+                os.getenv("RAG_RETRIEVAL_VECTOR_WEIGHT", cls.vector_weight)
+            ),
+            keyword_search=os.getenv("RAG_RETRIEVAL_KEYWORD", "true").lower() == "true",
+            graph_expansion=os.getenv("RAG_RETRIEVAL_GRAPH", "false").lower() == "true",
+            result_cache_size=int(
+                os.getenv("RAG_RETRIEVAL_CACHE_SIZE", cls.result_cache_size)
+            ),
+            result_cache_ttl=float(
+                os.getenv("RAG_RETRIEVAL_CACHE_TTL", cls.result_cache_ttl)
+            ),
+            index_refresh_seconds=float(
+                os.getenv("RAG_RETRIEVAL_INDEX_REFRESH", cls.index_refresh_seconds)
+            ),
+        )
+
+
+class _TenantIndex:
+    """Keyword index and chunk row lookup for one tenant"""
+
+    def __init__(self, k1: float, b: float):
+        self.bm25 = BM25Index(k1, b)
+        # chunk key -> (rag_document_chunks id, Qdrant point id)
+        self.rows: Dict[ChunkKey, Tuple[Any, Any]] = {}
+        self.by_document: Dict[str, Set[ChunkKey]] = defaultdict(set)
+        self.stale_documents: Set[str] = set()
+        self.loaded_at: Optional[float] = None
+        self.lock = asyncio.Lock()
+
+    def add(self, row: Dict[str, Any]):
+        key = (str(row["document_id"]), int(row["chunk_index"]))
+        self.bm25.add(key, row.get("content") or "")
+        self.rows[key] = (row.get("id"), row.get("vector_id"))
+        self.by_document[key[0]].add(key)
+
+    def remove_document(self, document_id: str):
+        for key in self.by_document.pop(document_id, set()):
+            self.bm25.remove(key)
+            self.rows.pop(key, None)
+
+
+class _Timer:
+    """Collects per-stage durations in milliseconds"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.timings: Dict[str, float] = {}
+
+    def stage(self, name: str, started: float):
+        elapsed = (time.perf_counter() - started) * 1000
+        self.timings[name] = round(self.timings.get(name, 0.0) + elapsed, 2)
+
+    def finish(self) -> Dict[str, float]:
+        self.stage("total", self.started)
+        return self.timings
+
+
+_retrievers: "weakref.WeakSet[HybridRetriever]" = weakref.WeakSet()
+
+
+def invalidate_retrieval_cache(tenant_id: str, document_id: Optional[str] = None):
+    """
+    Invalidate cached results (and keyword index entries) in this process
+
+    Retrievers in other processes are not reached; they pick up the change
+    through the result TTL and index refresh in RetrievalConfig.
+    """
+    for retriever in list(_retrievers):
+        retriever.invalidate(tenant_id, document_id)
+
+
+class HybridRetriever:
+    """
+    Hybrid vector + keyword retrieval with caching
+
+    `embedder` needs `generate_query_embedding(query)` and `storage` needs
+    `search_similar_chunks(query_embedding, tenant_id, limit, filters,
+    raise_errors=True)`, as provided by the embedding generator and storage
+    coordinator agents.
+    """
+
+    def __init__(
+        self,
+        embedder,
+        storage,
+        config: Optional[RetrievalConfig] = None,
+        supabase=None,
+        neo4j_driver=None,
+    ):
+        self.embedder = embedder
+        self.storage = storage
+        self.config = config or RetrievalConfig.from_env()
+        self._supabase = supabase
+        self._neo4j_driver = neo4j_driver
+        self._owns_driver = False
+
+        self.result_cache = ResultCache(
+            self.config.result_cache_size, self.config.result_cache_ttl
+        )
+        self.query_cache = EmbeddingCache(self.config.query_cache_size)
+        self._pending_embeddings: Dict[str, asyncio.Future] = {}
+        self._indexes: "OrderedDict[str, _TenantIndex]" = OrderedDict()
+        self.stats = {
+            "searches": 0,
+            "cache_hits": 0,
+            "degraded": 0,
+            "graph_errors": 0,
+        }
+
+        _retrievers.add(self)
+
+    @property
+    def supabase(self):
+        if self._supabase is None:
+            from shared.utils import get_supabase_client
+
+            self._supabase = get_supabase_client()
+        return self._supabase
+
+    @property
+    def neo4j_driver(self):
+        """Async Neo4j driver, created from the environment on first use"""
+        if self._neo4j_driver is None:
+            from neo4j import AsyncGraphDatabase
+
+            self._neo4j_driver = AsyncGraphDatabase.driver(
+                os.getenv("NEO4J_URI", "bolt://localhost:7687"),
+                auth=(os.getenv("NEO4J_USER", "neo4j"), os.getenv("NEO4J_PASSWORD")),
+            )
+            self._owns_driver = True
+        return self._neo4j_driver
+
+    def invalidate(self, tenant_id: str, document_id: Optional[str] = None):
+        """
+        Forget cached results for a tenant
+
+        With a document id only that document is reloaded into the keyword
+        index on the next search; without one the whole index is rebuilt.
+        """
+        self.result_cache.invalidate(tenant_id)
+        index = self._indexes.get(tenant_id)
+        if index is None:
+            return
+        if document_id is None:
+            del self._indexes[tenant_id]
+        else:
+            index.stale_documents.add(str(document_id))
+
+    async def search(
+        self,
+        query: str,
+        tenant_id: str,
+        limit: int = 10,
+        filters: Optional[Dict[str, Any]] = None,
+        expand_graph: Optional[bool] = None,
+        use_cache: bool = True,
+    ) -> Dict[str, Any]:
+        """Search a tenant's chunks, returning ranked results and timings"""
+        timer = _Timer()
+        self.stats["searches"] += 1
+        expand_graph = (
+            self.config.graph_expansion if expand_graph is None else expand_graph
+        )
+
+        cache_key = ResultCache.key(
+            normalize_query(query), limit, filters or {}, expand_graph
+        )
+        if use_cache:
+            started = time.perf_counter()
+            cached = self.result_cache.get(tenant_id, cache_key)
+            timer.stage("cache", started)
+            if cached is not None:
+                self.stats["cache_hits"] += 1
+                return {
+                    "query": query,
+                    "results": [dict(result) for result in cached],
+                    "total": len(cached),
+                    "cached": True,
+                    "degraded": False,
+                    "timings": timer.finish(),
+                }
+        generation = self.result_cache.generation(tenant_id)
+
+        pool = max(limit, limit * self.config.candidate_multiplier)
+        needs_index = self.config.keyword_search or expand_graph
+
+        # The keyword side does not need the query embedding, so it runs
+        # alongside embedding + vector search
+        searches = [self._vector_search(query, tenant_id, pool, filters, timer)]
+        if needs_index:
+            searches.append(
+                self._keyword_search(query, tenant_id, pool, filters, timer)
+            )
+        (vector_hits, degraded), *keyword = await asyncio.gather(*searches)
+        keyword_hits: List[Tuple[ChunkKey, float]] = []
+        if keyword:
+            keyword_hits, keyword_degraded = keyword[0]
+            degraded = degraded or keyword_degraded
+
+        started = time.perf_counter()
+        results = self._fuse(vector_hits, keyword_hits)
+        timer.stage("fusion", started)
+
+        index = self._indexes.get(tenant_id) if needs_index else None
+        if expand_graph and results and index is not None:
+            started = time.perf_counter()
+            results, graph_degraded = await self._expand_graph(results, index, filters)
+            degraded = degraded or graph_degraded
+            timer.stage("graph", started)
+
+        results = results[:limit]
+        started = time.perf_counter()
+        if not await self._hydrate(results, index):
+            degraded = True
+        timer.stage("hydrate", started)
+
+        # A partial answer is returned but not cached, so the next search
+        # retries the failed step instead of serving it for a whole TTL
+        if degraded:
+            self.stats["degraded"] += 1
+        elif use_cache:
+            self.result_cache.put(tenant_id, cache_key, results, generation)
+
+        return {
+            "query": query,
+            "results": [dict(result) for result in results],
+            "total": len(results),
+            "cached": False,
+            "degraded": degraded,
+            "timings": timer.finish(),
+        }
+
+    async def embed_query(self, query: str) -> List[float]:
+        """Query embedding, memoized and shared by concurrent identical queries"""
+        model = getattr(self.embedder, "default_model", "")
+        key = EmbeddingCache.key(model, normalize_query(query))
+
+        embedding = self.query_cache.get(key)
+        if embedding is not None:
+            return embedding
+
+        pending = self._pending_embeddings.get(key)
+        if pending is not None:
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise  # this caller was cancelled
+                # The caller computing it was cancelled; compute it here
+                return await self.embed_query(query)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending_embeddings[key] = future
+        try:
+            embedding = await self.embedder.generate_query_embedding(query)
+            if embedding:
+                self.query_cache.put(key, embedding)
+            future.set_result(embedding)
+            return embedding
+        except Exception as e:
+            future.set_exception(e)
+            # Retrieve it so an unawaited future does not log a warning
+            future.exception()
+            raise
+        finally:
+            if not future.done():
+                # Cancelled before a result; waiters must not hang on it
+                future.cancel()
+            del self._pending_embeddings[key]
+
+    async def _vector_search(
+        self,
+        query: str,
+        tenant_id: str,
+        pool: int,
+        filters: Optional[Dict[str, Any]],
+        timer: _Timer,
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """Vector hits, and whether the search failed (degraded)"""
+        started = time.perf_counter()
+        try:
+            embedding = await self.embed_query(query)
+        except Exception as e:
+            logger.error(f"Error embedding query: {str(e)}")
+            return [], True
+        finally:
+            timer.stage("embedding", started)
+        if not embedding:
+            return [], True
+
+        started = time.perf_counter()
+        try:
+            hits = await self.storage.search_similar_chunks(
+                embedding, tenant_id, pool, filters, raise_errors=True
+            )
+        except Exception as e:
+            logger.error(f"Error in vector search for {tenant_id}: {str(e)}")
+            return [], True
+        finally:
+            timer.stage("vector", started)
+        return hits, False
+
+    async def _keyword_search(
+        self,
+        query: str,
+        tenant_id: str,
+        pool: int,
+        filters: Optional[Dict[str, Any]],
+        timer: _Timer,
+    ) -> Tuple[List[Tuple[ChunkKey, float]], bool]:
+        """Keyword hits, and whether loading the index failed (degraded)"""
+        started = time.perf_counter()
+        try:
+            index = await self._tenant_index(tenant_id)
+        except Exception as e:
+            logger.error(f"Error loading keyword index for {tenant_id}: {str(e)}")
+            return [], True
+        finally:
+            timer.stage("index", started)
+
+        if not self.config.keyword_search:
+            return [], False
+
+        accept = _filter_predicate(filters)
+        if accept is False:
+            # Filters on fields the index does not hold; rely on vector hits
+            return [], False
+
+        started = time.perf_counter()
+        hits = index.bm25.search(query, pool, accept)
+        timer.stage("keyword", started)
+        return hits, False
+
+    async def _tenant_index(self, tenant_id: str) -> _TenantIndex:
+        """Keyword index for a tenant, loading or refreshing it as needed"""
+        index = self._indexes.get(tenant_id)
+        if (
+            index is not None
+            and index.loaded_at is not None
+            and time.monotonic() - index.loaded_at > self.config.index_refresh_seconds
+        ):
+            index = None
+        if index is None:
+            index = _TenantIndex(self.config.bm25_k1, self.config.bm25_b)
+            self._indexes[tenant_id] = index
+            while len(self._indexes) > self.config.max_indexed_tenants:
+                self._indexes.popitem(last=False)
+        self._indexes.move_to_end(tenant_id)
+
+        async with index.lock:
+            if index.loaded_at is None:
+                index.stale_documents.clear()
+                await self._load_chunks(index, tenant_id)
+                index.loaded_at = time.monotonic()
+            elif index.stale_documents:
+                documents = sorted(index.stale_documents)
+                index.stale_documents.clear()
+                for document_id in documents:
+                    index.remove_document(document_id)
+                await self._load_chunks(index, tenant_id, documents)
+        return index
+
+    async def _load_chunks(
+        self,
+        index: _TenantIndex,
+        tenant_id: str,
+        document_ids: Optional[List[str]] = None,
+    ):
+        """Page chunk text from Supabase into the index, off the event loop"""
+        page_size = max(1, self.config.index_page_size)
+
+        def fetch_page(start: int) -> List[Dict[str, Any]]:
+            request = (
+                self.supabase.table("rag_document_chunks")
+                .select("id, document_id, chunk_index, content, vector_id")
+                .eq("tenant_id", tenant_id)
+            )
+            if document_ids:
+                request = request.in_("document_id", document_ids)
+            return (
+                request.order("id").range(start, start + page_size - 1).execute().data
+                or []
+            )
+
+        start = 0
+        while True:
+            rows = await asyncio.to_thread(fetch_page, start)
+            for row in rows:
+                index.add(row)
+            if len(rows) < page_size:
+                break
+            start += page_size
+
+    def _fuse(
+        self,
+        vector_hits: List[Dict[str, Any]],
+        keyword_hits: List[Tuple[ChunkKey, float]],
+    ) -> List[Dict[str, Any]]:
+        """Weighted sum of max-normalized vector and BM25 scores"""
+        weight = self.config.vector_weight if keyword_hits else 1.0
+        top_vector = max((hit["score"] for hit in vector_hits), default=0.0) or 1.0
+        top_keyword = max((score for _, score in keyword_hits), default=0.0) or 1.0
+
+        results: Dict[ChunkKey, Dict[str, Any]] = {}
+        for hit in vector_hits:
+            key = (str(hit["document_id"]), int(hit["chunk_index"]))
+            results[key] = {
+                **hit,
+                "scores": {"vector": hit["score"], "keyword": 0.0},
+                "score": weight * hit["score"] / top_vector,
+                "source": "vector",
+            }
+
+        for key, score in keyword_hits:
+            result = results.get(key)
+            if result is None:
+                result = results[key] = {
+                    "id": None,
+                    "document_id": key[0],
+                    "chunk_index": key[1],
+                    "content": None,
+                    "metadata": {},
+                    "scores": {"vector": 0.0},
+                    "score": 0.0,
+                    "source": "keyword",
+                }
+            else:
+                result["source"] = "hybrid"
+            result["scores"]["keyword"] = score
+            result["score"] += (1 - weight) * score / top_keyword
+
+        return sorted(results.values(), key=lambda result: -result["score"])
+
+    async def _expand_graph(
+        self,
+        results: List[Dict[str, Any]],
+        index: _TenantIndex,
+        filters: Optional[Dict[str, Any]],
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Add Neo4j neighbors of the top results, scored below their seed
+
+        Returns the results and whether the graph query failed (degraded).
+        """
+        accept = _filter_predicate(filters)
+        if accept is False:
+            return results, False
+
+        seeds = results[: self.config.graph_seeds]
+        try:
+            async with self.neo4j_driver.session() as session:
+                result = await session.run(
+                    GRAPH_NEIGHBORS_QUERY,
+                    seeds=[
+                        {
+                            "position": position,
+                            "document_id": str(seed["document_id"]),
+                            "chunk_index": int(seed["chunk_index"]),
+                        }
+                        for position, seed in enumerate(seeds)
+                    ],
+                    per_seed=self.config.graph_neighbors,
+                )
+                records = await result.data()
+        except Exception as e:
+            self.stats["graph_errors"] += 1
+            logger.warning(f"Graph expansion skipped: {str(e)}")
+            return results, True
+
+        known = {(str(r["document_id"]), int(r["chunk_index"])) for r in results}
+        expanded: Dict[ChunkKey, Dict[str, Any]] = {}
+        for record in records:
+            seed = seeds[record["position"]]
+            score = seed["score"] * self.config.graph_decay
+            for neighbor in record["neighbors"]:
+                key = (str(neighbor["document_id"]), int(neighbor["chunk_index"]))
+                # Only chunks in this tenant's index: keeps tenants apart and
+                # skips chunk nodes left behind by earlier processing runs
+                if key in known or key not in index.rows:
+                    continue
+                if accept is not None and not accept(key):
+                    continue
+                current = expanded.get(key)
+                if current is None or current["score"] < score:
+                    expanded[key] = {
+                        "id": None,
+                        "document_id": key[0],
+                        "chunk_index": key[1],
+                        "content": None,
+                        "metadata": {},
+                        "scores": {"vector": 0.0, "keyword": 0.0},
+                        "score": score,
+                        "source": "graph",
+                        "graph": {
+                            "seed_document_id": seed["document_id"],
+                            "seed_chunk_index": seed["chunk_index"],
+                            "via": neighbor["via"],
+                        },
+                    }
+
+        expanded_results = sorted(
+            results + list(expanded.values()), key=lambda result: -result["score"]
+        )
+        return expanded_results, False
+
+    async def _hydrate(
+        self, results: List[Dict[str, Any]], index: Optional[_TenantIndex]
+    ) -> bool:
+        """
+        Fill in ids and text for results that did not come from Qdrant
+
+        Returns False if the chunk text could not be loaded.
+        """
+        missing = [result for result in results if result["content"] is None]
+        if not missing or index is None:
+            return True
+
+        row_ids = {}
+        for result in missing:
+            key = (result["document_id"], result["chunk_index"])
+            row_id, vector_id = index.rows.get(key, (None, None))
+            result["id"] = vector_id
+            if row_id is not None:
+                row_ids[row_id] = result
+
+        if not row_ids:
+            return True
+
+        def fetch_content() -> List[Dict[str, Any]]:
+            return (
+                self.supabase.table("rag_document_chunks")
+                .select("id, content")
+                .in_("id", list(row_ids))
+                .execute()
+                .data
+                or []
+            )
+
+        try:
+            rows = await asyncio.to_thread(fetch_content)
+        except Exception as e:
+            logger.error(f"Error loading chunk content: {str(e)}")
+            return False
+        for row in rows:
+            row_ids[row["id"]]["content"] = row.get("content")
+        return True
+
+    async def close(self):
+        """Close the Neo4j driver if this retriever created one"""
+        if self._owns_driver and self._neo4j_driver is not None:
+            await self._neo4j_driver.close()
+            self._neo4j_driver = None
+            self._owns_driver = False
+
+
+def _filter_predicate(filters: Optional[Dict[str, Any]]):
+    """
+    Predicate over chunk keys for the given filters
+
+    Returns None when there is nothing to filter, and False when filters
+    use fields other than document_id, which keyword and graph results
+    cannot be checked against.
+    """
+    if not filters:
+        return None
+    if set(filters) - {"document_id"}:
+        return False
+    document_id = str(filters["document_id"])
+    return lambda key: key[0] == document_id
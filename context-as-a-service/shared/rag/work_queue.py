@@ -0,0 +1,510 @@
+"""
+Work Queue
+Lease-based claiming for the RAG processing queue.
+
+Features:
+- Atomic claim of a batch of items per call, highest priority first
+- Visibility-timeout leases: a claimed item belongs to one worker until its
+  lease expires, after which any worker can reclaim it
+- Heartbeat task that keeps the leases of in-flight items alive
+- Completion and requeue fenced on the lease owner, so a worker that lost a
+  lease cannot overwrite the new owner's progress
+- SQLite stand-in with the same interface for local runs and tests
+
+The Supabase backend relies on the rag_claim_queue_items and
+rag_renew_queue_leases functions from
+database/migrations/add_rag_queue_leases.sql.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEASE_SECONDS = 300
+
+
+def default_worker_id() -> str:
+    """Identify this process across hosts: hostname, pid and a random suffix"""
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+@dataclass
+class QueueItem:
+    """A queue row leased to this worker"""
+
+    id: str
+    document_id: str
+    tenant_id: str
+    priority: int = 5
+    attempts: int = 0
+    max_attempts: int = 3
+    processor_type: Optional[str] = None
+    row: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def attempts_left(self) -> bool:
+        return self.attempts < self.max_attempts
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "QueueItem":
+        return cls(
+            id=str(row["id"]),
+            document_id=str(row["document_id"]),
+            tenant_id=str(row["tenant_id"]),
+            priority=row.get("priority") or 5,
+            attempts=row.get("attempts") or 0,
+            max_attempts=row.get("max_attempts") or 3,
+            processor_type=row.get("processor_type"),
+            row=row,
+        )
+
+
+def _claim_order(item: QueueItem):
+    return (-item.priority, str(item.row.get("created_at") or ""))
+
+
+class WorkQueue(ABC):
+    """Lease-based work queue shared by horizontally scaled workers"""
+
+    def __init__(
+        self,
+        worker_id: Optional[str] = None,
+        lease_seconds: int = DEFAULT_LEASE_SECONDS,
+    ):
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = lease_seconds
+
+    @abstractmethod
+    async def claim(self, batch_size: int = 1) -> List[QueueItem]:
+        """Lease up to batch_size claimable items, highest priority first"""
+
+    @abstractmethod
+    async def renew(self, queue_ids: Iterable[str]) -> Set[str]:
+        """Extend the leases on queue_ids; returns the ids still held"""
+
+    @abstractmethod
+    async def complete(self, item: QueueItem) -> bool:
+        """Mark an item done; False if its lease was lost"""
+
+    @abstractmethod
+    async def fail(self, item: QueueItem, error: str) -> bool:
+        """Mark an item permanently failed; False if its lease was lost"""
+
+    @abstractmethod
+    async def _requeue(
+        self, item: QueueItem, error: Optional[str], delay_seconds: float, attempts: int
+    ) -> bool:
+        """Return an item to pending, visible again after delay_seconds"""
+
+    async def release(
+        self,
+        item: QueueItem,
+        error: Optional[str] = None,
+        delay_seconds: float = 0,
+        consume_attempt: bool = True,
+    ) -> Optional[str]:
+        """
+        Give up the lease on an item
+
+        The item goes back to pending, or to failed once it has used all its
+        attempts. With consume_attempt=False (e.g. on shutdown) the claim does
+        not count as an attempt. Returns the new status, or None if the lease
+        had already been lost.
+        """
+        attempts = item.attempts if consume_attempt else max(0, item.attempts - 1)
+        if consume_attempt and not item.attempts_left:
+            failed = await self.fail(
+                item, f"Max attempts exceeded. Last error: {error}"
+            )
+            return "failed" if failed else None
+        requeued = await self._requeue(item, error, delay_seconds, attempts)
+        return "pending" if requeued else None
+
+
+class SupabaseWorkQueue(WorkQueue):
+    """Work queue over rag_processing_queue using the lease RPC functions"""
+
+    def __init__(
+        self,
+        supabase,
+        worker_id: Optional[str] = None,
+        lease_seconds: int = DEFAULT_LEASE_SECONDS,
+        table: str = "rag_processing_queue",
+    ):
+        super().__init__(worker_id, lease_seconds)
+        self.supabase = supabase
+        self.table = table
+
+    async def claim(self, batch_size: int = 1) -> List[QueueItem]:
+        result = await asyncio.to_thread(
+            lambda: self.supabase.rpc(
+                "rag_claim_queue_items",
+                {
+                    "p_worker_id": self.worker_id,
+                    "p_batch_size": max(1, batch_size),
+                    "p_lease_seconds": self.lease_seconds,
+                },
+            ).execute()
+        )
+        # UPDATE ... RETURNING does not preserve the claim order
+        return sorted(
+            (QueueItem.from_row(row) for row in result.data or []), key=_claim_order
+        )
+
+    async def renew(self, queue_ids: Iterable[str]) -> Set[str]:
+        queue_ids = list(queue_ids)
+        if not queue_ids:
+            return set()
+        result = await asyncio.to_thread(
+            lambda: self.supabase.rpc(
+                "rag_renew_queue_leases",
+                {
+                    "p_worker_id": self.worker_id,
+                    "p_queue_ids": queue_ids,
+                    "p_lease_seconds": self.lease_seconds,
+                },
+            ).execute()
+        )
+        # PostgREST returns a SETOF scalar either bare or wrapped in an object
+        return {
+            str(next(iter(row.values())) if isinstance(row, dict) else row)
+            for row in result.data or []
+        }
+
+    async def complete(self, item: QueueItem) -> bool:
+        return await self._update_leased(
+            item,
+            {
+                "status": "completed",
+                "completed_at": datetime.now(timezone.utc).isoformat(),
+            },
+        )
+
+    async def fail(self, item: QueueItem, error: str) -> bool:
+        return await self._update_leased(
+            item,
+            {
+                "status": "failed",
+                "last_error": error,
+                "completed_at": datetime.now(timezone.utc).isoformat(),
+            },
+        )
+
+    async def _requeue(
+        self, item: QueueItem, error: Optional[str], delay_seconds: float, attempts: int
+    ) -> bool:
+        scheduled_at = datetime.now(timezone.utc) + timedelta(seconds=delay_seconds)
+        return await self._update_leased(
+            item,
+            {
+                "status": "pending",
+                "last_error": error,
+                "attempts": attempts,
+                "scheduled_at": scheduled_at.isoformat(),
+            },
+        )
+
+    async def _update_leased(self, item: QueueItem, update: Dict[str, Any]) -> bool:
+        update = {**update, "lease_owner": None, "lease_expires_at": None}
+        result = await asyncio.to_thread(
+            lambda: self.supabase.table(self.table)
+            .update(update)
+            .eq("id", item.id)
+            .eq("lease_owner", self.worker_id)
+            .execute()
+        )
+        if not result.data:
+            logger.warning(f"Lease on queue item {item.id} was lost before update")
+            return False
+        return True
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """
+    Local stand-in for SupabaseWorkQueue backed by a SQLite file
+
+    Several instances (threads or processes) can share one database file;
+    claims run under BEGIN IMMEDIATE so each item goes to exactly one worker.
+    Timestamps are epoch seconds from `clock`, which tests can replace.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS rag_processing_queue (
+            id TEXT PRIMARY KEY,
+            tenant_id TEXT NOT NULL,
+            document_id TEXT NOT NULL,
+            priority INTEGER DEFAULT 5,
+            status TEXT NOT NULL DEFAULT 'pending',
+            processor_type TEXT,
+            attempts INTEGER DEFAULT 0,
+            max_attempts INTEGER DEFAULT 3,
+            last_error TEXT,
+            lease_owner TEXT,
+            lease_expires_at REAL,
+            scheduled_at REAL,
+            started_at REAL,
+            completed_at REAL,
+            created_at REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_rag_queue_claimable
+            ON rag_processing_queue(status, priority DESC, created_at);
+    """
+
+    def __init__(
+        self,
+        path: str,
+        worker_id: Optional[str] = None,
+        lease_seconds: int = DEFAULT_LEASE_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ):
+        super().__init__(worker_id, lease_seconds)
+        self.path = path
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._conn.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self.SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def enqueue(
+        self,
+        document_id: str,
+        tenant_id: str,
+        priority: int = 5,
+        processor_type: Optional[str] = None,
+        max_attempts: int = 3,
+    ) -> str:
+        """Add a pending item; returns its queue id"""
+        queue_id = str(uuid.uuid4())
+        now = self.clock()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO rag_processing_queue (id, tenant_id, document_id,"
+                " priority, processor_type, max_attempts, scheduled_at, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    queue_id,
+                    tenant_id,
+                    document_id,
+                    priority,
+                    processor_type,
+                    max_attempts,
+                    now,
+                    now,
+                ),
+            )
+        return queue_id
+
+    def get(self, queue_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM rag_processing_queue WHERE id = ?", (queue_id,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    async def claim(self, batch_size: int = 1) -> List[QueueItem]:
+        return await asyncio.to_thread(self._claim, max(1, batch_size))
+
+    def _claim(self, batch_size: int) -> List[QueueItem]:
+        now = self.clock()
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "UPDATE rag_processing_queue SET status = 'failed',"
+                    " last_error = COALESCE(last_error, 'Lease expired'),"
+                    " lease_owner = NULL, lease_expires_at = NULL"
+                    " WHERE status = 'processing' AND lease_expires_at < ?"
+                    " AND attempts >= max_attempts",
+                    (now,),
+                )
+                rows = conn.execute(
+                    "SELECT id FROM rag_processing_queue"
+                    " WHERE (status = 'pending' AND scheduled_at <= ?)"
+                    " OR (status = 'processing' AND lease_expires_at < ?"
+                    " AND attempts < max_attempts)"
+                    " ORDER BY priority DESC, created_at LIMIT ?",
+                    (now, now, batch_size),
+                ).fetchall()
+                ids = [row["id"] for row in rows]
+                if not ids:
+                    conn.execute("COMMIT")
+                    return []
+                conn.executemany(
+                    "UPDATE rag_processing_queue SET status = 'processing',"
+                    " lease_owner = ?, lease_expires_at = ?, started_at = ?,"
+                    " attempts = attempts + 1 WHERE id = ?",
+                    [
+                        (self.worker_id, now + self.lease_seconds, now, queue_id)
+                        for queue_id in ids
+                    ],
+                )
+                claimed = [
+                    dict(row)
+                    for row in conn.execute(
+                        "SELECT * FROM rag_processing_queue WHERE id IN"
+                        f" ({','.join('?' * len(ids))})",
+                        ids,
+                    ).fetchall()
+                ]
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return sorted((QueueItem.from_row(row) for row in claimed), key=_claim_order)
+
+    async def renew(self, queue_ids: Iterable[str]) -> Set[str]:
+        return await asyncio.to_thread(self._renew, list(queue_ids))
+
+    def _renew(self, queue_ids: List[str]) -> Set[str]:
+        if not queue_ids:
+            return set()
+        now = self.clock()
+        renewed = set()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for queue_id in queue_ids:
+                    cursor = self._conn.execute(
+                        "UPDATE rag_processing_queue SET lease_expires_at = ?"
+                        " WHERE id = ? AND lease_owner = ? AND status = 'processing'",
+                        (now + self.lease_seconds, queue_id, self.worker_id),
+                    )
+                    if cursor.rowcount:
+                        renewed.add(queue_id)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return renewed
+
+    async def complete(self, item: QueueItem) -> bool:
+        return await asyncio.to_thread(
+            self._update_leased,
+            item,
+            {"status": "completed", "completed_at": self.clock()},
+        )
+
+    async def fail(self, item: QueueItem, error: str) -> bool:
+        return await asyncio.to_thread(
+            self._update_leased,
+            item,
+            {"status": "failed", "last_error": error, "completed_at": self.clock()},
+        )
+
+    async def _requeue(
+        self, item: QueueItem, error: Optional[str], delay_seconds: float, attempts: int
+    ) -> bool:
+        return await asyncio.to_thread(
+            self._update_leased,
+            item,
+            {
+                "status": "pending",
+                "last_error": error,
+                "attempts": attempts,
+                "scheduled_at": self.clock() + delay_seconds,
+            },
+        )
+
+    def _update_leased(self, item: QueueItem, update: Dict[str, Any]) -> bool:
+        update = {**update, "lease_owner": None, "lease_expires_at": None}
+        assignments = ", ".join(f"{column} = ?" for column in update)
+        with self._lock:
+            cursor = self._conn.execute(
+                f"UPDATE rag_processing_queue SET {assignments}"
+                " WHERE id = ? AND lease_owner = ?",
+                [*update.values(), item.id, self.worker_id],
+            )
+        if not cursor.rowcount:
+            logger.warning(f"Lease on queue item {item.id} was lost before update")
+            return False
+        return True
+
+
+class LeaseHeartbeat:
+    """Background task that renews the leases of in-flight items"""
+
+    def __init__(
+        self,
+        queue: WorkQueue,
+        interval: Optional[float] = None,
+        on_lost: Optional[Callable[[QueueItem], None]] = None,
+    ):
+        """
+        Args:
+            queue: Queue the leases were claimed from
+            interval: Seconds between renewals; defaults to a third of the
+                lease so two heartbeats can fail before a lease expires
+            on_lost: Called with each item whose lease was taken over
+        """
+        self.queue = queue
+        self.interval = interval or max(1.0, queue.lease_seconds / 3)
+        self.on_lost = on_lost
+        self.items: Dict[str, QueueItem] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, item: QueueItem):
+        self.items[item.id] = item
+        self.start()
+
+    def discard(self, queue_id: str) -> Optional[QueueItem]:
+        return self.items.pop(queue_id, None)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="rag-lease-heartbeat")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def beat(self) -> Set[str]:
+        """Renew every held lease once; returns the ids that were lost"""
+        held = list(self.items)
+        if not held:
+            return set()
+        renewed = await self.queue.renew(held)
+        lost = set()
+        for queue_id in held:
+            if queue_id in renewed:
+                continue
+            item = self.items.pop(queue_id, None)
+            if item is None:
+                # Finished while the renewal was in flight
+                continue
+            lost.add(queue_id)
+            logger.warning(
+                f"Lost lease on queue item {queue_id} (document {item.document_id})"
+            )
+            if self.on_lost:
+                self.on_lost(item)
+        return lost
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.beat()
+            except Exception as e:
+                logger.error(f"Lease heartbeat failed: {e}")
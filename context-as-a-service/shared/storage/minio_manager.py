@@ -222,6 +222,40 @@ class MinIOTenantManager:
         logger.warning(f"Document not found: {document_id}/{filename}")
         return None
 
+    def get_document_stream(
+        self,
+        tenant_id: str,
+        document_id: str,
+        filename: str,
+        version_id: Optional[str] = None,
+    ):
+        """
+        Open a document for incremental reading without loading it into memory.
+
+        Returns the underlying object response (call .read(n) repeatedly, then
+        .close() and .release_conn()), or None if the document is not found.
+        """
+        bucket_name = self.get_bucket_name(tenant_id)
+
+        for days_back in range(7):  # Look back up to 7 days
+            date = datetime.now() - timedelta(days=days_back)
+            date_prefix = date.strftime("%Y/%m/%d")
+            object_key = f"documents/{date_prefix}/{document_id}/{filename}"
+
+            try:
+                return self.client.get_object(
+                    bucket_name, object_key, version_id=version_id
+                )
+
+            except S3Error as e:
+                if e.code == "NoSuchKey":
+                    continue
+                logger.error(f"Failed to open document stream: {e}")
+                return None
+
+        logger.warning(f"Document not found: {document_id}/{filename}")
+        return None
+
     def list_tenant_documents(
         self, tenant_id: str, prefix: str = "documents/", recursive: bool = True
     ) -> List[Dict[str, Any]]:
@@ -0,0 +1,292 @@
+"""
+Shared HTTP transport for inter-service clients
+
+One process-wide connection layer for A2A, MCP and gateway clients:
+- A pooled httpx transport per upstream origin, shared by every client
+- HTTP/2 when the h2 package is installed
+- Keep-alive and pool limits tuned from the environment
+- Per-host concurrency limits
+- A single background event loop for synchronous facades
+- Pool statistics
+- A shutdown hook that drains the pools of every event loop
+
+Clients stay lightweight: each one is an httpx.AsyncClient with its own
+headers and timeout whose transport routes into the shared pools, so closing
+a client never tears down connections other clients are using.
+"""
+
+import asyncio
+import atexit
+import logging
+import os
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Any, Awaitable, Dict, Optional, TypeVar
+
+import httpx
+
+try:
+    import h2  # noqa: F401
+
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class TransportConfig:
+    """Pool limits for the shared transport"""
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    per_host_concurrency: int = 64
+    http2: bool = True
+
+    @classmethod
+    def from_env(cls) -> "TransportConfig":
+        return cls(
+            max_connections=int(
+                os.getenv("HTTP_POOL_MAX_CONNECTIONS", cls.max_connections)
+            ),
+            max_keepalive_connections=int(
+                os.getenv("HTTP_POOL_MAX_KEEPALIVE", cls.max_keepalive_connections)
+            ),
+            keepalive_expiry=float(
+                os.getenv("HTTP_POOL_KEEPALIVE_EXPIRY", cls.keepalive_expiry)
+            ),
+            per_host_concurrency=int(
+                os.getenv("HTTP_PER_HOST_CONCURRENCY", cls.per_host_concurrency)
+            ),
+            http2=os.getenv("HTTP_ENABLE_HTTP2", "true").lower() == "true",
+        )
+
+
+class _HostPool:
+    """Connection pool, concurrency limit and counters for one origin"""
+
+    def __init__(self, config: TransportConfig):
+        self.transport = httpx.AsyncHTTPTransport(
+            http2=config.http2 and H2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry,
+            ),
+        )
+        self.semaphore = asyncio.Semaphore(config.per_host_concurrency)
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.waiting = 0
+        self.total_seconds = 0.0
+
+    def counters(self) -> Dict[str, Any]:
+        pool = getattr(self.transport, "_pool", None)
+        connections = getattr(pool, "connections", [])
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "total_seconds": self.total_seconds,
+            "connections": len(connections),
+            "idle_connections": sum(1 for c in connections if c.is_idle()),
+        }
+
+
+class SharedTransport(httpx.AsyncBaseTransport):
+    """Routes requests into per-origin pools for the running event loop"""
+
+    def __init__(self, config: Optional[TransportConfig] = None):
+        self.config = config or TransportConfig.from_env()
+        # event loop -> origin -> pool; connections belong to the loop that
+        # opened them
+        self._pools: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def _pool_for(self, url: httpx.URL) -> _HostPool:
+        loop = asyncio.get_running_loop()
+        pools = self._pools.setdefault(loop, {})
+        origin = f"{url.scheme}://{url.netloc.decode('ascii')}"
+        pool = pools.get(origin)
+        if pool is None:
+            pool = pools[origin] = _HostPool(self.config)
+        return pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        pool = self._pool_for(request.url)
+        pool.waiting += 1
+        try:
+            # The per-host limit covers the request until its headers arrive
+            await pool.semaphore.acquire()
+        finally:
+            # Also reached when the waiter is cancelled
+            pool.waiting -= 1
+        pool.in_flight += 1
+        started = time.monotonic()
+        try:
+            return await pool.transport.handle_async_request(request)
+        except Exception:
+            pool.errors += 1
+            raise
+        finally:
+            pool.semaphore.release()
+            pool.in_flight -= 1
+            pool.requests += 1
+            pool.total_seconds += time.monotonic() - started
+
+    async def aclose(self):
+        # Individual clients closing must not drop the shared pools
+        pass
+
+    async def close_pools(self):
+        """Close every pool opened on the running event loop"""
+        pools = self._pools.pop(asyncio.get_running_loop(), {})
+        await _close_transports(pools)
+
+    def close_all_pools(self, timeout: float = 5.0):
+        """
+        Close the pools of every event loop from synchronous shutdown code.
+
+        Pools on a loop running in another thread are closed on that loop;
+        pools on a closed loop are dropped, their connections went with it.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError("Use 'await close_pools()' inside an event loop")
+
+        for loop in list(self._pools.keys()):
+            pools = self._pools.pop(loop, {})
+            if not pools or loop.is_closed():
+                continue
+            try:
+                if loop.is_running():
+                    asyncio.run_coroutine_threadsafe(
+                        _close_transports(pools), loop
+                    ).result(timeout)
+                else:
+                    loop.run_until_complete(_close_transports(pools))
+            except Exception as e:
+                logger.warning(f"Failed to close HTTP pools on shutdown: {e}")
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-origin pool statistics, merged across event loops"""
+        stats: Dict[str, Dict[str, Any]] = {}
+        for pools in list(self._pools.values()):
+            for origin, pool in list(pools.items()):
+                merged = stats.setdefault(origin, {})
+                for key, value in pool.counters().items():
+                    merged[key] = merged.get(key, 0) + value
+
+        for merged in stats.values():
+            total_seconds = merged.pop("total_seconds")
+            merged["avg_response_ms"] = (
+                round(total_seconds * 1000 / merged["requests"], 2)
+                if merged["requests"]
+                else 0.0
+            )
+        return stats
+
+
+async def _close_transports(pools: Dict[str, _HostPool]):
+    for pool in pools.values():
+        await pool.transport.aclose()
+
+
+_transport: Optional[SharedTransport] = None
+_transport_lock = threading.Lock()
+
+
+def get_shared_transport() -> SharedTransport:
+    """Get the process-wide shared transport"""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = SharedTransport()
+        return _transport
+
+
+def create_http_client(
+    base_url: str = "",
+    timeout: float = 30.0,
+    headers: Optional[Dict[str, str]] = None,
+) -> httpx.AsyncClient:
+    """
+    Create a lightweight AsyncClient backed by the shared connection pools.
+
+    Args:
+        base_url: Optional base URL for relative requests
+        timeout: Default request timeout in seconds
+        headers: Default headers sent with every request from this client
+    """
+    return httpx.AsyncClient(
+        base_url=base_url,
+        timeout=timeout,
+        headers=headers,
+        transport=get_shared_transport(),
+    )
+
+
+def get_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Pool statistics for every upstream the process has talked to"""
+    return get_shared_transport().get_stats()
+
+
+class BackgroundLoop:
+    """One daemon thread running an event loop for synchronous callers"""
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name="http-transport-loop",
+                    daemon=True,
+                )
+                thread.start()
+            return self._loop
+
+    def run(self, coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """Run a coroutine on the background loop and wait for its result"""
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        return future.result(timeout)
+
+    def stop(self):
+        """Stop the background loop, if one was started"""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(loop.stop)
+
+
+_background_loop = BackgroundLoop()
+
+
+def run_sync(coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+    """Run a coroutine on the shared background loop from synchronous code"""
+    return _background_loop.run(coro, timeout)
+
+
+def shutdown_http_transport(timeout: float = 5.0):
+    """Drain the shared pools on every event loop and stop the background loop"""
+    if _transport is not None:
+        _transport.close_all_pools(timeout)
+    _background_loop.stop()
+
+
+atexit.register(shutdown_http_transport)
@@ -0,0 +1,31 @@
+-- Migration Script: Bulk Neo4j back-references for extracted entities
+-- The graph builder used to record neo4j_node_id / neo4j_edge_id with one
+-- UPDATE per entity and relationship. This function applies all of a
+-- document's references in a single call.
+--
+-- p_entities:      [{"id": uuid, "neo4j_node_id": text, "neo4j_labels": [text]}]
+-- p_relationships: [{"id": uuid, "neo4j_edge_id": text, "neo4j_type": text}]
+
+CREATE OR REPLACE FUNCTION rag_set_graph_refs(
+    p_entities JSONB DEFAULT '[]',
+    p_relationships JSONB DEFAULT '[]'
+)
+RETURNS void AS $$
+BEGIN
+    UPDATE rag_extracted_entities e
+    SET neo4j_node_id = refs.neo4j_node_id,
+        neo4j_labels = refs.neo4j_labels
+    FROM jsonb_to_recordset(COALESCE(p_entities, '[]'))
+        AS refs(id UUID, neo4j_node_id TEXT, neo4j_labels TEXT[])
+    WHERE e.id = refs.id;
+
+    UPDATE rag_entity_relationships r
+    SET neo4j_edge_id = refs.neo4j_edge_id,
+        neo4j_type = refs.neo4j_type
+    FROM jsonb_to_recordset(COALESCE(p_relationships, '[]'))
+        AS refs(id UUID, neo4j_edge_id TEXT, neo4j_type TEXT)
+    WHERE r.id = refs.id;
+END;
+$$ LANGUAGE plpgsql;
+
+GRANT EXECUTE ON FUNCTION rag_set_graph_refs(JSONB, JSONB) TO anon, authenticated;
@@ -0,0 +1,93 @@
+-- Migration Script: Lease-based claiming for rag_processing_queue
+-- Lets several RAG workers pull from the queue without processing the same
+-- document twice. A worker claims a batch in one call, holds a lease on each
+-- row and renews it with heartbeats; rows whose lease expires are reclaimed.
+
+-- 1. Lease columns
+ALTER TABLE rag_processing_queue
+    ADD COLUMN IF NOT EXISTS lease_owner TEXT,
+    ADD COLUMN IF NOT EXISTS lease_expires_at TIMESTAMPTZ;
+
+-- 2. Index for the claim query (priority order over claimable rows)
+CREATE INDEX IF NOT EXISTS idx_rag_queue_claimable
+    ON rag_processing_queue(priority DESC, created_at)
+    WHERE status IN ('pending', 'processing');
+
+CREATE INDEX IF NOT EXISTS idx_rag_queue_lease_owner
+    ON rag_processing_queue(lease_owner)
+    WHERE lease_owner IS NOT NULL;
+
+-- 3. Atomically claim up to p_batch_size items for a worker
+-- Pending rows whose scheduled_at has passed and processing rows whose lease
+-- expired are both claimable. FOR UPDATE SKIP LOCKED lets concurrent callers
+-- take disjoint batches instead of blocking on each other.
+CREATE OR REPLACE FUNCTION rag_claim_queue_items(
+    p_worker_id TEXT,
+    p_batch_size INTEGER DEFAULT 1,
+    p_lease_seconds INTEGER DEFAULT 300
+)
+RETURNS SETOF rag_processing_queue AS $$
+BEGIN
+    -- Expired leases with no attempts left are failed instead of reclaimed.
+    -- Rows another caller has locked are skipped, as in the claim below.
+    WITH exhausted AS (
+        SELECT id
+        FROM rag_processing_queue
+        WHERE status = 'processing'
+          AND lease_expires_at < NOW()
+          AND attempts >= max_attempts
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE rag_processing_queue q
+    SET status = 'failed',
+        last_error = COALESCE(q.last_error, 'Lease expired'),
+        lease_owner = NULL,
+        lease_expires_at = NULL
+    FROM exhausted
+    WHERE q.id = exhausted.id;
+
+    RETURN QUERY
+    WITH claimable AS (
+        SELECT id
+        FROM rag_processing_queue
+        WHERE (status = 'pending' AND COALESCE(scheduled_at, created_at) <= NOW())
+           OR (status = 'processing'
+               AND lease_expires_at < NOW()
+               AND attempts < max_attempts)
+        ORDER BY priority DESC, created_at
+        LIMIT GREATEST(p_batch_size, 1)
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE rag_processing_queue q
+    SET status = 'processing',
+        lease_owner = p_worker_id,
+        lease_expires_at = NOW() + make_interval(secs => p_lease_seconds),
+        started_at = NOW(),
+        attempts = q.attempts + 1
+    FROM claimable
+    WHERE q.id = claimable.id
+    RETURNING q.*;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 4. Extend the leases a worker still holds; returns the ids renewed
+-- An id missing from the result has been reclaimed by another worker.
+CREATE OR REPLACE FUNCTION rag_renew_queue_leases(
+    p_worker_id TEXT,
+    p_queue_ids UUID[],
+    p_lease_seconds INTEGER DEFAULT 300
+)
+RETURNS SETOF UUID AS $$
+BEGIN
+    RETURN QUERY
+    UPDATE rag_processing_queue
+    SET lease_expires_at = NOW() + make_interval(secs => p_lease_seconds)
+    WHERE id = ANY(p_queue_ids)
+      AND lease_owner = p_worker_id
+      AND status = 'processing'
+    RETURNING id;
+END;
+$$ LANGUAGE plpgsql;
+
+GRANT EXECUTE ON FUNCTION rag_claim_queue_items(TEXT, INTEGER, INTEGER) TO anon, authenticated;
+GRANT EXECUTE ON FUNCTION rag_renew_queue_leases(TEXT, UUID[], INTEGER) TO anon, authenticated;
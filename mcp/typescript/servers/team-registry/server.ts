@@ -95,6 +95,13 @@ export class TeamRegistryMCPServer extends BaseMCPServer {
           team_name: z.string().describe('Team name'),
         })
       ),
+      this.createTool(
+        'get_teams_members',
+        'Get the members of several teams in one call',
+        z.object({
+          team_names: z.array(z.string()).describe('Team names'),
+        })
+      ),
       this.createTool(
         'get_team_composition',
         'Get team composition summary',
@@ -120,6 +127,8 @@ export class TeamRegistryMCPServer extends BaseMCPServer {
           return await this.updateTeamRelationship(args);
         case 'get_team_members':
           return await this.getTeamMembers(args);
+        case 'get_teams_members':
+          return await this.getTeamsMembers(args);
         case 'get_team_composition':
           return await this.getTeamComposition();
         default:
@@ -336,6 +345,48 @@ export class TeamRegistryMCPServer extends BaseMCPServer {
     return this.createSuccessResponse(data || []);
   }
 
+  private async getTeamsMembers(args: any) {
+    const { team_names } = this.validateInput(
+      z.object({
+        team_names: z.array(z.string()),
+      }),
+      args
+    );
+
+    // Get team IDs
+    const { data: teams, error: teamError } = await this.supabase
+      .from('teams')
+      .select('id, name')
+      .in('name', team_names);
+
+    if (teamError) {
+      throw new Error(`Failed to get teams: ${teamError.message}`);
+    }
+
+    // Get members of every team at once
+    const { data, error } = await this.supabase
+      .from('team_members')
+      .select('*')
+      .in('team_id', (teams || []).map(t => t.id))
+      .order('is_manager', { ascending: false })
+      .order('role', { ascending: true });
+
+    if (error) {
+      throw new Error(`Failed to get team members: ${error.message}`);
+    }
+
+    const teamNames = new Map((teams || []).map(t => [t.id, t.name]));
+    const members: Record<string, any[]> = {};
+    for (const team of teams || []) {
+      members[team.name] = [];
+    }
+    for (const member of data || []) {
+      members[teamNames.get(member.team_id)].push(member);
+    }
+
+    return this.createSuccessResponse(members);
+  }
+
   private async getTeamComposition() {
     const { data, error } = await this.supabase
       .from('team_composition')
@@ -31,6 +31,7 @@ from sklearn.decomposition import PCA
 from sklearn.metrics.pairwise import cosine_similarity
 
 from elf_automations.shared.config import settings
+from elf_automations.shared.rag import VectorDeduplicator
 from elf_automations.shared.utils import get_supabase_client
 
 console = Console()
@@ -113,7 +114,7 @@ class EmbeddingOptimizer:
             # Redundancy analysis
             console.print("[yellow]Checking for redundant embeddings...[/yellow]")
             redundancy_analysis = await self._analyze_redundancy(
-                embeddings_array, payloads
+                embeddings_array, payloads, collection_name=collection_name
             )
             stats["redundancy_analysis"] = redundancy_analysis
 
@@ -200,56 +201,79 @@ class EmbeddingOptimizer:
         embeddings: np.ndarray,
         payloads: List[Dict],
         similarity_threshold: float = 0.95,
+        collection_name: Optional[str] = None,
     ) -> Dict[str, Any]:
-        """Analyze redundant embeddings"""
-        n_embeddings = len(embeddings)
-
-        # Sample for large datasets
-        if n_embeddings > 1000:
-            sample_indices = np.random.choice(n_embeddings, 1000, replace=False)
-            sample_embeddings = embeddings[sample_indices]
-            sample_payloads = [payloads[i] for i in sample_indices]
+        """
+        Analyze redundant embeddings
+
+        With a collection name the whole collection is streamed through the
+        LSH deduplicator; otherwise every given embedding is analyzed.
+        """
+        deduplicator = VectorDeduplicator(threshold=similarity_threshold)
+
+        if collection_name:
+            payloads = await self._stream_collection(collection_name, deduplicator)
         else:
-            sample_embeddings = embeddings
-            sample_payloads = payloads
-
-        # Calculate similarity matrix
-        similarity_matrix = cosine_similarity(sample_embeddings)
-
-        # Find highly similar pairs
-        redundant_pairs = []
-        for i in range(len(sample_embeddings)):
-            for j in range(i + 1, len(sample_embeddings)):
-                if similarity_matrix[i, j] > similarity_threshold:
-                    redundant_pairs.append(
-                        {
-                            "indices": (i, j),
-                            "similarity": float(similarity_matrix[i, j]),
-                            "doc_ids": (
-                                sample_payloads[i].get("document_id", "unknown"),
-                                sample_payloads[j].get("document_id", "unknown"),
-                            ),
-                        }
-                    )
+            deduplicator.add(embeddings)
+
+        result = deduplicator.run()
 
-        # Identify potential duplicates
-        duplicate_groups = defaultdict(set)
-        for pair in redundant_pairs:
-            i, j = pair["indices"]
-            duplicate_groups[i].add(j)
-            duplicate_groups[j].add(i)
+        # Largest groups first, with the documents they span
+        largest_groups = sorted(result.groups, key=len, reverse=True)[:10]
+        top_groups = [
+            {
+                "size": len(group),
+                "doc_ids": sorted(
+                    {
+                        str((payloads[i] or {}).get("document_id", "unknown"))
+                        for i in group
+                        if i < len(payloads)
+                    }
+                ),
+            }
+            for group in largest_groups
+        ]
 
         return {
-            "redundant_pairs": len(redundant_pairs),
-            "redundancy_ratio": len(redundant_pairs)
-            / (len(sample_embeddings) * (len(sample_embeddings) - 1) / 2),
-            "potential_duplicates": len(duplicate_groups),
-            "avg_similarity_score": np.mean([p["similarity"] for p in redundant_pairs])
-            if redundant_pairs
-            else 0,
-            "sample_size": len(sample_embeddings),
+            "redundant_pairs": result.pair_count,
+            "redundancy_ratio": result.pair_ratio,
+            "potential_duplicates": result.duplicate_items,
+            "redundant_embeddings": result.redundant_items,
+            "duplicate_groups": len(result.groups),
+            "top_duplicate_groups": top_groups,
+            "candidate_pairs": result.candidate_pairs,
+            "avg_similarity_score": result.avg_similarity,
+            "total_analyzed": result.total_items,
+            "sample_size": result.total_items,
         }
 
+    async def _stream_collection(
+        self,
+        collection_name: str,
+        deduplicator: VectorDeduplicator,
+        page_size: int = 1000,
+    ) -> List[Dict]:
+        """Scroll a whole collection into the deduplicator, keeping document ids"""
+        payloads: List[Dict] = []
+        offset = None
+
+        while True:
+            points, offset = await asyncio.to_thread(
+                self.qdrant_client.scroll,
+                collection_name=collection_name,
+                limit=page_size,
+                offset=offset,
+                with_payload=["document_id"],
+                with_vectors=True,
+            )
+            if points:
+                deduplicator.add([point.vector for point in points])
+                payloads.extend(point.payload or {} for point in points)
+            if offset is None:
+                break
+
+        return payloads
+
     def _calculate_quality_metrics(self, embeddings: np.ndarray) -> Dict[str, Any]:
         """Calculate embedding quality metrics"""
         # Normalize embeddings
@@ -565,6 +589,11 @@ class EmbeddingOptimizer:
             f"Redundancy Ratio: [{'red' if redundancy['redundancy_ratio'] > 0.05 else 'green'}]{redundancy['redundancy_ratio']:.1%}[/]"
         )
         console.print(f"Potential Duplicates: {redundancy['potential_duplicates']}")
+        console.print(
+            f"Duplicate Groups: {redundancy['duplicate_groups']} "
+            f"({redundancy['redundant_embeddings']} removable, "
+            f"{redundancy['total_analyzed']} embeddings analyzed)"
+        )
 
         # Recommendations
         if analysis["recommendations"]:
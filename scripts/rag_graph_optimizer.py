@@ -27,6 +27,7 @@ from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.table import Table
 
 from elf_automations.shared.config import settings
+from elf_automations.shared.rag import NameDeduplicator
 from elf_automations.shared.utils import get_supabase_client
 
 console = Console()
@@ -348,7 +349,9 @@ class GraphOptimizer:
                     entities = record["entities"]
 
                     # Group similar entities
-                    groups = self._group_similar_entities(entities)
+                    groups = self._group_similar_entities(
+                        entities, similarity_threshold
+                    )
 
                     for group in groups:
                         if len(group) > 1:
@@ -391,37 +394,13 @@ class GraphOptimizer:
             console.print(f"[red]Error finding duplicates: {str(e)}[/red]")
             return {"error": str(e)}
 
-    def _group_similar_entities(self, entities: List[Dict]) -> List[List[Dict]]:
+    def _group_similar_entities(
+        self, entities: List[Dict], similarity_threshold: float = 0.9
+    ) -> List[List[Dict]]:
         """Group similar entities based on normalized names"""
-        from difflib import SequenceMatcher
-
-        groups = []
-        processed = set()
-
-        for i, entity1 in enumerate(entities):
-            if i in processed:
-                continue
-
-            group = [entity1]
-            processed.add(i)
-
-            for j, entity2 in enumerate(entities[i + 1 :], i + 1):
-                if j in processed:
-                    continue
-
-                # Calculate similarity
-                similarity = SequenceMatcher(
-                    None, entity1["name"], entity2["name"]
-                ).ratio()
-
-                if similarity > 0.9:
-                    group.append(entity2)
-                    processed.add(j)
-
-            if len(group) > 1:
-                groups.append(group)
-
-        return groups
+        deduplicator = NameDeduplicator(threshold=similarity_threshold)
+        result = deduplicator.run([entity.get("name") for entity in entities])
+        return [[entities[i] for i in group] for group in result.groups]
 
     def _generate_deduplication_recommendations(
         self, duplicate_count: int
@@ -39,7 +39,7 @@ class ChatStatus(Enum):
     ERROR = "error"
 
 
-@dataclass
+@dataclass(kw_only=True)
 class ChatInitiationRequest(A2AMessage):
     """Request to start an interactive chat session with a team manager."""
 
@@ -54,7 +54,7 @@ class ChatInitiationRequest(A2AMessage):
         self.type = ChatMessageType.CHAT_INITIATION_REQUEST.value
 
 
-@dataclass
+@dataclass(kw_only=True)
 class ChatInitiationResponse(A2AMessage):
     """Response to chat initiation request."""
 
@@ -70,7 +70,7 @@ class ChatInitiationResponse(A2AMessage):
         self.type = ChatMessageType.CHAT_INITIATION_RESPONSE.value
 
 
-@dataclass
+@dataclass(kw_only=True)
 class ChatMessage(A2AMessage):
     """A message within a chat session."""
 
@@ -84,7 +84,7 @@ class ChatMessage(A2AMessage):
         self.type = ChatMessageType.CHAT_MESSAGE.value
 
 
-@dataclass
+@dataclass(kw_only=True)
 class ChatStatusUpdate(A2AMessage):
     """Update on chat session status."""
 
@@ -98,7 +98,7 @@ class ChatStatusUpdate(A2AMessage):
         self.type = ChatMessageType.CHAT_STATUS_UPDATE.value
 
 
-@dataclass
+@dataclass(kw_only=True)
 class ChatDelegationReady(A2AMessage):
     """Manager is ready to delegate after chat."""
 
@@ -114,7 +114,7 @@ class ChatDelegationReady(A2AMessage):
         self.type = ChatMessageType.CHAT_DELEGATION_READY.value
 
 
-@dataclass
+@dataclass(kw_only=True)
 class ChatDelegationConfirmed(A2AMessage):
     """User confirmed delegation after chat."""
 
@@ -128,7 +128,7 @@ class ChatDelegationConfirmed(A2AMessage):
         self.type = ChatMessageType.CHAT_DELEGATION_CONFIRMED.value
 
 
-@dataclass
+@dataclass(kw_only=True)
 class ChatSessionEnd(A2AMessage):
     """Chat session has ended."""
 
@@ -144,7 +144,7 @@ class ChatSessionEnd(A2AMessage):
         self.type = ChatMessageType.CHAT_SESSION_END.value
 
 
-@dataclass
+@dataclass(kw_only=True)
 class ChatHandoff(A2AMessage):
     """Handoff chat session to another team."""
 
@@ -16,6 +16,8 @@ from typing import Any, Dict, List, Optional
 
 import httpx
 
+from ..utils.http_transport import create_http_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -43,7 +45,8 @@ class A2AClient:
         self.team_id = team_id
         self.team_endpoint = team_endpoint
         self.timeout = timeout
-        self.client = httpx.AsyncClient(timeout=timeout)
+        # Lightweight client over the process-wide connection pools
+        self.client = create_http_client(timeout=timeout)
 
         # Gateway configuration
         self.use_gateway = use_gateway
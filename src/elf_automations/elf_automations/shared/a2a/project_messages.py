@@ -26,7 +26,7 @@ class ProjectMessageType(Enum):
     TASK_HANDOFF = "task_handoff"
 
 
-@dataclass
+@dataclass(kw_only=True)
 class ProjectAssignmentMessage(A2AMessage):
     """Message to assign a project to a team."""
 
@@ -43,7 +43,7 @@ class ProjectAssignmentMessage(A2AMessage):
             self.assigned_tasks = []
 
 
-@dataclass
+@dataclass(kw_only=True)
 class TaskAssignmentMessage(A2AMessage):
     """Message to assign a specific task to a team."""
 
@@ -63,7 +63,7 @@ class TaskAssignmentMessage(A2AMessage):
             self.dependencies = []
 
 
-@dataclass
+@dataclass(kw_only=True)
 class ProgressUpdateMessage(A2AMessage):
     """Message to update progress on a task or project."""
 
@@ -82,7 +82,7 @@ class ProgressUpdateMessage(A2AMessage):
             self.blockers = []
 
 
-@dataclass
+@dataclass(kw_only=True)
 class DependencyCompleteMessage(A2AMessage):
     """Message to notify that a dependency is complete."""
 
@@ -97,7 +97,7 @@ class DependencyCompleteMessage(A2AMessage):
         self.type = ProjectMessageType.DEPENDENCY_COMPLETE.value
 
 
-@dataclass
+@dataclass(kw_only=True)
 class BlockerReportedMessage(A2AMessage):
     """Message to report a blocker that needs resolution."""
 
@@ -114,7 +114,7 @@ class BlockerReportedMessage(A2AMessage):
         self.type = ProjectMessageType.BLOCKER_REPORTED.value
 
 
-@dataclass
+@dataclass(kw_only=True)
 class HelpRequestedMessage(A2AMessage):
     """Message to request help from another team."""
 
@@ -131,7 +131,7 @@ class HelpRequestedMessage(A2AMessage):
         self.type = ProjectMessageType.HELP_REQUESTED.value
 
 
-@dataclass
+@dataclass(kw_only=True)
 class ResourceRequestMessage(A2AMessage):
     """Message to request additional resources for a project."""
 
@@ -148,7 +148,7 @@ class ResourceRequestMessage(A2AMessage):
         self.type = ProjectMessageType.RESOURCE_REQUEST.value
 
 
-@dataclass
+@dataclass(kw_only=True)
 class DeadlineWarningMessage(A2AMessage):
     """Message to warn about an at-risk deadline."""
 
@@ -169,7 +169,7 @@ class DeadlineWarningMessage(A2AMessage):
             self.mitigation_options = []
 
 
-@dataclass
+@dataclass(kw_only=True)
 class TaskHandoffMessage(A2AMessage):
     """Message to hand off a task between teams."""
 
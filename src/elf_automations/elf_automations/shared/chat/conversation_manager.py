@@ -7,6 +7,7 @@ Manages the chat context, history, and delegation preparation.
 import json
 import logging
 import uuid
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
@@ -38,6 +39,7 @@ class ChatContext:
     total_tokens: int = 0
     status: ChatStatus = ChatStatus.ACTIVE
     metadata: Dict[str, Any] = field(default_factory=dict)
+    last_activity: datetime = field(default_factory=datetime.utcnow)
 
     def add_message(self, role: str, content: str, tokens: int = 0):
         """Add a message to the conversation."""
@@ -50,6 +52,7 @@ class ChatContext:
             }
         )
         self.total_tokens += tokens
+        self.last_activity = datetime.utcnow()
 
     def get_conversation_history(
         self, max_messages: Optional[int] = None
@@ -91,7 +94,9 @@ class ConversationManager:
             team_name: Name of the team
             manager_name: Name of the manager agent
             manager_role: Role of the manager agent
-            chat_config: Chat configuration from team settings
+            chat_config: Chat configuration from team settings. Sessions are
+                capped by `max_sessions` (least recently active evicted
+                first) and expire after `session_ttl_seconds` idle.
         """
         self.team_agent = team_agent
         self.team_name = team_name
@@ -99,8 +104,10 @@ class ConversationManager:
         self.manager_role = manager_role
         self.chat_config = chat_config or {}
 
-        # Active sessions
-        self.sessions: Dict[str, ChatContext] = {}
+        # Active sessions, least recently active first
+        self.sessions: "OrderedDict[str, ChatContext]" = OrderedDict()
+        self.max_sessions = self.chat_config.get("max_sessions", 1000)
+        self.session_ttl_seconds = self.chat_config.get("session_ttl_seconds", 3600)
 
         # Delegation readiness tracking
         self.delegation_ready: Dict[str, bool] = {}
@@ -139,8 +146,10 @@ class ConversationManager:
             metadata=initial_context or {},
         )
 
+        self._drop_session(session_id)
         self.sessions[session_id] = context
         self.delegation_ready[session_id] = False
+        self._evict_sessions()
 
         # Generate greeting
         greeting = self._generate_greeting(user_id, initial_context)
@@ -167,10 +176,12 @@ class ConversationManager:
         Returns:
             Response dictionary with assistant's reply and metadata
         """
+        self._evict_sessions()
         if session_id not in self.sessions:
             raise ValueError(f"Session {session_id} not found")
 
         session = self.sessions[session_id]
+        self.sessions.move_to_end(session_id)
         session.status = ChatStatus.THINKING
 
         # Add user message
@@ -308,14 +319,32 @@ class ConversationManager:
         }
 
         # Clean up
-        del self.sessions[session_id]
-        self.delegation_ready.pop(session_id, None)
-        self.delegation_specs.pop(session_id, None)
+        self._drop_session(session_id)
 
         logger.info(f"Ended session {session_id}: {reason}")
 
         return summary
 
+    def _drop_session(self, session_id: str):
+        """Forget a session and its cached delegation state."""
+        self.sessions.pop(session_id, None)
+        self.delegation_ready.pop(session_id, None)
+        self.delegation_specs.pop(session_id, None)
+        self.delegation_builder.forget(session_id)
+
+    def _evict_sessions(self):
+        """Drop idle sessions and the least recently active beyond the cap."""
+        now = datetime.utcnow()
+        while self.sessions:
+            session_id, session = next(iter(self.sessions.items()))
+            idle = (now - session.last_activity).total_seconds()
+            if len(self.sessions) <= self.max_sessions and (
+                idle <= self.session_ttl_seconds
+            ):
+                break
+            self._drop_session(session_id)
+            logger.info(f"Evicted chat session {session_id} after {idle:.0f}s idle")
+
     def _generate_greeting(
         self, user_id: str, context: Optional[Dict[str, Any]]
     ) -> str:
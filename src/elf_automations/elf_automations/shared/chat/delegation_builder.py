@@ -1,13 +1,16 @@
 """
 Delegation Builder for Chat Interface
 Handles the preparation and validation of task delegations from chat conversations.
+
+Analysis is incremental: each session keeps the partial results extracted so
+far and only new messages are scanned on the next call.
 """
 
 import re
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from ...shared.a2a import ChatDelegationReady, TaskRequest
 from ...shared.utils import get_logger
@@ -126,11 +129,48 @@ class DelegationSpec:
         )
 
 
+@dataclass
+class _ConversationAnalysis:
+    """Partial extraction results for the messages of one session seen so far."""
+
+    processed: int = 0
+    first_message: Optional[Tuple[Any, Any]] = None
+    last_message: Optional[Tuple[Any, Any]] = None
+
+    user_message_count: int = 0
+    title: Optional[str] = None
+    fallback_title: Optional[str] = None
+    description_parts: List[str] = field(default_factory=list)
+    requirements: List[DelegationRequirement] = field(default_factory=list)
+    seen_requirements: Set[str] = field(default_factory=set)
+    priorities: Set[TaskPriority] = field(default_factory=set)
+    deadline_hint: Optional[str] = None  # "today" or "tomorrow"
+    constraints: List[str] = field(default_factory=list)
+    success_criteria: List[str] = field(default_factory=list)
+    description_teams: Set[str] = field(default_factory=set)
+    user_intents: List[str] = field(default_factory=list)
+    key_points: List[str] = field(default_factory=list)
+
+    def continues(self, messages: List[Dict[str, Any]]) -> bool:
+        """Whether messages extend (rather than replace) what was analyzed."""
+        if len(messages) < self.processed:
+            return False
+        if self.processed == 0:
+            return True
+        first = messages[0]
+        last = messages[self.processed - 1]
+        return (first.get("role"), first.get("content")) == self.first_message and (
+            last.get("role"),
+            last.get("content"),
+        ) == self.last_message
+
+
 class DelegationBuilder:
     """Builds task delegations from chat conversations."""
 
     def __init__(self):
         self.specs: Dict[str, DelegationSpec] = {}
+        self._analyses: Dict[str, _ConversationAnalysis] = {}
 
         # Keywords for extraction
         self.requirement_keywords = [
@@ -180,6 +220,51 @@ class DelegationBuilder:
             ],
         }
 
+        self.constraint_keywords = [
+            "cannot",
+            "must not",
+            "avoid",
+            "don't",
+            "shouldn't",
+            "constraint",
+            "limitation",
+        ]
+
+        self.success_keywords = [
+            "success",
+            "complete when",
+            "done when",
+            "finished when",
+            "goal",
+            "outcome",
+        ]
+
+        self.team_keywords = {
+            "engineering-team": [
+                "code",
+                "api",
+                "database",
+                "technical",
+                "develop",
+                "implement",
+            ],
+            "marketing-team": ["campaign", "marketing", "social", "content", "brand"],
+            "operations-team": [
+                "process",
+                "operations",
+                "deployment",
+                "infrastructure",
+            ],
+            "finance-team": ["budget", "cost", "financial", "accounting", "expense"],
+            "product-team": [
+                "feature",
+                "product",
+                "user experience",
+                "requirements",
+                "design",
+            ],
+        }
+
     def analyze_conversation(
         self,
         messages: List[Dict[str, Any]],
@@ -197,6 +282,41 @@ class DelegationBuilder:
         Returns:
             DelegationSpec with extracted information
         """
+        analysis = self._analyses.get(session_id)
+        if analysis is None or not analysis.continues(messages):
+            # New session, or earlier messages were edited: start over
+            analysis = _ConversationAnalysis()
+            self._analyses[session_id] = analysis
+
+        # Only scan messages added since the last call
+        for msg in messages[analysis.processed :]:
+            self._fold_message(analysis, msg)
+        analysis.processed = len(messages)
+        if messages:
+            first, last = messages[0], messages[-1]
+            analysis.first_message = (first.get("role"), first.get("content"))
+            analysis.last_message = (last.get("role"), last.get("content"))
+
+        spec = self._build_spec(analysis, len(messages), session_id, user_id)
+
+        # Store the spec
+        self.specs[session_id] = spec
+
+        return spec
+
+    def forget(self, session_id: str):
+        """Drop the stored spec and incremental state for a session."""
+        self.specs.pop(session_id, None)
+        self._analyses.pop(session_id, None)
+
+    def _build_spec(
+        self,
+        analysis: _ConversationAnalysis,
+        message_count: int,
+        session_id: str,
+        user_id: Optional[str],
+    ) -> DelegationSpec:
+        """Assemble a spec from the accumulated partial results."""
         # Initialize spec
         spec = DelegationSpec(
             title="Task from chat conversation",
@@ -205,234 +325,165 @@ class DelegationBuilder:
             user_id=user_id,
         )
 
-        # Extract information from messages
-        user_messages = [m for m in messages if m.get("role") == "user"]
-        assistant_messages = [m for m in messages if m.get("role") == "assistant"]
-
-        if user_messages:
-            # Extract title from first substantial user message
-            spec.title = self._extract_title(user_messages)
+        if not analysis.user_message_count:
+            return spec
 
-            # Build description from user intent
-            spec.description = self._build_description(user_messages)
-
-            # Extract requirements
-            spec.requirements = self._extract_requirements(messages)
-
-            # Determine priority
-            spec.priority = self._determine_priority(user_messages)
-
-            # Extract timeline/deadline
-            spec.deadline = self._extract_deadline(user_messages)
-
-            # Extract constraints and success criteria
-            spec.constraints = self._extract_constraints(messages)
-            spec.success_criteria = self._extract_success_criteria(messages)
-
-            # Estimate effort
-            spec.estimated_hours = self._estimate_effort(spec)
+        spec.title = analysis.title or analysis.fallback_title
+        spec.description = "User request from chat session:\n\n" + "\n\n".join(
+            analysis.description_parts
+        )
+        spec.requirements = list(analysis.requirements)
+        spec.priority = next(
+            (p for p in self.priority_indicators if p in analysis.priorities),
+            TaskPriority.NORMAL,
+        )
+        spec.deadline = self._resolve_deadline(analysis.deadline_hint)
+        spec.constraints = list(analysis.constraints)
+        spec.success_criteria = list(analysis.success_criteria)
 
-            # Suggest teams based on content
-            spec.suggested_teams = self._suggest_teams(spec)
+        # Estimate effort
+        spec.estimated_hours = self._estimate_effort(spec)
 
-            # Calculate confidence
-            spec.confidence_level = self._calculate_confidence(spec, messages)
+        # Suggest teams based on content
+        spec.suggested_teams = self._suggest_teams(spec, analysis.description_teams)
 
-            # Generate summary
-            spec.chat_summary = self._generate_summary(messages)
+        # Calculate confidence
+        spec.confidence_level = self._calculate_confidence(spec, message_count)
 
-        # Store the spec
-        self.specs[session_id] = spec
+        # Generate summary
+        spec.chat_summary = self._generate_summary(analysis)
 
         return spec
 
-    def _extract_title(self, user_messages: List[Dict[str, Any]]) -> str:
-        """Extract a concise title from user messages."""
-        # Look for explicit task statements
-        for msg in user_messages:
-            content = msg.get("content", "").lower()
-
-            # Check for explicit task phrases
-            if "i need" in content or "please" in content or "can you" in content:
-                # Extract the main request
-                lines = msg["content"].split("\n")
-                for line in lines:
-                    if any(
-                        keyword in line.lower()
-                        for keyword in ["need", "want", "please", "help"]
-                    ):
-                        # Clean and truncate
-                        title = line.strip()
-                        title = re.sub(
-                            r"^(i need|please|can you|help me|i want)\s+",
-                            "",
-                            title,
-                            flags=re.IGNORECASE,
-                        )
-                        return title[:100]  # Max 100 chars
-
-        # Fallback: use first message snippet
-        if user_messages:
-            first_msg = user_messages[0].get("content", "")
-            return first_msg[:100].strip() + ("..." if len(first_msg) > 100 else "")
-
-        return "Task from chat conversation"
-
-    def _build_description(self, user_messages: List[Dict[str, Any]]) -> str:
-        """Build a comprehensive description from user messages."""
-        description_parts = []
-
-        for msg in user_messages:
-            content = msg.get("content", "")
-            # Skip very short messages
-            if len(content) < 20:
-                continue
-
-            # Add substantial messages to description
-            description_parts.append(content)
-
-        # Join with proper spacing
-        full_description = "\n\n".join(description_parts)
-
-        # Add context prefix
-        return f"User request from chat session:\n\n{full_description}"
-
-    def _extract_requirements(
-        self, messages: List[Dict[str, Any]]
-    ) -> List[DelegationRequirement]:
-        """Extract specific requirements from messages."""
-        requirements = []
-
-        for msg in messages:
-            content = msg.get("content", "")
-            role = msg.get("role", "")
-
-            # Look for requirement patterns
-            lines = content.split("\n")
+    def _fold_message(self, analysis: _ConversationAnalysis, msg: Dict[str, Any]):
+        """Extract everything one message contributes to the analysis."""
+        content = msg.get("content", "")
+        role = msg.get("role", "")
+        lines = content.split("\n")
+
+        # Requirements, constraints and success criteria come from every message
+        for line in lines:
+            line_lower = line.lower()
+
+            requirement = self._extract_requirement(line, line_lower, role, msg)
+            if (
+                requirement
+                and requirement.description not in analysis.seen_requirements
+            ):
+                analysis.seen_requirements.add(requirement.description)
+                analysis.requirements.append(requirement)
+
+            if any(keyword in line_lower for keyword in self.constraint_keywords):
+                analysis.constraints.append(line.strip())
+
+            if any(keyword in line_lower for keyword in self.success_keywords):
+                analysis.success_criteria.append(line.strip())
+
+        if role == "user":
+            self._fold_user_message(analysis, content, lines)
+        elif role == "assistant":
+            # Look for clarifications or confirmations
+            if len(analysis.key_points) < 2 and (
+                "will" in content.lower() or "plan to" in content.lower()
+            ):
+                analysis.key_points.append(content[:100])
+
+    def _fold_user_message(
+        self, analysis: _ConversationAnalysis, content: str, lines: List[str]
+    ):
+        content_lower = content.lower()
+        analysis.user_message_count += 1
+
+        # Title: first explicit request, else the first message snippet
+        if analysis.fallback_title is None:
+            analysis.fallback_title = content[:100].strip() + (
+                "..." if len(content) > 100 else ""
+            )
+        if analysis.title is None:
+            analysis.title = self._extract_title(content, content_lower, lines)
+
+        # Skip very short messages in the description
+        if len(content) >= 20:
+            analysis.description_parts.append(content)
+            analysis.description_teams.update(self._match_teams(content_lower))
+
+        for priority, keywords in self.priority_indicators.items():
+            if any(keyword in content_lower for keyword in keywords):
+                analysis.priorities.add(priority)
+
+        if analysis.deadline_hint is None and any(
+            keyword in content_lower for keyword in self.timeline_keywords
+        ):
+            if "today" in content_lower:
+                analysis.deadline_hint = "today"
+            elif "tomorrow" in content_lower:
+                analysis.deadline_hint = "tomorrow"
+
+        # First line often contains main intent
+        if len(analysis.user_intents) < 3 and lines and lines[0]:
+            analysis.user_intents.append(lines[0][:100])
+
+    def _extract_title(
+        self, content: str, content_lower: str, lines: List[str]
+    ) -> Optional[str]:
+        """Extract a concise title from an explicit request, if this is one."""
+        # Check for explicit task phrases
+        if any(phrase in content_lower for phrase in ["i need", "please", "can you"]):
+            # Extract the main request
             for line in lines:
-                line_lower = line.lower()
-
-                # Check for requirement keywords
-                if any(keyword in line_lower for keyword in self.requirement_keywords):
-                    # Extract the requirement
-                    req_text = line.strip()
-
-                    # Determine category
-                    category = None
-                    if any(
-                        word in line_lower
-                        for word in ["api", "database", "code", "technical"]
-                    ):
-                        category = "technical"
-                    elif any(
-                        word in line_lower for word in ["user", "customer", "business"]
-                    ):
-                        category = "business"
-                    elif any(
-                        word in line_lower for word in ["deadline", "timeline", "when"]
-                    ):
-                        category = "timeline"
-
-                    # Higher confidence for user requirements
-                    confidence = 0.9 if role == "user" else 0.7
-
-                    requirements.append(
-                        DelegationRequirement(
-                            description=req_text,
-                            source_message_id=msg.get("id"),
-                            confidence=confidence,
-                            category=category,
-                        )
+                if any(
+                    keyword in line.lower()
+                    for keyword in ["need", "want", "please", "help"]
+                ):
+                    # Clean and truncate
+                    title = line.strip()
+                    title = re.sub(
+                        r"^(i need|please|can you|help me|i want)\s+",
+                        "",
+                        title,
+                        flags=re.IGNORECASE,
                     )
+                    return title[:100]  # Max 100 chars
 
-        # Remove duplicates
-        seen = set()
-        unique_requirements = []
-        for req in requirements:
-            if req.description not in seen:
-                seen.add(req.description)
-                unique_requirements.append(req)
-
-        return unique_requirements
-
-    def _determine_priority(self, user_messages: List[Dict[str, Any]]) -> TaskPriority:
-        """Determine task priority from conversation."""
-        all_content = " ".join(msg.get("content", "").lower() for msg in user_messages)
+        return None
 
-        # Check priority indicators
-        for priority, keywords in self.priority_indicators.items():
-            if any(keyword in all_content for keyword in keywords):
-                return priority
+    def _extract_requirement(
+        self, line: str, line_lower: str, role: str, msg: Dict[str, Any]
+    ) -> Optional[DelegationRequirement]:
+        """Extract a requirement from one line of a message."""
+        # Check for requirement keywords
+        if not any(keyword in line_lower for keyword in self.requirement_keywords):
+            return None
 
-        return TaskPriority.NORMAL
+        # Determine category
+        category = None
+        if any(word in line_lower for word in ["api", "database", "code", "technical"]):
+            category = "technical"
+        elif any(word in line_lower for word in ["user", "customer", "business"]):
+            category = "business"
+        elif any(word in line_lower for word in ["deadline", "timeline", "when"]):
+            category = "timeline"
+
+        # Higher confidence for user requirements
+        confidence = 0.9 if role == "user" else 0.7
+
+        return DelegationRequirement(
+            description=line.strip(),
+            source_message_id=msg.get("id"),
+            confidence=confidence,
+            category=category,
+        )
 
-    def _extract_deadline(
-        self, user_messages: List[Dict[str, Any]]
-    ) -> Optional[datetime]:
-        """Extract deadline from messages."""
+    def _resolve_deadline(self, deadline_hint: Optional[str]) -> Optional[datetime]:
+        """Turn a relative deadline hint into a date."""
         # This is a simplified implementation
         # In production, you'd use date parsing libraries
-
-        for msg in user_messages:
-            content = msg.get("content", "").lower()
-
-            if any(keyword in content for keyword in self.timeline_keywords):
-                # Simple patterns
-                if "today" in content:
-                    return datetime.utcnow().replace(hour=23, minute=59)
-                elif "tomorrow" in content:
-                    from datetime import timedelta
-
-                    return datetime.utcnow() + timedelta(days=1)
-                # Add more sophisticated date parsing here
-
+        if deadline_hint == "today":
+            return datetime.utcnow().replace(hour=23, minute=59)
+        elif deadline_hint == "tomorrow":
+            return datetime.utcnow() + timedelta(days=1)
         return None
 
-    def _extract_constraints(self, messages: List[Dict[str, Any]]) -> List[str]:
-        """Extract constraints from conversation."""
-        constraints = []
-        constraint_keywords = [
-            "cannot",
-            "must not",
-            "avoid",
-            "don't",
-            "shouldn't",
-            "constraint",
-            "limitation",
-        ]
-
-        for msg in messages:
-            content = msg.get("content", "")
-            lines = content.split("\n")
-
-            for line in lines:
-                if any(keyword in line.lower() for keyword in constraint_keywords):
-                    constraints.append(line.strip())
-
-        return constraints
-
-    def _extract_success_criteria(self, messages: List[Dict[str, Any]]) -> List[str]:
-        """Extract success criteria from conversation."""
-        criteria = []
-        success_keywords = [
-            "success",
-            "complete when",
-            "done when",
-            "finished when",
-            "goal",
-            "outcome",
-        ]
-
-        for msg in messages:
-            content = msg.get("content", "")
-            lines = content.split("\n")
-
-            for line in lines:
-                if any(keyword in line.lower() for keyword in success_keywords):
-                    criteria.append(line.strip())
-
-        return criteria
-
     def _estimate_effort(self, spec: DelegationSpec) -> float:
         """Estimate effort in hours based on requirements and complexity."""
         base_hours = 4.0  # Base estimate
@@ -449,42 +500,21 @@ class DelegationBuilder:
         # Cap at reasonable limits
         return min(max(hours, 1.0), 80.0)
 
-    def _suggest_teams(self, spec: DelegationSpec) -> List[str]:
-        """Suggest teams based on task content."""
-        suggestions = []
-
-        content = (spec.title + " " + spec.description).lower()
-
-        # Simple keyword matching
-        team_keywords = {
-            "engineering-team": [
-                "code",
-                "api",
-                "database",
-                "technical",
-                "develop",
-                "implement",
-            ],
-            "marketing-team": ["campaign", "marketing", "social", "content", "brand"],
-            "operations-team": [
-                "process",
-                "operations",
-                "deployment",
-                "infrastructure",
-            ],
-            "finance-team": ["budget", "cost", "financial", "accounting", "expense"],
-            "product-team": [
-                "feature",
-                "product",
-                "user experience",
-                "requirements",
-                "design",
-            ],
+    def _match_teams(self, content_lower: str) -> Set[str]:
+        """Teams whose keywords appear in the text."""
+        return {
+            team
+            for team, keywords in self.team_keywords.items()
+            if any(keyword in content_lower for keyword in keywords)
         }
 
-        for team, keywords in team_keywords.items():
-            if any(keyword in content for keyword in keywords):
-                suggestions.append(team)
+    def _suggest_teams(
+        self, spec: DelegationSpec, description_teams: Set[str]
+    ) -> List[str]:
+        """Suggest teams based on task content."""
+        # Simple keyword matching
+        matched = description_teams | self._match_teams(spec.title.lower())
+        suggestions = [team for team in self.team_keywords if team in matched]
 
         # Default to general team if no specific match
         if not suggestions:
@@ -492,9 +522,7 @@ class DelegationBuilder:
 
         return suggestions
 
-    def _calculate_confidence(
-        self, spec: DelegationSpec, messages: List[Dict[str, Any]]
-    ) -> float:
+    def _calculate_confidence(self, spec: DelegationSpec, message_count: int) -> float:
         """Calculate confidence level for delegation readiness."""
         confidence = 0.5  # Base confidence
 
@@ -508,38 +536,22 @@ class DelegationBuilder:
         if spec.success_criteria:
             confidence += 0.1
 
-        if len(messages) > 5:  # Substantial conversation
+        if message_count > 5:  # Substantial conversation
             confidence += 0.1
 
         # Cap at maximum
         return min(confidence, 0.95)
 
-    def _generate_summary(self, messages: List[Dict[str, Any]]) -> str:
+    def _generate_summary(self, analysis: _ConversationAnalysis) -> str:
         """Generate a summary of the conversation."""
         # In production, this could use an LLM for better summaries
-
-        user_intents = []
-        key_points = []
-
-        for msg in messages:
-            if msg.get("role") == "user":
-                # First line often contains main intent
-                lines = msg.get("content", "").split("\n")
-                if lines and lines[0]:
-                    user_intents.append(lines[0][:100])
-            elif msg.get("role") == "assistant":
-                # Look for clarifications or confirmations
-                content = msg.get("content", "")
-                if "will" in content.lower() or "plan to" in content.lower():
-                    key_points.append(content[:100])
-
         summary_parts = []
 
-        if user_intents:
-            summary_parts.append(f"User requested: {'; '.join(user_intents[:3])}")
+        if analysis.user_intents:
+            summary_parts.append(f"User requested: {'; '.join(analysis.user_intents)}")
 
-        if key_points:
-            summary_parts.append(f"Agreed approach: {'; '.join(key_points[:2])}")
+        if analysis.key_points:
+            summary_parts.append(f"Agreed approach: {'; '.join(analysis.key_points)}")
 
         return (
             " | ".join(summary_parts)
@@ -11,6 +11,7 @@ A lightweight, k3s-native credential management solution that provides:
 
 from .access_control import BreakGlassAccess, TeamBasedAccessControl
 from .audit_logger import AuditLogger
+from .audit_store import AuditStore
 from .credential_manager import Credential, CredentialManager, CredentialType
 from .credential_store import CredentialStore, SecureCredentialStore
 from .k3s_integration import K3sSecretManager
@@ -25,6 +26,7 @@ __all__ = [
     "TeamBasedAccessControl",
     "BreakGlassAccess",
     "AuditLogger",
+    "AuditStore",
     "RotationManager",
     "K3sSecretManager",
 ]
@@ -6,9 +6,10 @@ import json
 from collections import defaultdict
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 from ..utils.logging import setup_logger
+from .audit_store import AuditStore
 
 logger = setup_logger(__name__)
 
@@ -32,9 +33,23 @@ class AuditLogger:
     Provides compliance-ready audit trail
     """
 
-    def __init__(self, storage_path: Optional[Path] = None):
+    def __init__(
+        self,
+        storage_path: Optional[Path] = None,
+        buffered: bool = True,
+        compress_after_days: Optional[int] = None,
+    ):
+        """
+        Args:
+            storage_path: Directory for the audit partitions
+            buffered: Batch writes through a background writer thread
+            compress_after_days: Convert days older than this into compressed
+                columnar segments (disabled when None)
+        """
         self.storage_path = storage_path or Path.home() / ".elf_automations" / "audit"
         self.storage_path.mkdir(parents=True, exist_ok=True)
+        self.store = AuditStore(self.storage_path, buffered=buffered)
+        self.compress_after_days = compress_after_days
 
         # Separate logs by date for easier rotation
         self.current_date = datetime.now().date()
@@ -50,6 +65,9 @@ class AuditLogger:
             self.current_date = datetime.now().date()
             self.log_file = self._get_log_file()
 
+            if self.compress_after_days is not None:
+                self.store.compact_older_than(self.compress_after_days)
+
     def _log_event(self, event: Dict[str, Any]) -> None:
         """Log an audit event"""
         self._rotate_if_needed()
@@ -58,9 +76,8 @@ class AuditLogger:
         event["timestamp"] = datetime.now().isoformat()
         event["event_id"] = f"{event['timestamp']}_{event['event']}"
 
-        # Write as JSON line
-        with open(self.log_file, "a") as f:
-            f.write(json.dumps(event) + "\n")
+        # Buffered append to the day partition
+        self.store.append(event)
 
         # Also log to standard logger
         logger.info(
@@ -178,32 +195,25 @@ class AuditLogger:
         self, team: str, credential: str, minutes: int = 5
     ) -> int:
         """Count recent access denials"""
-        count = 0
-        cutoff = datetime.now() - timedelta(minutes=minutes)
-
-        # Read recent events
-        events = self.get_events(minutes=minutes)
-
-        for event in events:
-            if (
-                event.get("event") == AuditEvent.DENIED
-                and event.get("team") == team
-                and event.get("credential") == credential
-            ):
-                count += 1
-
-        return count
+        return sum(
+            1
+            for _ in self.store.iter_events(
+                start=datetime.now() - timedelta(minutes=minutes),
+                event_type=AuditEvent.DENIED,
+                team=team,
+                credential=credential,
+            )
+        )
 
-    def get_events(
+    def iter_events(
         self,
         days: Optional[int] = None,
         minutes: Optional[int] = None,
         event_type: Optional[str] = None,
         team: Optional[str] = None,
-    ) -> List[Dict]:
-        """Get audit events with filters"""
-        events = []
-
+        credential: Optional[str] = None,
+    ) -> Iterator[Dict]:
+        """Stream audit events, newest first, without loading them all"""
         # Determine time cutoff
         if minutes:
             cutoff = datetime.now() - timedelta(minutes=minutes)
@@ -212,49 +222,25 @@ class AuditLogger:
         else:
             cutoff = None
 
-        # Read log files
-        log_files = sorted(self.storage_path.glob("audit_*.jsonl"), reverse=True)
-
-        for log_file in log_files:
-            # Skip old files if cutoff specified
-            if cutoff:
-                file_date = datetime.fromisoformat(log_file.stem.replace("audit_", ""))
-                if file_date.date() < cutoff.date():
-                    break
-
-            # Read events from file
-            try:
-                with open(log_file, "r") as f:
-                    for line in f:
-                        event = json.loads(line.strip())
-
-                        # Apply filters
-                        if (
-                            cutoff
-                            and datetime.fromisoformat(event["timestamp"]) < cutoff
-                        ):
-                            continue
-
-                        if event_type and event["event"] != event_type:
-                            continue
-
-                        if team and event.get("team") != team:
-                            continue
-
-                        events.append(event)
-
-            except Exception as e:
-                logger.error(f"Failed to read audit log {log_file}: {e}")
+        return self.store.iter_events(
+            start=cutoff, event_type=event_type, team=team, credential=credential
+        )
 
-        return sorted(events, key=lambda x: x["timestamp"], reverse=True)
+    def get_events(
+        self,
+        days: Optional[int] = None,
+        minutes: Optional[int] = None,
+        event_type: Optional[str] = None,
+        team: Optional[str] = None,
+    ) -> List[Dict]:
+        """Get audit events with filters"""
+        return list(self.iter_events(days, minutes, event_type, team))
 
     def get_access_report(self, days: int = 30) -> Dict[str, Any]:
         """Generate comprehensive access report"""
-        events = self.get_events(days=days)
-
         report = {
             "period": f"Last {days} days",
-            "total_events": len(events),
+            "total_events": 0,
             "by_event_type": defaultdict(int),
             "by_team": defaultdict(int),
             "by_credential": defaultdict(int),
@@ -263,8 +249,11 @@ class AuditLogger:
             "anomalies": [],
         }
 
-        # Analyze events
-        for event in events:
+        access_by_team_hour = defaultdict(lambda: defaultdict(int))
+
+        # Analyze events in a single streaming pass
+        for event in self.iter_events(days=days):
+            report["total_events"] += 1
             event_type = event["event"]
             report["by_event_type"][event_type] += 1
 
@@ -292,23 +281,32 @@ class AuditLogger:
                     }
                 )
 
+            self._count_access_hour(event, access_by_team_hour)
+
         # Detect anomalies
-        report["anomalies"] = self._detect_anomalies(events)
+        report["anomalies"] = self._flag_unusual_hours(access_by_team_hour)
 
         return report
 
-    def _detect_anomalies(self, events: List[Dict]) -> List[Dict]:
+    def _detect_anomalies(self, events: Iterable[Dict]) -> List[Dict]:
         """Detect suspicious patterns in audit events"""
-        anomalies = []
-
         # Check for unusual access patterns
         access_by_team_hour = defaultdict(lambda: defaultdict(int))
 
         for event in events:
-            if event["event"] == AuditEvent.ACCESSED:
-                hour = datetime.fromisoformat(event["timestamp"]).hour
-                team = event["team"]
-                access_by_team_hour[team][hour] += 1
+            self._count_access_hour(event, access_by_team_hour)
+
+        return self._flag_unusual_hours(access_by_team_hour)
+
+    @staticmethod
+    def _count_access_hour(event: Dict, access_by_team_hour: Dict) -> None:
+        if event["event"] == AuditEvent.ACCESSED:
+            hour = datetime.fromisoformat(event["timestamp"]).hour
+            access_by_team_hour[event["team"]][hour] += 1
+
+    @staticmethod
+    def _flag_unusual_hours(access_by_team_hour: Dict) -> List[Dict]:
+        anomalies = []
 
         # Flag teams accessing credentials at unusual hours
         for team, hours in access_by_team_hour.items():
@@ -339,34 +337,28 @@ class AuditLogger:
         self, start_date: datetime, end_date: datetime, output_path: Path
     ) -> None:
         """Export audit logs for compliance reporting"""
-        events = []
-
-        # Collect events in date range
-        current = start_date.date()
-        while current <= end_date.date():
-            log_file = self.storage_path / f"audit_{current.isoformat()}.jsonl"
-
-            if log_file.exists():
-                with open(log_file, "r") as f:
-                    for line in f:
-                        event = json.loads(line.strip())
-                        event_time = datetime.fromisoformat(event["timestamp"])
-
-                        if start_date <= event_time <= end_date:
-                            events.append(event)
+        total = 0
 
-            current += timedelta(days=1)
+        # Stream events in date range straight to the report file
+        with open(output_path, "w") as f:
+            header = {
+                "report_generated": datetime.now().isoformat(),
+                "period_start": start_date.isoformat(),
+                "period_end": end_date.isoformat(),
+            }
+            f.write("{\n")
+            for key, value in header.items():
+                f.write(f"  {json.dumps(key)}: {json.dumps(value)},\n")
+            f.write('  "events": [')
 
-        # Write compliance report
-        report = {
-            "report_generated": datetime.now().isoformat(),
-            "period_start": start_date.isoformat(),
-            "period_end": end_date.isoformat(),
-            "total_events": len(events),
-            "events": sorted(events, key=lambda x: x["timestamp"]),
-        }
+            for event in self.store.iter_events(
+                start=start_date, end=end_date, newest_first=False
+            ):
+                f.write(",\n" if total else "\n")
+                f.write("    " + json.dumps(event, indent=2).replace("\n", "\n    "))
+                total += 1
 
-        with open(output_path, "w") as f:
-            json.dump(report, f, indent=2)
+            f.write("\n  ]" if total else "]")
+            f.write(f',\n  "total_events": {total}\n}}\n')
 
-        logger.info(f"Exported {len(events)} audit events for compliance")
+        logger.info(f"Exported {total} audit events for compliance")
@@ -0,0 +1,438 @@
+"""
+Time-partitioned, indexed storage for credential audit events
+
+Layout inside the audit directory:
+- audit_<day>.jsonl      - one JSON event per line (unchanged format)
+- audit_<day>.jsonl.idx  - sidecar index: line offsets, timestamps and
+                           postings by team, event type and credential;
+                           saved when the day rotates and on close, and
+                           caught up from the log tail when it lags behind
+- audit_<day>.seg.gz     - optional compressed columnar segment that
+                           replaces both files for old days
+
+Writes are buffered and flushed by a background thread. Queries pick the day
+partitions in range, narrow rows with the postings and a binary search on
+timestamps, and stream matching events instead of loading whole days.
+"""
+
+import atexit
+import gzip
+import json
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set
+
+from ..utils.logging import setup_logger
+
+logger = setup_logger(__name__)
+
+# Event fields with a postings list in the day index
+INDEXED_FIELDS = ("team", "event", "credential")
+
+
+class _DayIndex:
+    """Row offsets, timestamps and postings for one day's JSONL file"""
+
+    def __init__(self):
+        self.size = 0
+        self.offsets: List[int] = []
+        self.timestamps: List[str] = []
+        self.ordered = True
+        self.postings: Dict[str, Dict[str, List[int]]] = {
+            field: {} for field in INDEXED_FIELDS
+        }
+
+    def add(self, row: int, offset: int, event: Dict[str, Any]):
+        timestamp = event["timestamp"]
+        if self.timestamps and timestamp < self.timestamps[-1]:
+            # Interleaved writers; fall back to scanning the day by time
+            self.ordered = False
+        self.offsets.append(offset)
+        self.timestamps.append(timestamp)
+        for field in INDEXED_FIELDS:
+            value = event.get(field)
+            if value is not None:
+                self.postings[field].setdefault(str(value), []).append(row)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "offsets": self.offsets,
+            "timestamps": self.timestamps,
+            "ordered": self.ordered,
+            "postings": self.postings,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "_DayIndex":
+        index = cls()
+        index.size = data["size"]
+        index.offsets = data["offsets"]
+        index.timestamps = data["timestamps"]
+        index.ordered = data["ordered"]
+        index.postings = data["postings"]
+        return index
+
+
+class AuditStore:
+    """Buffered writer and indexed reader for daily audit partitions"""
+
+    def __init__(
+        self,
+        storage_path: Path,
+        flush_interval: float = 1.0,
+        max_buffer: int = 500,
+        buffered: bool = True,
+    ):
+        """
+        Args:
+            storage_path: Directory holding the audit partitions
+            flush_interval: Seconds between background flushes
+            max_buffer: Flush immediately once this many events are pending
+            buffered: Write through synchronously when False
+        """
+        self.storage_path = Path(storage_path)
+        self.storage_path.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.buffered = buffered
+
+        self._buffer: List[Dict[str, Any]] = []
+        self._lock = threading.RLock()
+        self._wake = threading.Event()
+        self._indexes: Dict[date, _DayIndex] = {}
+        self._dirty: Set[date] = set()
+        self._latest_day: Optional[date] = None
+        self._writer: Optional[threading.Thread] = None
+
+        if buffered:
+            self._writer = threading.Thread(
+                target=self._write_loop, name="audit-writer", daemon=True
+            )
+            self._writer.start()
+        atexit.register(self.close)
+
+    # Paths
+
+    def _log_file(self, day: date) -> Path:
+        return self.storage_path / f"audit_{day.isoformat()}.jsonl"
+
+    def _index_file(self, day: date) -> Path:
+        return self.storage_path / f"audit_{day.isoformat()}.jsonl.idx"
+
+    def _segment_file(self, day: date) -> Path:
+        return self.storage_path / f"audit_{day.isoformat()}.seg.gz"
+
+    def days(self) -> List[date]:
+        """All days with stored events, oldest first"""
+        found = set()
+        for path in self.storage_path.glob("audit_*"):
+            stamp = path.name[len("audit_") : len("audit_") + 10]
+            try:
+                found.add(date.fromisoformat(stamp))
+            except ValueError:
+                continue
+        return sorted(found)
+
+    # Writing
+
+    def append(self, event: Dict[str, Any]):
+        """Queue an event (must already carry its timestamp)"""
+        with self._lock:
+            self._buffer.append(event)
+            pending = len(self._buffer)
+        if not self.buffered:
+            self.flush()
+        elif pending >= self.max_buffer:
+            self._wake.set()
+
+    def _write_loop(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Failed to flush audit events: {e}")
+
+    def flush(self):
+        """Write pending events to their day partitions"""
+        with self._lock:
+            events, self._buffer = self._buffer, []
+            if not events:
+                return
+
+            by_day: Dict[date, List[str]] = {}
+            for event in events:
+                day = date.fromisoformat(event["timestamp"][:10])
+                by_day.setdefault(day, []).append(json.dumps(event) + "\n")
+
+            for day, lines in by_day.items():
+                with open(self._log_file(day), "a") as f:
+                    f.write("".join(lines))
+                # Keep the in-memory index current; the sidecar is only
+                # rewritten once the day rotates, so flushes stay O(batch)
+                self._index_for(day)
+                self._dirty.add(day)
+
+            newest = max(by_day)
+            if self._latest_day is None or newest > self._latest_day:
+                self._latest_day = newest
+            self._save_indexes(lambda day: day < self._latest_day)
+
+    def close(self):
+        """Flush pending events and save every unsaved day index"""
+        with self._lock:
+            self.flush()
+            self._save_indexes(lambda day: True)
+
+    # Indexing
+
+    def _index_for(self, day: date) -> _DayIndex:
+        """Load the day's index and extend it with rows appended since"""
+        with self._lock:
+            index = self._indexes.get(day)
+            if index is None:
+                index = self._load_index(day)
+                self._indexes[day] = index
+
+            log_file = self._log_file(day)
+            try:
+                size = log_file.stat().st_size
+            except FileNotFoundError:
+                return index
+
+            if size < index.size:
+                # File was replaced; rebuild from scratch
+                index = self._indexes[day] = _DayIndex()
+            if size == index.size:
+                return index
+
+            with open(log_file, "rb") as f:
+                f.seek(index.size)
+                offset = index.size
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        # Partial tail from a concurrent writer
+                        break
+                    if line.strip():
+                        try:
+                            index.add(len(index.offsets), offset, json.loads(line))
+                        except (ValueError, KeyError) as e:
+                            logger.warning(f"Skipping malformed audit line: {e}")
+                    offset += len(line)
+                index.size = offset
+            return index
+
+    def _load_index(self, day: date) -> _DayIndex:
+        index_file = self._index_file(day)
+        if index_file.exists():
+            try:
+                with open(index_file, "r") as f:
+                    return _DayIndex.from_dict(json.load(f))
+            except (ValueError, KeyError) as e:
+                logger.warning(f"Rebuilding corrupt audit index {index_file}: {e}")
+        return _DayIndex()
+
+    def _save_indexes(self, should_save: Callable[[date], bool]):
+        """Persist the dirty day indexes selected by should_save(day)"""
+        for day in [day for day in self._dirty if should_save(day)]:
+            index = self._indexes.get(day)
+            if index is not None:
+                self._save_index(day, index)
+            self._dirty.discard(day)
+
+    def _save_index(self, day: date, index: _DayIndex):
+        tmp_file = self._index_file(day).with_suffix(".idx.tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(index.to_dict(), f, separators=(",", ":"))
+        tmp_file.replace(self._index_file(day))
+
+    # Columnar segments
+
+    def compact_day(self, day: date) -> bool:
+        """
+        Rewrite a finished day as a compressed columnar segment.
+
+        Columns hold one value per row; fields missing from an event are
+        stored as null and dropped again when the row is read back.
+        """
+        log_file = self._log_file(day)
+        if day >= datetime.now().date() or not log_file.exists():
+            return False
+
+        with self._lock:
+            self.flush()
+            events = list(self._scan_log(day, self._index_for(day)))
+            events.sort(key=lambda event: event["timestamp"])
+
+            fields: Dict[str, None] = {}
+            for event in events:
+                fields.update(dict.fromkeys(event))
+            columns = {
+                field: [event.get(field) for event in events] for field in fields
+            }
+
+            tmp_file = self._segment_file(day).with_suffix(".tmp")
+            with gzip.open(tmp_file, "wt") as f:
+                json.dump({"rows": len(events), "columns": columns}, f)
+            tmp_file.replace(self._segment_file(day))
+
+            log_file.unlink()
+            self._index_file(day).unlink(missing_ok=True)
+            self._indexes.pop(day, None)
+            self._dirty.discard(day)
+
+        logger.info(f"Compacted {len(events)} audit events for {day} into a segment")
+        return True
+
+    def compact_older_than(self, days: int) -> int:
+        """Convert every JSONL day older than `days` into a segment"""
+        cutoff = datetime.now().date() - timedelta(days=days)
+        return sum(1 for day in self.days() if day < cutoff and self.compact_day(day))
+
+    # Querying
+
+    def _scan_log(self, day: date, index: _DayIndex) -> Iterator[Dict[str, Any]]:
+        with open(self._log_file(day), "rb") as f:
+            remaining = index.size
+            for line in f:
+                if remaining <= 0:
+                    break
+                remaining -= len(line)
+                if line.strip():
+                    yield json.loads(line)
+
+    def _query_log(
+        self,
+        day: date,
+        start: Optional[str],
+        end: Optional[str],
+        filters: Dict[str, str],
+        newest_first: bool,
+    ) -> Iterator[Dict[str, Any]]:
+        index = self._index_for(day)
+
+        rows: Optional[set] = None
+        for field, value in filters.items():
+            posting = set(index.postings[field].get(value, ()))
+            rows = posting if rows is None else rows & posting
+            if not rows:
+                return
+
+        if index.ordered:
+            lo = bisect_left(index.timestamps, start) if start else 0
+            hi = bisect_right(index.timestamps, end) if end else len(index.offsets)
+            selected = (
+                range(lo, hi)
+                if rows is None
+                else sorted(row for row in rows if lo <= row < hi)
+            )
+        else:
+            candidates = range(len(index.offsets)) if rows is None else rows
+            selected = sorted(
+                (
+                    row
+                    for row in candidates
+                    if (not start or index.timestamps[row] >= start)
+                    and (not end or index.timestamps[row] <= end)
+                ),
+                key=lambda row: index.timestamps[row],
+            )
+
+        if newest_first:
+            selected = reversed(selected)
+
+        with open(self._log_file(day), "rb") as f:
+            for row in selected:
+                f.seek(index.offsets[row])
+                yield json.loads(f.readline())
+
+    def _query_segment(
+        self,
+        day: date,
+        start: Optional[str],
+        end: Optional[str],
+        filters: Dict[str, str],
+        newest_first: bool,
+    ) -> Iterator[Dict[str, Any]]:
+        with gzip.open(self._segment_file(day), "rt") as f:
+            segment = json.load(f)
+        columns = segment["columns"]
+        timestamps = columns["timestamp"]
+
+        lo = bisect_left(timestamps, start) if start else 0
+        hi = bisect_right(timestamps, end) if end else segment["rows"]
+        selected = range(lo, hi)
+        for field, value in filters.items():
+            column = columns.get(field)
+            if column is None:
+                return
+            selected = [row for row in selected if column[row] == value]
+
+        if newest_first:
+            selected = reversed(selected)
+
+        for row in selected:
+            yield {
+                field: column[row]
+                for field, column in columns.items()
+                if column[row] is not None
+            }
+
+    def iter_events(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        event_type: Optional[str] = None,
+        team: Optional[str] = None,
+        credential: Optional[str] = None,
+        newest_first: bool = True,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream events in timestamp order, one day partition at a time.
+
+        Args:
+            start: Earliest timestamp (inclusive)
+            end: Latest timestamp (inclusive)
+            event_type: Only events of this type
+            team: Only events for this team
+            credential: Only events for this credential
+            newest_first: Order from newest to oldest
+        """
+        self.flush()
+
+        filters = {
+            field: value
+            for field, value in (
+                ("event", event_type),
+                ("team", team),
+                ("credential", credential),
+            )
+            if value is not None
+        }
+        start_key = start.isoformat() if start else None
+        end_key = end.isoformat() if end else None
+
+        days = [
+            day
+            for day in self.days()
+            if (not start or day >= start.date()) and (not end or day <= end.date())
+        ]
+        if newest_first:
+            days.reverse()
+
+        for day in days:
+            try:
+                if self._log_file(day).exists():
+                    yield from self._query_log(
+                        day, start_key, end_key, filters, newest_first
+                    )
+                elif self._segment_file(day).exists():
+                    yield from self._query_segment(
+                        day, start_key, end_key, filters, newest_first
+                    )
+            except (OSError, ValueError) as e:
+                logger.error(f"Failed to read audit events for {day}: {e}")
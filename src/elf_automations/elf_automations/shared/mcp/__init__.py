@@ -10,8 +10,14 @@ from .agentgateway_router import (
     create_agentgateway_routes,
 )
 from .client import MCPClient, SyncMCPClient
-from .discovery import MCPDiscovery, MCPServerInfo, discover_mcp_servers
+from .discovery import (
+    MCPDiscovery,
+    MCPServerInfo,
+    discover_mcp_servers,
+    get_shared_discovery,
+)
 from .mock_client import MockMCPClient
+from .stdio_transport import StdioConnection, StdioProcessPool
 
 __all__ = [
     "MCPClient",
@@ -20,7 +26,10 @@ __all__ = [
     "MCPDiscovery",
     "MCPServerInfo",
     "discover_mcp_servers",
+    "get_shared_discovery",
     "MCPRouter",
     "MCPServerInstance",
     "create_agentgateway_routes",
+    "StdioConnection",
+    "StdioProcessPool",
 ]
@@ -6,19 +6,32 @@ Handles discovery of MCP servers from multiple sources:
 2. Local MCP configuration files
 3. K8s ConfigMaps
 4. Environment variables
+
+Each source is cached and revalidated cheaply: config files by mtime and
+size, the AgentGateway server list by ETag, and the K8s ConfigMap by TTL.
+discover_all() serves a recent snapshot without touching any source, and
+get_shared_discovery() gives the process one snapshot kept current by a
+background refresher, so creating clients doesn't rediscover servers.
 """
 
 import json
 import logging
 import os
 import subprocess
+import threading
+import time
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 import yaml
 
 logger = logging.getLogger(__name__)
 
+ServerMap = Dict[str, "MCPServerInfo"]
+
+# Whether kubectl works doesn't change while the process runs
+_k8s_available: Optional[bool] = None
+
 
 class MCPServerInfo:
     """Information about an MCP server"""
@@ -65,6 +78,8 @@ class MCPDiscovery:
         config_paths: Optional[List[str]] = None,
         k8s_namespace: str = "elf-automations",
         use_agentgateway: bool = True,
+        max_age: float = 30.0,
+        k8s_ttl: float = 300.0,
     ):
         """
         Initialize MCP Discovery
@@ -73,10 +88,14 @@ class MCPDiscovery:
             config_paths: Additional paths to search for MCP configs
             k8s_namespace: Kubernetes namespace to search
             use_agentgateway: Whether to query AgentGateway for servers
+            max_age: Seconds discover_all() serves its last snapshot as is
+            k8s_ttl: Seconds between reads of the K8s ConfigMap
         """
         self.config_paths = config_paths or []
         self.k8s_namespace = k8s_namespace
         self.use_agentgateway = use_agentgateway
+        self.max_age = max_age
+        self.k8s_ttl = k8s_ttl
 
         # Add default config paths
         self.config_paths.extend(
@@ -89,60 +108,114 @@ class MCPDiscovery:
             ]
         )
 
-        self._servers: Dict[str, MCPServerInfo] = {}
+        # Current snapshot; replaced (never mutated) on refresh
+        self._servers: ServerMap = {}
+        self._tool_index: Dict[str, List[str]] = {}
+        self._discovered_at: Optional[float] = None
 
-    def discover_all(self) -> Dict[str, MCPServerInfo]:
-        """Discover all available MCP servers"""
-        logger.info("Starting MCP server discovery...")
+        # Per-source caches
+        self._file_cache: Dict[str, Tuple[Tuple[int, int], ServerMap]] = {}
+        self._k8s_cache: Optional[Tuple[float, ServerMap]] = None
+        self._gateway_url: Optional[str] = None
+        self._gateway_etag: Optional[str] = None
+        self._gateway_servers: ServerMap = {}
 
-        # Clear previous discoveries
-        self._servers.clear()
+        # Guards the snapshot swap and gateway state; never held during I/O
+        self._lock = threading.Lock()
+        self._refresher: Optional[threading.Thread] = None
+        self._stop_refresh = threading.Event()
 
-        # Discover from various sources
-        self._discover_from_files()
-        self._discover_from_env()
-        self._discover_from_k8s()
-        self._discover_from_agentgateway()
+    def discover_all(self, force: bool = False) -> Dict[str, MCPServerInfo]:
+        """
+        Discover all available MCP servers
 
-        logger.info(
-            f"Discovered {len(self._servers)} MCP servers: {list(self._servers.keys())}"
-        )
-        return self._servers
+        Args:
+            force: Revalidate every source even if the snapshot is recent
+        """
+        started = time.monotonic()
+        with self._lock:
+            if (
+                not force
+                and self._discovered_at is not None
+                and started - self._discovered_at < self.max_age
+            ):
+                return self._servers
+
+        logger.info("Starting MCP server discovery...")
 
-    def _discover_from_files(self):
+        # Query the sources without the lock so readers and other callers
+        # never wait on gateway HTTP calls or kubectl. Later sources override
+        # earlier ones
+        servers: ServerMap = {}
+        servers.update(self._discover_from_files())
+        servers.update(self._discover_from_env())
+        servers.update(self._discover_from_k8s())
+        servers.update(self._discover_from_agentgateway())
+
+        tool_index: Dict[str, List[str]] = {}
+        for name, server in servers.items():
+            for tool in dict.fromkeys(server.tools):
+                tool_index.setdefault(tool, []).append(name)
+
+        with self._lock:
+            # A slower, older discovery must not replace a newer snapshot
+            if self._discovered_at is None or started >= self._discovered_at:
+                self._servers = servers
+                self._tool_index = tool_index
+                self._discovered_at = started
+
+        logger.info(f"Discovered {len(servers)} MCP servers: {list(servers.keys())}")
+        return servers
+
+    def _discover_from_files(self) -> ServerMap:
         """Discover MCP servers from configuration files"""
+        servers: ServerMap = {}
         for config_path in self.config_paths:
-            path = Path(config_path)
-            if not path.exists():
-                continue
-
             try:
-                logger.debug(f"Checking config file: {path}")
-
-                if path.suffix == ".json":
-                    with open(path, "r") as f:
-                        config = json.load(f)
-                elif path.suffix in [".yaml", ".yml"]:
-                    with open(path, "r") as f:
-                        config = yaml.safe_load(f)
-                else:
-                    continue
+                stat = os.stat(config_path)
+            except OSError:
+                self._file_cache.pop(config_path, None)
+                continue
 
-                # Parse different config formats
-                if "mcpServers" in config:
-                    # Claude Desktop style config
-                    self._parse_claude_config(config["mcpServers"])
-                elif "targets" in config and "mcp" in config["targets"]:
-                    # AgentGateway style config
-                    self._parse_agentgateway_config(config["targets"]["mcp"])
-                elif "mcp" in config:
-                    # Custom MCP config format
-                    self._parse_custom_config(config["mcp"])
+            validator = (stat.st_mtime_ns, stat.st_size)
+            cached = self._file_cache.get(config_path)
+            if cached is None or cached[0] != validator:
+                cached = (validator, self._parse_config_file(Path(config_path)))
+                self._file_cache[config_path] = cached
+            servers.update(cached[1])
+        return servers
+
+    def _parse_config_file(self, path: Path) -> ServerMap:
+        """Parse one configuration file"""
+        servers: ServerMap = {}
+        try:
+            logger.debug(f"Checking config file: {path}")
+
+            if path.suffix == ".json":
+                with open(path, "r") as f:
+                    config = json.load(f)
+            elif path.suffix in [".yaml", ".yml"]:
+                with open(path, "r") as f:
+                    config = yaml.safe_load(f)
+            else:
+                return servers
+
+            # Parse different config formats
+            if "mcpServers" in config:
+                # Claude Desktop style config
+                self._parse_claude_config(config["mcpServers"], servers)
+            elif "targets" in config and "mcp" in config["targets"]:
+                # AgentGateway style config
+                self._parse_agentgateway_config(config["targets"]["mcp"], servers)
+            elif "mcp" in config:
+                # Custom MCP config format
+                self._parse_custom_config(config["mcp"], servers)
 
-            except Exception as e:
-                logger.warning(f"Failed to parse config {path}: {e}")
+        except Exception as e:
+            logger.warning(f"Failed to parse config {path}: {e}")
+        return servers
 
-    def _parse_claude_config(self, servers_config: Dict):
+    def _parse_claude_config(self, servers_config: Dict, servers: ServerMap):
         """Parse Claude Desktop style MCP configuration"""
         for name, server_config in servers_config.items():
             try:
@@ -153,12 +226,12 @@ class MCPDiscovery:
                     args=server_config.get("args", []),
                     env=server_config.get("env", {}),
                 )
-                self._servers[name] = server
+                servers[name] = server
                 logger.debug(f"Added server from Claude config: {name}")
             except Exception as e:
                 logger.warning(f"Failed to parse Claude server config {name}: {e}")
 
-    def _parse_agentgateway_config(self, mcp_targets: List[Dict]):
+    def _parse_agentgateway_config(self, mcp_targets: List[Dict], servers: ServerMap):
         """Parse AgentGateway style MCP configuration"""
         for target in mcp_targets:
             try:
@@ -183,21 +256,21 @@ class MCPDiscovery:
                 else:
                     continue
 
-                self._servers[name] = server
+                servers[name] = server
                 logger.debug(f"Added server from AgentGateway config: {name}")
             except Exception as e:
                 logger.warning(f"Failed to parse AgentGateway target: {e}")
 
-    def _parse_custom_config(self, mcp_config: Dict):
+    def _parse_custom_config(self, mcp_config: Any, servers: ServerMap):
         """Parse custom MCP configuration format"""
         if isinstance(mcp_config, list):
-            servers = mcp_config
+            server_configs = mcp_config
         elif "servers" in mcp_config:
-            servers = mcp_config["servers"]
+            server_configs = mcp_config["servers"]
         else:
-            servers = [mcp_config]
+            server_configs = [mcp_config]
 
-        for server_config in servers:
+        for server_config in server_configs:
             try:
                 name = server_config.get("name", server_config.get("id", "unknown"))
                 server = MCPServerInfo(
@@ -210,13 +283,15 @@ class MCPDiscovery:
                     tools=server_config.get("tools", []),
                     description=server_config.get("description"),
                 )
-                self._servers[name] = server
+                servers[name] = server
                 logger.debug(f"Added server from custom config: {name}")
             except Exception as e:
                 logger.warning(f"Failed to parse custom server config: {e}")
 
-    def _discover_from_env(self):
+    def _discover_from_env(self) -> ServerMap:
         """Discover MCP servers from environment variables"""
+        servers: ServerMap = {}
+
         # Check for MCP_SERVERS env var (comma-separated list)
         mcp_servers = os.environ.get("MCP_SERVERS", "")
         if mcp_servers:
@@ -233,7 +308,7 @@ class MCPDiscovery:
                     server = MCPServerInfo(
                         name=server_name, protocol="stdio", command=os.environ[cmd_var]
                     )
-                    self._servers[server_name] = server
+                    servers[server_name] = server
                     logger.debug(f"Added server from env: {server_name}")
                 elif endpoint_var in os.environ:
                     server = MCPServerInfo(
@@ -241,13 +316,18 @@ class MCPDiscovery:
                         protocol="http",
                         endpoint=os.environ[endpoint_var],
                     )
-                    self._servers[server_name] = server
+                    servers[server_name] = server
                     logger.debug(f"Added server from env: {server_name}")
+        return servers
 
-    def _discover_from_k8s(self):
+    def _discover_from_k8s(self) -> ServerMap:
         """Discover MCP servers from Kubernetes ConfigMaps"""
+        if self._k8s_cache and time.monotonic() - self._k8s_cache[0] < self.k8s_ttl:
+            return self._k8s_cache[1]
+
+        servers: ServerMap = {}
         if not self._is_k8s_available():
-            return
+            return servers
 
         try:
             # Get AgentGateway ConfigMap
@@ -273,53 +353,58 @@ class MCPDiscovery:
                 config = json.loads(config_data)
 
                 if "targets" in config and "mcp" in config["targets"]:
-                    self._parse_agentgateway_config(config["targets"]["mcp"])
+                    self._parse_agentgateway_config(config["targets"]["mcp"], servers)
 
         except Exception as e:
             logger.debug(f"Failed to discover from K8s: {e}")
 
-    def _discover_from_agentgateway(self):
+        self._k8s_cache = (time.monotonic(), servers)
+        return servers
+
+    def _discover_from_agentgateway(self) -> ServerMap:
         """Discover MCP servers from AgentGateway API"""
         if not self.use_agentgateway:
-            return
+            return {}
+
+        with self._lock:
+            last_url = self._gateway_url
+            last_etag = self._gateway_etag
+            last_servers = self._gateway_servers
 
         try:
             import httpx
 
-            # Try common AgentGateway URLs
+            # Try the last gateway that answered, then common AgentGateway URLs
             gateway_urls = [
+                last_url or "",
                 os.environ.get("AGENTGATEWAY_URL", ""),
                 "http://agentgateway:3000",
                 "http://agentgateway.elf-automations:3000",
                 "http://localhost:3000",
             ]
 
-            for url in gateway_urls:
+            for url in dict.fromkeys(gateway_urls):
                 if not url:
                     continue
 
+                headers = {}
+                if url == last_url and last_etag:
+                    headers["If-None-Match"] = last_etag
+
                 try:
-                    response = httpx.get(f"{url}/mcp/servers", timeout=2.0)
+                    response = httpx.get(
+                        f"{url}/mcp/servers", headers=headers, timeout=2.0
+                    )
+                    if response.status_code == 304:
+                        logger.debug(f"AgentGateway server list unchanged at {url}")
+                        return last_servers
                     if response.status_code == 200:
-                        servers = response.json()
-                        for server_info in servers:
-                            if isinstance(server_info, str):
-                                # Simple server name
-                                self._servers[server_info] = MCPServerInfo(
-                                    name=server_info
-                                )
-                            elif isinstance(server_info, dict):
-                                # Detailed server info
-                                name = server_info.get("name", "unknown")
-                                self._servers[name] = MCPServerInfo(
-                                    name=name,
-                                    protocol=server_info.get("protocol", "stdio"),
-                                    endpoint=server_info.get("endpoint"),
-                                    tools=server_info.get("tools", []),
-                                    description=server_info.get("description"),
-                                )
+                        servers = self._parse_gateway_servers(response.json())
+                        self._set_gateway_state(
+                            url, response.headers.get("ETag"), servers
+                        )
                         logger.debug(f"Discovered servers from AgentGateway at {url}")
-                        break
+                        return servers
                 except Exception:
                     continue
 
@@ -328,17 +413,78 @@ class MCPDiscovery:
         except Exception as e:
             logger.debug(f"Failed to discover from AgentGateway: {e}")
 
+        self._set_gateway_state(None, None, {})
+        return {}
+
+    def _set_gateway_state(
+        self, url: Optional[str], etag: Optional[str], servers: ServerMap
+    ):
+        """Record the answering gateway, its ETag and server list together"""
+        with self._lock:
+            self._gateway_url = url
+            self._gateway_etag = etag
+            self._gateway_servers = servers
+
+    def _parse_gateway_servers(self, server_list: List[Any]) -> ServerMap:
+        """Parse the AgentGateway /mcp/servers response"""
+        servers: ServerMap = {}
+        for server_info in server_list:
+            if isinstance(server_info, str):
+                # Simple server name
+                servers[server_info] = MCPServerInfo(name=server_info)
+            elif isinstance(server_info, dict):
+                # Detailed server info
+                name = server_info.get("name", "unknown")
+                servers[name] = MCPServerInfo(
+                    name=name,
+                    protocol=server_info.get("protocol", "stdio"),
+                    endpoint=server_info.get("endpoint"),
+                    tools=server_info.get("tools", []),
+                    description=server_info.get("description"),
+                )
+        return servers
+
     def _is_k8s_available(self) -> bool:
         """Check if kubectl is available and configured"""
-        try:
-            result = subprocess.run(
-                ["kubectl", "version", "--client", "--short"],
-                capture_output=True,
-                check=False,
-            )
-            return result.returncode == 0
-        except Exception:
-            return False
+        global _k8s_available
+        if _k8s_available is None:
+            try:
+                result = subprocess.run(
+                    ["kubectl", "version", "--client", "--short"],
+                    capture_output=True,
+                    check=False,
+                )
+                _k8s_available = result.returncode == 0
+            except Exception:
+                _k8s_available = False
+        return _k8s_available
+
+    # Background refresh
+
+    def start_background_refresh(self, interval: float = 60.0):
+        """Revalidate all sources every `interval` seconds in a daemon thread"""
+        if self._refresher and self._refresher.is_alive():
+            return
+
+        def refresh_loop():
+            while not self._stop_refresh.is_set():
+                try:
+                    self.discover_all(force=True)
+                except Exception as e:
+                    logger.warning(f"Background MCP discovery failed: {e}")
+                self._stop_refresh.wait(interval)
+
+        self._stop_refresh.clear()
+        self._refresher = threading.Thread(
+            target=refresh_loop, name="mcp-discovery-refresh", daemon=True
+        )
+        self._refresher.start()
+
+    def stop_background_refresh(self):
+        """Stop the background refresher"""
+        self._stop_refresh.set()
+
+    # Lookups
 
     def get_server(self, name: str) -> Optional[MCPServerInfo]:
         """Get a specific server by name"""
@@ -356,13 +502,42 @@ class MCPDiscovery:
 
     def get_servers_with_tool(self, tool_name: str) -> List[MCPServerInfo]:
         """Get all servers that provide a specific tool"""
+        servers = self._servers
         return [
-            server for server in self._servers.values() if tool_name in server.tools
+            servers[name]
+            for name in self._tool_index.get(tool_name, ())
+            if name in servers
         ]
 
+    def list_tools(self) -> Set[str]:
+        """All tool names advertised by discovered servers"""
+        return set(self._tool_index)
+
+
+_shared_discovery: Optional[MCPDiscovery] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_discovery() -> MCPDiscovery:
+    """
+    Get the process-wide discovery snapshot.
+
+    Uses the default config paths. A background refresher revalidates it
+    every MCP_DISCOVERY_REFRESH_INTERVAL seconds (default 60, 0 disables).
+    """
+    global _shared_discovery
+    with _shared_lock:
+        if _shared_discovery is None:
+            interval = float(os.getenv("MCP_DISCOVERY_REFRESH_INTERVAL", 60))
+            _shared_discovery = MCPDiscovery(use_agentgateway=True)
+            if interval > 0:
+                _shared_discovery.max_age = interval * 2
+                _shared_discovery.start_background_refresh(interval)
+        return _shared_discovery
+
 
 # Convenience function
 def discover_mcp_servers(**kwargs) -> Dict[str, MCPServerInfo]:
     """Convenience function to discover all MCP servers"""
-    discovery = MCPDiscovery(**kwargs)
+    discovery = MCPDiscovery(**kwargs) if kwargs else get_shared_discovery()
     return discovery.discover_all()
@@ -1,5 +1,19 @@
 """Memory and Learning System components."""
 
+from .embedding_service import (
+    EmbeddingProvider,
+    EmbeddingService,
+    HashEmbeddingProvider,
+    OpenAIEmbeddingProvider,
+    get_embedding_service,
+)
+from .episode_analytics import (
+    EpisodeRollups,
+    RollupBucket,
+    TeamIdResolver,
+    categorize_task,
+    get_team_rollups,
+)
 from .evolved_agent_loader import EvolvedAgentConfig, EvolvedAgentLoader
 from .improvement_loop import ContinuousImprovementLoop
 from .learning_system import LearningSystem
@@ -18,4 +32,14 @@ __all__ = [
     "PromptEvolution",
     "EvolvedAgentLoader",
     "EvolvedAgentConfig",
+    "EmbeddingProvider",
+    "EmbeddingService",
+    "HashEmbeddingProvider",
+    "OpenAIEmbeddingProvider",
+    "get_embedding_service",
+    "EpisodeRollups",
+    "RollupBucket",
+    "TeamIdResolver",
+    "categorize_task",
+    "get_team_rollups",
 ]
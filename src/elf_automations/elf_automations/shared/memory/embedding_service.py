@@ -0,0 +1,352 @@
+"""
+Embedding Service - Shared, cached and batched embeddings for the memory system
+
+Provides a single place where episode and query text is turned into vectors:
+- Pluggable providers (deterministic hash provider for development, OpenAI)
+- Content-hash LRU cache in memory plus an optional on-disk cache
+- Batched provider calls, with async request coalescing for concurrent callers
+- NumPy float32 outputs instead of Python lists
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingProvider:
+    """Base class for embedding providers."""
+
+    name: str = "base"
+    dimension: int = 1536
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed a batch of texts into a (len(texts), dimension) float32 array."""
+        raise NotImplementedError
+
+
+class HashEmbeddingProvider(EmbeddingProvider):
+    """
+    Deterministic placeholder embeddings derived from a SHA-256 digest.
+
+    Produces the same vectors the memory mixin has always generated (each digest
+    byte scaled to [0, 1] and repeated to fill the dimension) without building
+    them one Python float at a time.
+    """
+
+    name = "hash"
+
+    def __init__(self, dimension: int = 1536, repeat: int = 8):
+        self.dimension = dimension
+        self.repeat = repeat
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        digests = b"".join(hashlib.sha256(text.encode()).digest() for text in texts)
+        digest_bytes = np.frombuffer(digests, dtype=np.uint8).reshape(len(texts), 32)
+        distinct = -(-self.dimension // self.repeat)
+        values = digest_bytes[:, np.arange(distinct) % 32]
+        vectors = np.repeat(values.astype(np.float32) / 255.0, self.repeat, axis=1)
+        return np.ascontiguousarray(vectors[:, : self.dimension])
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """Embeddings from the OpenAI API, one request per batch."""
+
+    name = "openai"
+
+    MODEL_DIMENSIONS = {
+        "text-embedding-3-small": 1536,
+        "text-embedding-3-large": 3072,
+        "text-embedding-ada-002": 1536,
+    }
+
+    def __init__(self, model: str = "text-embedding-3-small"):
+        import openai
+
+        self.model = model
+        self.name = f"openai:{model}"
+        self.dimension = self.MODEL_DIMENSIONS.get(model, 1536)
+        self._client = openai.OpenAI()
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        response = self._client.embeddings.create(input=list(texts), model=self.model)
+        data = sorted(response.data, key=lambda item: item.index)
+        return np.asarray([item.embedding for item in data], dtype=np.float32)
+
+
+class _DiskCache:
+    """SQLite-backed key -> vector store shared across processes."""
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        found: Dict[str, bytes] = {}
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                batch = keys[i : i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    batch,
+                ).fetchall()
+                found.update(rows)
+        return found
+
+    def put_many(self, items: Dict[str, bytes]):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                list(items.items()),
+            )
+            self._conn.commit()
+
+
+class EmbeddingService:
+    """
+    Cached, batched embedding front-end over a pluggable provider.
+
+    Usage:
+        service = EmbeddingService(HashEmbeddingProvider())
+        vectors = service.embed(["first text", "second text"])  # (2, 1536)
+        vector = service.embed_one("query text")
+        vector = await service.aembed("query text")  # coalesced with peers
+    """
+
+    def __init__(
+        self,
+        provider: Optional[EmbeddingProvider] = None,
+        cache_size: int = 10_000,
+        cache_dir: Optional[Path] = None,
+        batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+    ):
+        """
+        Initialize embedding service.
+
+        Args:
+            provider: Embedding provider (defaults to HashEmbeddingProvider)
+            cache_size: Maximum vectors kept in the in-memory LRU
+            cache_dir: Optional directory for the on-disk cache
+            batch_size: Maximum texts per provider call
+            max_wait_ms: How long aembed waits to coalesce concurrent requests
+        """
+        self.provider = provider or HashEmbeddingProvider()
+        self.cache_size = cache_size
+        self.batch_size = batch_size
+        self.max_wait_ms = max_wait_ms
+
+        self._lru: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = (
+            _DiskCache(Path(cache_dir) / "embeddings.db") if cache_dir else None
+        )
+
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._queue: List[str] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "provider_calls": 0}
+
+    @property
+    def dimension(self) -> int:
+        return self.provider.dimension
+
+    def cache_key(self, text: str) -> str:
+        """Content-addressed key, scoped to the provider that produced it."""
+        return hashlib.sha256(f"{self.provider.name}\0{text}".encode()).hexdigest()
+
+    def _lookup(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Resolve keys from the LRU, then the disk cache."""
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for key in keys:
+                vector = self._lru.get(key)
+                if vector is not None:
+                    self._lru.move_to_end(key)
+                    found[key] = vector
+            self.stats["hits"] += len(found)
+
+        missing = [key for key in keys if key not in found]
+        if self._disk and missing:
+            for key, blob in self._disk.get_many(missing).items():
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+            self._remember({k: found[k] for k in missing if k in found})
+            self.stats["disk_hits"] += sum(1 for k in missing if k in found)
+        return found
+
+    def _remember(self, vectors: Dict[str, np.ndarray]):
+        with self._lock:
+            for key, vector in vectors.items():
+                self._lru[key] = vector
+                self._lru.move_to_end(key)
+            while len(self._lru) > self.cache_size:
+                self._lru.popitem(last=False)
+
+    def _compute(self, texts: List[str], keys: List[str]) -> Dict[str, np.ndarray]:
+        """Call the provider in batches for texts missing from every cache."""
+        computed: Dict[str, np.ndarray] = {}
+        for i in range(0, len(texts), self.batch_size):
+            vectors = self.provider.embed(texts[i : i + self.batch_size])
+            self.stats["provider_calls"] += 1
+            vectors = np.asarray(vectors, dtype=np.float32)
+            vectors.setflags(write=False)
+            for key, vector in zip(keys[i : i + self.batch_size], vectors):
+                computed[key] = vector
+        self.stats["misses"] += len(computed)
+
+        self._remember(computed)
+        if self._disk and computed:
+            self._disk.put_many({k: v.tobytes() for k, v in computed.items()})
+        return computed
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed texts, reusing cached vectors and batching the rest."""
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+
+        keys = [self.cache_key(text) for text in texts]
+        found = self._lookup(list(dict.fromkeys(keys)))
+
+        # Deduplicate identical texts before calling the provider
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+        if missing:
+            found.update(self._compute(list(missing.values()), list(missing.keys())))
+
+        return np.stack([found[key] for key in keys])
+
+    def embed_one(self, text: str) -> np.ndarray:
+        """Embed a single text."""
+        return self.embed([text])[0]
+
+    def embed_json(self, obj: Any) -> np.ndarray:
+        """Embed a JSON-serializable object by its canonical serialization."""
+        return self.embed_one(json.dumps(obj, sort_keys=True, default=str))
+
+    async def aembed(self, text: str) -> np.ndarray:
+        """
+        Embed a single text, coalescing with other concurrent callers.
+
+        Requests arriving within max_wait_ms of each other are sent to the
+        provider as one batch; identical in-flight texts share one result.
+        """
+        key = self.cache_key(text)
+        found = self._lookup([key])
+        if key in found:
+            return found[key]
+
+        if key in self._pending:
+            return await asyncio.shield(self._pending[key])
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending[key] = future
+        self._queue.append(text)
+
+        if len(self._queue) >= self.batch_size:
+            self._schedule_flush(loop, immediate=True)
+        elif self._flush_handle is None:
+            self._schedule_flush(loop)
+
+        return await asyncio.shield(future)
+
+    async def aembed_many(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed many texts without blocking the event loop."""
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.embed, list(texts)
+        )
+
+    def _schedule_flush(self, loop: asyncio.AbstractEventLoop, immediate: bool = False):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        delay = 0 if immediate else self.max_wait_ms / 1000
+        self._flush_handle = loop.call_later(
+            delay, lambda: loop.create_task(self._flush())
+        )
+
+    async def _flush(self):
+        """Send the queued texts to the provider as one batch."""
+        self._flush_handle = None
+        texts, self._queue = self._queue, []
+        if not texts:
+            return
+
+        keys = [self.cache_key(text) for text in texts]
+        futures = [self._pending.pop(key) for key in keys]
+        try:
+            vectors = await asyncio.get_running_loop().run_in_executor(
+                None, self.embed, texts
+            )
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for future, vector in zip(futures, vectors):
+            if not future.done():
+                future.set_result(vector)
+
+    def clear(self):
+        """Drop the in-memory cache (the disk cache is kept)."""
+        with self._lock:
+            self._lru.clear()
+
+
+_default_service: Optional[EmbeddingService] = None
+_default_lock = threading.Lock()
+
+
+def get_embedding_service() -> EmbeddingService:
+    """
+    Get the process-wide embedding service.
+
+    Configured from the environment:
+        MEMORY_EMBEDDING_PROVIDER: "hash" (default) or "openai"
+        MEMORY_EMBEDDING_MODEL: OpenAI model name
+        MEMORY_EMBEDDING_CACHE_DIR: Directory for the on-disk cache
+    """
+    global _default_service
+    with _default_lock:
+        if _default_service is None:
+            provider_name = os.getenv("MEMORY_EMBEDDING_PROVIDER", "hash")
+            provider: EmbeddingProvider
+            if provider_name == "openai":
+                provider = OpenAIEmbeddingProvider(
+                    os.getenv("MEMORY_EMBEDDING_MODEL", "text-embedding-3-small")
+                )
+            else:
+                provider = HashEmbeddingProvider()
+            cache_dir = os.getenv("MEMORY_EMBEDDING_CACHE_DIR")
+            _default_service = EmbeddingService(
+                provider, cache_dir=Path(cache_dir) if cache_dir else None
+            )
+        return _default_service
+
+
+def set_embedding_service(service: Optional[EmbeddingService]):
+    """Replace (or reset, with None) the process-wide embedding service."""
+    global _default_service
+    with _default_lock:
+        _default_service = service
@@ -0,0 +1,319 @@
+"""
+Episode Analytics - Incremental rollups over team episodes
+
+Keeps per-team, per-task-type daily rollups so metrics, patterns and
+predictions are answered without re-reading raw episodes:
+- Success and total counts
+- Duration sums and log-scale duration histograms
+- Agent contribution and action counts for successful episodes
+- A few sample episode IDs per bucket as evidence
+
+Rollups are updated directly as episodes are stored. Episodes written by
+other processes are picked up by tailing memory_entries past a created_at
+watermark, so each row is parsed once per process rather than on every read.
+"""
+
+import json
+import logging
+import threading
+import time
+from bisect import bisect_right
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Upper edges (seconds) of the duration histogram buckets; last bucket is open
+DURATION_BUCKETS = [1, 2, 5, 10, 30, 60, 120, 300, 600, 1800, 3600, 7200]
+
+# Task categories used for rollup keys
+TASK_CATEGORIES = {
+    "development": ["create", "build", "implement", "develop", "code"],
+    "analysis": ["analyze", "investigate", "research", "study", "examine"],
+    "debugging": ["fix", "debug", "resolve", "troubleshoot", "repair"],
+    "design": ["design", "architect", "plan", "structure", "layout"],
+    "documentation": ["document", "write", "describe", "explain"],
+    "testing": ["test", "verify", "validate", "check", "ensure"],
+    "deployment": ["deploy", "release", "launch", "publish"],
+    "optimization": ["optimize", "improve", "enhance", "refactor"],
+}
+
+# Distinct actions kept per agent per bucket before rare ones are pruned
+MAX_ACTIONS_PER_AGENT = 50
+
+
+def categorize_task(task_description: Optional[str]) -> str:
+    """Categorize task based on description."""
+    task_lower = (task_description or "").lower()
+
+    for category, keywords in TASK_CATEGORIES.items():
+        if any(keyword in task_lower for keyword in keywords):
+            return category
+
+    return "general"
+
+
+class TeamIdResolver:
+    """Caches team name -> team id lookups with a TTL."""
+
+    def __init__(self, ttl_seconds: float = 600.0, negative_ttl_seconds: float = 30.0):
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._cache: Dict[str, Tuple[Optional[str], float]] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, supabase, team_name: str) -> Optional[str]:
+        """Get the team id for a team name, querying Supabase on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(team_name)
+            if cached and cached[1] > now:
+                return cached[0]
+
+        result = supabase.table("teams").select("id").eq("name", team_name).execute()
+        team_id = result.data[0]["id"] if result.data else None
+
+        ttl = self.ttl_seconds if team_id else self.negative_ttl_seconds
+        with self._lock:
+            self._cache[team_name] = (team_id, now + ttl)
+        return team_id
+
+    def invalidate(self, team_name: Optional[str] = None):
+        with self._lock:
+            if team_name is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(team_name, None)
+
+
+# Process-wide resolver shared by every TeamMemory and LearningSystem
+team_id_resolver = TeamIdResolver()
+
+
+class RollupBucket:
+    """Aggregates for one (day, task type) bucket."""
+
+    def __init__(self):
+        self.total = 0
+        self.successes = 0
+        self.duration_sum = 0.0
+        self.duration_count = 0
+        self.durations = [0] * (len(DURATION_BUCKETS) + 1)
+        self.success_durations = [0] * (len(DURATION_BUCKETS) + 1)
+        self.agent_successes: Counter = Counter()
+        self.agent_actions: Dict[str, Counter] = {}
+        self.sample_ids: List[str] = []
+        self.success_ids: List[str] = []
+
+    def add(self, episode_id: str, content: Dict[str, Any]):
+        success = bool(content.get("success", False))
+        duration = content.get("duration") or 0
+
+        self.total += 1
+        if len(self.sample_ids) < 5:
+            self.sample_ids.append(episode_id)
+
+        if duration:
+            slot = bisect_right(DURATION_BUCKETS, duration)
+            self.duration_sum += duration
+            self.duration_count += 1
+            self.durations[slot] += 1
+            if success:
+                self.success_durations[slot] += 1
+
+        if not success:
+            return
+
+        self.successes += 1
+        if len(self.success_ids) < 5:
+            self.success_ids.append(episode_id)
+
+        for agent, actions in (content.get("agent_contributions") or {}).items():
+            self.agent_successes[agent] += 1
+            counts = self.agent_actions.setdefault(agent, Counter())
+            for action in actions or []:
+                counts[str(action).lower().strip()] += 1
+            if len(counts) > 2 * MAX_ACTIONS_PER_AGENT:
+                self.agent_actions[agent] = Counter(
+                    dict(counts.most_common(MAX_ACTIONS_PER_AGENT))
+                )
+
+    def merge(self, other: "RollupBucket"):
+        self.total += other.total
+        self.successes += other.successes
+        self.duration_sum += other.duration_sum
+        self.duration_count += other.duration_count
+        self.durations = [a + b for a, b in zip(self.durations, other.durations)]
+        self.success_durations = [
+            a + b for a, b in zip(self.success_durations, other.success_durations)
+        ]
+        self.agent_successes.update(other.agent_successes)
+        for agent, counts in other.agent_actions.items():
+            self.agent_actions.setdefault(agent, Counter()).update(counts)
+        self.sample_ids.extend(other.sample_ids[: 5 - len(self.sample_ids)])
+        self.success_ids.extend(other.success_ids[: 5 - len(self.success_ids)])
+
+    @property
+    def success_rate(self) -> float:
+        return self.successes / self.total if self.total else 0.0
+
+    @property
+    def average_duration(self) -> float:
+        return self.duration_sum / self.duration_count if self.duration_count else 0
+
+    @staticmethod
+    def histogram_median(histogram: List[int]) -> Optional[float]:
+        """Estimate the median by interpolating inside the middle bucket."""
+        count = sum(histogram)
+        if not count:
+            return None
+
+        target = count / 2
+        seen = 0
+        for slot, bucket_count in enumerate(histogram):
+            if seen + bucket_count >= target and bucket_count:
+                low = DURATION_BUCKETS[slot - 1] if slot else 0
+                high = (
+                    DURATION_BUCKETS[slot]
+                    if slot < len(DURATION_BUCKETS)
+                    else DURATION_BUCKETS[-1] * 2
+                )
+                return low + (high - low) * (target - seen) / bucket_count
+            seen += bucket_count
+        return None
+
+
+class EpisodeRollups:
+    """Daily rollups for one team, kept current from writes and a table tail."""
+
+    def __init__(self, refresh_interval: float = 30.0, page_size: int = 1000):
+        """
+        Args:
+            refresh_interval: Minimum seconds between tails of memory_entries
+            page_size: Rows fetched per page while tailing
+        """
+        self.refresh_interval = refresh_interval
+        self.page_size = page_size
+
+        self.buckets: Dict[Tuple[date, str], RollupBucket] = {}
+        self._lock = threading.RLock()
+        self._watermark: Optional[str] = None
+        self._watermark_ids: Set[str] = set()
+        self._pending_ids: Set[str] = set()
+        self._last_refresh = 0.0
+
+    def record(self, episode_id: str, created_at: str, content: Dict[str, Any]):
+        """Fold one episode into its day/task-type bucket."""
+        day = date.fromisoformat(created_at[:10])
+        task_type = categorize_task(content.get("task_description"))
+        with self._lock:
+            bucket = self.buckets.get((day, task_type))
+            if bucket is None:
+                bucket = self.buckets[(day, task_type)] = RollupBucket()
+            bucket.add(episode_id, content)
+
+    def record_local(self, rows: Iterable[Dict[str, Any]]):
+        """Apply rows this process just inserted so reads see them at once."""
+        with self._lock:
+            for row in rows:
+                self.record(row["id"], row["created_at"], json.loads(row["content"]))
+                # The tail will see these rows again; skip them there
+                self._pending_ids.add(row["id"])
+
+    def refresh(self, supabase, team_id: str, force: bool = False):
+        """Fold in rows inserted since the watermark (by any process)."""
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._last_refresh < self.refresh_interval:
+                return
+            self._last_refresh = now
+
+            while True:
+                query = (
+                    supabase.table("memory_entries")
+                    .select("id, content, created_at")
+                    .eq("team_id", team_id)
+                    .eq("entry_type", "experience")
+                )
+                skip = 0
+                if self._watermark:
+                    # Rows at the watermark sort first; skip the ones seen
+                    query = query.gte("created_at", self._watermark)
+                    skip = len(self._watermark_ids)
+                rows = (
+                    query.order("created_at")
+                    .order("id")
+                    .range(skip, skip + self.page_size - 1)
+                    .execute()
+                    .data
+                )
+
+                fresh = 0
+                for row in rows:
+                    if row["id"] in self._watermark_ids:
+                        continue
+                    fresh += 1
+                    if row["created_at"] != self._watermark:
+                        self._watermark = row["created_at"]
+                        self._watermark_ids = set()
+                    self._watermark_ids.add(row["id"])
+
+                    if row["id"] in self._pending_ids:
+                        self._pending_ids.discard(row["id"])
+                        continue
+                    try:
+                        self.record(
+                            row["id"], row["created_at"], json.loads(row["content"])
+                        )
+                    except (ValueError, TypeError) as e:
+                        logger.warning(f"Skipping unreadable episode {row['id']}: {e}")
+
+                if len(rows) < self.page_size or not fresh:
+                    break
+
+    def query(
+        self,
+        since: Optional[date] = None,
+        until: Optional[date] = None,
+        task_type: Optional[str] = None,
+    ) -> Dict[Tuple[date, str], RollupBucket]:
+        """Buckets in [since, until) matching the task type."""
+        with self._lock:
+            return {
+                key: bucket
+                for key, bucket in self.buckets.items()
+                if (since is None or key[0] >= since)
+                and (until is None or key[0] < until)
+                and (task_type is None or key[1] == task_type)
+            }
+
+    def merged(
+        self,
+        since: Optional[date] = None,
+        until: Optional[date] = None,
+        task_type: Optional[str] = None,
+    ) -> RollupBucket:
+        """All matching buckets merged into one."""
+        total = RollupBucket()
+        for bucket in self.query(since, until, task_type).values():
+            total.merge(bucket)
+        return total
+
+
+_team_rollups: Dict[str, EpisodeRollups] = {}
+_team_rollups_lock = threading.Lock()
+
+
+def get_team_rollups(team_name: str) -> EpisodeRollups:
+    """Rollups for a team, shared by every TeamMemory in the process."""
+    with _team_rollups_lock:
+        rollups = _team_rollups.get(team_name)
+        if rollups is None:
+            rollups = _team_rollups[team_name] = EpisodeRollups()
+        return rollups
+
+
+def since_days(days: int) -> date:
+    """First day of a trailing window of `days` days."""
+    return (datetime.utcnow() - timedelta(days=days)).date()
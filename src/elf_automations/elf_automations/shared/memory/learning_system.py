@@ -8,14 +8,11 @@ This module provides:
 - Continuous improvement loops
 """
 
-import json
 import logging
 from collections import defaultdict
-from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple
 
-import numpy as np
-
+from .episode_analytics import categorize_task
 from .team_memory import TeamMemory
 
 
@@ -120,13 +117,9 @@ class LearningSystem:
         duration = episode.get("duration", 0)
         if duration > 0:
             # Compare with similar past episodes
-            similar_episodes = self._get_similar_past_episodes(
-                episode["task_description"]
-            )
-            if similar_episodes:
-                avg_duration = np.mean(
-                    [e["duration_seconds"] for e in similar_episodes]
-                )
+            similar_stats = self._get_similar_past_stats(episode["task_description"])
+            avg_duration = similar_stats.get("average_duration_seconds")
+            if avg_duration:
                 if duration < avg_duration * 0.8:
                     factor = {
                         "description": "Task completed faster than average",
@@ -235,18 +228,13 @@ class LearningSystem:
                 strategy["avoid"].append(learning["insight"])
 
         # Estimate duration from recent successful episodes
-        recent_episodes = self._get_recent_successful_episodes(task_type, days=30)
-        if recent_episodes:
-            durations = [
-                e["duration_seconds"]
-                for e in recent_episodes
-                if e.get("duration_seconds")
-            ]
-            if durations:
-                strategy["estimated_duration"] = int(np.median(durations))
+        recent_stats = self.memory.get_task_type_stats(task_type, days_back=30)
+        median_duration = recent_stats.get("median_success_duration_seconds")
+        if median_duration:
+            strategy["estimated_duration"] = int(median_duration)
 
         # Calculate confidence
-        total_episodes = len(patterns) + len(recent_episodes)
+        total_episodes = len(patterns) + recent_stats.get("successful_episodes", 0)
         strategy["confidence"] = min(0.95, 0.5 + (total_episodes / 100))
 
         self.logger.info(
@@ -270,13 +258,11 @@ class LearningSystem:
         task_type = self._categorize_task(task_description)
 
         # Get historical success rate for this task type
-        recent_episodes = self._get_recent_episodes(task_type, days=90)
-        if not recent_episodes:
+        recent_stats = self.memory.get_task_type_stats(task_type, days_back=90)
+        if not recent_stats.get("total_episodes"):
             return 0.5  # No data, assume 50%
 
-        base_success_rate = sum(1 for e in recent_episodes if e["success"]) / len(
-            recent_episodes
-        )
+        base_success_rate = recent_stats["success_rate"]
 
         # Adjust based on planned approach
         adjustment = 0.0
@@ -379,87 +365,14 @@ class LearningSystem:
 
     def _categorize_task(self, task_description: str) -> str:
         """Categorize task based on description."""
-        task_lower = task_description.lower()
-
-        categories = {
-            "development": ["create", "build", "implement", "develop", "code"],
-            "analysis": ["analyze", "investigate", "research", "study", "examine"],
-            "debugging": ["fix", "debug", "resolve", "troubleshoot", "repair"],
-            "design": ["design", "architect", "plan", "structure", "layout"],
-            "documentation": ["document", "write", "describe", "explain"],
-            "testing": ["test", "verify", "validate", "check", "ensure"],
-            "deployment": ["deploy", "release", "launch", "publish"],
-            "optimization": ["optimize", "improve", "enhance", "refactor"],
-        }
-
-        for category, keywords in categories.items():
-            if any(keyword in task_lower for keyword in keywords):
-                return category
+        return categorize_task(task_description)
 
-        return "general"
-
-    def _get_similar_past_episodes(self, task_description: str) -> List[Dict[str, Any]]:
-        """Get similar past episodes from memory."""
+    def _get_similar_past_stats(self, task_description: str) -> Dict[str, Any]:
+        """Get rolled-up statistics for similar past episodes."""
         # This would use vector similarity in real implementation
         # For now, using simple category matching
         task_type = self._categorize_task(task_description)
-        return self._get_recent_episodes(task_type, days=90)
-
-    def _get_recent_episodes(self, task_type: str, days: int) -> List[Dict[str, Any]]:
-        """Get recent episodes of a specific type."""
-        if not self.memory.supabase:
-            return []
-
-        try:
-            since_date = (datetime.utcnow() - timedelta(days=days)).isoformat()
-            # Get team_id
-            team_result = (
-                self.memory.supabase.table("teams")
-                .select("id")
-                .eq("name", self.team_name)
-                .execute()
-            )
-            team_id = team_result.data[0]["id"] if team_result.data else None
-
-            if not team_id:
-                return []
-
-            result = (
-                self.memory.supabase.table("memory_entries")
-                .select("*")
-                .eq("team_id", team_id)
-                .eq("entry_type", "experience")
-                .gte("created_at", since_date)
-                .execute()
-            )
-
-            # Filter by task type
-            episodes = []
-            for entry in result.data:
-                content = json.loads(entry["content"])
-                if (
-                    self._categorize_task(content.get("task_description", ""))
-                    == task_type
-                ):
-                    episodes.append(
-                        {
-                            "id": entry["id"],
-                            "task_description": content.get("task_description"),
-                            "success": content.get("success", False),
-                            "duration_seconds": content.get("duration", 0),
-                        }
-                    )
-
-            return episodes
-        except:
-            return []
-
-    def _get_recent_successful_episodes(
-        self, task_type: str, days: int
-    ) -> List[Dict[str, Any]]:
-        """Get recent successful episodes of a specific type."""
-        episodes = self._get_recent_episodes(task_type, days)
-        return [e for e in episodes if e.get("success", False)]
+        return self.memory.get_task_type_stats(task_type, days_back=90)
 
     def _get_expected_agents_for_task(self, task_description: str) -> List[str]:
         """Determine which agents should participate in a task."""
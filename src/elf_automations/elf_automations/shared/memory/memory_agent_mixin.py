@@ -8,6 +8,7 @@ This mixin can be added to both CrewAI and LangGraph agents to provide:
 - Knowledge sharing with team
 """
 
+import atexit
 import json
 import logging
 import time
@@ -15,6 +16,9 @@ from datetime import datetime
 from functools import wraps
 from typing import Any, Callable, Dict, List, Optional
 
+import numpy as np
+
+from .embedding_service import EmbeddingService, get_embedding_service
 from .learning_system import LearningSystem
 from .team_memory import TeamMemory
 
@@ -30,20 +34,35 @@ class MemoryAgentMixin:
                 self.init_memory(team_name)
     """
 
-    def init_memory(self, team_name: str, qdrant_url: str = "http://localhost:6333"):
+    def init_memory(
+        self,
+        team_name: str,
+        qdrant_url: str = "http://localhost:6333",
+        embedding_service: Optional[EmbeddingService] = None,
+        episode_batch_size: int = 1,
+    ):
         """
         Initialize memory system for the agent.
 
         Args:
             team_name: Name of the team this agent belongs to
             qdrant_url: URL of Qdrant service
+            embedding_service: Embedding service (defaults to the shared one)
+            episode_batch_size: Buffer this many completed episodes before
+                storing them in one bulk write (1 stores immediately). Buffered
+                episodes are flushed by close_memory() and at interpreter exit.
         """
         self.team_memory = TeamMemory(team_name, qdrant_url)
         self.learning_system = LearningSystem(self.team_memory)
+        self.embedding_service = embedding_service or get_embedding_service()
+        self.episode_batch_size = episode_batch_size
+        self._pending_episodes: List[Dict[str, Any]] = []
         self.current_episode = None
         self.memory_logger = logging.getLogger(
             f"MemoryAgent.{team_name}.{getattr(self, 'role', 'agent')}"
         )
+        if episode_batch_size > 1:
+            atexit.register(self.close_memory)
 
     def start_episode(
         self, task_description: str, context: Optional[Dict[str, Any]] = None
@@ -147,23 +166,50 @@ class MemoryAgentMixin:
             }
         )
 
-        # Generate embedding (placeholder - would use real embedding model)
-        embedding = self._generate_episode_embedding(self.current_episode)
-
-        # Store in memory
-        episode_id = self.team_memory.store_episode(self.current_episode, embedding)
+        # Queue for storage; embeddings are generated per flushed batch
+        self._pending_episodes.append(self.current_episode)
+        if len(self._pending_episodes) >= self.episode_batch_size:
+            self.flush_episodes()
 
         # Learn from the episode
         learnings = self.learning_system.learn_from_episode(self.current_episode)
 
         self.memory_logger.info(
-            f"Completed episode {episode_id}: success={success}, "
+            f"Completed episode: success={success}, "
             f"duration={duration:.1f}s, learnings={len(learnings)}"
         )
 
         # Reset current episode
         self.current_episode = None
 
+    def flush_episodes(self) -> List[str]:
+        """
+        Embed and store all buffered episodes in one bulk write.
+
+        Returns:
+            IDs of the stored episodes
+        """
+        episodes, self._pending_episodes = self._pending_episodes, []
+        if not episodes:
+            return []
+
+        embeddings = self.embedding_service.embed(
+            [json.dumps(episode, sort_keys=True, default=str) for episode in episodes]
+        )
+        episode_ids = self.team_memory.store_episodes(episodes, embeddings)
+
+        self.memory_logger.info(f"Stored {len(episode_ids)} episode(s)")
+        return episode_ids
+
+    def close_memory(self):
+        """Store any buffered episodes before the agent shuts down."""
+        if self.episode_batch_size > 1:
+            atexit.unregister(self.close_memory)
+        try:
+            self.flush_episodes()
+        except Exception as e:
+            self.memory_logger.error(f"Failed to flush buffered episodes: {e}")
+
     def _recall_relevant_experiences(self, task_description: str):
         """Recall relevant past experiences for the current task."""
         # Generate query embedding (placeholder)
@@ -260,36 +306,13 @@ class MemoryAgentMixin:
         learning_id = self.team_memory.store_learning(learning)
         self.memory_logger.info(f"Shared knowledge: {insight} (id: {learning_id})")
 
-    def _generate_episode_embedding(self, episode: Dict[str, Any]) -> List[float]:
-        """Generate embedding for an episode (placeholder)."""
-        # In production, this would use a real embedding model
-        # For now, return a mock embedding
-        import hashlib
-
-        text = json.dumps(episode, sort_keys=True)
-        hash_obj = hashlib.sha256(text.encode())
-        # Generate deterministic floats from hash
-        embedding = []
-        for i in range(192):  # 1536 / 8
-            byte_slice = hash_obj.digest()[i % 32 : (i % 32) + 1]
-            value = int.from_bytes(byte_slice, "big") / 255.0
-            for _ in range(8):
-                embedding.append(value)
-        return embedding
-
-    def _generate_text_embedding(self, text: str) -> List[float]:
-        """Generate embedding for text (placeholder)."""
-        # In production, this would use a real embedding model
-        import hashlib
-
-        hash_obj = hashlib.sha256(text.encode())
-        embedding = []
-        for i in range(192):
-            byte_slice = hash_obj.digest()[i % 32 : (i % 32) + 1]
-            value = int.from_bytes(byte_slice, "big") / 255.0
-            for _ in range(8):
-                embedding.append(value)
-        return embedding
+    def _generate_episode_embedding(self, episode: Dict[str, Any]) -> np.ndarray:
+        """Generate embedding for an episode."""
+        return self.embedding_service.embed_json(episode)
+
+    def _generate_text_embedding(self, text: str) -> np.ndarray:
+        """Generate embedding for text."""
+        return self.embedding_service.embed_one(text)
 
 
 def with_memory(func: Callable) -> Callable:
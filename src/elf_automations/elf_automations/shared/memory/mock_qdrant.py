@@ -1,15 +1,85 @@
-"""Mock Qdrant client for development without Qdrant server."""
+"""Mock Qdrant client for development without Qdrant server.
+
+Despite the name this is a small embedded vector store: each collection keeps
+its vectors in one contiguous float32 matrix, searches score the whole
+collection in a single matrix-vector product, and filters and score thresholds
+are applied before top-k selection. Collections can optionally be persisted
+to a directory, with vectors in a memory-mapped file.
+"""
 
 import json
 import logging
 import uuid
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
 
 import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Initial row capacity of a collection matrix; grows by doubling
+_INITIAL_CAPACITY = 1024
+
+
+class Distance(str, Enum):
+    """Distance metrics, mirroring qdrant_client.models.Distance."""
+
+    COSINE = "Cosine"
+    DOT = "Dot"
+    EUCLID = "Euclid"
+
+
+@dataclass
+class VectorParams:
+    """Mock vector configuration, mirroring qdrant_client.models.VectorParams."""
+
+    size: int
+    distance: Distance = Distance.COSINE
+
+
+@dataclass
+class MatchValue:
+    """Exact match condition value."""
+
+    value: Any
+
+
+@dataclass
+class MatchAny:
+    """Match any of the given values."""
+
+    any: List[Any]
+
+
+@dataclass
+class Range:
+    """Numeric range condition."""
+
+    gt: Optional[float] = None
+    gte: Optional[float] = None
+    lt: Optional[float] = None
+    lte: Optional[float] = None
+
+
+@dataclass
+class FieldCondition:
+    """Payload field condition, mirroring qdrant_client.models.FieldCondition."""
+
+    key: str
+    match: Optional[Any] = None
+    range: Optional[Range] = None
+
+
+@dataclass
+class PointStruct:
+    """Point to upsert, mirroring qdrant_client.models.PointStruct."""
+
+    id: Union[str, int]
+    vector: List[float]
+    payload: Dict[str, Any] = field(default_factory=dict)
+
 
 @dataclass
 class MockPoint:
@@ -30,59 +100,264 @@ class MockFilter:
     must_not: List[Dict[str, Any]] = None
 
 
+Filter = MockFilter
+
+
+class _Collection:
+    """Vectors, ids and payloads of one collection, stored row-aligned."""
+
+    def __init__(
+        self,
+        size: int,
+        distance: Distance,
+        config: Any = None,
+        storage_dir: Optional[Path] = None,
+        name: str = "",
+    ):
+        self.size = size
+        self.distance = distance
+        self.config = config
+        self.ids: List[Any] = []
+        self.payloads: List[Optional[Dict[str, Any]]] = []
+        self.id_to_row: Dict[Any, int] = {}
+
+        self._vectors_file = None
+        self._log_file = None
+        if storage_dir is not None:
+            self._vectors_file = storage_dir / f"{name}.vectors"
+            self._log_file = storage_dir / f"{name}.points.jsonl"
+
+        self.vectors = self._allocate(_INITIAL_CAPACITY)
+        self.alive = np.zeros(_INITIAL_CAPACITY, dtype=bool)
+
+    def _allocate(self, capacity: int) -> np.ndarray:
+        """Allocate (or grow) the vector matrix to the given row capacity."""
+        if self._vectors_file is None:
+            matrix = np.zeros((capacity, self.size), dtype=np.float32)
+            if hasattr(self, "vectors"):
+                matrix[: self.vectors.shape[0]] = self.vectors
+            return matrix
+
+        # Growing a memmap means extending the file and remapping it
+        if hasattr(self, "vectors"):
+            self.vectors.flush()
+            del self.vectors
+        nbytes = capacity * self.size * np.dtype(np.float32).itemsize
+        with open(self._vectors_file, "ab") as f:
+            if f.tell() < nbytes:
+                f.truncate(nbytes)
+        return np.memmap(
+            self._vectors_file,
+            dtype=np.float32,
+            mode="r+",
+            shape=(capacity, self.size),
+        )
+
+    def _ensure_capacity(self, rows: int):
+        capacity = self.vectors.shape[0]
+        if rows <= capacity:
+            return
+        while capacity < rows:
+            capacity *= 2
+        self.vectors = self._allocate(capacity)
+        alive = np.zeros(capacity, dtype=bool)
+        alive[: len(self.alive)] = self.alive
+        self.alive = alive
+
+    def _prepare(self, vectors: np.ndarray) -> np.ndarray:
+        """Normalize vectors up front for cosine, as Qdrant does."""
+        if self.distance == Distance.COSINE:
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            vectors = vectors / norms
+        return vectors
+
+    def upsert(self, ids: List[Any], vectors: np.ndarray, payloads: List[Dict]):
+        """Write a batch of points, overwriting rows of existing ids."""
+        vectors = self._prepare(vectors)
+        rows = []
+        for point_id, payload in zip(ids, payloads):
+            row = self.id_to_row.get(point_id)
+            if row is None:
+                row = len(self.ids)
+                self.id_to_row[point_id] = row
+                self.ids.append(point_id)
+                self.payloads.append(payload)
+            else:
+                self.payloads[row] = payload
+            rows.append(row)
+
+        self._ensure_capacity(len(self.ids))
+        row_index = np.asarray(rows, dtype=np.int64)
+        self.vectors[row_index] = vectors
+        self.alive[row_index] = True
+        self._log(
+            [
+                {"row": row, "id": point_id, "payload": payload}
+                for row, point_id, payload in zip(rows, ids, payloads)
+            ]
+        )
+
+    def delete(self, ids: List[Any]) -> int:
+        """Tombstone rows of the given ids."""
+        deleted = []
+        for point_id in ids:
+            row = self.id_to_row.pop(point_id, None)
+            if row is not None:
+                self.alive[row] = False
+                self.payloads[row] = None
+                deleted.append({"row": row, "id": point_id, "deleted": True})
+        self._log(deleted)
+        return len(deleted)
+
+    def _log(self, records: List[Dict[str, Any]]):
+        """Append point metadata to the persistence log."""
+        if self._log_file is None or not records:
+            return
+        with open(self._log_file, "a") as f:
+            for record in records:
+                f.write(json.dumps(record, default=str) + "\n")
+        self.vectors.flush()
+
+    def load(self):
+        """Replay the persistence log and map the stored vectors."""
+        if self._log_file is None or not self._log_file.exists():
+            return
+        with open(self._log_file) as f:
+            for line in f:
+                record = json.loads(line)
+                row = record["row"]
+                while len(self.ids) <= row:
+                    self.ids.append(None)
+                    self.payloads.append(None)
+                if record.get("deleted"):
+                    self.id_to_row.pop(record["id"], None)
+                    self.payloads[row] = None
+                else:
+                    self.ids[row] = record["id"]
+                    self.payloads[row] = record["payload"]
+                    self.id_to_row[record["id"]] = row
+
+        self._ensure_capacity(len(self.ids))
+        self.alive = np.zeros(self.vectors.shape[0], dtype=bool)
+        if self.id_to_row:
+            self.alive[np.fromiter(self.id_to_row.values(), dtype=np.int64)] = True
+
+    def point(self, row: int, with_vectors: bool = True, score: float = 1.0):
+        return MockPoint(
+            id=self.ids[row],
+            vector=self.vectors[row].tolist() if with_vectors else None,
+            payload=self.payloads[row],
+            score=score,
+        )
+
+    def __len__(self) -> int:
+        return len(self.id_to_row)
+
+
 class MockQdrantClient:
     """Mock Qdrant client that stores vectors in memory.
 
     This allows development and testing of the Memory & Learning System
-    without requiring a running Qdrant instance.
+    without requiring a running Qdrant instance. Search results are real
+    similarity scores computed with NumPy over the stored vectors.
     """
 
-    def __init__(self, host: str = "mock", port: int = 6333):
-        """Initialize mock client."""
+    def __init__(
+        self, host: str = "mock", port: int = 6333, path: Optional[str] = None
+    ):
+        """Initialize mock client.
+
+        Args:
+            host: Reported host name (informational only)
+            port: Reported port (informational only)
+            path: Optional directory to persist collections to. Vectors are
+                kept in memory-mapped files and payloads in an append-only log.
+        """
         self.host = host
         self.port = port
-        self.collections = {}
+        self.path = Path(path) if path else None
+        self.collections: Dict[str, _Collection] = {}
+
+        if self.path:
+            self.path.mkdir(parents=True, exist_ok=True)
+            self._load_persisted()
+
         logger.info(f"[MOCK QDRANT] Initialized mock client at {host}:{port}")
 
+    def _load_persisted(self):
+        """Reopen collections persisted under self.path."""
+        for meta_file in self.path.glob("*.collection.json"):
+            with open(meta_file) as f:
+                meta = json.load(f)
+            collection = _Collection(
+                meta["size"],
+                Distance(meta["distance"]),
+                VectorParams(meta["size"], Distance(meta["distance"])),
+                storage_dir=self.path,
+                name=meta["name"],
+            )
+            collection.load()
+            self.collections[meta["name"]] = collection
+            logger.info(
+                f"[MOCK QDRANT] Loaded collection {meta['name']} "
+                f"with {len(collection)} points"
+            )
+
+    def _get(self, collection_name: str) -> _Collection:
+        if collection_name not in self.collections:
+            raise ValueError(f"Collection {collection_name} not found")
+        return self.collections[collection_name]
+
     def create_collection(self, collection_name: str, vectors_config: Any = None):
         """Create a mock collection."""
         if collection_name in self.collections:
             logger.warning(f"[MOCK QDRANT] Collection {collection_name} already exists")
             return
 
-        self.collections[collection_name] = {
-            "config": vectors_config,
-            "points": {},
-            "next_id": 1,
-        }
+        size = getattr(vectors_config, "size", None) or 384
+        distance = getattr(vectors_config, "distance", Distance.COSINE)
+        distance = Distance(getattr(distance, "value", distance))
+
+        if self.path:
+            with open(self.path / f"{collection_name}.collection.json", "w") as f:
+                json.dump(
+                    {"name": collection_name, "size": size, "distance": distance.value},
+                    f,
+                )
+
+        self.collections[collection_name] = _Collection(
+            size, distance, vectors_config, storage_dir=self.path, name=collection_name
+        )
         logger.info(f"[MOCK QDRANT] Created collection: {collection_name}")
 
     def delete_collection(self, collection_name: str):
         """Delete a mock collection."""
         if collection_name in self.collections:
             del self.collections[collection_name]
+            if self.path:
+                for suffix in (".collection.json", ".vectors", ".points.jsonl"):
+                    (self.path / f"{collection_name}{suffix}").unlink(missing_ok=True)
             logger.info(f"[MOCK QDRANT] Deleted collection: {collection_name}")
 
     def get_collections(self):
         """List all collections."""
-        collections = [{"name": name} for name in self.collections.keys()]
+        collections = [
+            type("obj", (object,), {"name": name}) for name in self.collections.keys()
+        ]
         logger.info(f"[MOCK QDRANT] Listing {len(collections)} collections")
         return type("obj", (object,), {"collections": collections})
 
     def get_collection(self, collection_name: str):
         """Get collection info."""
-        if collection_name not in self.collections:
-            raise ValueError(f"Collection {collection_name} not found")
-
-        collection = self.collections[collection_name]
-        points_count = len(collection["points"])
+        collection = self._get(collection_name)
 
         # Return mock collection info
         return type(
             "obj",
             (object,),
             {
-                "points_count": points_count,
+                "points_count": len(collection),
                 "config": type(
                     "obj",
                     (object,),
@@ -95,10 +370,8 @@ class MockQdrantClient:
                                     "obj",
                                     (object,),
                                     {
-                                        "size": collection["config"].size
-                                        if collection["config"]
-                                        else 384,
-                                        "distance": "Cosine",
+                                        "size": collection.size,
+                                        "distance": collection.distance.value,
                                     },
                                 )
                             },
@@ -108,59 +381,102 @@ class MockQdrantClient:
             },
         )
 
-    def upsert(self, collection_name: str, points: List[Any]):
+    def upsert(self, collection_name: str, points: List[Any], **kwargs):
         """Insert or update points in collection."""
-        if collection_name not in self.collections:
-            raise ValueError(f"Collection {collection_name} not found")
-
-        collection = self.collections[collection_name]
+        collection = self._get(collection_name)
+        if not points:
+            return
 
+        ids, vectors, payloads = [], [], []
         for point in points:
             # Handle both dict and object inputs
             if hasattr(point, "id"):
-                point_id = point.id
-                vector = point.vector
-                payload = point.payload
+                ids.append(point.id)
+                vectors.append(point.vector)
+                payloads.append(point.payload or {})
             else:
-                point_id = point.get("id", str(uuid.uuid4()))
-                vector = point.get("vector", [])
-                payload = point.get("payload", {})
-
-            # Store the point
-            collection["points"][point_id] = MockPoint(
-                id=point_id, vector=vector, payload=payload
+                ids.append(point.get("id", str(uuid.uuid4())))
+                vectors.append(point.get("vector", []))
+                payloads.append(point.get("payload", {}))
+
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape[1] != collection.size:
+            raise ValueError(
+                f"Vector dimension mismatch for {collection_name}: "
+                f"expected {collection.size}, got {matrix.shape[-1]}"
             )
 
+        collection.upsert(ids, matrix, payloads)
         logger.info(
             f"[MOCK QDRANT] Upserted {len(points)} points into {collection_name}"
         )
 
+    def delete(self, collection_name: str, points_selector: Any, **kwargs):
+        """Delete points by id list (or a selector with a .points list)."""
+        collection = self._get(collection_name)
+        ids = getattr(points_selector, "points", points_selector)
+        deleted = collection.delete(list(ids))
+        logger.info(f"[MOCK QDRANT] Deleted {deleted} points from {collection_name}")
+
     def search(
         self,
         collection_name: str,
         query_vector: List[float],
         query_filter: Optional[Any] = None,
         limit: int = 5,
+        score_threshold: Optional[float] = None,
+        with_payload: bool = True,
+        with_vectors: bool = False,
+        **kwargs,
     ):
-        """Mock similarity search."""
-        if collection_name not in self.collections:
-            raise ValueError(f"Collection {collection_name} not found")
-
-        collection = self.collections[collection_name]
-        all_points = list(collection["points"].values())
+        """Similarity search over all live points of a collection."""
+        collection = self._get(collection_name)
+        n_rows = len(collection.ids)
+        if n_rows == 0 or limit <= 0:
+            return []
+
+        query = np.asarray(query_vector, dtype=np.float32).reshape(1, -1)
+        if query.shape[1] != collection.size:
+            raise ValueError(
+                f"Query dimension mismatch for {collection_name}: "
+                f"expected {collection.size}, got {query.shape[1]}"
+            )
+        query = collection._prepare(query)[0]
 
-        # Apply filters if provided
-        if query_filter:
-            filtered_points = self._apply_filter(all_points, query_filter)
+        matrix = collection.vectors[:n_rows]
+        if collection.distance == Distance.EUCLID:
+            # Qdrant reports euclidean distance; smaller is better
+            scores = np.linalg.norm(matrix - query, axis=1)
+            ranking = -scores
         else:
-            filtered_points = all_points
+            scores = matrix @ query
+            ranking = scores
+
+        mask = collection.alive[:n_rows].copy()
+        if score_threshold is not None:
+            if collection.distance == Distance.EUCLID:
+                mask &= scores <= score_threshold
+            else:
+                mask &= scores >= score_threshold
+        if query_filter is not None:
+            mask &= self._filter_mask(collection, query_filter, mask)
+
+        candidates = np.flatnonzero(mask)
+        if candidates.size == 0:
+            return []
+
+        if candidates.size > limit:
+            top = np.argpartition(-ranking[candidates], limit - 1)[:limit]
+            candidates = candidates[top]
+        order = candidates[np.argsort(-ranking[candidates], kind="stable")]
 
-        # Mock similarity scoring (random for now)
         results = []
-        for i, point in enumerate(filtered_points[:limit]):
-            # Simple mock scoring - in real Qdrant this would be cosine similarity
-            score = 1.0 - (i * 0.1)  # Decreasing scores
-            point.score = max(0.0, score)
+        for row in order:
+            point = collection.point(
+                row, with_vectors=with_vectors, score=float(scores[row])
+            )
+            if not with_payload:
+                point.payload = {}
             results.append(point)
 
         logger.info(
@@ -168,60 +484,101 @@ class MockQdrantClient:
         )
         return results
 
-    def retrieve(self, collection_name: str, ids: List[str]):
+    def retrieve(self, collection_name: str, ids: List[str], **kwargs):
         """Retrieve points by IDs."""
-        if collection_name not in self.collections:
-            raise ValueError(f"Collection {collection_name} not found")
-
-        collection = self.collections[collection_name]
-        results = []
-
-        for point_id in ids:
-            if point_id in collection["points"]:
-                results.append(collection["points"][point_id])
-
-        return results
-
-    def count(self, collection_name: str, exact: bool = True):
+        collection = self._get(collection_name)
+        return [
+            collection.point(collection.id_to_row[point_id])
+            for point_id in ids
+            if point_id in collection.id_to_row
+        ]
+
+    def count(self, collection_name: str, exact: bool = True, **kwargs):
         """Count points in collection."""
-        if collection_name not in self.collections:
-            raise ValueError(f"Collection {collection_name} not found")
-
-        count = len(self.collections[collection_name]["points"])
+        count = len(self._get(collection_name))
         return type("obj", (object,), {"count": count})
 
+    def _filter_mask(
+        self, collection: _Collection, query_filter: Any, candidates: np.ndarray
+    ) -> np.ndarray:
+        """Evaluate a filter over payloads of candidate rows only."""
+        mask = np.zeros(len(candidates), dtype=bool)
+        for row in np.flatnonzero(candidates):
+            payload = collection.payloads[row] or {}
+            mask[row] = self._matches_filter(payload, query_filter)
+        return mask
+
     def _apply_filter(
         self, points: List[MockPoint], query_filter: Any
     ) -> List[MockPoint]:
-        """Apply basic filtering to points."""
-        filtered = []
-
-        # Simple filter implementation - just check exact matches
-        for point in points:
-            include = True
-
-            # Check must conditions
-            if hasattr(query_filter, "must") and query_filter.must:
-                for condition in query_filter.must:
-                    if hasattr(condition, "key") and hasattr(condition, "match"):
-                        key = condition.key
-                        expected_value = (
-                            condition.match.value
-                            if hasattr(condition.match, "value")
-                            else condition.match
-                        )
-
-                        if (
-                            key not in point.payload
-                            or point.payload[key] != expected_value
-                        ):
-                            include = False
-                            break
-
-            if include:
-                filtered.append(point)
-
-        return filtered
+        """Apply filtering to points."""
+        return [p for p in points if self._matches_filter(p.payload, query_filter)]
+
+    def _matches_filter(self, payload: Dict[str, Any], query_filter: Any) -> bool:
+        """Check a payload against must / should / must_not conditions."""
+        must = self._get_attr(query_filter, "must") or []
+        should = self._get_attr(query_filter, "should") or []
+        must_not = self._get_attr(query_filter, "must_not") or []
+
+        if not all(self._matches_condition(payload, c) for c in must):
+            return False
+        if should and not any(self._matches_condition(payload, c) for c in should):
+            return False
+        if any(self._matches_condition(payload, c) for c in must_not):
+            return False
+        return True
+
+    def _matches_condition(self, payload: Dict[str, Any], condition: Any) -> bool:
+        """Check a single field condition (or nested filter)."""
+        key = self._get_attr(condition, "key")
+        if key is None:
+            # Nested filter
+            return self._matches_filter(payload, condition)
+
+        value = payload
+        for part in key.split("."):
+            if not isinstance(value, dict) or part not in value:
+                return False
+            value = value[part]
+
+        match = self._get_attr(condition, "match")
+        if match is not None:
+            expected_any = self._get_attr(match, "any")
+            if expected_any is not None:
+                values = value if isinstance(value, list) else [value]
+                return any(v in expected_any for v in values)
+            expected = self._get_attr(match, "value", match)
+            if isinstance(value, list):
+                return expected in value
+            return value == expected
+
+        value_range = self._get_attr(condition, "range")
+        if value_range is not None:
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                return False
+            bounds = {
+                op: self._get_attr(value_range, op) for op in ("gt", "gte", "lt", "lte")
+            }
+            if bounds["gt"] is not None and not value > bounds["gt"]:
+                return False
+            if bounds["gte"] is not None and not value >= bounds["gte"]:
+                return False
+            if bounds["lt"] is not None and not value < bounds["lt"]:
+                return False
+            if bounds["lte"] is not None and not value <= bounds["lte"]:
+                return False
+            return True
+
+        return True
+
+    @staticmethod
+    def _get_attr(obj: Any, name: str, default: Any = None) -> Any:
+        """Read a field from either a model object or a plain dict."""
+        if isinstance(obj, dict):
+            return obj.get(name, default)
+        return getattr(obj, name, default)
 
     # Compatibility methods for common patterns
     def recreate_collection(self, collection_name: str, vectors_config: Any = None):
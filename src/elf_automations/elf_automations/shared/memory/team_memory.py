@@ -12,17 +12,16 @@ to provide teams with:
 import hashlib
 import json
 import logging
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Union
 from uuid import uuid4
 
+import numpy as np
+
 try:
     from qdrant_client import QdrantClient
     from qdrant_client.models import (
         Distance,
-        FieldCondition,
-        Filter,
-        MatchValue,
         PointStruct,
         VectorParams,
     )
@@ -32,7 +31,20 @@ except ImportError:
     QDRANT_AVAILABLE = False
     logging.warning("Qdrant client not available. Using mock implementation.")
 
+    from .mock_qdrant import (
+        Distance,
+        PointStruct,
+        VectorParams,
+    )
+
 from ..utils.supabase_client import get_supabase_client
+from .episode_analytics import (
+    RollupBucket,
+    categorize_task,
+    get_team_rollups,
+    since_days,
+    team_id_resolver,
+)
 
 
 class TeamMemory:
@@ -65,6 +77,9 @@ class TeamMemory:
         self.collection_name = collection_name or f"{team_name}_memories"
         self.logger = logging.getLogger(f"TeamMemory.{team_name}")
 
+        # Incremental analytics shared by every TeamMemory for this team
+        self.rollups = get_team_rollups(team_name)
+
         # Initialize Qdrant for vector storage
         if QDRANT_AVAILABLE:
             try:
@@ -78,6 +93,7 @@ class TeamMemory:
             from .mock_qdrant import MockQdrantClient
 
             self.qdrant = MockQdrantClient()
+            self._ensure_collection()
             self.logger.info("Using mock Qdrant client")
 
         # Initialize Supabase for structured storage
@@ -104,7 +120,9 @@ class TeamMemory:
         except Exception as e:
             self.logger.error(f"Failed to ensure collection: {e}")
 
-    def store_episode(self, episode: Dict[str, Any], embedding: List[float]) -> str:
+    def store_episode(
+        self, episode: Dict[str, Any], embedding: Union[List[float], np.ndarray]
+    ) -> str:
         """
         Store a complete task episode in memory.
 
@@ -122,13 +140,38 @@ class TeamMemory:
         Returns:
             Episode ID
         """
-        episode_id = str(uuid4())
+        return self.store_episodes([episode], [embedding])[0]
+
+    def store_episodes(
+        self,
+        episodes: List[Dict[str, Any]],
+        embeddings: Union[List[List[float]], np.ndarray],
+    ) -> List[str]:
+        """
+        Store many episodes with one Qdrant upsert and one Supabase insert.
+
+        Args:
+            episodes: Episodes in the same shape accepted by store_episode
+            embeddings: One embedding per episode (list of vectors or 2-D array)
+
+        Returns:
+            Episode IDs, in the order of the given episodes
+        """
+        if len(episodes) != len(embeddings):
+            raise ValueError("store_episodes needs exactly one embedding per episode")
+        if not episodes:
+            return []
+
         timestamp = datetime.utcnow()
+        episode_ids = []
 
         # Add metadata
-        episode["id"] = episode_id
-        episode["team_name"] = self.team_name
-        episode["timestamp"] = timestamp.isoformat()
+        for episode in episodes:
+            episode_id = str(uuid4())
+            episode["id"] = episode_id
+            episode["team_name"] = self.team_name
+            episode["timestamp"] = timestamp.isoformat()
+            episode_ids.append(episode_id)
 
         # Store in Qdrant (vector storage)
         if self.qdrant:
@@ -136,57 +179,83 @@ class TeamMemory:
                 self.qdrant.upsert(
                     collection_name=self.collection_name,
                     points=[
-                        PointStruct(id=episode_id, vector=embedding, payload=episode)
+                        PointStruct(
+                            id=episode["id"],
+                            vector=self._as_vector(embedding),
+                            payload=episode,
+                        )
+                        for episode, embedding in zip(episodes, embeddings)
                     ],
                 )
-                self.logger.info(f"Stored episode {episode_id} in Qdrant")
+                self.logger.info(f"Stored {len(episodes)} episode(s) in Qdrant")
             except Exception as e:
                 self.logger.error(f"Failed to store in Qdrant: {e}")
 
         # Store in Supabase (structured storage)
         if self.supabase:
             try:
-                # Get team_id from team name
-                team_result = (
-                    self.supabase.table("teams")
-                    .select("id")
-                    .eq("name", self.team_name)
-                    .execute()
-                )
-                team_id = team_result.data[0]["id"] if team_result.data else None
+                team_id = self._get_team_id()
+                rows = [
+                    self._episode_row(episode, team_id, timestamp)
+                    for episode in episodes
+                ]
 
-                self.supabase.table("memory_entries").insert(
-                    {
-                        "id": episode_id,
-                        "team_id": team_id,
-                        "agent_name": episode.get("primary_agent", "team"),
-                        "entry_type": "experience",
-                        "title": episode.get("task_description", "")[:500],
-                        "content": json.dumps(
-                            {
-                                "task_description": episode.get("task_description"),
-                                "success": episode.get("success", False),
-                                "duration": episode.get("duration"),
-                                "result": episode.get("result", {}),
-                                "agent_contributions": episode.get(
-                                    "agent_contributions", {}
-                                ),
-                                "actions": episode.get("actions", []),
-                            }
-                        ),
-                        "context": episode.get("context", {}),
-                        "tags": self._extract_tags(episode),
-                        "vector_id": episode_id,
-                        "collection_name": self.collection_name,
-                        "importance_score": 0.8 if episode.get("success") else 0.5,
-                        "created_at": timestamp.isoformat(),
-                    }
-                ).execute()
-                self.logger.info(f"Stored episode {episode_id} in Supabase")
+                self.supabase.table("memory_entries").insert(rows).execute()
+                self.logger.info(f"Stored {len(episodes)} episode(s) in Supabase")
+
+                # Update analytics rollups without waiting for the next tail
+                self.rollups.record_local(rows)
             except Exception as e:
                 self.logger.error(f"Failed to store in Supabase: {e}")
 
-        return episode_id
+        return episode_ids
+
+    def _get_team_id(self) -> Optional[str]:
+        """Resolve this team's id through the shared TTL cache."""
+        return team_id_resolver.resolve(self.supabase, self.team_name)
+
+    def _refresh_rollups(self) -> bool:
+        """Fold in episodes stored by other processes; False if team unknown."""
+        team_id = self._get_team_id()
+        if not team_id:
+            return False
+        self.rollups.refresh(self.supabase, team_id)
+        return True
+
+    def _episode_row(
+        self, episode: Dict[str, Any], team_id: Optional[str], timestamp: datetime
+    ) -> Dict[str, Any]:
+        """Build the memory_entries row for an episode."""
+        return {
+            "id": episode["id"],
+            "team_id": team_id,
+            "agent_name": episode.get("primary_agent", "team"),
+            "entry_type": "experience",
+            "title": episode.get("task_description", "")[:500],
+            "content": json.dumps(
+                {
+                    "task_description": episode.get("task_description"),
+                    "success": episode.get("success", False),
+                    "duration": episode.get("duration"),
+                    "result": episode.get("result", {}),
+                    "agent_contributions": episode.get("agent_contributions", {}),
+                    "actions": episode.get("actions", []),
+                }
+            ),
+            "context": episode.get("context", {}),
+            "tags": self._extract_tags(episode),
+            "vector_id": episode["id"],
+            "collection_name": self.collection_name,
+            "importance_score": 0.8 if episode.get("success") else 0.5,
+            "created_at": timestamp.isoformat(),
+        }
+
+    @staticmethod
+    def _as_vector(embedding: Union[List[float], np.ndarray]) -> List[float]:
+        """Convert NumPy embeddings to the plain float lists Qdrant expects."""
+        if hasattr(embedding, "tolist"):
+            return embedding.tolist()
+        return list(embedding)
 
     def _extract_tags(self, episode: Dict[str, Any]) -> List[str]:
         """Extract relevant tags from an episode."""
@@ -213,7 +282,10 @@ class TeamMemory:
         return tags
 
     def recall_similar_episodes(
-        self, query_embedding: List[float], limit: int = 5, min_score: float = 0.7
+        self,
+        query_embedding: Union[List[float], np.ndarray],
+        limit: int = 5,
+        min_score: float = 0.7,
     ) -> List[Dict[str, Any]]:
         """
         Recall similar past episodes based on semantic similarity.
@@ -232,7 +304,7 @@ class TeamMemory:
         try:
             results = self.qdrant.search(
                 collection_name=self.collection_name,
-                query_vector=query_embedding,
+                query_vector=self._as_vector(query_embedding),
                 limit=limit,
                 score_threshold=min_score,
             )
@@ -257,7 +329,7 @@ class TeamMemory:
         Identify patterns from successful past episodes.
 
         Args:
-            task_type: Optional filter by task type
+            task_type: Optional filter by task type (see categorize_task)
             days_back: How many days of history to analyze
 
         Returns:
@@ -267,51 +339,14 @@ class TeamMemory:
             return []
 
         try:
-            since_date = (datetime.utcnow() - timedelta(days=days_back)).isoformat()
-
-            # Get team_id
-            team_result = (
-                self.supabase.table("teams")
-                .select("id")
-                .eq("name", self.team_name)
-                .execute()
-            )
-            team_id = team_result.data[0]["id"] if team_result.data else None
-
-            if not team_id:
+            if not self._refresh_rollups():
                 return []
 
-            # Query successful episodes
-            query = (
-                self.supabase.table("memory_entries")
-                .select("*")
-                .eq("team_id", team_id)
-                .eq("entry_type", "experience")
-                .contains("tags", ["success"])
-                .gte("created_at", since_date)
+            # Answer from the daily rollups instead of re-reading episodes
+            rollup = self.rollups.merged(
+                since=since_days(days_back), task_type=task_type
             )
-
-            if task_type:
-                query = query.ilike("title", f"%{task_type}%")
-
-            result = query.execute()
-            episodes = []
-
-            # Parse content JSON
-            for entry in result.data:
-                content = json.loads(entry["content"])
-                episodes.append(
-                    {
-                        "id": entry["id"],
-                        "task_description": content.get("task_description"),
-                        "success": content.get("success"),
-                        "duration_seconds": content.get("duration"),
-                        "agent_contributions": content.get("agent_contributions", {}),
-                    }
-                )
-
-            # Analyze patterns
-            patterns = self._analyze_patterns(episodes)
+            patterns = self._patterns_from_rollup(rollup)
 
             self.logger.info(f"Identified {len(patterns)} successful patterns")
             return patterns
@@ -320,46 +355,21 @@ class TeamMemory:
             self.logger.error(f"Failed to get patterns: {e}")
             return []
 
-    def _analyze_patterns(self, episodes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Analyze episodes to identify common successful patterns."""
-        patterns = {}
-
-        for episode in episodes:
-            # Extract agent contributions
-            contributions = json.loads(episode.get("agent_contributions", "{}"))
-
-            for agent, actions in contributions.items():
-                if agent not in patterns:
-                    patterns[agent] = {
-                        "agent": agent,
-                        "successful_actions": {},
-                        "total_successes": 0,
-                    }
-
-                patterns[agent]["total_successes"] += 1
-
-                # Count action frequencies
-                for action in actions:
-                    action_key = self._normalize_action(action)
-                    if action_key not in patterns[agent]["successful_actions"]:
-                        patterns[agent]["successful_actions"][action_key] = 0
-                    patterns[agent]["successful_actions"][action_key] += 1
-
-        # Convert to list and sort by effectiveness
+    def _patterns_from_rollup(self, rollup: RollupBucket) -> List[Dict[str, Any]]:
+        """Turn rolled-up agent contributions into successful patterns."""
         pattern_list = []
-        for agent, data in patterns.items():
+        for agent, total_successes in rollup.agent_successes.items():
             # Get top actions
-            top_actions = sorted(
-                data["successful_actions"].items(), key=lambda x: x[1], reverse=True
-            )[:5]
+            top_actions = rollup.agent_actions.get(agent, {})
+            top_actions = sorted(top_actions.items(), key=lambda x: x[1], reverse=True)
 
             pattern_list.append(
                 {
                     "agent": agent,
-                    "total_successes": data["total_successes"],
+                    "total_successes": total_successes,
                     "top_actions": [
                         {"action": action, "frequency": freq}
-                        for action, freq in top_actions
+                        for action, freq in top_actions[:5]
                     ],
                 }
             )
@@ -390,14 +400,7 @@ class TeamMemory:
 
         if self.supabase:
             try:
-                # Get team_id
-                team_result = (
-                    self.supabase.table("teams")
-                    .select("id")
-                    .eq("name", self.team_name)
-                    .execute()
-                )
-                team_id = team_result.data[0]["id"] if team_result.data else None
+                team_id = self._get_team_id()
 
                 # Determine pattern type
                 pattern_type = "insight"
@@ -448,14 +451,7 @@ class TeamMemory:
             return []
 
         try:
-            # Get team_id
-            team_result = (
-                self.supabase.table("teams")
-                .select("id")
-                .eq("name", self.team_name)
-                .execute()
-            )
-            team_id = team_result.data[0]["id"] if team_result.data else None
+            team_id = self._get_team_id()
 
             if not team_id:
                 return []
@@ -499,89 +495,75 @@ class TeamMemory:
             return
 
         try:
-            cutoff_date = (
-                datetime.utcnow() - timedelta(days=older_than_days)
-            ).isoformat()
-
-            # Get team_id
-            team_result = (
-                self.supabase.table("teams")
-                .select("id")
-                .eq("name", self.team_name)
-                .execute()
-            )
-            team_id = team_result.data[0]["id"] if team_result.data else None
-
-            if not team_id:
+            if not self._refresh_rollups():
                 return
 
-            # Get old episodes
-            result = (
-                self.supabase.table("memory_entries")
-                .select("*")
-                .eq("team_id", team_id)
-                .eq("entry_type", "experience")
-                .lt("created_at", cutoff_date)
-                .execute()
-            )
-
-            old_episodes = result.data
-
-            if not old_episodes:
+            # Group old episodes by task type using the rollups
+            old_buckets = self.rollups.query(until=since_days(older_than_days))
+            if not old_buckets:
                 return
 
-            # Group by task type and analyze
-            task_groups = {}
-            for entry in old_episodes:
-                content = json.loads(entry["content"])
-                task_type = self._extract_task_type(content.get("task_description", ""))
-                if task_type not in task_groups:
-                    task_groups[task_type] = []
-                task_groups[task_type].append(
-                    {
-                        "id": entry["id"],
-                        "success": content.get("success", False),
-                        "task_description": content.get("task_description", ""),
-                    }
-                )
+            task_groups: Dict[str, RollupBucket] = {}
+            for (_, task_type), bucket in old_buckets.items():
+                task_groups.setdefault(task_type, RollupBucket()).merge(bucket)
 
             # Create consolidated learnings
-            for task_type, episodes in task_groups.items():
-                success_rate = sum(1 for e in episodes if e["success"]) / len(episodes)
+            for task_type, rollup in task_groups.items():
+                success_rate = rollup.success_rate
 
                 if success_rate > 0.7:  # High success rate
-                    patterns = self._analyze_patterns(
-                        [e for e in episodes if e["success"]]
-                    )
-
                     learning = {
                         "insight": f"Effective approach for {task_type} tasks",
                         "context": {"task_type": task_type},
-                        "evidence": [e["id"] for e in episodes[:5]],  # Sample IDs
+                        "evidence": rollup.sample_ids[:5],  # Sample IDs
                         "confidence": success_rate,
                     }
 
                     self.store_learning(learning)
 
-            self.logger.info(f"Consolidated {len(old_episodes)} old memories")
+            consolidated = sum(rollup.total for rollup in task_groups.values())
+            self.logger.info(f"Consolidated {consolidated} old memories")
 
         except Exception as e:
             self.logger.error(f"Failed to consolidate memories: {e}")
 
     def _extract_task_type(self, task_description: str) -> str:
         """Extract task type from description."""
-        # Simple extraction - can be enhanced
-        words = task_description.lower().split()
-        if "create" in words:
-            return "creation"
-        elif "analyze" in words:
-            return "analysis"
-        elif "fix" in words or "debug" in words:
-            return "debugging"
-        elif "design" in words:
-            return "design"
-        else:
-            return "general"
+        return categorize_task(task_description)
+
+    def get_task_type_stats(
+        self, task_type: Optional[str] = None, days_back: int = 90
+    ) -> Dict[str, Any]:
+        """
+        Get rolled-up statistics for one task type.
+
+        Args:
+            task_type: Task category (see categorize_task); None for all
+            days_back: Number of days to include
+
+        Returns:
+            Episode counts, success rate and duration estimates
+        """
+        if not self.supabase:
+            return {"total_episodes": 0}
+
+        try:
+            if not self._refresh_rollups():
+                return {"total_episodes": 0}
+        except Exception as e:
+            self.logger.warning(f"Failed to refresh task type stats: {e}")
+            return {"total_episodes": 0}
+
+        rollup = self.rollups.merged(since=since_days(days_back), task_type=task_type)
+        return {
+            "total_episodes": rollup.total,
+            "successful_episodes": rollup.successes,
+            "success_rate": rollup.success_rate,
+            "average_duration_seconds": rollup.average_duration,
+            "median_success_duration_seconds": rollup.histogram_median(
+                rollup.success_durations
+            ),
+        }
 
     def get_performance_metrics(self, days_back: int = 30) -> Dict[str, Any]:
         """
@@ -597,68 +579,28 @@ class TeamMemory:
             return {}
 
         try:
-            since_date = (datetime.utcnow() - timedelta(days=days_back)).isoformat()
-
-            # Get team_id
-            team_result = (
-                self.supabase.table("teams")
-                .select("id")
-                .eq("name", self.team_name)
-                .execute()
-            )
-            team_id = team_result.data[0]["id"] if team_result.data else None
-
-            if not team_id:
+            if not self._refresh_rollups():
                 return {}
 
-            result = (
-                self.supabase.table("memory_entries")
-                .select("*")
-                .eq("team_id", team_id)
-                .eq("entry_type", "experience")
-                .gte("created_at", since_date)
-                .execute()
-            )
-
-            episodes = result.data
-
-            if not episodes:
+            buckets = self.rollups.query(since=since_days(days_back))
+            if not buckets:
                 return {}
 
-            # Parse episodes and calculate metrics
-            parsed_episodes = []
-            for entry in episodes:
-                content = json.loads(entry["content"])
-                parsed_episodes.append(
-                    {
-                        "success": content.get("success", False),
-                        "duration_seconds": content.get("duration", 0),
-                        "created_at": entry["created_at"],
-                    }
-                )
-
-            total = len(parsed_episodes)
-            successful = sum(1 for e in parsed_episodes if e["success"])
-
-            # Average duration
-            durations = [
-                e["duration_seconds"] for e in parsed_episodes if e["duration_seconds"]
-            ]
-            avg_duration = sum(durations) / len(durations) if durations else 0
-
-            # Success rate by week
+            rollup = RollupBucket()
             weekly_stats = {}
-            for episode in parsed_episodes:
-                week = datetime.fromisoformat(
-                    episode["created_at"].replace("Z", "+00:00")
-                ).isocalendar()[1]
+            for (day, _), bucket in buckets.items():
+                rollup.merge(bucket)
 
+                # Success rate by week
+                week = day.isocalendar()[1]
                 if week not in weekly_stats:
                     weekly_stats[week] = {"total": 0, "successful": 0}
+                weekly_stats[week]["total"] += bucket.total
+                weekly_stats[week]["successful"] += bucket.successes
 
-                weekly_stats[week]["total"] += 1
-                if episode["success"]:
-                    weekly_stats[week]["successful"] += 1
+            total = rollup.total
+            successful = rollup.successes
+            avg_duration = rollup.average_duration
 
             # Calculate trend
             weeks = sorted(weekly_stats.keys())
@@ -4,6 +4,7 @@ N8N Integration Module for ELF Automations
 Provides SDK and utilities for teams to interact with n8n workflows.
 """
 
+from .batch import BatchProgress
 from .client import N8NClient
 from .config import (
     NotificationSettings,
@@ -63,6 +64,7 @@ __all__ = [
     "WorkflowExporter",
     "WorkflowValidator",
     "ValidationReport",
+    "BatchProgress",
     # Patterns
     "WorkflowPattern",
     "WorkflowPatterns",
@@ -0,0 +1,104 @@
+"""
+Batch helpers for workflow import and export
+
+Bounded concurrency with per-item error isolation, chunking and progress
+reporting, shared by WorkflowImporter and WorkflowExporter.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    TypeVar,
+    Union,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@dataclass
+class BatchProgress:
+    """Progress of one stage of a batch operation"""
+
+    stage: str
+    total: Optional[int] = None
+    completed: int = 0
+    failed: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def succeeded(self) -> int:
+        return self.completed - self.failed
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+
+ProgressCallback = Callable[[BatchProgress], None]
+
+
+def report_progress(
+    progress: BatchProgress,
+    callback: Optional[ProgressCallback],
+    completed: int = 1,
+    failed: int = 0,
+):
+    """Advance a stage and notify the callback; callback errors are logged"""
+    progress.completed += completed
+    progress.failed += failed
+    if callback:
+        try:
+            callback(progress)
+        except Exception as e:
+            logger.warning(f"Progress callback failed: {e}")
+
+
+def chunked(items: Sequence[T], size: int) -> Iterator[List[T]]:
+    """Consecutive slices of at most size items"""
+    size = max(1, size)
+    for start in range(0, len(items), size):
+        yield list(items[start : start + size])
+
+
+async def gather_bounded(
+    items: Sequence[T],
+    worker: Callable[[T], Awaitable[R]],
+    max_concurrency: int,
+    progress: Optional[BatchProgress] = None,
+    progress_callback: Optional[ProgressCallback] = None,
+) -> List[Union[R, BaseException]]:
+    """
+    Run worker over items with at most max_concurrency in flight
+
+    Results keep the order of items; an item that raises gets its exception
+    in place of a result instead of failing the batch.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run(item: T) -> Union[R, BaseException]:
+        async with semaphore:
+            try:
+                result: Any = await worker(item)
+            except Exception as e:
+                result = e
+        if progress is not None:
+            report_progress(
+                progress,
+                progress_callback,
+                failed=1 if isinstance(result, Exception) else 0,
+            )
+        return result
+
+    return await asyncio.gather(*(run(item) for item in items))
@@ -5,10 +5,14 @@ Analyzes workflows for optimization opportunities, security issues, and best pra
 Provides recommendations for improvements and cost optimization.
 """
 
+import copy
+import hashlib
 import json
+import re
+from collections import OrderedDict
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 
 class IssueType(Enum):
@@ -71,10 +75,99 @@ class WorkflowMetrics:
     database_operations: int
 
 
+LANGCHAIN_PREFIX = "@n8n/n8n-nodes-langchain"
+BRANCH_NODE_TYPES = frozenset({"n8n-nodes-base.if", "n8n-nodes-base.switch"})
+DATABASE_NODE_TYPES = frozenset({"n8n-nodes-base.postgres", "n8n-nodes-base.supabase"})
+
+# Any of these in a parameter value suggests a hardcoded credential
+_CREDENTIAL_KEYWORDS = re.compile(
+    "password|api_key|apikey|secret|token|private_key|privatekey|access_key|accesskey"
+)
+
+
+def workflow_fingerprint(
+    workflow: Dict[str, Any], serialized: Optional[str] = None
+) -> str:
+    """Content hash of a workflow, used to memoize analysis and validation"""
+    if serialized is None:
+        serialized = json.dumps(workflow, default=str)
+    return hashlib.sha256(serialized.encode()).hexdigest()
+
+
+class _WorkflowScan:
+    """Counters gathered while visiting a workflow's nodes and connections"""
+
+    def __init__(self, workflow: Dict[str, Any]):
+        connections = workflow.get("connections", {})
+        self.workflow = workflow
+        self.connections = connections if isinstance(connections, dict) else {}
+        self.node_count = 0
+        self.branch_nodes = 0
+        self.ai_nodes = 0
+        self.api_nodes = 0
+        self.db_nodes = 0
+        self.total_time = 0
+        self.total_cost = 0
+
+    def metrics(self) -> WorkflowMetrics:
+        connection_count = 0
+        parallel_opportunities = 0
+
+        for outputs in self.connections.values():
+            connection_count += len(outputs.get("main", [[]])[0])
+
+            # Multiple connections to the same target might be parallelizable
+            main_outputs = outputs["main"][0] if outputs.get("main") else []
+            targets: Dict[str, int] = {}
+            for output in main_outputs:
+                target = output.get("node")
+                if target:
+                    targets[target] = targets.get(target, 0) + 1
+            parallel_opportunities += sum(1 for count in targets.values() if count > 1)
+
+        return WorkflowMetrics(
+            node_count=self.node_count,
+            connection_count=connection_count,
+            complexity_score=self.node_count
+            + connection_count
+            + (self.branch_nodes * 2),
+            estimated_execution_time=self.total_time,
+            estimated_cost_per_run=self.total_cost,
+            parallel_execution_opportunities=parallel_opportunities,
+            ai_node_count=self.ai_nodes,
+            external_api_calls=self.api_nodes,
+            database_operations=self.db_nodes,
+        )
+
+
 class WorkflowAnalyzer:
     """Analyzes N8N workflows for issues and optimization opportunities"""
 
-    def __init__(self):
+    # Checks in reporting order. Node checks run during the single traversal
+    # on nodes of their kind ("*" for every node); workflow checks run on the
+    # finished metrics. Issues are reported by check, then in node order.
+    RULES: Tuple[Tuple[str, Optional[str]], ...] = (
+        ("_check_node_security", "*"),
+        ("_check_parallel_execution", None),
+        ("_check_async_loop", "code"),
+        ("_check_unbounded_query", "database"),
+        ("_check_error_workflow", None),
+        ("_check_http_retry", "http"),
+        ("_check_http_timeout", "http"),
+        ("_check_ai_cost", None),
+        ("_check_multiple_ai_calls", None),
+        ("_check_database_operations", None),
+        ("_check_workflow_name", None),
+        ("_check_node_name", "*"),
+        ("_check_complexity", None),
+        ("_check_ai_node", "ai"),
+    )
+
+    def __init__(self, cache_size: int = 256):
+        """
+        Args:
+            cache_size: Number of analysis results memoized by workflow content
+        """
         # Define node costs (approximate)
         self.node_costs = {
             "n8n-nodes-base.webhook": 0.00001,
@@ -95,147 +188,163 @@ class WorkflowAnalyzer:
             "n8n-nodes-base.code": 0.05,
         }
 
+        # Compile the rules into dispatch tables once
+        self._node_rules: List[Tuple[int, Optional[str], Callable]] = []
+        self._workflow_rules: List[Tuple[int, Callable]] = []
+        for index, (method, kind) in enumerate(self.RULES):
+            if kind is None:
+                self._workflow_rules.append((index, getattr(self, method)))
+            else:
+                self._node_rules.append((index, kind, getattr(self, method)))
+        self._rules_by_type: Dict[str, Tuple[Tuple[int, Callable], ...]] = {}
+
+        self.cache_size = cache_size
+        # fingerprint -> (issues, metrics)
+        self._results: "OrderedDict[str, Tuple]" = OrderedDict()
+
     def analyze_workflow(
+        self, workflow: Dict[str, Any], fingerprint: Optional[str] = None
+    ) -> Tuple[List[WorkflowIssue], WorkflowMetrics]:
+        """
+        Analyze a workflow and return issues and metrics
+
+        Results are memoized by workflow content; pass a precomputed
+        fingerprint (see workflow_fingerprint) to skip hashing.
+        """
+        if fingerprint is None:
+            fingerprint = workflow_fingerprint(workflow)
+
+        result = self._results.get(fingerprint)
+        if result is None:
+            result = self._run_rules(workflow)
+            self._results[fingerprint] = result
+            while len(self._results) > self.cache_size:
+                self._results.popitem(last=False)
+        else:
+            self._results.move_to_end(fingerprint)
+
+        issues, metrics = result
+        return list(issues), copy.copy(metrics)
+
+    def _run_rules(
         self, workflow: Dict[str, Any]
     ) -> Tuple[List[WorkflowIssue], WorkflowMetrics]:
-        """Analyze a workflow and return issues and metrics"""
-
-        issues = []
-
-        # Calculate basic metrics
-        metrics = self._calculate_metrics(workflow)
-
-        # Run various checks
-        issues.extend(self._check_security_issues(workflow))
-        issues.extend(self._check_performance_issues(workflow, metrics))
-        issues.extend(self._check_reliability_issues(workflow))
-        issues.extend(self._check_cost_issues(workflow, metrics))
-        issues.extend(self._check_best_practices(workflow))
-        issues.extend(self._check_ai_specific_issues(workflow))
-
-        return issues, metrics
+        """Visit every node once, then run the workflow-level checks"""
 
-    def _calculate_metrics(self, workflow: Dict[str, Any]) -> WorkflowMetrics:
-        """Calculate workflow metrics"""
+        scan = _WorkflowScan(workflow)
+        buckets: List[List[WorkflowIssue]] = [[] for _ in self.RULES]
 
-        nodes = workflow.get("nodes", [])
-        connections = workflow.get("connections", {})
-
-        # Count connections
-        connection_count = sum(
-            len(outputs.get("main", [[]])[0]) for outputs in connections.values()
-        )
-
-        # Calculate complexity (nodes + connections + branches)
-        branch_count = len(
-            [
-                n
-                for n in nodes
-                if n.get("type") in ["n8n-nodes-base.if", "n8n-nodes-base.switch"]
-            ]
-        )
-        complexity_score = len(nodes) + connection_count + (branch_count * 2)
-
-        # Count specific node types
-        ai_nodes = [n for n in nodes if "@n8n/n8n-nodes-langchain" in n.get("type", "")]
-        api_nodes = [n for n in nodes if n.get("type") == "n8n-nodes-base.httpRequest"]
-        db_nodes = [
-            n
-            for n in nodes
-            if n.get("type") in ["n8n-nodes-base.postgres", "n8n-nodes-base.supabase"]
-        ]
-
-        # Estimate execution time
-        total_time = sum(
-            self.node_times.get(node.get("type", ""), 0.1) for node in nodes
-        )
-
-        # Estimate cost
-        total_cost = sum(
-            self.node_costs.get(node.get("type", ""), 0.0001) for node in nodes
-        )
-
-        # Find parallel opportunities
-        parallel_opportunities = self._find_parallel_opportunities(workflow)
-
-        return WorkflowMetrics(
-            node_count=len(nodes),
-            connection_count=connection_count,
-            complexity_score=complexity_score,
-            estimated_execution_time=total_time,
-            estimated_cost_per_run=total_cost,
-            parallel_execution_opportunities=parallel_opportunities,
-            ai_node_count=len(ai_nodes),
-            external_api_calls=len(api_nodes),
-            database_operations=len(db_nodes),
-        )
+        for node in workflow.get("nodes", []):
+            if not isinstance(node, dict):
+                continue
+            node_type = node.get("type", "")
+            if not isinstance(node_type, str):
+                node_type = ""
+
+            scan.node_count += 1
+            scan.total_time += self.node_times.get(node_type, 0.1)
+            scan.total_cost += self.node_costs.get(node_type, 0.0001)
+            if node_type in BRANCH_NODE_TYPES:
+                scan.branch_nodes += 1
+            elif node_type in DATABASE_NODE_TYPES:
+                scan.db_nodes += 1
+            elif node_type == "n8n-nodes-base.httpRequest":
+                scan.api_nodes += 1
+            if LANGCHAIN_PREFIX in node_type:
+                scan.ai_nodes += 1
+
+            for index, rule in self._rules_for_type(node_type):
+                rule(node, scan, buckets[index])
+
+        metrics = scan.metrics()
+        for index, rule in self._workflow_rules:
+            rule(scan, metrics, buckets[index])
+
+        return [issue for bucket in buckets for issue in bucket], metrics
+
+    def _rules_for_type(self, node_type: str) -> Tuple[Tuple[int, Callable], ...]:
+        """Node checks that apply to a node type, resolved once per type"""
+
+        rules = self._rules_by_type.get(node_type)
+        if rules is None:
+            kinds = {"*"}
+            if node_type == "n8n-nodes-base.code":
+                kinds.add("code")
+            elif node_type == "n8n-nodes-base.httpRequest":
+                kinds.add("http")
+            elif node_type in DATABASE_NODE_TYPES:
+                kinds.add("database")
+            if LANGCHAIN_PREFIX in node_type:
+                kinds.add("ai")
+
+            rules = tuple(
+                (index, rule) for index, kind, rule in self._node_rules if kind in kinds
+            )
+            self._rules_by_type[node_type] = rules
+        return rules
 
-    def _check_security_issues(self, workflow: Dict[str, Any]) -> List[WorkflowIssue]:
-        """Check for security issues"""
+    # Security
 
-        issues = []
-        nodes = workflow.get("nodes", [])
+    def _check_node_security(
+        self, node: Dict[str, Any], scan: _WorkflowScan, issues: List[WorkflowIssue]
+    ):
+        """Hardcoded credentials, plain HTTP and unauthenticated webhooks"""
 
-        for node in nodes:
-            node_type = node.get("type", "")
-            node_id = node.get("id", node.get("name", "unknown"))
-            params = node.get("parameters", {})
+        node_type = node.get("type", "")
+        node_id = node.get("id", node.get("name", "unknown"))
+        params = node.get("parameters", {})
 
-            # Check for hardcoded credentials
-            if self._contains_credentials(params):
-                issues.append(
-                    WorkflowIssue(
-                        type=IssueType.SECURITY,
-                        severity=IssueSeverity.CRITICAL,
-                        node_id=node_id,
-                        title="Hardcoded Credentials Detected",
-                        description=f"Node '{node_id}' contains hardcoded credentials",
-                        recommendation="Use n8n credentials system instead of hardcoding sensitive data",
-                    )
+        # Check for hardcoded credentials
+        if self._contains_credentials(params):
+            issues.append(
+                WorkflowIssue(
+                    type=IssueType.SECURITY,
+                    severity=IssueSeverity.CRITICAL,
+                    node_id=node_id,
+                    title="Hardcoded Credentials Detected",
+                    description=f"Node '{node_id}' contains hardcoded credentials",
+                    recommendation="Use n8n credentials system instead of hardcoding sensitive data",
                 )
+            )
 
-            # Check for unencrypted HTTP requests
-            if node_type == "n8n-nodes-base.httpRequest":
-                url = params.get("url", "")
-                if url.startswith("http://") and "localhost" not in url:
-                    issues.append(
-                        WorkflowIssue(
-                            type=IssueType.SECURITY,
-                            severity=IssueSeverity.HIGH,
-                            node_id=node_id,
-                            title="Unencrypted HTTP Request",
-                            description=f"Node '{node_id}' makes unencrypted HTTP request",
-                            recommendation="Use HTTPS for external API calls",
-                        )
-                    )
-
-            # Check for missing authentication
-            if node_type == "n8n-nodes-base.webhook" and not params.get(
-                "authentication"
-            ):
+        # Check for unencrypted HTTP requests
+        if node_type == "n8n-nodes-base.httpRequest":
+            url = params.get("url", "")
+            if url.startswith("http://") and "localhost" not in url:
                 issues.append(
                     WorkflowIssue(
                         type=IssueType.SECURITY,
-                        severity=IssueSeverity.MEDIUM,
+                        severity=IssueSeverity.HIGH,
                         node_id=node_id,
-                        title="Webhook Without Authentication",
-                        description=f"Webhook '{node_id}' has no authentication configured",
-                        recommendation="Add authentication to prevent unauthorized access",
+                        title="Unencrypted HTTP Request",
+                        description=f"Node '{node_id}' makes unencrypted HTTP request",
+                        recommendation="Use HTTPS for external API calls",
                     )
                 )
 
-        return issues
+        # Check for missing authentication
+        if node_type == "n8n-nodes-base.webhook" and not params.get("authentication"):
+            issues.append(
+                WorkflowIssue(
+                    type=IssueType.SECURITY,
+                    severity=IssueSeverity.MEDIUM,
+                    node_id=node_id,
+                    title="Webhook Without Authentication",
+                    description=f"Webhook '{node_id}' has no authentication configured",
+                    recommendation="Add authentication to prevent unauthorized access",
+                )
+            )
 
-    def _check_performance_issues(
-        self, workflow: Dict[str, Any], metrics: WorkflowMetrics
-    ) -> List[WorkflowIssue]:
-        """Check for performance issues"""
+    # Performance
 
-        issues = []
-        nodes = workflow.get("nodes", [])
-        connections = workflow.get("connections", {})
+    def _check_parallel_execution(
+        self,
+        scan: _WorkflowScan,
+        metrics: WorkflowMetrics,
+        issues: List[WorkflowIssue],
+    ):
+        """Sequential operations that could be parallel"""
 
-        # Check for sequential operations that could be parallel
         if metrics.parallel_execution_opportunities > 0:
             issues.append(
                 WorkflowIssue(
@@ -249,56 +358,53 @@ class WorkflowAnalyzer:
                 )
             )
 
-        # Check for inefficient loops
-        code_nodes = [n for n in nodes if n.get("type") == "n8n-nodes-base.code"]
-        for node in code_nodes:
-            code = node.get("parameters", {}).get("jsCode", "")
-            if "for" in code and "await" in code:
-                issues.append(
-                    WorkflowIssue(
-                        type=IssueType.PERFORMANCE,
-                        severity=IssueSeverity.HIGH,
-                        node_id=node.get("id"),
-                        title="Inefficient Async Loop",
-                        description="Sequential await in loop detected",
-                        recommendation="Use Promise.all() for parallel async operations",
-                    )
-                )
+    def _check_async_loop(
+        self, node: Dict[str, Any], scan: _WorkflowScan, issues: List[WorkflowIssue]
+    ):
+        """Sequential awaits inside code node loops"""
 
-        # Check for missing pagination
-        db_nodes = [
-            n
-            for n in nodes
-            if n.get("type") in ["n8n-nodes-base.postgres", "n8n-nodes-base.supabase"]
-        ]
-        for node in db_nodes:
-            if node.get("parameters", {}).get("operation") == "select" and not node.get(
-                "parameters", {}
-            ).get("limit"):
-                issues.append(
-                    WorkflowIssue(
-                        type=IssueType.PERFORMANCE,
-                        severity=IssueSeverity.MEDIUM,
-                        node_id=node.get("id"),
-                        title="Unbounded Database Query",
-                        description="Database query without limit could return excessive data",
-                        recommendation="Add pagination or limit to database queries",
-                    )
+        code = node.get("parameters", {}).get("jsCode", "")
+        if "for" in code and "await" in code:
+            issues.append(
+                WorkflowIssue(
+                    type=IssueType.PERFORMANCE,
+                    severity=IssueSeverity.HIGH,
+                    node_id=node.get("id"),
+                    title="Inefficient Async Loop",
+                    description="Sequential await in loop detected",
+                    recommendation="Use Promise.all() for parallel async operations",
                 )
+            )
 
-        return issues
+    def _check_unbounded_query(
+        self, node: Dict[str, Any], scan: _WorkflowScan, issues: List[WorkflowIssue]
+    ):
+        """Database selects without pagination"""
 
-    def _check_reliability_issues(
-        self, workflow: Dict[str, Any]
-    ) -> List[WorkflowIssue]:
-        """Check for reliability issues"""
+        params = node.get("parameters", {})
+        if params.get("operation") == "select" and not params.get("limit"):
+            issues.append(
+                WorkflowIssue(
+                    type=IssueType.PERFORMANCE,
+                    severity=IssueSeverity.MEDIUM,
+                    node_id=node.get("id"),
+                    title="Unbounded Database Query",
+                    description="Database query without limit could return excessive data",
+                    recommendation="Add pagination or limit to database queries",
+                )
+            )
+
+    # Reliability
 
-        issues = []
-        nodes = workflow.get("nodes", [])
-        settings = workflow.get("settings", {})
+    def _check_error_workflow(
+        self,
+        scan: _WorkflowScan,
+        metrics: WorkflowMetrics,
+        issues: List[WorkflowIssue],
+    ):
+        """Missing error workflow"""
 
-        # Check for missing error handling
-        if not settings.get("errorWorkflow"):
+        if not scan.workflow.get("settings", {}).get("errorWorkflow"):
             issues.append(
                 WorkflowIssue(
                     type=IssueType.RELIABILITY,
@@ -310,46 +416,50 @@ class WorkflowAnalyzer:
                 )
             )
 
-        # Check for missing retries on HTTP requests
-        http_nodes = [n for n in nodes if n.get("type") == "n8n-nodes-base.httpRequest"]
-        for node in http_nodes:
-            if not node.get("parameters", {}).get("options", {}).get("retry"):
-                issues.append(
-                    WorkflowIssue(
-                        type=IssueType.RELIABILITY,
-                        severity=IssueSeverity.MEDIUM,
-                        node_id=node.get("id"),
-                        title="HTTP Request Without Retry",
-                        description="HTTP request has no retry configuration",
-                        recommendation="Add retry logic for better reliability",
-                    )
-                )
+    def _check_http_retry(
+        self, node: Dict[str, Any], scan: _WorkflowScan, issues: List[WorkflowIssue]
+    ):
+        """HTTP requests without retries"""
 
-        # Check for missing timeouts
-        for node in http_nodes:
-            if not node.get("parameters", {}).get("options", {}).get("timeout"):
-                issues.append(
-                    WorkflowIssue(
-                        type=IssueType.RELIABILITY,
-                        severity=IssueSeverity.LOW,
-                        node_id=node.get("id"),
-                        title="HTTP Request Without Timeout",
-                        description="HTTP request has no timeout configured",
-                        recommendation="Set appropriate timeout to prevent hanging",
-                    )
+        if not node.get("parameters", {}).get("options", {}).get("retry"):
+            issues.append(
+                WorkflowIssue(
+                    type=IssueType.RELIABILITY,
+                    severity=IssueSeverity.MEDIUM,
+                    node_id=node.get("id"),
+                    title="HTTP Request Without Retry",
+                    description="HTTP request has no retry configuration",
+                    recommendation="Add retry logic for better reliability",
                 )
+            )
+
+    def _check_http_timeout(
+        self, node: Dict[str, Any], scan: _WorkflowScan, issues: List[WorkflowIssue]
+    ):
+        """HTTP requests without timeouts"""
 
-        return issues
+        if not node.get("parameters", {}).get("options", {}).get("timeout"):
+            issues.append(
+                WorkflowIssue(
+                    type=IssueType.RELIABILITY,
+                    severity=IssueSeverity.LOW,
+                    node_id=node.get("id"),
+                    title="HTTP Request Without Timeout",
+                    description="HTTP request has no timeout configured",
+                    recommendation="Set appropriate timeout to prevent hanging",
+                )
+            )
 
-    def _check_cost_issues(
-        self, workflow: Dict[str, Any], metrics: WorkflowMetrics
-    ) -> List[WorkflowIssue]:
-        """Check for cost optimization opportunities"""
+    # Cost
 
-        issues = []
-        nodes = workflow.get("nodes", [])
+    def _check_ai_cost(
+        self,
+        scan: _WorkflowScan,
+        metrics: WorkflowMetrics,
+        issues: List[WorkflowIssue],
+    ):
+        """Expensive AI operations"""
 
-        # Check for expensive AI operations
         if metrics.ai_node_count > 0 and metrics.estimated_cost_per_run > 0.05:
             issues.append(
                 WorkflowIssue(
@@ -363,9 +473,15 @@ class WorkflowAnalyzer:
                 )
             )
 
-        # Check for redundant AI calls
-        ai_nodes = [n for n in nodes if "@n8n/n8n-nodes-langchain" in n.get("type", "")]
-        if len(ai_nodes) > 1:
+    def _check_multiple_ai_calls(
+        self,
+        scan: _WorkflowScan,
+        metrics: WorkflowMetrics,
+        issues: List[WorkflowIssue],
+    ):
+        """Redundant AI calls"""
+
+        if metrics.ai_node_count > 1:
             issues.append(
                 WorkflowIssue(
                     type=IssueType.COST,
@@ -377,7 +493,14 @@ class WorkflowAnalyzer:
                 )
             )
 
-        # Check for unnecessary data fetching
+    def _check_database_operations(
+        self,
+        scan: _WorkflowScan,
+        metrics: WorkflowMetrics,
+        issues: List[WorkflowIssue],
+    ):
+        """Unnecessary data fetching"""
+
         if metrics.database_operations > 3:
             issues.append(
                 WorkflowIssue(
@@ -390,16 +513,17 @@ class WorkflowAnalyzer:
                 )
             )
 
-        return issues
-
-    def _check_best_practices(self, workflow: Dict[str, Any]) -> List[WorkflowIssue]:
-        """Check for best practice violations"""
+    # Best practices
 
-        issues = []
-        nodes = workflow.get("nodes", [])
+    def _check_workflow_name(
+        self,
+        scan: _WorkflowScan,
+        metrics: WorkflowMetrics,
+        issues: List[WorkflowIssue],
+    ):
+        """Missing workflow name"""
 
-        # Check for missing workflow description
-        if not workflow.get("name"):
+        if not scan.workflow.get("name"):
             issues.append(
                 WorkflowIssue(
                     type=IssueType.BEST_PRACTICE,
@@ -411,144 +535,111 @@ class WorkflowAnalyzer:
                 )
             )
 
-        # Check for missing node names
-        for node in nodes:
-            if not node.get("name") or node.get("name") == node.get("type"):
-                issues.append(
-                    WorkflowIssue(
-                        type=IssueType.BEST_PRACTICE,
-                        severity=IssueSeverity.LOW,
-                        node_id=node.get("id"),
-                        title="Generic Node Name",
-                        description=f"Node has generic or missing name",
-                        recommendation="Use descriptive names for nodes",
-                    )
+    def _check_node_name(
+        self, node: Dict[str, Any], scan: _WorkflowScan, issues: List[WorkflowIssue]
+    ):
+        """Missing or generic node names"""
+
+        if not node.get("name") or node.get("name") == node.get("type"):
+            issues.append(
+                WorkflowIssue(
+                    type=IssueType.BEST_PRACTICE,
+                    severity=IssueSeverity.LOW,
+                    node_id=node.get("id"),
+                    title="Generic Node Name",
+                    description=f"Node has generic or missing name",
+                    recommendation="Use descriptive names for nodes",
                 )
+            )
 
-        # Check workflow complexity
-        if len(nodes) > 20:
+    def _check_complexity(
+        self,
+        scan: _WorkflowScan,
+        metrics: WorkflowMetrics,
+        issues: List[WorkflowIssue],
+    ):
+        """Workflows too large to maintain"""
+
+        if metrics.node_count > 20:
             issues.append(
                 WorkflowIssue(
                     type=IssueType.MAINTAINABILITY,
                     severity=IssueSeverity.MEDIUM,
                     node_id=None,
                     title="Complex Workflow",
-                    description=f"Workflow has {len(nodes)} nodes, consider breaking it down",
+                    description=f"Workflow has {metrics.node_count} nodes, consider breaking it down",
                     recommendation="Split into sub-workflows for better maintainability",
                 )
             )
 
-        return issues
-
-    def _check_ai_specific_issues(
-        self, workflow: Dict[str, Any]
-    ) -> List[WorkflowIssue]:
-        """Check for AI-specific issues"""
+    # AI-specific
 
-        issues = []
-        nodes = workflow.get("nodes", [])
+    def _check_ai_node(
+        self, node: Dict[str, Any], scan: _WorkflowScan, issues: List[WorkflowIssue]
+    ):
+        """Temperature, token limits and error outputs on AI nodes"""
 
-        ai_nodes = [n for n in nodes if "@n8n/n8n-nodes-langchain" in n.get("type", "")]
+        params = node.get("parameters", {})
 
-        for node in ai_nodes:
-            params = node.get("parameters", {})
+        # Check for missing temperature settings
+        if "agent" in node.get("type", "") and not params.get("options", {}).get(
+            "temperature"
+        ):
+            issues.append(
+                WorkflowIssue(
+                    type=IssueType.BEST_PRACTICE,
+                    severity=IssueSeverity.LOW,
+                    node_id=node.get("id"),
+                    title="AI Agent Without Temperature Setting",
+                    description="AI agent uses default temperature",
+                    recommendation="Set appropriate temperature for consistent results",
+                )
+            )
 
-            # Check for missing temperature settings
-            if "agent" in node.get("type", "") and not params.get("options", {}).get(
-                "temperature"
-            ):
-                issues.append(
-                    WorkflowIssue(
-                        type=IssueType.BEST_PRACTICE,
-                        severity=IssueSeverity.LOW,
-                        node_id=node.get("id"),
-                        title="AI Agent Without Temperature Setting",
-                        description="AI agent uses default temperature",
-                        recommendation="Set appropriate temperature for consistent results",
-                    )
+        # Check for missing max tokens
+        if not params.get("options", {}).get("maxTokens"):
+            issues.append(
+                WorkflowIssue(
+                    type=IssueType.COST,
+                    severity=IssueSeverity.MEDIUM,
+                    node_id=node.get("id"),
+                    title="AI Without Token Limit",
+                    description="AI node has no token limit set",
+                    recommendation="Set maxTokens to control costs",
                 )
+            )
 
-            # Check for missing max tokens
-            if not params.get("options", {}).get("maxTokens"):
+        # Check for missing error handling on AI nodes
+        node_name = node.get("name", node.get("id"))
+        if node_name in scan.connections:
+            outputs = scan.connections[node_name].get("main", [[]])
+            if len(outputs) < 2:  # No error output configured
                 issues.append(
                     WorkflowIssue(
-                        type=IssueType.COST,
-                        severity=IssueSeverity.MEDIUM,
+                        type=IssueType.RELIABILITY,
+                        severity=IssueSeverity.HIGH,
                         node_id=node.get("id"),
-                        title="AI Without Token Limit",
-                        description="AI node has no token limit set",
-                        recommendation="Set maxTokens to control costs",
+                        title="AI Node Without Error Handling",
+                        description="AI node has no error output configured",
+                        recommendation="Add error handling for AI failures",
                     )
                 )
 
-            # Check for missing error handling on AI nodes
-            node_name = node.get("name", node.get("id"))
-            connections = workflow.get("connections", {})
-            if node_name in connections:
-                outputs = connections[node_name].get("main", [[]])
-                if len(outputs) < 2:  # No error output configured
-                    issues.append(
-                        WorkflowIssue(
-                            type=IssueType.RELIABILITY,
-                            severity=IssueSeverity.HIGH,
-                            node_id=node.get("id"),
-                            title="AI Node Without Error Handling",
-                            description="AI node has no error output configured",
-                            recommendation="Add error handling for AI failures",
-                        )
-                    )
-
-        return issues
-
     def _contains_credentials(self, obj: Any) -> bool:
         """Check if object contains potential credentials"""
 
-        if isinstance(obj, str):
-            # Check for common credential patterns
-            sensitive_patterns = [
-                "password",
-                "api_key",
-                "apikey",
-                "secret",
-                "token",
-                "private_key",
-                "privatekey",
-                "access_key",
-                "accesskey",
-            ]
-            lower_str = obj.lower()
-            return any(pattern in lower_str for pattern in sensitive_patterns)
-
-        elif isinstance(obj, dict):
-            return any(self._contains_credentials(v) for v in obj.values())
-
-        elif isinstance(obj, list):
-            return any(self._contains_credentials(item) for item in obj)
-
+        pending = [obj]
+        while pending:
+            item = pending.pop()
+            if isinstance(item, str):
+                if _CREDENTIAL_KEYWORDS.search(item.lower()):
+                    return True
+            elif isinstance(item, dict):
+                pending.extend(item.values())
+            elif isinstance(item, list):
+                pending.extend(item)
         return False
 
-    def _find_parallel_opportunities(self, workflow: Dict[str, Any]) -> int:
-        """Find operations that could be executed in parallel"""
-
-        connections = workflow.get("connections", {})
-        opportunities = 0
-
-        # Look for nodes with multiple outputs to same target
-        for node_name, outputs in connections.items():
-            main_outputs = outputs.get("main", [[]])[0] if outputs.get("main") else []
-
-            # Group by target node
-            targets = {}
-            for output in main_outputs:
-                target = output.get("node")
-                if target:
-                    targets[target] = targets.get(target, 0) + 1
-
-            # If multiple connections to same target, they might be parallelizable
-            opportunities += sum(1 for count in targets.values() if count > 1)
-
-        return opportunities
-
     def suggest_optimizations(
         self, workflow: Dict[str, Any], issues: List[WorkflowIssue]
     ) -> List[OptimizationSuggestion]:
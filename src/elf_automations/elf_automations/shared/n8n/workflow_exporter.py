@@ -5,32 +5,77 @@ Handles exporting workflows from the database to N8N format.
 Supports single and bulk exports, versioning, and format conversion.
 """
 
+import io
 import json
 import logging
+import tarfile
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
-from zipfile import ZipFile
+from typing import Any, Dict, Iterator, List, Optional, Union
+from zipfile import ZIP_DEFLATED, ZipFile
 
 from supabase import Client
 
+from .batch import BatchProgress, ProgressCallback, chunked, report_progress
 from .exceptions import N8NError, WorkflowNotFoundError
 from .models import WorkflowStatus
 
 logger = logging.getLogger(__name__)
 
+# Archive format -> file suffix
+ARCHIVE_FORMATS = {"zip": ".zip", "tar": ".tar", "tar.gz": ".tar.gz"}
+
+
+class _ArchiveWriter:
+    """Writes JSON entries one at a time to a zip or tar archive"""
+
+    def __init__(self, path: Path, archive_format: str):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if archive_format == "zip":
+            self._zip: Optional[ZipFile] = ZipFile(path, "w", ZIP_DEFLATED)
+            self._tar: Optional[tarfile.TarFile] = None
+        else:
+            self._zip = None
+            mode = "w:gz" if archive_format == "tar.gz" else "w"
+            self._tar = tarfile.open(path, mode)
+
+    def write(self, name: str, data: Any):
+        payload = json.dumps(data, indent=2).encode()
+        if self._zip:
+            self._zip.writestr(name, payload)
+        else:
+            info = tarfile.TarInfo(name)
+            info.size = len(payload)
+            info.mtime = int(time.time())
+            self._tar.addfile(info, io.BytesIO(payload))
+
+    def close(self):
+        if self._zip:
+            self._zip.close()
+        else:
+            self._tar.close()
+
+    def __enter__(self) -> "_ArchiveWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
 
 class WorkflowExporter:
     """Export workflows from database to N8N format"""
 
-    def __init__(self, supabase_client: Client):
+    def __init__(self, supabase_client: Client, page_size: int = 100):
         """
         Initialize workflow exporter
 
         Args:
             supabase_client: Supabase client for database operations
+            page_size: Registry rows fetched per query in batch exports
         """
         self.supabase = supabase_client
+        self.page_size = page_size
 
     def export_workflow(
         self,
@@ -91,6 +136,26 @@ class WorkflowExporter:
         else:
             workflow_json = workflow["n8n_workflow_json"]
 
+        export_data = self._build_export(
+            workflow, workflow_json, version, include_metadata
+        )
+
+        # Log export
+        self.supabase.table("workflow_import_export_log").insert(
+            self._export_log(workflow, version, include_metadata)
+        ).execute()
+
+        return export_data
+
+    def _build_export(
+        self,
+        workflow: Dict[str, Any],
+        workflow_json: Dict[str, Any],
+        version: Optional[int],
+        include_metadata: bool,
+    ) -> Dict[str, Any]:
+        """Export data for a registry row and its workflow definition"""
+
         # Ensure workflow has been imported (has actual JSON)
         if not workflow_json or workflow_json == {}:
             raise N8NError(
@@ -105,7 +170,7 @@ class WorkflowExporter:
 
         # Prepare export
         if include_metadata:
-            export_data = {
+            return {
                 "workflow": workflow_json,
                 "metadata": {
                     "exported_at": datetime.utcnow().isoformat(),
@@ -119,11 +184,14 @@ class WorkflowExporter:
                     "description": workflow.get("description"),
                 },
             }
-        else:
-            export_data = workflow_json
 
-        # Log export
-        log_data = {
+        return workflow_json
+
+    def _export_log(
+        self, workflow: Dict[str, Any], version: Optional[int], include_metadata: bool
+    ) -> Dict[str, Any]:
+        """Import/export log row for an export"""
+        return {
             "operation_type": "export",
             "workflow_id": workflow["id"],
             "status": "completed",
@@ -134,10 +202,6 @@ class WorkflowExporter:
             },
         }
 
-        self.supabase.table("workflow_import_export_log").insert(log_data).execute()
-
-        return export_data
-
     def export_to_file(
         self,
         workflow_id: Optional[str] = None,
@@ -194,6 +258,7 @@ class WorkflowExporter:
         status: Optional[WorkflowStatus] = None,
         tags: Optional[List[str]] = None,
         include_metadata: bool = True,
+        progress_callback: Optional[ProgressCallback] = None,
     ) -> List[Dict[str, Any]]:
         """
         Export multiple workflows based on filters
@@ -205,46 +270,128 @@ class WorkflowExporter:
             status: Filter by status
             tags: Filter by tags (any match)
             include_metadata: Include export metadata
+            progress_callback: Called with a BatchProgress after each page
 
         Returns:
             List of exported workflows
         """
-        # Build query
-        query = self.supabase.table("workflow_registry").select("id")
-
-        if workflow_ids:
-            query = query.in_("id", workflow_ids)
-        if category:
-            query = query.eq("category", category)
-        if owner_team:
-            query = query.eq("owner_team", owner_team)
-        if status:
-            query = query.eq("status", status.value)
-        if tags:
-            query = query.contains("tags", tags)
-
-        # Execute query
-        result = query.execute()
+        exported_workflows = list(
+            self.iter_exports(
+                workflow_ids=workflow_ids,
+                category=category,
+                owner_team=owner_team,
+                status=status,
+                tags=tags,
+                include_metadata=include_metadata,
+                progress_callback=progress_callback,
+            )
+        )
 
-        if not result.data:
+        if not exported_workflows:
             logger.warning("No workflows found matching filters")
-            return []
+        else:
+            logger.info(f"Exported {len(exported_workflows)} workflows")
 
-        # Export each workflow
-        exported_workflows = []
+        return exported_workflows
 
-        for workflow in result.data:
-            try:
-                export_data = self.export_workflow(
-                    workflow_id=workflow["id"], include_metadata=include_metadata
-                )
-                exported_workflows.append(export_data)
-            except Exception as e:
-                logger.error(f"Failed to export workflow {workflow['id']}: {e}")
+    def iter_exports(
+        self,
+        workflow_ids: Optional[List[str]] = None,
+        category: Optional[str] = None,
+        owner_team: Optional[str] = None,
+        status: Optional[WorkflowStatus] = None,
+        tags: Optional[List[str]] = None,
+        include_metadata: bool = True,
+        progress_callback: Optional[ProgressCallback] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Export workflows page by page
 
-        logger.info(f"Exported {len(exported_workflows)} workflows")
+        Each page of registry rows is fetched in one query and its export
+        log rows are written in one insert, so only one page is held in
+        memory. A workflow that cannot be exported is logged and skipped.
+        Takes the same filters as export_batch.
+        """
+        progress = BatchProgress(
+            "export", total=len(workflow_ids) if workflow_ids else None
+        )
 
-        return exported_workflows
+        pages = self._registry_pages(workflow_ids, category, owner_team, status, tags)
+        for page in pages:
+            exports = []
+            logs = []
+            failed = 0
+
+            for workflow in page:
+                try:
+                    exports.append(
+                        self._build_export(
+                            workflow,
+                            workflow["n8n_workflow_json"],
+                            None,
+                            include_metadata,
+                        )
+                    )
+                    logs.append(self._export_log(workflow, None, include_metadata))
+                except Exception as e:
+                    failed += 1
+                    logger.error(f"Failed to export workflow {workflow.get('id')}: {e}")
+
+            if logs:
+                try:
+                    self.supabase.table("workflow_import_export_log").insert(
+                        logs
+                    ).execute()
+                except Exception as e:
+                    logger.warning(f"Failed to log {len(logs)} exports: {e}")
+
+            report_progress(progress, progress_callback, len(page), failed)
+            yield from exports
+
+    def _registry_pages(
+        self,
+        workflow_ids: Optional[List[str]],
+        category: Optional[str],
+        owner_team: Optional[str],
+        status: Optional[WorkflowStatus],
+        tags: Optional[List[str]],
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Registry rows matching the filters, page_size rows at a time"""
+
+        def query():
+            query = self.supabase.table("workflow_registry").select("*")
+            if category:
+                query = query.eq("category", category)
+            if owner_team:
+                query = query.eq("owner_team", owner_team)
+            if status:
+                query = query.eq("status", status.value)
+            if tags:
+                query = query.contains("tags", tags)
+            return query
+
+        if workflow_ids:
+            for ids in chunked(workflow_ids, self.page_size):
+                rows = query().in_("id", ids).execute().data
+                if rows:
+                    yield rows
+            return
+
+        offset = 0
+        while True:
+            rows = (
+                query()
+                .order("id")
+                .range(offset, offset + self.page_size - 1)
+                .execute()
+                .data
+            )
+            if not rows:
+                return
+            yield rows
+            if len(rows) < self.page_size:
+                return
+            offset += self.page_size
 
     def export_to_archive(
         self,
@@ -253,50 +400,58 @@ class WorkflowExporter:
         category: Optional[str] = None,
         owner_team: Optional[str] = None,
         include_templates: bool = False,
+        archive_format: str = "zip",
+        progress_callback: Optional[ProgressCallback] = None,
     ) -> Path:
         """
-        Export workflows to a ZIP archive
+        Export workflows to a ZIP or tar archive
+
+        Entries are written as each page of workflows is exported; the
+        manifest is written last.
 
         Args:
-            output_path: Output ZIP file path
+            output_path: Output archive path
             workflow_ids: Specific workflows to export
             category: Filter by category
             owner_team: Filter by owner team
             include_templates: Also export workflow templates
+            archive_format: "zip", "tar" or "tar.gz"
+            progress_callback: Called with a BatchProgress after each page
 
         Returns:
             Path to created archive
         """
-        output_path = Path(output_path)
-
-        # Ensure .zip extension
-        if output_path.suffix != ".zip":
-            output_path = output_path.with_suffix(".zip")
+        if archive_format not in ARCHIVE_FORMATS:
+            raise ValueError(f"Unsupported archive format: {archive_format}")
 
-        # Export workflows
-        workflows = self.export_batch(
-            workflow_ids=workflow_ids,
-            category=category,
-            owner_team=owner_team,
-            include_metadata=True,
-        )
+        output_path = Path(output_path)
 
-        # Create archive
-        with ZipFile(output_path, "w") as zipf:
-            # Add manifest
-            manifest = {
-                "export_date": datetime.utcnow().isoformat(),
-                "workflow_count": len(workflows),
-                "exporter_version": "1.0.0",
-            }
+        # Ensure the extension matches the format
+        suffix = ARCHIVE_FORMATS[archive_format]
+        if not output_path.name.endswith(suffix):
+            output_path = output_path.with_suffix(suffix)
 
-            zipf.writestr("manifest.json", json.dumps(manifest, indent=2))
+        manifest = {
+            "export_date": datetime.utcnow().isoformat(),
+            "workflow_count": 0,
+            "exporter_version": "1.0.0",
+        }
 
+        with _ArchiveWriter(output_path, archive_format) as archive:
             # Add workflows
-            for i, workflow_data in enumerate(workflows):
+            for i, workflow_data in enumerate(
+                self.iter_exports(
+                    workflow_ids=workflow_ids,
+                    category=category,
+                    owner_team=owner_team,
+                    include_metadata=True,
+                    progress_callback=progress_callback,
+                )
+            ):
                 metadata = workflow_data.get("metadata", {})
                 filename = f"workflows/{metadata.get('slug', f'workflow_{i}')}.json"
-                zipf.writestr(filename, json.dumps(workflow_data, indent=2))
+                archive.write(filename, workflow_data)
+                manifest["workflow_count"] += 1
 
             # Add templates if requested
             if include_templates:
@@ -307,12 +462,12 @@ class WorkflowExporter:
                 if templates_result.data:
                     for template in templates_result.data:
                         filename = f"templates/{template['template_slug']}.json"
-                        zipf.writestr(filename, json.dumps(template, indent=2))
+                        archive.write(filename, template)
 
                     manifest["template_count"] = len(templates_result.data)
 
-            # Update manifest
-            zipf.writestr("manifest.json", json.dumps(manifest, indent=2))
+            # Add manifest
+            archive.write("manifest.json", manifest)
 
         logger.info(f"Created workflow archive: {output_path}")
 
@@ -5,15 +5,25 @@ Handles importing workflows from various sources with validation and processing.
 """
 
 import json
+import logging
 import os
 import re
 import uuid
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 from urllib.parse import urlparse
 
 import httpx
+from elf_automations.shared.n8n.batch import (
+    BatchProgress,
+    ProgressCallback,
+    chunked,
+    gather_bounded,
+    report_progress,
+)
+from elf_automations.shared.n8n.exceptions import N8NError
 from elf_automations.shared.n8n.workflow_validator import (
     ValidationLevel,
     ValidationReport,
@@ -23,12 +33,43 @@ from elf_automations.shared.n8n.workflow_validator import (
 from elf_automations.shared.utils.llm_factory import LLMFactory
 from supabase import Client
 
+logger = logging.getLogger(__name__)
+
+# Tables whose rows reference the workflows row, in write order
+_LINKED_TABLES = (
+    "workflow_versions",
+    "workflow_metadata",
+    "workflow_import_export_log",
+)
+
+
+@dataclass
+class _PreparedImport:
+    """Database rows for one processed workflow"""
+
+    workflow_record: Dict[str, Any]
+    linked_records: Dict[str, Dict[str, Any]]  # table -> row without workflow_id
+    validation_report: Optional[ValidationReport]
+
 
 class WorkflowImporter:
     """Imports N8N workflows with validation and processing"""
 
-    def __init__(self, supabase_client: Client):
+    def __init__(
+        self,
+        supabase_client: Client,
+        max_concurrency: int = 8,
+        chunk_size: int = 100,
+    ):
+        """
+        Args:
+            supabase_client: Supabase client for database operations
+            max_concurrency: Workflows loaded and processed at once in batches
+            chunk_size: Rows per bulk write in batches
+        """
         self.supabase = supabase_client
+        self.max_concurrency = max_concurrency
+        self.chunk_size = chunk_size
         self.validator = WorkflowValidator()
         self.llm = LLMFactory.create_llm(
             preferred_provider="anthropic",
@@ -61,55 +102,54 @@ class WorkflowImporter:
                 workflow_data, ValidationLevel.FULL
             )
 
-            if validation_report.status == ValidationStatus.FAILED and not auto_fix:
-                return None, validation_report
-
-        # 3. Process workflow if requested
-        processed_workflow = workflow_data
-        if process:
-            processed_workflow = await self._process_workflow(
-                workflow_data, validation_report, auto_fix
-            )
-
-        # 4. Extract metadata
-        metadata = self._extract_metadata(processed_workflow)
+        return await self._import_loaded(
+            workflow_data,
+            validation_report,
+            source=source,
+            source_type=source_type,
+            owner_team=owner_team,
+            category=category,
+            process=process,
+            auto_fix=auto_fix,
+        )
 
-        # 5. Generate unique workflow ID
-        workflow_id = f"imported_{uuid.uuid4().hex[:8]}"
+    async def _import_loaded(
+        self,
+        workflow_data: Dict[str, Any],
+        validation_report: Optional[ValidationReport],
+        source: str,
+        source_type: str,
+        owner_team: str,
+        category: str,
+        process: bool,
+        auto_fix: bool,
+    ) -> Tuple[Optional[str], ValidationReport]:
+        """Process and store a loaded workflow given its validation report"""
+
+        if (
+            validation_report
+            and validation_report.status == ValidationStatus.FAILED
+            and not auto_fix
+        ):
+            return None, validation_report
+
+        prepared = await self._prepare_import(
+            workflow_data,
+            validation_report,
+            source=source,
+            source_type=source_type,
+            owner_team=owner_team,
+            category=category,
+            process=process,
+            auto_fix=auto_fix,
+        )
 
         # 6. Store in database
         try:
-            # Insert main workflow record
-            workflow_record = {
-                "workflow_id": workflow_id,
-                "name": processed_workflow.get("name", "Imported Workflow"),
-                "description": metadata.get(
-                    "ai_description", processed_workflow.get("description", "")
-                ),
-                "category": category,
-                "tags": metadata.get("tags", []),
-                "owner_team": owner_team,
-                "source": "imported",
-                "source_url": source if source_type == "url" else None,
-                "status": "validated"
-                if validation_report
-                and validation_report.status != ValidationStatus.FAILED
-                else "draft",
-                "validation_status": validation_report.status.value
-                if validation_report
-                else "pending",
-                "last_validation": datetime.utcnow().isoformat(),
-                "node_types": metadata.get("node_types", []),
-                "integrations": metadata.get("integrations", []),
-                "complexity_score": metadata.get("complexity_score", 5),
-                "estimated_cost_per_run": validation_report.estimated_cost
-                if validation_report
-                else 0.0,
-                "created_by": "workflow_importer",
-            }
-
             workflow_result = (
-                self.supabase.table("workflows").insert(workflow_record).execute()
+                self.supabase.table("workflows")
+                .insert(prepared.workflow_record)
+                .execute()
             )
 
             if not workflow_result.data:
@@ -119,60 +159,126 @@ class WorkflowImporter:
 
             workflow_uuid = workflow_result.data[0]["id"]
 
-            # Insert workflow version
-            version_record = {
-                "workflow_id": workflow_uuid,
-                "workflow_json": workflow_data,  # Original
-                "processed_json": processed_workflow,  # Processed version
-                "validation_status": validation_report.status.value
-                if validation_report
-                else "pending",
-                "validation_report": self._serialize_validation_report(
-                    validation_report
-                )
-                if validation_report
-                else None,
-                "created_by": "workflow_importer",
-            }
-
-            self.supabase.table("workflow_versions").insert(version_record).execute()
-
-            # Insert metadata
-            metadata_record = {
-                "workflow_id": workflow_uuid,
-                "trigger_types": metadata.get("trigger_types", []),
-                "input_sources": metadata.get("input_sources", []),
-                "output_destinations": metadata.get("output_destinations", []),
-                "required_credentials": metadata.get("required_credentials", {}),
-                "environment_variables": metadata.get("environment_variables", []),
-                "webhook_urls": metadata.get("webhook_urls", []),
-                "ai_generated_description": metadata.get("ai_description"),
-                "ai_suggested_improvements": metadata.get("ai_improvements", {}),
-                "ai_detected_patterns": metadata.get("detected_patterns", []),
-            }
-
-            self.supabase.table("workflow_metadata").insert(metadata_record).execute()
-
-            # Log the import
-            import_log = {
-                "workflow_id": workflow_uuid,
-                "operation": "import",
-                "operation_status": "success",
-                "source_format": source_type,
-                "source_data": source[:255] if source_type != "json" else "inline_json",
-                "original_json": workflow_data,
-                "performed_by": "workflow_importer",
-            }
-
-            self.supabase.table("workflow_import_export_log").insert(
-                import_log
-            ).execute()
+            for k, table in enumerate(_LINKED_TABLES):
+                try:
+                    self.supabase.table(table).insert(
+                        {**prepared.linked_records[table], "workflow_id": workflow_uuid}
+                    ).execute()
+                except Exception:
+                    self._delete_orphans({workflow_uuid: _LINKED_TABLES[:k]}, 1)
+                    raise
 
             return workflow_uuid, validation_report or self._create_success_report()
 
         except Exception as e:
             return None, self._create_error_report(f"Database error: {str(e)}")
 
+    async def _prepare_import(
+        self,
+        workflow_data: Dict[str, Any],
+        validation_report: Optional[ValidationReport],
+        source: str,
+        source_type: str,
+        owner_team: str,
+        category: str,
+        process: bool,
+        auto_fix: bool,
+    ) -> "_PreparedImport":
+        """Process a workflow and build its database rows"""
+
+        # 3. Process workflow if requested
+        processed_workflow = workflow_data
+        if process:
+            processed_workflow = await self._process_workflow(
+                workflow_data, validation_report, auto_fix
+            )
+
+        # 4. Extract metadata
+        metadata = self._extract_metadata(processed_workflow)
+
+        # 5. Generate unique workflow ID; the full uuid, because batch writes
+        # upsert on workflow_id and a collision would overwrite another import
+        workflow_id = f"imported_{uuid.uuid4().hex}"
+
+        # Main workflow record
+        workflow_record = {
+            "workflow_id": workflow_id,
+            "name": processed_workflow.get("name", "Imported Workflow"),
+            "description": metadata.get(
+                "ai_description", processed_workflow.get("description", "")
+            ),
+            "category": category,
+            "tags": metadata.get("tags", []),
+            "owner_team": owner_team,
+            "source": "imported",
+            "source_url": source if source_type == "url" else None,
+            "status": (
+                "validated"
+                if validation_report
+                and validation_report.status != ValidationStatus.FAILED
+                else "draft"
+            ),
+            "validation_status": (
+                validation_report.status.value if validation_report else "pending"
+            ),
+            "last_validation": datetime.utcnow().isoformat(),
+            "node_types": metadata.get("node_types", []),
+            "integrations": metadata.get("integrations", []),
+            "complexity_score": metadata.get("complexity_score", 5),
+            "estimated_cost_per_run": (
+                validation_report.estimated_cost if validation_report else 0.0
+            ),
+            "created_by": "workflow_importer",
+        }
+
+        # Workflow version
+        version_record = {
+            "workflow_json": workflow_data,  # Original
+            "processed_json": processed_workflow,  # Processed version
+            "validation_status": (
+                validation_report.status.value if validation_report else "pending"
+            ),
+            "validation_report": (
+                self._serialize_validation_report(validation_report)
+                if validation_report
+                else None
+            ),
+            "created_by": "workflow_importer",
+        }
+
+        # Metadata
+        metadata_record = {
+            "trigger_types": metadata.get("trigger_types", []),
+            "input_sources": metadata.get("input_sources", []),
+            "output_destinations": metadata.get("output_destinations", []),
+            "required_credentials": metadata.get("required_credentials", {}),
+            "environment_variables": metadata.get("environment_variables", []),
+            "webhook_urls": metadata.get("webhook_urls", []),
+            "ai_generated_description": metadata.get("ai_description"),
+            "ai_suggested_improvements": metadata.get("ai_improvements", {}),
+            "ai_detected_patterns": metadata.get("detected_patterns", []),
+        }
+
+        # Import log
+        import_log = {
+            "operation": "import",
+            "operation_status": "success",
+            "source_format": source_type,
+            "source_data": source[:255] if source_type != "json" else "inline_json",
+            "original_json": workflow_data,
+            "performed_by": "workflow_importer",
+        }
+
+        return _PreparedImport(
+            workflow_record=workflow_record,
+            linked_records={
+                "workflow_versions": version_record,
+                "workflow_metadata": metadata_record,
+                "workflow_import_export_log": import_log,
+            },
+            validation_report=validation_report,
+        )
+
     async def _load_workflow(
         self, source: str, source_type: str
     ) -> Optional[Dict[str, Any]]:
@@ -275,9 +381,9 @@ class WorkflowImporter:
 
         # Add missing name
         if not workflow.get("name") or workflow.get("name") == "My workflow":
-            workflow[
-                "name"
-            ] = f"Imported Workflow {datetime.now().strftime('%Y-%m-%d')}"
+            workflow["name"] = (
+                f"Imported Workflow {datetime.now().strftime('%Y-%m-%d')}"
+            )
 
         # Add error workflow setting
         if "settings" not in workflow:
@@ -332,7 +438,7 @@ Return as JSON:
 }}"""
 
         try:
-            response = self.llm.invoke(prompt)
+            response = await self.llm.ainvoke(prompt)
             enhancements = json.loads(response.content)
 
             # Add AI-generated description if none exists
@@ -502,18 +608,255 @@ Return as JSON:
         sources: List[Tuple[str, str]],  # [(source, source_type), ...]
         owner_team: str = "default",
         category: str = "imported",
+        max_concurrency: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        progress_callback: Optional[ProgressCallback] = None,
     ) -> List[Tuple[Optional[str], ValidationReport]]:
-        """Import multiple workflows in batch"""
+        """
+        Import multiple workflows in batch
+
+        Sources are loaded and processed concurrently, validated in one batch
+        and written with chunked bulk inserts. Failures are isolated per
+        item: a workflow that cannot be loaded, fails validation or has its
+        rows rejected gets an error report without affecting the others.
+
+        Args:
+            sources: (source, source_type) pairs
+            owner_team: Team owning the imported workflows
+            category: Category for the imported workflows
+            max_concurrency: Workflows loaded and processed at once
+                (defaults to the importer's max_concurrency)
+            chunk_size: Rows per bulk write (defaults to the importer's)
+            progress_callback: Called with a BatchProgress as items finish
+                each stage ("load", "process", "store")
+
+        Returns:
+            (workflow_uuid, report) per source, in order
+        """
+        concurrency = max_concurrency or self.max_concurrency
+        results: List[Optional[Tuple[Optional[str], ValidationReport]]] = [None] * len(
+            sources
+        )
 
-        results = []
+        # 1. Load workflows
+        async def load(item: Tuple[str, str]) -> Dict[str, Any]:
+            workflow_data = await self._load_workflow(*item)
+            if not workflow_data:
+                raise N8NError("Failed to load workflow")
+            return workflow_data
+
+        loaded = await gather_bounded(
+            sources,
+            load,
+            concurrency,
+            BatchProgress("load", total=len(sources)),
+            progress_callback,
+        )
+
+        # 2. Validate everything that loaded in one batch
+        indexes = []
+        for i, workflow_data in enumerate(loaded):
+            if isinstance(workflow_data, Exception):
+                results[i] = (None, self._create_error_report(str(workflow_data)))
+            else:
+                indexes.append(i)
 
-        for source, source_type in sources:
-            result = await self.import_workflow(
+        reports = self.validator.validate_batch(
+            [loaded[i] for i in indexes], ValidationLevel.FULL
+        )
+
+        pending = []
+        for i, report in zip(indexes, reports):
+            if report.status == ValidationStatus.FAILED:
+                results[i] = (None, report)
+            else:
+                pending.append((i, report))
+
+        # 3. Process concurrently
+        async def prepare(item: Tuple[int, ValidationReport]) -> _PreparedImport:
+            i, report = item
+            source, source_type = sources[i]
+            return await self._prepare_import(
+                loaded[i],
+                report,
                 source=source,
                 source_type=source_type,
                 owner_team=owner_team,
                 category=category,
+                process=True,
+                auto_fix=False,
             )
-            results.append(result)
+
+        prepared = await gather_bounded(
+            pending,
+            prepare,
+            concurrency,
+            BatchProgress("process", total=len(pending)),
+            progress_callback,
+        )
+
+        ready = []
+        for (i, _), item in zip(pending, prepared):
+            if isinstance(item, Exception):
+                results[i] = (
+                    None,
+                    self._create_error_report(f"Processing failed: {item}"),
+                )
+            else:
+                ready.append((i, item))
+
+        # 4. Store in bulk
+        outcomes = self._store_batch(
+            [item for _, item in ready],
+            chunk_size or self.chunk_size,
+            BatchProgress("store", total=len(ready)),
+            progress_callback,
+        )
+
+        for (i, item), outcome in zip(ready, outcomes):
+            if isinstance(outcome, Exception):
+                results[i] = (
+                    None,
+                    self._create_error_report(f"Database error: {outcome}"),
+                )
+            else:
+                results[i] = (
+                    outcome,
+                    item.validation_report or self._create_success_report(),
+                )
 
         return results
+
+    def _store_batch(
+        self,
+        prepared: List[_PreparedImport],
+        chunk_size: int,
+        progress: BatchProgress,
+        progress_callback: Optional[ProgressCallback] = None,
+    ) -> List[Union[str, Exception]]:
+        """Write prepared imports table by table; returns a uuid or error each"""
+
+        outcomes: List[Union[str, Exception]] = []
+
+        # Workflows first; their ids key every other row. Upserting on the
+        # freshly generated workflow_id makes retrying a chunk row by row safe.
+        written = self._write_rows(
+            "workflows",
+            [item.workflow_record for item in prepared],
+            chunk_size,
+            on_conflict="workflow_id",
+        )
+        for row in written:
+            if isinstance(row, Exception):
+                outcomes.append(row)
+            elif not row.get("id"):
+                outcomes.append(N8NError("Failed to create workflow record"))
+            else:
+                outcomes.append(row["id"])
+
+        # Items whose workflows row was written but a linked row was not
+        orphans: Dict[str, Tuple[str, ...]] = {}  # uuid -> linked tables written
+        for k, table in enumerate(_LINKED_TABLES):
+            live = [i for i, outcome in enumerate(outcomes) if isinstance(outcome, str)]
+            rows = [
+                {**prepared[i].linked_records[table], "workflow_id": outcomes[i]}
+                for i in live
+            ]
+            for i, row in zip(live, self._write_rows(table, rows, chunk_size)):
+                if isinstance(row, Exception):
+                    orphans[outcomes[i]] = _LINKED_TABLES[:k]
+                    outcomes[i] = row
+
+        if orphans:
+            self._delete_orphans(orphans, chunk_size)
+
+        failed = sum(1 for outcome in outcomes if isinstance(outcome, Exception))
+        report_progress(progress, progress_callback, len(outcomes), failed)
+
+        return outcomes
+
+    def _delete_orphans(
+        self, orphans: Dict[str, Tuple[str, ...]], chunk_size: int
+    ) -> None:
+        """
+        Remove the rows of partially stored imports
+
+        Linked rows go before the workflows rows they reference. Failures are
+        logged and otherwise ignored; the import already reports an error.
+        """
+        for table in reversed(_LINKED_TABLES):
+            workflow_uuids = [
+                workflow_uuid
+                for workflow_uuid, tables in orphans.items()
+                if table in tables
+            ]
+            self._delete_rows(table, "workflow_id", workflow_uuids, chunk_size)
+
+        self._delete_rows("workflows", "id", list(orphans), chunk_size)
+
+    def _delete_rows(
+        self, table: str, column: str, values: List[str], chunk_size: int
+    ) -> None:
+        for chunk in chunked(values, chunk_size):
+            try:
+                self.supabase.table(table).delete().in_(column, chunk).execute()
+            except Exception as e:
+                logger.warning(
+                    f"Failed to remove {len(chunk)} partially imported rows "
+                    f"from {table}: {e}"
+                )
+
+    def _write_rows(
+        self,
+        table: str,
+        rows: List[Dict[str, Any]],
+        chunk_size: int,
+        on_conflict: Optional[str] = None,
+    ) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Insert (or upsert on a key) rows in chunks
+
+        A rejected chunk is retried row by row so one bad row only fails
+        itself. Returns the written row (empty if none came back) or the
+        error for each input row.
+        """
+        results: List[Union[Dict[str, Any], Exception]] = []
+
+        for chunk in chunked(rows, chunk_size):
+            try:
+                data = self._execute_write(table, chunk, on_conflict)
+            except Exception as e:
+                logger.warning(
+                    f"Bulk write of {len(chunk)} rows to {table} failed, "
+                    f"retrying row by row: {e}"
+                )
+                for row in chunk:
+                    try:
+                        data = self._execute_write(table, [row], on_conflict)
+                        results.append(data[0] if data else {})
+                    except Exception as row_error:
+                        results.append(row_error)
+                continue
+
+            if on_conflict:
+                by_key = {written.get(on_conflict): written for written in data}
+                results.extend(by_key.get(row[on_conflict], {}) for row in chunk)
+            else:
+                results.extend(
+                    data[i] if i < len(data) else {} for i in range(len(chunk))
+                )
+
+        return results
+
+    def _execute_write(
+        self,
+        table: str,
+        rows: List[Dict[str, Any]],
+        on_conflict: Optional[str],
+    ) -> List[Dict[str, Any]]:
+        query = self.supabase.table(table)
+        if on_conflict:
+            result = query.upsert(rows, on_conflict=on_conflict).execute()
+        else:
+            result = query.insert(rows).execute()
+        return result.data or []
@@ -6,12 +6,17 @@ Comprehensive validation for imported workflows including security, compatibilit
 
 import json
 import re
-from dataclasses import dataclass
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
 from datetime import datetime
 from enum import Enum
 from typing import Any, Dict, List, Optional, Set, Tuple
 
-from elf_automations.shared.n8n.workflow_analyzer import IssueSeverity, WorkflowAnalyzer
+from elf_automations.shared.n8n.workflow_analyzer import (
+    IssueSeverity,
+    WorkflowAnalyzer,
+    workflow_fingerprint,
+)
 
 
 class ValidationLevel(Enum):
@@ -87,6 +92,50 @@ class ValidationReport:
     validation_level: ValidationLevel
 
 
+@dataclass
+class _NodeFindings:
+    """Per-node results collected in the single pass over a workflow's nodes"""
+
+    schema_errors: List[ValidationError] = field(default_factory=list)
+    webhook_warnings: List[ValidationWarning] = field(default_factory=list)
+    node_errors: List[ValidationError] = field(default_factory=list)
+    missing_nodes: List[str] = field(default_factory=list)
+    credential_requirements: List[CredentialRequirement] = field(default_factory=list)
+    is_valid: bool = True
+
+
+# Patterns for detecting secrets
+SECRET_PATTERNS = {
+    "api_key": re.compile(
+        r'(api[_-]?key|apikey)[\s]*[:=][\s]*["\']?([a-zA-Z0-9\-_]{20,})["\']?',
+        re.I,
+    ),
+    "password": re.compile(
+        r'(password|passwd|pwd)[\s]*[:=][\s]*["\']?([^\s"\']+)["\']?', re.I
+    ),
+    "token": re.compile(
+        r'(token|access[_-]?token)[\s]*[:=][\s]*["\']?([a-zA-Z0-9\-_]{20,})["\']?',
+        re.I,
+    ),
+    "secret": re.compile(
+        r'(secret|private[_-]?key)[\s]*[:=][\s]*["\']?([^\s"\']+)["\']?', re.I
+    ),
+    "url_with_auth": re.compile(r"https?://[^:]+:[^@]+@[^\s]+", re.I),
+}
+
+# Lowercase keywords a secret pattern needs to match. The serialized workflow
+# is ASCII, so a substring test rules a pattern out before running it.
+_SECRET_KEYWORDS = {
+    "api_key": ("api",),
+    "password": ("pass", "pwd"),
+    "token": ("token",),
+    "secret": ("secret", "private"),
+    "url_with_auth": ("http",),
+}
+
+_UNSAFE_URL = re.compile(r'http://[^\s"\']+')
+
+
 class WorkflowValidator:
     """Validates N8N workflows for import"""
 
@@ -94,8 +143,9 @@ class WorkflowValidator:
         self,
         available_nodes: Optional[Set[str]] = None,
         available_credentials: Optional[Dict[str, str]] = None,
+        cache_size: int = 256,
     ):
-        self.analyzer = WorkflowAnalyzer()
+        self.analyzer = WorkflowAnalyzer(cache_size=cache_size)
 
         # Default available nodes (extend as needed)
         self.available_nodes = available_nodes or {
@@ -131,49 +181,137 @@ class WorkflowValidator:
         }
 
         # Patterns for detecting secrets
-        self.secret_patterns = {
-            "api_key": re.compile(
-                r'(api[_-]?key|apikey)[\s]*[:=][\s]*["\']?([a-zA-Z0-9\-_]{20,})["\']?',
-                re.I,
-            ),
-            "password": re.compile(
-                r'(password|passwd|pwd)[\s]*[:=][\s]*["\']?([^\s"\']+)["\']?', re.I
-            ),
-            "token": re.compile(
-                r'(token|access[_-]?token)[\s]*[:=][\s]*["\']?([a-zA-Z0-9\-_]{20,})["\']?',
-                re.I,
-            ),
-            "secret": re.compile(
-                r'(secret|private[_-]?key)[\s]*[:=][\s]*["\']?([^\s"\']+)["\']?', re.I
-            ),
-            "url_with_auth": re.compile(r"https?://[^:]+:[^@]+@[^\s]+", re.I),
-        }
+        self.secret_patterns = dict(SECRET_PATTERNS)
+
+        # node type -> credential type (or None), resolved once per type
+        self._credential_types: Dict[str, Optional[str]] = {}
+
+        # (fingerprint, level) -> report
+        self.cache_size = cache_size
+        self._reports: "OrderedDict[Tuple, ValidationReport]" = OrderedDict()
 
     def validate(
         self, workflow: Dict[str, Any], level: ValidationLevel = ValidationLevel.FULL
     ) -> ValidationReport:
-        """Validate a workflow at the specified level"""
+        """
+        Validate a workflow at the specified level
+
+        Reports are memoized by workflow content and level; repeat validations
+        return a copy stamped with the current time.
+        """
+        return self._copy_report(self._validate_cached(workflow, level))
+
+    def validate_batch(
+        self,
+        workflows: List[Dict[str, Any]],
+        level: ValidationLevel = ValidationLevel.FULL,
+    ) -> List[ValidationReport]:
+        """
+        Validate many workflows, e.g. for a batch import
+
+        Identical workflows are validated once, even when the batch is larger
+        than the memo.
+        """
+        reports: Dict[str, ValidationReport] = {}  # serialized workflow -> report
+        results = []
+
+        for workflow in workflows:
+            try:
+                serialized = json.dumps(workflow)
+            except (TypeError, ValueError):
+                results.append(self.validate(workflow, level))
+                continue
+
+            report = reports.get(serialized)
+            if report is None:
+                report = self._validate_cached(workflow, level, serialized)
+                reports[serialized] = report
+            results.append(self._copy_report(report))
+
+        return results
+
+    def _validate_cached(
+        self,
+        workflow: Dict[str, Any],
+        level: ValidationLevel,
+        serialized: Optional[str] = None,
+    ) -> ValidationReport:
+        """Memoized validation; the returned report must not be modified"""
+
+        if serialized is None:
+            try:
+                serialized = json.dumps(workflow)
+            except (TypeError, ValueError):
+                # Not cacheable; validated as is
+                return self._validate(workflow, level, None, None)
+
+        fingerprint = workflow_fingerprint(workflow, serialized)
+        key = (fingerprint, level)
+        report = self._reports.get(key)
+        if report is not None:
+            self._reports.move_to_end(key)
+            return report
+
+        report = self._validate(workflow, level, serialized, fingerprint)
+        self._reports[key] = report
+        while len(self._reports) > self.cache_size:
+            self._reports.popitem(last=False)
+        return report
+
+    @staticmethod
+    def _copy_report(report: ValidationReport) -> ValidationReport:
+        """Report with its own lists; the entries are shared with the memo"""
+        return replace(
+            report,
+            errors=list(report.errors),
+            warnings=list(report.warnings),
+            suggestions=list(report.suggestions),
+            security_issues=list(report.security_issues),
+            missing_nodes=list(report.missing_nodes),
+            credential_requirements=list(report.credential_requirements),
+            validated_at=datetime.utcnow(),
+        )
+
+    def _validate(
+        self,
+        workflow: Dict[str, Any],
+        level: ValidationLevel,
+        serialized: Optional[str],
+        fingerprint: Optional[str],
+    ) -> ValidationReport:
+        """Run the checks for a level; the nodes are visited once"""
 
         errors = []
         warnings = []
         suggestions = []
 
+        check_security = level in [ValidationLevel.SECURITY, ValidationLevel.FULL]
+        check_compatibility = level in [
+            ValidationLevel.COMPATIBILITY,
+            ValidationLevel.FULL,
+        ]
+        findings = self._visit_nodes(workflow, check_security, check_compatibility)
+
         # Basic validation
-        is_valid_schema = self._validate_schema(workflow, errors)
+        is_valid_schema = self._validate_schema(workflow, errors, findings)
 
         # Security validation
         security_issues = []
-        if level in [ValidationLevel.SECURITY, ValidationLevel.FULL]:
-            security_issues = self._validate_security(workflow, errors, warnings)
+        if check_security:
+            if serialized is None:
+                serialized = json.dumps(workflow)
+            security_issues = self._validate_security(serialized, errors, warnings)
+            warnings.extend(findings.webhook_warnings)
 
         # Compatibility validation
         missing_nodes = []
         credential_requirements = []
         compatibility_score = 100.0
 
-        if level in [ValidationLevel.COMPATIBILITY, ValidationLevel.FULL]:
-            missing_nodes = self._validate_nodes(workflow, errors)
-            credential_requirements = self._extract_credentials(workflow)
+        if check_compatibility:
+            errors.extend(findings.node_errors)
+            missing_nodes = list(set(findings.missing_nodes))
+            credential_requirements = findings.credential_requirements
             compatibility_score = self._calculate_compatibility_score(
                 missing_nodes, credential_requirements
             )
@@ -184,7 +322,7 @@ class WorkflowValidator:
 
         if level in [ValidationLevel.PERFORMANCE, ValidationLevel.FULL]:
             # Use analyzer for performance metrics
-            issues, metrics = self.analyzer.analyze_workflow(workflow)
+            issues, metrics = self.analyzer.analyze_workflow(workflow, fingerprint)
             estimated_cost = metrics.estimated_cost_per_run
             complexity_score = int(metrics.complexity_score)
 
@@ -236,19 +374,87 @@ class WorkflowValidator:
             validation_level=level,
         )
 
+    def _visit_nodes(
+        self,
+        workflow: Dict[str, Any],
+        check_security: bool,
+        check_compatibility: bool,
+    ) -> _NodeFindings:
+        """Collect node structure, webhook, availability and credential findings"""
+
+        findings = _NodeFindings()
+        nodes = workflow.get("nodes")
+        if not isinstance(nodes, list):
+            return findings
+
+        for i, node in enumerate(nodes):
+            if not isinstance(node, dict):
+                findings.schema_errors.append(
+                    ValidationError(
+                        field=f"nodes[{i}]", message="Node must be a dictionary"
+                    )
+                )
+                findings.is_valid = False
+                continue
+
+            if "type" not in node:
+                findings.schema_errors.append(
+                    ValidationError(
+                        field=f"nodes[{i}]",
+                        message="Node missing required 'type' field",
+                    )
+                )
+                findings.is_valid = False
+
+            node_type = node.get("type")
+
+            # Check webhook security
+            if check_security and node_type == "n8n-nodes-base.webhook":
+                params = node.get("parameters", {})
+                if not params.get("authentication"):
+                    findings.webhook_warnings.append(
+                        ValidationWarning(
+                            field=f"node.{node.get('name', node.get('id'))}",
+                            message="Webhook without authentication",
+                            suggestion="Add authentication to webhook",
+                        )
+                    )
+
+            if check_compatibility:
+                # Check if the node is available
+                if node_type and node_type not in self.available_nodes:
+                    findings.missing_nodes.append(node_type)
+                    findings.node_errors.append(
+                        ValidationError(
+                            field=f"node.{node.get('name', node.get('id'))}",
+                            message=f"Node type '{node_type}' is not available",
+                            suggestion="Install the required node package or use an alternative",
+                        )
+                    )
+
+                requirement = self._credential_requirement(node)
+                if requirement:
+                    findings.credential_requirements.append(requirement)
+
+        return findings
+
     def _validate_schema(
-        self, workflow: Dict[str, Any], errors: List[ValidationError]
+        self,
+        workflow: Dict[str, Any],
+        errors: List[ValidationError],
+        findings: _NodeFindings,
     ) -> bool:
         """Validate basic workflow schema"""
 
         required_fields = ["name", "nodes", "connections"]
         is_valid = True
 
-        for field in required_fields:
-            if field not in workflow:
+        for required in required_fields:
+            if required not in workflow:
                 errors.append(
                     ValidationError(
-                        field=field, message=f"Required field '{field}' is missing"
+                        field=required,
+                        message=f"Required field '{required}' is missing",
                     )
                 )
                 is_valid = False
@@ -261,22 +467,8 @@ class WorkflowValidator:
                 )
                 is_valid = False
             else:
-                for i, node in enumerate(workflow["nodes"]):
-                    if not isinstance(node, dict):
-                        errors.append(
-                            ValidationError(
-                                field=f"nodes[{i}]", message="Node must be a dictionary"
-                            )
-                        )
-                        is_valid = False
-                    elif "type" not in node:
-                        errors.append(
-                            ValidationError(
-                                field=f"nodes[{i}]",
-                                message="Node missing required 'type' field",
-                            )
-                        )
-                        is_valid = False
+                errors.extend(findings.schema_errors)
+                is_valid = is_valid and findings.is_valid
 
         # Validate connections structure
         if "connections" in workflow:
@@ -292,17 +484,21 @@ class WorkflowValidator:
 
     def _validate_security(
         self,
-        workflow: Dict[str, Any],
+        workflow_str: str,
         errors: List[ValidationError],
         warnings: List[ValidationWarning],
     ) -> List[Dict[str, Any]]:
-        """Validate security aspects of the workflow"""
+        """Scan the serialized workflow for secrets and unsafe URLs"""
 
         security_issues = []
-        workflow_str = json.dumps(workflow)
+        lowered = workflow_str.lower()
 
         # Check for hardcoded secrets
         for secret_type, pattern in self.secret_patterns.items():
+            keywords = _SECRET_KEYWORDS.get(secret_type)
+            if keywords and not any(keyword in lowered for keyword in keywords):
+                continue
+
             matches = pattern.findall(workflow_str)
             if matches:
                 for match in matches:
@@ -323,9 +519,8 @@ class WorkflowValidator:
                     )
 
         # Check for unsafe URLs
-        unsafe_urls = re.findall(r'http://[^\s"\']+', workflow_str)
-        if unsafe_urls:
-            for url in unsafe_urls:
+        if "http://" in workflow_str:
+            for url in _UNSAFE_URL.findall(workflow_str):
                 if "localhost" not in url and "127.0.0.1" not in url:
                     warnings.append(
                         ValidationWarning(
@@ -335,85 +530,48 @@ class WorkflowValidator:
                         )
                     )
 
-        # Check webhook security
-        for node in workflow.get("nodes", []):
-            if node.get("type") == "n8n-nodes-base.webhook":
-                params = node.get("parameters", {})
-                if not params.get("authentication"):
-                    warnings.append(
-                        ValidationWarning(
-                            field=f"node.{node.get('name', node.get('id'))}",
-                            message="Webhook without authentication",
-                            suggestion="Add authentication to webhook",
-                        )
-                    )
-
         return security_issues
 
-    def _validate_nodes(
-        self, workflow: Dict[str, Any], errors: List[ValidationError]
-    ) -> List[str]:
-        """Check if all nodes are available"""
-
-        missing_nodes = []
-
-        for node in workflow.get("nodes", []):
-            node_type = node.get("type")
-            if node_type and node_type not in self.available_nodes:
-                missing_nodes.append(node_type)
-                errors.append(
-                    ValidationError(
-                        field=f"node.{node.get('name', node.get('id'))}",
-                        message=f"Node type '{node_type}' is not available",
-                        suggestion="Install the required node package or use an alternative",
-                    )
-                )
-
-        return list(set(missing_nodes))
-
-    def _extract_credentials(
-        self, workflow: Dict[str, Any]
-    ) -> List[CredentialRequirement]:
-        """Extract credential requirements from workflow"""
-
-        requirements = []
+    def _credential_requirement(
+        self, node: Dict[str, Any]
+    ) -> Optional[CredentialRequirement]:
+        """Credential a node needs, based on its type"""
 
-        for node in workflow.get("nodes", []):
-            node_type = node.get("type", "")
-            node_id = node.get("id", node.get("name", "unknown"))
+        node_type = node.get("type", "")
+        node_id = node.get("id", node.get("name", "unknown"))
 
-            # Check for credential requirements based on node type
+        if node_type in self._credential_types:
+            credential_type = self._credential_types[node_type]
+        else:
             credential_type = None
+            lowered = node_type.lower()
 
-            if "slack" in node_type.lower():
+            if "slack" in lowered:
                 credential_type = "slackApi"
-            elif "gmail" in node_type.lower():
+            elif "gmail" in lowered:
                 credential_type = "gmailOAuth2"
-            elif "postgres" in node_type.lower():
+            elif "postgres" in lowered:
                 credential_type = "postgresDb"
-            elif "supabase" in node_type.lower():
+            elif "supabase" in lowered:
                 credential_type = "supabaseApi"
-            elif "openai" in node_type.lower() or "openAi" in node_type:
+            elif "openai" in lowered or "openAi" in node_type:
                 credential_type = "openAiApi"
-            elif "anthropic" in node_type.lower():
+            elif "anthropic" in lowered:
                 credential_type = "anthropicApi"
 
-            if credential_type:
-                # Check if we have a mapping for this credential
-                is_available = credential_type in self.available_credentials
-                suggested_mapping = self.available_credentials.get(credential_type)
-
-                requirements.append(
-                    CredentialRequirement(
-                        type=credential_type,
-                        name=f"{credential_type} for {node.get('name', node_id)}",
-                        node_id=node_id,
-                        is_available=is_available,
-                        suggested_mapping=suggested_mapping,
-                    )
-                )
+            self._credential_types[node_type] = credential_type
 
-        return requirements
+        if not credential_type:
+            return None
+
+        # Check if we have a mapping for this credential
+        return CredentialRequirement(
+            type=credential_type,
+            name=f"{credential_type} for {node.get('name', node_id)}",
+            node_id=node_id,
+            is_available=credential_type in self.available_credentials,
+            suggested_mapping=self.available_credentials.get(credential_type),
+        )
 
     def _calculate_compatibility_score(
         self,
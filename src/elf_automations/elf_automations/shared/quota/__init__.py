@@ -6,5 +6,6 @@ Tracks API usage and costs per team to prevent quota exhaustion.
 
 from .manager import QuotaManager
 from .tracker import UsageTracker
+from .usage_journal import UsageJournal
 
-__all__ = ["QuotaManager", "UsageTracker"]
+__all__ = ["QuotaManager", "UsageTracker", "UsageJournal"]
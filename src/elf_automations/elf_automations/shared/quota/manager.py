@@ -6,14 +6,18 @@ Prevents teams from exhausting API quotas by:
 - Enforcing budgets
 - Providing fallback options
 - Alerting on high usage
+- Reserving estimated cost for in-flight requests
 """
 
-import json
 import logging
+import threading
+import uuid
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, Optional, Tuple
 
+from .usage_journal import UsageJournal
+
 logger = logging.getLogger(__name__)
 
 
@@ -30,11 +34,18 @@ class QuotaManager:
         "claude-3-haiku": {"input": 0.00025, "output": 0.00125},
     }
 
+    # Cheaper model to fall back to when a team nears its budget
+    CHEAPER_ALTERNATIVES = {
+        "gpt-4": "gpt-3.5-turbo",
+        "claude-3-opus": "claude-3-haiku",
+    }
+
     def __init__(
         self,
         storage_path: Path = Path("quota_data"),
         default_daily_budget: float = 10.0,
         warning_threshold: float = 0.8,
+        compact_threshold_bytes: int = 1_000_000,
     ):
         """
         Initialize quota manager
@@ -43,27 +54,117 @@ class QuotaManager:
             storage_path: Where to store usage data
             default_daily_budget: Default daily budget per team in USD
             warning_threshold: Warn when usage exceeds this fraction of budget
+            compact_threshold_bytes: Fold the usage journal into daily rollups
+                once it grows past this size
         """
         self.storage_path = storage_path
         self.storage_path.mkdir(exist_ok=True)
         self.default_daily_budget = default_daily_budget
         self.warning_threshold = warning_threshold
-        self._load_usage_data()
+        self._journal = UsageJournal(storage_path, compact_threshold_bytes)
+
+        # team -> reservation id -> (model, estimated cost) for requests in
+        # flight in this process
+        self._reservations: Dict[str, Dict[str, Tuple[str, float]]] = {}
+        self._reservation_lock = threading.RLock()
+
+    @property
+    def usage_data(self) -> Dict:
+        """In-memory daily rollups (team -> date -> usage, plus "budgets")"""
+        return self._journal.data
 
     def _load_usage_data(self):
-        """Load usage data from storage"""
-        usage_file = self.storage_path / "usage.json"
-        if usage_file.exists():
-            with open(usage_file, "r") as f:
-                self.usage_data = json.load(f)
-        else:
-            self.usage_data = {}
-
-    def _save_usage_data(self):
-        """Save usage data to storage"""
-        usage_file = self.storage_path / "usage.json"
-        with open(usage_file, "w") as f:
-            json.dump(self.usage_data, f, indent=2)
+        """Pick up usage written by other processes since the last read"""
+        self._journal.refresh()
+
+    def compact(self):
+        """Fold the usage journal into the daily rollup snapshot"""
+        self._journal.compact()
+
+    def estimate_cost(self, model: str, input_tokens: int, output_tokens: int) -> float:
+        """Cost in USD of a request with the given token counts"""
+        model_cost = self.MODEL_COSTS.get(model, self.MODEL_COSTS["gpt-3.5-turbo"])
+        return (
+            input_tokens * model_cost["input"] + output_tokens * model_cost["output"]
+        ) / 1000
+
+    def reserved_cost(self, team: str) -> float:
+        """Estimated cost of the team's requests still in flight"""
+        with self._reservation_lock:
+            return sum(cost for _, cost in self._reservations.get(team, {}).values())
+
+    def _committed_cost(self, team: str) -> float:
+        """Today's tracked spend plus in-flight reservations"""
+        self._load_usage_data()
+        today = datetime.now().strftime("%Y-%m-%d")
+        current_usage = 0
+
+        if team in self.usage_data and today in self.usage_data[team]:
+            current_usage = self.usage_data[team][today]["total_cost"]
+
+        return current_usage + self.reserved_cost(team)
+
+    def reserve(
+        self,
+        team: str,
+        model: str,
+        estimated_input_tokens: int,
+        estimated_output_tokens: int,
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Atomically check the budget and hold the estimated cost of a request
+
+        Concurrent callers each see the others' reservations, so they cannot
+        all pass the check and overspend together.
+
+        Returns:
+            (reservation_id or None if over budget, alternative_model_if_used)
+        """
+        with self._reservation_lock:
+            committed = self._committed_cost(team)
+
+            candidates = [(model, None)]
+            alternative = self.CHEAPER_ALTERNATIVES.get(model)
+            if alternative:
+                candidates.append((alternative, alternative))
+
+            for candidate, alt_model in candidates:
+                estimated_cost = self.estimate_cost(
+                    candidate, estimated_input_tokens, estimated_output_tokens
+                )
+                if committed + estimated_cost <= self.default_daily_budget:
+                    reservation_id = str(uuid.uuid4())
+                    self._reservations.setdefault(team, {})[reservation_id] = (
+                        candidate,
+                        estimated_cost,
+                    )
+                    return reservation_id, alt_model
+
+            return None, None
+
+    def release(self, team: str, reservation_id: str):
+        """Drop a reservation without charging it (e.g. the request failed)"""
+        with self._reservation_lock:
+            self._reservations.get(team, {}).pop(reservation_id, None)
+
+    def settle(
+        self,
+        team: str,
+        reservation_id: str,
+        model: str,
+        input_tokens: int,
+        output_tokens: int,
+    ) -> float:
+        """
+        Replace a reservation with the request's actual usage
+
+        Returns:
+            Actual cost in USD
+        """
+        with self._reservation_lock:
+            # Swap under the lock so the cost is never counted twice or not at all
+            self._reservations.get(team, {}).pop(reservation_id, None)
+            return self.track_usage(team, model, input_tokens, output_tokens)
 
     def track_usage(
         self, team: str, model: str, input_tokens: int, output_tokens: int
@@ -75,31 +176,20 @@ class QuotaManager:
             Cost of this usage in USD
         """
         # Calculate cost
-        model_cost = self.MODEL_COSTS.get(model, self.MODEL_COSTS["gpt-3.5-turbo"])
-        cost = (
-            input_tokens * model_cost["input"] + output_tokens * model_cost["output"]
-        ) / 1000
+        cost = self.estimate_cost(model, input_tokens, output_tokens)
 
-        # Initialize team data if needed
+        # Append to the journal; the aggregate is updated in place
         today = datetime.now().strftime("%Y-%m-%d")
-        if team not in self.usage_data:
-            self.usage_data[team] = {}
-        if today not in self.usage_data[team]:
-            self.usage_data[team][today] = {
-                "total_cost": 0,
-                "models": {},
-                "token_count": 0,
+        self._journal.append(
+            {
+                "team": team,
+                "date": today,
+                "model": model,
+                "cost": cost,
+                "tokens": input_tokens + output_tokens,
             }
-
-        # Update usage
+        )
         daily_data = self.usage_data[team][today]
-        daily_data["total_cost"] += cost
-        daily_data["token_count"] += input_tokens + output_tokens
-
-        if model not in daily_data["models"]:
-            daily_data["models"][model] = {"cost": 0, "calls": 0}
-        daily_data["models"][model]["cost"] += cost
-        daily_data["models"][model]["calls"] += 1
 
         # Check if warning needed
         if (
@@ -111,9 +201,15 @@ class QuotaManager:
                 f"of ${self.default_daily_budget:.2f} daily budget"
             )
 
-        self._save_usage_data()
         return cost
 
+    def track_cache_hit(self, team: str, model: str):
+        """Record a request answered from the response cache (no cost)"""
+        today = datetime.now().strftime("%Y-%m-%d")
+        self._journal.append(
+            {"type": "cache_hit", "team": team, "date": today, "model": model}
+        )
+
     def can_make_request(
         self, team: str, model: str, estimated_tokens: int = 1000
     ) -> Tuple[bool, Optional[str]]:
@@ -123,29 +219,24 @@ class QuotaManager:
         Returns:
             (can_make_request, alternative_model_if_needed)
         """
-        today = datetime.now().strftime("%Y-%m-%d")
-        current_usage = 0
-
-        if team in self.usage_data and today in self.usage_data[team]:
-            current_usage = self.usage_data[team][today]["total_cost"]
+        # Count requests already in flight alongside tracked usage
+        current_usage = self._committed_cost(team)
 
         # Estimate cost
-        model_cost = self.MODEL_COSTS.get(model, self.MODEL_COSTS["gpt-3.5-turbo"])
-        estimated_cost = (estimated_tokens * model_cost["output"]) / 1000
+        estimated_cost = self.estimate_cost(model, 0, estimated_tokens)
 
         if current_usage + estimated_cost <= self.default_daily_budget:
             return True, None
 
         # Try cheaper alternatives
-        if model == "gpt-4":
-            return True, "gpt-3.5-turbo"
-        elif model == "claude-3-opus":
-            return True, "claude-3-haiku"
+        if model in self.CHEAPER_ALTERNATIVES:
+            return True, self.CHEAPER_ALTERNATIVES[model]
 
         return False, None
 
     def get_usage_report(self, team: str, days: int = 7) -> Dict:
         """Get usage report for a team"""
+        self._load_usage_data()
         report = {
             "team": team,
             "period": f"Last {days} days",
@@ -162,15 +253,15 @@ class QuotaManager:
 
         report["total_cost"] = sum(day["total_cost"] for day in report["days"].values())
         report["average_daily"] = report["total_cost"] / days
+        report["cache_hits"] = sum(
+            day.get("cache_hits", 0) for day in report["days"].values()
+        )
 
         return report
 
     def set_team_budget(self, team: str, daily_budget: float):
         """Set custom budget for a team"""
-        if "budgets" not in self.usage_data:
-            self.usage_data["budgets"] = {}
-        self.usage_data["budgets"][team] = daily_budget
-        self._save_usage_data()
+        self._journal.append({"type": "budget", "team": team, "budget": daily_budget})
 
     def get_team_budget(self, team: str) -> float:
         """Get budget for a team"""
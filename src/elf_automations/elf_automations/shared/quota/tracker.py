@@ -2,6 +2,7 @@
 Usage Tracker for detailed API usage monitoring
 """
 
+import itertools
 import logging
 import time
 from functools import wraps
@@ -16,11 +17,13 @@ class UsageTracker:
     def __init__(self, quota_manager):
         self.quota_manager = quota_manager
         self.active_requests = {}
+        self._seq = itertools.count()
 
     def track_request(self, team: str, model: str, request_id: Optional[str] = None):
         """Start tracking a request"""
         if not request_id:
-            request_id = f"{team}_{model}_{int(time.time() * 1000)}"
+            # Millisecond timestamps collide for concurrent requests
+            request_id = f"{team}_{model}_{int(time.time() * 1000)}_{next(self._seq)}"
 
         self.active_requests[request_id] = {
             "team": team,
@@ -32,14 +35,24 @@ class UsageTracker:
 
         return request_id
 
-    def update_tokens(self, request_id: str, input_tokens: int, output_tokens: int):
-        """Update token counts for a request"""
+    def update_tokens(
+        self,
+        request_id: str,
+        input_tokens: int,
+        output_tokens: int,
+        model: Optional[str] = None,
+    ):
+        """Update token counts (and the model actually used) for a request"""
         if request_id in self.active_requests:
             self.active_requests[request_id]["input_tokens"] = input_tokens
             self.active_requests[request_id]["output_tokens"] = output_tokens
+            if model:
+                self.active_requests[request_id]["model"] = model
 
-    def complete_request(self, request_id: str) -> Dict[str, Any]:
-        """Complete tracking for a request"""
+    def complete_request(
+        self, request_id: str, reservation_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Complete tracking for a request, settling its reservation if any"""
         if request_id not in self.active_requests:
             return {}
 
@@ -47,12 +60,21 @@ class UsageTracker:
         request_data["duration"] = time.time() - request_data["start_time"]
 
         # Track in quota manager
-        cost = self.quota_manager.track_usage(
-            request_data["team"],
-            request_data["model"],
-            request_data["input_tokens"],
-            request_data["output_tokens"],
-        )
+        if reservation_id:
+            cost = self.quota_manager.settle(
+                request_data["team"],
+                reservation_id,
+                request_data["model"],
+                request_data["input_tokens"],
+                request_data["output_tokens"],
+            )
+        else:
+            cost = self.quota_manager.track_usage(
+                request_data["team"],
+                request_data["model"],
+                request_data["input_tokens"],
+                request_data["output_tokens"],
+            )
 
         request_data["cost"] = cost
 
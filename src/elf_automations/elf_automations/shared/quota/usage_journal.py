@@ -0,0 +1,209 @@
+"""
+Append-only usage journal for quota tracking
+
+Storage layout inside the quota storage directory:
+- usage.json  - compacted daily rollups (same shape QuotaManager always used)
+- usage.jsonl - append-only journal of records written since the last compaction
+- usage.lock  - lock file used to serialize writers across processes
+
+Each tracked call appends one compact line to the journal instead of rewriting
+the whole usage file. The journal is folded into the rollup snapshot once it
+grows past a size threshold. Readers keep an in-memory aggregate and only read
+bytes appended since their last refresh, so checks never re-parse history.
+"""
+
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import fcntl
+
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class UsageJournal:
+    """Process-safe append-only journal with an in-memory daily aggregate"""
+
+    SNAPSHOT_FILE = "usage.json"
+    JOURNAL_FILE = "usage.jsonl"
+    LOCK_FILE = "usage.lock"
+
+    def __init__(self, storage_path: Path, compact_threshold_bytes: int = 1_000_000):
+        """
+        Initialize the journal
+
+        Args:
+            storage_path: Directory holding the snapshot, journal and lock files
+            compact_threshold_bytes: Compact once the journal grows past this size
+        """
+        self.storage_path = Path(storage_path)
+        self.storage_path.mkdir(parents=True, exist_ok=True)
+        self.snapshot_file = self.storage_path / self.SNAPSHOT_FILE
+        self.journal_file = self.storage_path / self.JOURNAL_FILE
+        self.lock_file = self.storage_path / self.LOCK_FILE
+        self.compact_threshold_bytes = compact_threshold_bytes
+
+        self.data: Dict[str, Any] = {}
+        self._journal_offset = 0
+        self._snapshot_id: Optional[Tuple[int, int]] = None
+        self._thread_lock = threading.RLock()
+
+        with self._locked(exclusive=False):
+            self._refresh_locked()
+
+    @contextmanager
+    def _locked(self, exclusive: bool = True):
+        """Hold the in-process lock plus an advisory file lock across processes"""
+        with self._thread_lock:
+            if not FCNTL_AVAILABLE:
+                yield
+                return
+            with open(self.lock_file, "a") as lock_handle:
+                fcntl.flock(
+                    lock_handle.fileno(),
+                    fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH,
+                )
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_handle.fileno(), fcntl.LOCK_UN)
+
+    def _stat_snapshot(self) -> Optional[Tuple[int, int]]:
+        """Identify the current snapshot file by inode and mtime"""
+        try:
+            stat = self.snapshot_file.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns)
+
+    def _refresh_locked(self, force_reload: bool = False):
+        """Pick up a new snapshot and any journal bytes appended since last read"""
+        snapshot_id = self._stat_snapshot()
+        if force_reload or snapshot_id != self._snapshot_id:
+            # Another process compacted (or this is the first load)
+            if snapshot_id is not None:
+                with open(self.snapshot_file, "r") as f:
+                    self.data = json.load(f)
+            else:
+                self.data = {}
+            self._snapshot_id = snapshot_id
+            self._journal_offset = 0
+
+        try:
+            size = self.journal_file.stat().st_size
+        except FileNotFoundError:
+            self._journal_offset = 0
+            return
+
+        if size < self._journal_offset:
+            # Journal truncated without a visible snapshot change; rebuild fully
+            self._refresh_locked(force_reload=True)
+            return
+        if size == self._journal_offset:
+            return
+
+        with open(self.journal_file, "rb") as f:
+            f.seek(self._journal_offset)
+            chunk = f.read(size - self._journal_offset)
+
+        # Only consume complete lines; a partial tail is picked up next time
+        end = chunk.rfind(b"\n") + 1
+        for line in chunk[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                self._apply(json.loads(line))
+            except (ValueError, KeyError) as e:
+                logger.warning(f"Skipping malformed usage journal record: {e}")
+        self._journal_offset += end
+
+    def _apply(self, record: Dict[str, Any]):
+        """Fold a single journal record into the in-memory aggregate"""
+        kind = record.get("type", "usage")
+
+        if kind == "budget":
+            self.data.setdefault("budgets", {})[record["team"]] = record["budget"]
+            return
+
+        team_data = self.data.setdefault(record["team"], {})
+        daily_data = team_data.setdefault(
+            record["date"], {"total_cost": 0, "models": {}, "token_count": 0}
+        )
+        model_data = daily_data["models"].setdefault(
+            record["model"], {"cost": 0, "calls": 0}
+        )
+
+        if kind == "cache_hit":
+            # Served from the response cache: counted, but free
+            daily_data["cache_hits"] = daily_data.get("cache_hits", 0) + 1
+            model_data["cache_hits"] = model_data.get("cache_hits", 0) + 1
+            return
+
+        daily_data["total_cost"] += record["cost"]
+        daily_data["token_count"] += record["tokens"]
+        model_data["cost"] += record["cost"]
+        model_data["calls"] += 1
+
+    def refresh(self):
+        """Bring the aggregate up to date with writes from other processes"""
+        with self._locked(exclusive=False):
+            self._refresh_locked()
+
+    def append(self, record: Dict[str, Any]):
+        """Append a record to the journal and apply it to the aggregate"""
+        line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+
+        with self._locked():
+            self._refresh_locked()
+
+            fd = os.open(
+                self.journal_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644
+            )
+            try:
+                # Writers hold the exclusive lock, so bytes past the last
+                # complete line are a torn write from a crashed process. Drop
+                # them, or this record would be glued onto the partial line.
+                if os.fstat(fd).st_size > self._journal_offset:
+                    logger.warning("Discarding partial record at end of usage journal")
+                    os.ftruncate(fd, self._journal_offset)
+                os.write(fd, line)
+                offset = os.lseek(fd, 0, os.SEEK_CUR)
+            finally:
+                os.close(fd)
+
+            self._apply(record)
+            self._journal_offset = offset
+
+            if self._journal_offset >= self.compact_threshold_bytes:
+                self._compact_locked()
+
+    def compact(self):
+        """Fold the journal into the daily rollup snapshot"""
+        with self._locked():
+            self._refresh_locked()
+            self._compact_locked()
+
+    def _compact_locked(self):
+        """Write the aggregate as the new snapshot and truncate the journal"""
+        tmp_file = self.snapshot_file.with_suffix(".json.tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(self.data, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.snapshot_file)
+
+        with open(self.journal_file, "w"):
+            pass
+
+        self._snapshot_id = self._stat_snapshot()
+        self._journal_offset = 0
+        logger.debug(f"Compacted usage journal into {self.snapshot_file}")
@@ -2,6 +2,16 @@
 RAG (Retrieval-Augmented Generation) shared utilities
 """
 
+from .dedup import DedupResult, NameDeduplicator, UnionFind, VectorDeduplicator
 from .rag_health_monitor import Alert, ComponentHealth, HealthStatus, RAGHealthMonitor
 
-__all__ = ["RAGHealthMonitor", "HealthStatus", "ComponentHealth", "Alert"]
+__all__ = [
+    "RAGHealthMonitor",
+    "HealthStatus",
+    "ComponentHealth",
+    "Alert",
+    "VectorDeduplicator",
+    "NameDeduplicator",
+    "DedupResult",
+    "UnionFind",
+]
@@ -0,0 +1,448 @@
+"""
+Near-duplicate detection for RAG collections
+
+Finds near-duplicate embeddings and entity names without comparing every
+pair, so whole collections can be analyzed instead of samples.
+
+- Candidate generation by locality-sensitive hashing: random hyperplanes
+  for cosine similarity between vectors, MinHash over character n-grams for
+  names
+- Vectorized verification of candidate pairs (row-wise dot products, or a
+  block matrix product for large buckets)
+- Union-find to turn verified pairs into duplicate groups
+"""
+
+import logging
+import math
+import zlib
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# splitmix64 finalizer constants, used to derive MinHash permutations
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+
+
+def _mix64(values: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer; wrapping uint64 arithmetic is intended"""
+    values = (values ^ (values >> np.uint64(30))) * _MIX_1
+    values = (values ^ (values >> np.uint64(27))) * _MIX_2
+    return values ^ (values >> np.uint64(31))
+
+
+class UnionFind:
+    """Disjoint sets over 0..n-1 with path halving and union by size"""
+
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+        self.size = [1] * n
+
+    def find(self, i: int) -> int:
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, a: int, b: int) -> bool:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return False
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        return True
+
+    def groups(self, min_size: int = 2) -> List[List[int]]:
+        """Sets with at least min_size members, ordered by first member"""
+        members: Dict[int, List[int]] = {}
+        for i in range(len(self.parent)):
+            members.setdefault(self.find(i), []).append(i)
+        return [group for group in members.values() if len(group) >= min_size]
+
+
+@dataclass
+class DedupResult:
+    """Verified near-duplicate pairs and the groups they form"""
+
+    total_items: int
+    candidate_pairs: int = 0
+    pairs: np.ndarray = field(default_factory=lambda: np.empty((0, 2), np.int64))
+    similarities: np.ndarray = field(default_factory=lambda: np.empty(0))
+    groups: List[List[int]] = field(default_factory=list)
+
+    @property
+    def pair_count(self) -> int:
+        return len(self.pairs)
+
+    @property
+    def duplicate_items(self) -> int:
+        """Items that have at least one near-duplicate"""
+        return sum(len(group) for group in self.groups)
+
+    @property
+    def redundant_items(self) -> int:
+        """Items that could be removed keeping one per group"""
+        return sum(len(group) - 1 for group in self.groups)
+
+    @property
+    def avg_similarity(self) -> float:
+        return float(self.similarities.mean()) if len(self.similarities) else 0.0
+
+    @property
+    def pair_ratio(self) -> float:
+        """Verified pairs as a fraction of all possible pairs"""
+        n = self.total_items
+        return self.pair_count / (n * (n - 1) / 2) if n > 1 else 0.0
+
+
+def _bucket_pairs(
+    keys: np.ndarray, max_pairwise_bucket: int
+) -> Tuple[Iterator[Tuple[np.ndarray, np.ndarray]], List[np.ndarray]]:
+    """
+    Group item indices by hash key
+
+    Returns a generator of (a, b) index arrays covering every pair inside
+    buckets of at most max_pairwise_bucket items, plus the member arrays of
+    larger buckets, which callers verify as blocks.
+    """
+    n = len(keys)
+    order = np.argsort(keys, kind="stable")
+    boundaries = np.flatnonzero(np.diff(keys[order])) + 1
+    starts = np.concatenate(([0], boundaries))
+    ends = np.concatenate((boundaries, [n]))
+    sizes = ends - starts
+
+    large = sizes > max_pairwise_bucket
+    large_buckets = [order[s:e] for s, e in zip(starts[large], ends[large])]
+
+    def small_pairs():
+        # Positions in small buckets with at least one later bucket member
+        small = np.repeat(~large & (sizes > 1), sizes)
+        remaining = np.repeat(ends, sizes) - np.arange(n) - 1
+        positions = np.flatnonzero(small & (remaining > 0))
+        remaining = remaining[positions]
+        offset = 1
+        while len(positions):
+            yield order[positions], order[positions + offset]
+            keep = remaining > offset
+            positions, remaining = positions[keep], remaining[keep]
+            offset += 1
+
+    return small_pairs(), large_buckets
+
+
+def _pair_codes(a: np.ndarray, b: np.ndarray, n: int) -> np.ndarray:
+    low, high = np.minimum(a, b), np.maximum(a, b)
+    return low.astype(np.int64) * n + high
+
+
+def _finish(
+    total: int, candidates: int, codes: List[np.ndarray], sims: List[np.ndarray]
+) -> DedupResult:
+    result = DedupResult(total_items=total, candidate_pairs=candidates)
+    if not codes:
+        return result
+
+    all_codes = np.concatenate(codes)
+    unique_codes, first = np.unique(all_codes, return_index=True)
+    result.pairs = np.stack((unique_codes // total, unique_codes % total), axis=1)
+    result.similarities = np.concatenate(sims)[first]
+
+    union_find = UnionFind(total)
+    for a, b in result.pairs.tolist():
+        union_find.union(a, b)
+    result.groups = union_find.groups()
+    return result
+
+
+class VectorDeduplicator:
+    """
+    Near-duplicate vectors by cosine similarity
+
+    Vectors are added in batches (e.g. while scrolling a Qdrant collection)
+    and hashed with random-hyperplane LSH. Only vectors that share a bucket
+    in some hash table are compared. The number of tables is chosen so that
+    a pair at exactly the threshold is found with probability `recall`.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        bits_per_table: int = 20,
+        recall: float = 0.99,
+        num_tables: Optional[int] = None,
+        max_pairwise_bucket: int = 64,
+        verify_chunk: int = 65_536,
+        dtype=np.float32,
+        seed: int = 0,
+    ):
+        """
+        Args:
+            threshold: Cosine similarity above which two vectors are duplicates
+            bits_per_table: Hyperplanes per hash table (at most 63); more bits
+                mean fewer false candidates per table
+            recall: Target probability of finding a pair at the threshold
+            num_tables: Override the number of hash tables
+            max_pairwise_bucket: Buckets up to this size are verified pair by
+                pair, larger ones with a block matrix product
+            verify_chunk: Pairs verified per vectorized step
+            dtype: Storage type for normalized vectors; float16 halves memory
+            seed: Seed for the hyperplanes
+        """
+        if not 0 < bits_per_table <= 63:
+            raise ValueError("bits_per_table must be between 1 and 63")
+        self.threshold = threshold
+        self.bits_per_table = bits_per_table
+        self.num_tables = num_tables or self.tables_for_recall(
+            threshold, bits_per_table, recall
+        )
+        self.max_pairwise_bucket = max_pairwise_bucket
+        self.verify_chunk = verify_chunk
+        self.dtype = dtype
+        self.seed = seed
+
+        self._hyperplanes: Optional[np.ndarray] = None
+        self._vectors: List[np.ndarray] = []
+        self._keys: List[np.ndarray] = []
+        self._weights = 1 << np.arange(bits_per_table, dtype=np.uint64)
+
+    @staticmethod
+    def tables_for_recall(threshold: float, bits: int, recall: float) -> int:
+        """Hash tables needed to find a pair at `threshold` with `recall`"""
+        angle = math.acos(max(-1.0, min(1.0, threshold)))
+        collide = (1 - angle / math.pi) ** bits
+        if collide >= 1:
+            return 1
+        return max(1, math.ceil(math.log(1 - recall) / math.log(1 - collide)))
+
+    @property
+    def count(self) -> int:
+        return sum(len(batch) for batch in self._vectors)
+
+    def add(self, vectors) -> None:
+        """Normalize, hash and keep a batch of vectors"""
+        batch = np.asarray(vectors, dtype=np.float32)
+        if batch.ndim != 2 or not len(batch):
+            return
+
+        if self._hyperplanes is None:
+            rng = np.random.default_rng(self.seed)
+            self._hyperplanes = rng.standard_normal(
+                (batch.shape[1], self.num_tables * self.bits_per_table)
+            ).astype(np.float32)
+
+        norms = np.linalg.norm(batch, axis=1, keepdims=True)
+        batch = batch / np.where(norms == 0, 1, norms)
+
+        bits = (batch @ self._hyperplanes) > 0
+        bits = bits.reshape(len(batch), self.num_tables, self.bits_per_table)
+        self._keys.append((bits.astype(np.uint64) * self._weights).sum(axis=2))
+        self._vectors.append(batch.astype(self.dtype))
+
+    def run(self) -> DedupResult:
+        """Verify every LSH candidate pair and group the duplicates"""
+        total = self.count
+        if total < 2:
+            return DedupResult(total_items=total)
+
+        vectors = np.concatenate(self._vectors)
+        keys = np.concatenate(self._keys)
+        candidates = 0
+        codes: List[np.ndarray] = []
+        sims: List[np.ndarray] = []
+
+        for table in range(self.num_tables):
+            small_pairs, large_buckets = _bucket_pairs(
+                keys[:, table], self.max_pairwise_bucket
+            )
+
+            for a, b in small_pairs:
+                candidates += len(a)
+                for start in range(0, len(a), self.verify_chunk):
+                    ca = a[start : start + self.verify_chunk]
+                    cb = b[start : start + self.verify_chunk]
+                    similarity = np.einsum(
+                        "ij,ij->i",
+                        vectors[ca].astype(np.float32),
+                        vectors[cb].astype(np.float32),
+                    )
+                    hit = similarity > self.threshold
+                    if hit.any():
+                        codes.append(_pair_codes(ca[hit], cb[hit], total))
+                        sims.append(similarity[hit])
+
+            for members in large_buckets:
+                candidates += len(members) * (len(members) - 1) // 2
+                self._verify_block(members, vectors, total, codes, sims)
+
+        return _finish(total, candidates, codes, sims)
+
+    def _verify_block(self, members, vectors, total, codes, sims):
+        """All pairs within one large bucket, in row blocks"""
+        block = vectors[members].astype(np.float32)
+        rows = max(1, self.verify_chunk // len(members))
+        for start in range(0, len(members), rows):
+            similarity = block[start : start + rows] @ block.T
+            i, j = np.nonzero(similarity > self.threshold)
+            i += start
+            upper = j > i
+            i, j = i[upper], j[upper]
+            if len(i):
+                codes.append(_pair_codes(members[i], members[j], total))
+                sims.append(similarity[i - start, j])
+
+
+class NameDeduplicator:
+    """
+    Near-duplicate names by difflib similarity ratio
+
+    Identical names are grouped directly. The remaining distinct names are
+    blocked with MinHash over character n-grams (LSH banding), filtered by
+    length, and only then compared with SequenceMatcher.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        ngram: int = 3,
+        num_perm: int = 64,
+        band_rows: int = 2,
+        max_pairwise_bucket: int = 5_000,
+        seed: int = 0,
+    ):
+        """
+        Args:
+            threshold: SequenceMatcher ratio above which names are duplicates
+            ngram: Character n-gram size for MinHash shingles
+            num_perm: MinHash permutations; must be a multiple of band_rows
+            band_rows: Rows per LSH band; fewer rows catch looser matches
+            max_pairwise_bucket: Larger buckets are skipped (with a warning),
+                since they come from very common n-grams rather than variants
+            seed: Seed for the MinHash permutations
+        """
+        if num_perm % band_rows:
+            raise ValueError("num_perm must be a multiple of band_rows")
+        self.threshold = threshold
+        self.ngram = ngram
+        self.num_perm = num_perm
+        self.band_rows = band_rows
+        self.max_pairwise_bucket = max_pairwise_bucket
+
+        rng = np.random.default_rng(seed)
+        self._masks = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64)
+
+    def _shingles(self, name: str) -> List[int]:
+        padded = f" {name} "
+        if len(padded) <= self.ngram:
+            return [zlib.crc32(padded.encode())]
+        return [
+            zlib.crc32(padded[i : i + self.ngram].encode())
+            for i in range(len(padded) - self.ngram + 1)
+        ]
+
+    def signatures(self, names: Sequence[str], chunk: int = 50_000) -> np.ndarray:
+        """MinHash signatures, one row per name"""
+        result = np.empty((len(names), self.num_perm), dtype=np.uint64)
+        for start in range(0, len(names), chunk):
+            shingles = [self._shingles(name) for name in names[start : start + chunk]]
+            lengths = np.fromiter((len(s) for s in shingles), np.int64, len(shingles))
+            offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+            values = np.fromiter(
+                (h for s in shingles for h in s), np.uint64, int(lengths.sum())
+            )
+            for p in range(self.num_perm):
+                hashed = _mix64(values ^ self._masks[p])
+                result[start : start + len(shingles), p] = np.minimum.reduceat(
+                    hashed, offsets
+                )
+        return result
+
+    def run(self, names: Sequence[Optional[str]]) -> DedupResult:
+        """Find and group near-duplicate names"""
+        total = len(names)
+        codes: List[np.ndarray] = []
+        sims: List[np.ndarray] = []
+
+        # Identical names need no comparison; keep one representative each
+        first_seen: Dict[str, int] = {}
+        exact_a, exact_b = [], []
+        for i, name in enumerate(names):
+            if not name:
+                continue
+            if name in first_seen:
+                exact_a.append(first_seen[name])
+                exact_b.append(i)
+            else:
+                first_seen[name] = i
+        if exact_a:
+            codes.append(_pair_codes(np.array(exact_a), np.array(exact_b), total))
+            sims.append(np.ones(len(exact_a)))
+
+        distinct = list(first_seen)
+        representative = np.fromiter(first_seen.values(), np.int64, len(distinct))
+        candidates = 0
+
+        if len(distinct) > 1:
+            signatures = self.signatures(distinct)
+            band_codes: List[np.ndarray] = []
+            for band in range(0, self.num_perm, self.band_rows):
+                keys = np.zeros(len(distinct), dtype=np.uint64)
+                for row in range(band, band + self.band_rows):
+                    keys = keys * np.uint64(0x9E3779B97F4A7C15) + signatures[:, row]
+                small_pairs, large_buckets = _bucket_pairs(
+                    keys, self.max_pairwise_bucket
+                )
+                for a, b in small_pairs:
+                    band_codes.append(_pair_codes(a, b, len(distinct)))
+                if large_buckets:
+                    logger.warning(
+                        f"Skipped {len(large_buckets)} name bucket(s) larger than "
+                        f"{self.max_pairwise_bucket}"
+                    )
+
+            if band_codes:
+                unique = np.unique(np.concatenate(band_codes))
+                a, b = unique // len(distinct), unique % len(distinct)
+                candidates = len(unique)
+                a, b, similarity = self._verify(distinct, a, b)
+                if len(a):
+                    codes.append(
+                        _pair_codes(representative[a], representative[b], total)
+                    )
+                    sims.append(similarity)
+
+        return _finish(total, candidates, codes, sims)
+
+    def _verify(
+        self, names: List[str], a: np.ndarray, b: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # ratio = 2 * matches / (len_a + len_b) can only exceed the
+        # threshold if the shorter name is long enough; drop the rest first
+        lengths = np.fromiter((len(name) for name in names), np.int64, len(names))
+        la, lb = lengths[a], lengths[b]
+        possible = 2 * np.minimum(la, lb) > self.threshold * (la + lb)
+        a, b = a[possible], b[possible]
+
+        keep, similarity = [], []
+        for i, j in zip(a.tolist(), b.tolist()):
+            matcher = SequenceMatcher(None, names[i], names[j])
+            if (
+                matcher.real_quick_ratio() > self.threshold
+                and matcher.quick_ratio() > self.threshold
+            ):
+                ratio = matcher.ratio()
+                if ratio > self.threshold:
+                    keep.append(True)
+                    similarity.append(ratio)
+                    continue
+            keep.append(False)
+
+        mask = np.array(keep, dtype=bool)
+        return a[mask], b[mask], np.array(similarity)
@@ -6,21 +6,27 @@ enabling teams to:
 - Query organizational hierarchy
 - Register themselves and update status
 - Find appropriate teams for delegation
+
+Lookups go through a TTL cache that coalesces concurrent identical requests
+and is invalidated by the client's own writes. Team members are fetched in
+one batch per lookup, and hierarchies are answered from a materialized tree
+of all teams.
 """
 
 import asyncio
-import json
 import logging
+import time
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from datetime import datetime
-from functools import lru_cache
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
 
 from ..mcp.client import MCPClient
 from ..utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+_MISSING = object()
+
 
 @dataclass
 class TeamMember:
@@ -67,14 +73,133 @@ class TeamHierarchy:
     team: Team
     parent: Optional[Team] = None
     children: List[Team] = field(default_factory=list)
+    descendants: List[Team] = field(default_factory=list)
 
     def get_all_descendants(self) -> List[Team]:
         """Get all descendant teams recursively."""
-        descendants = []
-        for child in self.children:
-            descendants.append(child)
-            # In real implementation, would need to fetch child hierarchies
-        return descendants
+        # Populated when built from the materialized tree
+        return self.descendants or list(self.children)
+
+
+@dataclass
+class _TeamTree:
+    """All teams indexed by name, id and parent."""
+
+    by_name: Dict[str, Dict[str, Any]]
+    by_id: Dict[str, Dict[str, Any]]
+    children: Dict[str, List[Dict[str, Any]]]
+
+    @classmethod
+    def build(cls, teams: List[Dict[str, Any]]) -> "_TeamTree":
+        tree = cls(by_name={}, by_id={}, children={})
+        for team in teams:
+            tree.by_name[team.get("name", "")] = team
+            if team.get("id"):
+                tree.by_id[team["id"]] = team
+        for team in teams:
+            if team.get("parent_id"):
+                tree.children.setdefault(team["parent_id"], []).append(team)
+        return tree
+
+    def descendants(self, team_id: str) -> List[Dict[str, Any]]:
+        """Descendants of a team, breadth first."""
+        found = []
+        seen = {team_id}
+        queue = [team_id]
+        while queue:
+            for child in self.children.get(queue.pop(0), []):
+                if child.get("id") in seen:
+                    continue
+                seen.add(child.get("id"))
+                found.append(child)
+                queue.append(child.get("id"))
+        return found
+
+
+class _RegistryCache:
+    """TTL cache for registry lookups with single-flight loading.
+
+    Concurrent lookups of the same key share one in-flight request. Loaders
+    returning None are not cached. Invalidation bumps a generation so a load
+    that started before it cannot store a stale result afterwards.
+    """
+
+    def __init__(self, ttl: float = 300, max_entries: int = 1000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.generation = 0
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "invalidations": 0}
+
+    def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        if entry[0] < time.monotonic():
+            del self._entries[key]
+            return _MISSING
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: str, value: Any, generation: Optional[int] = None):
+        if value is None or (generation is not None and generation != self.generation):
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_or_load(
+        self, key: str, loader: Callable[[], Awaitable[Any]], store: bool = True
+    ) -> Any:
+        """Cached value for key, loading it once for all concurrent callers.
+
+        With store=False the load is only coalesced, never cached.
+        """
+        value = self.get(key) if store else _MISSING
+        if value is not _MISSING:
+            self.stats["hits"] += 1
+            return value
+
+        loop = asyncio.get_running_loop()
+        future = self._inflight.get(key)
+        if future is not None and future.get_loop() is loop:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(future)
+
+        self.stats["misses"] += 1
+        future = self._inflight[key] = loop.create_future()
+        generation = self.generation
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved; waiters (if any) get it re-raised
+            future.exception()
+            raise
+        else:
+            if store:
+                self.put(key, value, generation)
+            future.set_result(value)
+            return value
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def invalidate(self, *prefixes: str):
+        """Drop cached entries whose key starts with any of the prefixes."""
+        self.generation += 1
+        self.stats["invalidations"] += 1
+        for key in [k for k in self._entries if k.startswith(prefixes)]:
+            del self._entries[key]
+
+    def clear(self):
+        self.generation += 1
+        self._entries.clear()
 
 
 class TeamRegistryClient:
@@ -84,15 +209,32 @@ class TeamRegistryClient:
     registration, and management through the MCP interface.
     """
 
-    def __init__(self, mcp_client: Optional[MCPClient] = None):
+    def __init__(
+        self,
+        mcp_client: Optional[MCPClient] = None,
+        cache_ttl: float = 300,
+        max_cache_entries: int = 1000,
+        member_concurrency: int = 10,
+    ):
         """Initialize the registry client.
 
         Args:
             mcp_client: Optional MCPClient instance. If not provided, creates one.
+            cache_ttl: Seconds a registry lookup stays cached
+            max_cache_entries: Maximum cached lookups
+            member_concurrency: Parallel member lookups when the registry
+                has no batch member tool
         """
         self.mcp_client = mcp_client or MCPClient()
-        self._cache: Dict[str, Any] = {}
-        self._cache_ttl = 300  # 5 minutes
+        self._cache = _RegistryCache(cache_ttl, max_cache_entries)
+        self._cache_ttl = cache_ttl
+        self.member_concurrency = member_concurrency
+        # None until we learn whether the registry supports batch members
+        self._batch_members: Optional[bool] = None
+
+    async def _call(self, tool: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Call a Team Registry MCP tool."""
+        return await self.mcp_client.call_tool("team-registry", tool, arguments)
 
     async def register_team(
         self,
@@ -113,8 +255,7 @@ class TeamRegistryClient:
             The registered Team object
         """
         try:
-            result = await self.mcp_client.call_tool_async(
-                "team-registry",
+            result = await self._call(
                 "register_team",
                 {
                     "name": name,
@@ -125,6 +266,7 @@ class TeamRegistryClient:
             )
 
             if result.get("success"):
+                self._cache.invalidate("tree", "type:", "executive:", "hierarchy:")
                 team_data = result.get("team", {})
                 return Team(
                     id=team_data.get("id"),
@@ -161,8 +303,7 @@ class TeamRegistryClient:
             True if successful
         """
         try:
-            result = await self.mcp_client.call_tool_async(
-                "team-registry",
+            result = await self._call(
                 "add_team_member",
                 {
                     "team_name": team_name,
@@ -173,12 +314,26 @@ class TeamRegistryClient:
                 },
             )
 
-            return result.get("success", False)
+            if result.get("success", False):
+                self._cache.invalidate(f"members:{team_name}", "capability:")
+                return True
+            return False
 
         except Exception as e:
             logger.error(f"Error adding member to team {team_name}: {e}")
             return False
 
+    async def _query_teams(
+        self, cache_key: str, tool: str, arguments: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """Raw team records for a query, cached and coalesced."""
+
+        async def load():
+            result = await self._call(tool, arguments)
+            return result.get("teams", []) if result.get("success") else None
+
+        return await self._cache.get_or_load(cache_key, load) or []
+
     async def find_teams_by_capability(self, capability: str) -> List[Team]:
         """Find teams that have a specific capability.
 
@@ -188,23 +343,11 @@ class TeamRegistryClient:
         Returns:
             List of teams with the capability
         """
-        cache_key = f"capability:{capability}"
-        if cache_key in self._cache:
-            return self._cache[cache_key]
-
         try:
-            result = await self.mcp_client.call_tool_async(
-                "team-registry", "query_teams", {"capability": capability}
+            teams_data = await self._query_teams(
+                f"capability:{capability}", "query_teams", {"capability": capability}
             )
-
-            teams = []
-            if result.get("success"):
-                for team_data in result.get("teams", []):
-                    team = await self._build_team_with_members(team_data)
-                    teams.append(team)
-
-            self._cache[cache_key] = teams
-            return teams
+            return await self._build_teams(teams_data)
 
         except Exception as e:
             logger.error(f"Error finding teams by capability {capability}: {e}")
@@ -220,22 +363,30 @@ class TeamRegistryClient:
             List of teams of that type
         """
         try:
-            result = await self.mcp_client.call_tool_async(
-                "team-registry", "query_teams", {"type": team_type}
+            teams_data = await self._query_teams(
+                f"type:{team_type}", "query_teams", {"type": team_type}
             )
-
-            teams = []
-            if result.get("success"):
-                for team_data in result.get("teams", []):
-                    team = await self._build_team_with_members(team_data)
-                    teams.append(team)
-
-            return teams
+            return await self._build_teams(teams_data)
 
         except Exception as e:
             logger.error(f"Error finding teams by type {team_type}: {e}")
             return []
 
+    async def _team_tree(self) -> Optional[_TeamTree]:
+        """Materialized tree of every team, rebuilt when the cache expires."""
+
+        async def load():
+            result = await self._call("query_teams", {})
+            if not result.get("success"):
+                return None
+            return _TeamTree.build(result.get("teams", []))
+
+        try:
+            return await self._cache.get_or_load("tree", load)
+        except Exception as e:
+            logger.debug(f"Could not load team tree: {e}")
+            return None
+
     async def get_team_hierarchy(self, team_name: str) -> Optional[TeamHierarchy]:
         """Get the organizational hierarchy for a team.
 
@@ -246,31 +397,52 @@ class TeamRegistryClient:
             TeamHierarchy object with parent and children
         """
         try:
-            result = await self.mcp_client.call_tool_async(
-                "team-registry", "get_team_hierarchy", {"team_name": team_name}
-            )
-
-            if result.get("success"):
-                hierarchy_data = result.get("hierarchy", {})
-
-                # Build team objects
-                team = await self._build_team_with_members(
-                    hierarchy_data.get("team", {})
+            tree = await self._team_tree()
+            if tree and team_name in tree.by_name:
+                team_data = tree.by_name[team_name]
+                parent_data = tree.by_id.get(team_data.get("parent_id"))
+                descendants_data = tree.descendants(team_data.get("id"))
+
+                teams = await self._build_teams(
+                    [team_data]
+                    + ([parent_data] if parent_data else [])
+                    + descendants_data
+                )
+                team = teams[0]
+                parent = teams[1] if parent_data else None
+                descendants = teams[2:] if parent_data else teams[1:]
+                children = [d for d in descendants if d.parent_id == team.id]
+                return TeamHierarchy(
+                    team=team,
+                    parent=parent,
+                    children=children,
+                    descendants=descendants,
                 )
-                parent = None
-                if hierarchy_data.get("parent"):
-                    parent = await self._build_team_with_members(
-                        hierarchy_data["parent"]
-                    )
-
-                children = []
-                for child_data in hierarchy_data.get("children", []):
-                    child = await self._build_team_with_members(child_data)
-                    children.append(child)
 
-                return TeamHierarchy(team=team, parent=parent, children=children)
+            # Not in the tree; ask the registry for this team directly
+            async def load():
+                result = await self._call(
+                    "get_team_hierarchy", {"team_name": team_name}
+                )
+                return result.get("hierarchy", {}) if result.get("success") else None
 
-            return None
+            hierarchy_data = await self._cache.get_or_load(
+                f"hierarchy:{team_name}", load
+            )
+            if hierarchy_data is None:
+                return None
+
+            parent_data = hierarchy_data.get("parent")
+            children_data = hierarchy_data.get("children", [])
+            teams = await self._build_teams(
+                [hierarchy_data.get("team", {})]
+                + ([parent_data] if parent_data else [])
+                + children_data
+            )
+            team = teams[0]
+            parent = teams[1] if parent_data else None
+            children = teams[2:] if parent_data else teams[1:]
+            return TeamHierarchy(team=team, parent=parent, children=children)
 
         except Exception as e:
             logger.error(f"Error getting hierarchy for team {team_name}: {e}")
@@ -286,19 +458,12 @@ class TeamRegistryClient:
             List of teams reporting to that executive
         """
         try:
-            result = await self.mcp_client.call_tool_async(
-                "team-registry",
+            teams_data = await self._query_teams(
+                f"executive:{executive_name}",
                 "get_executive_teams",
                 {"executive_name": executive_name},
             )
-
-            teams = []
-            if result.get("success"):
-                for team_data in result.get("teams", []):
-                    team = await self._build_team_with_members(team_data)
-                    teams.append(team)
-
-            return teams
+            return await self._build_teams(teams_data)
 
         except Exception as e:
             logger.error(f"Error getting teams for executive {executive_name}: {e}")
@@ -321,6 +486,7 @@ class TeamRegistryClient:
         # For now, we can update by re-adding the member
         logger.info(f"Updating capabilities for {agent_name} in {team_name}")
         # Implementation would go here
+        self._cache.invalidate(f"members:{team_name}", "capability:")
         return True
 
     async def find_collaborators(self, required_capabilities: List[str]) -> List[Team]:
@@ -332,60 +498,133 @@ class TeamRegistryClient:
         Returns:
             List of teams that together have all capabilities
         """
-        teams_by_capability = {}
-
-        # Find teams for each capability
-        for cap in required_capabilities:
-            teams = await self.find_teams_by_capability(cap)
-            teams_by_capability[cap] = teams
+        # Query every capability at once
+        results = await asyncio.gather(
+            *(
+                self._query_teams(
+                    f"capability:{cap}", "query_teams", {"capability": cap}
+                )
+                for cap in required_capabilities
+            ),
+            return_exceptions=True,
+        )
 
         # Find minimal set of teams that cover all capabilities
         # Simple implementation: return all unique teams
-        all_teams = {}
-        for teams in teams_by_capability.values():
-            for team in teams:
-                all_teams[team.name] = team
-
-        return list(all_teams.values())
+        all_teams: Dict[str, Dict[str, Any]] = {}
+        for cap, teams_data in zip(required_capabilities, results):
+            if isinstance(teams_data, Exception):
+                logger.error(f"Error finding teams by capability {cap}: {teams_data}")
+                continue
+            for team_data in teams_data:
+                all_teams[team_data.get("name", "")] = team_data
+
+        return await self._build_teams(list(all_teams.values()))
+
+    @staticmethod
+    def _parse_member(member_data: Dict[str, Any]) -> TeamMember:
+        return TeamMember(
+            agent_name=member_data.get("agent_name", ""),
+            role=member_data.get("role", ""),
+            capabilities=member_data.get("capabilities", []),
+            is_manager=member_data.get("is_manager", False),
+        )
 
-    async def _build_team_with_members(self, team_data: Dict[str, Any]) -> Team:
-        """Build a Team object with its members.
+    async def _load_members(self, team_name: str) -> Optional[List[TeamMember]]:
+        try:
+            result = await self._call("get_team_members", {"team_name": team_name})
+        except Exception as e:
+            logger.warning(f"Could not fetch members for team {team_name}: {e}")
+            return None
+        if not result.get("success"):
+            return None
+        return [self._parse_member(m) for m in result.get("members", [])]
 
-        Args:
-            team_data: Raw team data from MCP
+    async def _fetch_members(
+        self, team_names: List[str]
+    ) -> Dict[str, List[TeamMember]]:
+        """Members for many teams: cache first, then one batch call.
 
-        Returns:
-            Team object with members populated
+        Falls back to concurrent per-team lookups when the registry has no
+        batch member tool.
         """
-        team = Team(
-            id=team_data.get("id", ""),
-            name=team_data.get("name", ""),
-            type=team_data.get("type", ""),
-            parent_id=team_data.get("parent_id"),
-            metadata=team_data.get("metadata", {}),
-        )
+        members: Dict[str, List[TeamMember]] = {}
+        missing = []
+        for name in dict.fromkeys(team_names):
+            cached = self._cache.get(f"members:{name}")
+            if cached is _MISSING:
+                missing.append(name)
+            else:
+                members[name] = cached
 
-        # Get team members if not included
-        if not team_data.get("members"):
+        if len(missing) > 1 and self._batch_members is not False:
+            generation = self._cache.generation
             try:
-                result = await self.mcp_client.call_tool_async(
-                    "team-registry", "get_team_members", {"team_name": team.name}
+                result = await self._cache.get_or_load(
+                    "batch:" + ",".join(sorted(missing)),
+                    lambda: self._call("get_teams_members", {"team_names": missing}),
+                    store=False,
                 )
-
-                if result.get("success"):
-                    members_data = result.get("members", [])
-                    for member_data in members_data:
-                        member = TeamMember(
-                            agent_name=member_data.get("agent_name", ""),
-                            role=member_data.get("role", ""),
-                            capabilities=member_data.get("capabilities", []),
-                            is_manager=member_data.get("is_manager", False),
-                        )
-                        team.members.append(member)
             except Exception as e:
-                logger.warning(f"Could not fetch members for team {team.name}: {e}")
+                result = {"success": False, "error": str(e)}
+
+            if result.get("success"):
+                self._batch_members = True
+                for name, members_data in (result.get("members") or {}).items():
+                    parsed = [self._parse_member(m) for m in members_data]
+                    self._cache.put(f"members:{name}", parsed, generation)
+                    members[name] = parsed
+                missing = [name for name in missing if name not in members]
+            elif self._batch_members is None:
+                logger.debug("Registry has no batch member lookup; fetching per team")
+                self._batch_members = False
+
+        if missing:
+            semaphore = asyncio.Semaphore(self.member_concurrency)
+
+            async def fetch(name: str):
+                async with semaphore:
+                    return await self._cache.get_or_load(
+                        f"members:{name}", lambda: self._load_members(name)
+                    )
+
+            fetched = await asyncio.gather(*(fetch(name) for name in missing))
+            for name, team_members in zip(missing, fetched):
+                members[name] = team_members or []
+
+        return members
+
+    async def _build_teams(self, teams_data: List[Dict[str, Any]]) -> List[Team]:
+        """Build Team objects, fetching missing members in one batch.
 
-        return team
+        Args:
+            teams_data: Raw team data from MCP
+
+        Returns:
+            Team objects with members populated
+        """
+        teams = []
+        need_members = []
+        for team_data in teams_data:
+            team = Team(
+                id=team_data.get("id", ""),
+                name=team_data.get("name", ""),
+                type=team_data.get("type", ""),
+                parent_id=team_data.get("parent_id"),
+                metadata=team_data.get("metadata", {}),
+                members=[self._parse_member(m) for m in team_data.get("members") or []],
+            )
+            if not team.members:
+                need_members.append(team.name)
+            teams.append(team)
+
+        if need_members:
+            members = await self._fetch_members(need_members)
+            for team in teams:
+                if not team.members:
+                    team.members = list(members.get(team.name, []))
+
+        return teams
 
     # Synchronous convenience methods
     def register_team_sync(
@@ -414,3 +653,11 @@ class TeamRegistryClient:
         """Clear the internal cache."""
         self._cache.clear()
         logger.info("Registry client cache cleared")
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Cache hit, miss and coalescing counters."""
+        return {
+            **self._cache.stats,
+            "entries": len(self._cache._entries),
+            "batch_members": self._batch_members,
+        }
@@ -10,7 +10,14 @@ Provides comprehensive fallback strategies for:
 - Docker/K8s resources
 """
 
-from .circuit_breaker import CircuitBreaker, CircuitState
+from .circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerRegistry,
+    CircuitOpenError,
+    CircuitState,
+    circuit_breaker,
+    get_circuit_breaker_registry,
+)
 from .fallback_protocols import (
     FallbackProtocol,
     FallbackStrategy,
@@ -36,6 +43,10 @@ __all__ = [
     # Circuit Breaker
     "CircuitBreaker",
     "CircuitState",
+    "CircuitOpenError",
+    "CircuitBreakerRegistry",
+    "circuit_breaker",
+    "get_circuit_breaker_registry",
     # Retry Policies
     "RetryPolicy",
     "ExponentialBackoff",
@@ -2,19 +2,32 @@
 Circuit breaker pattern implementation
 
 Prevents cascading failures by:
-1. Monitoring failure rates
-2. Opening circuit when threshold exceeded
+1. Monitoring failure and slow-call rates over a sliding time window
+2. Opening circuit when a rate threshold is exceeded
 3. Rejecting requests while open
 4. Attempting recovery after timeout
 5. Closing circuit on successful recovery
+
+The call path reads only the monotonic clock and takes a lock only to change
+state, so the compare and the set of a transition happen as one step. Window
+counts live in fixed time buckets that are recycled in place, so recording a
+call is a couple of list updates; rates are only summed when a failure or
+slow call could trip the circuit. Under heavy thread contention a count may
+occasionally be lost, which rate-based tripping tolerates.
+
+Breakers are shared through a CircuitBreakerRegistry, sharded by name so
+lookups of hot breakers never wait on breakers being created elsewhere.
 """
 
 import asyncio
+import functools
+import itertools
 import logging
+import threading
+import time
 from datetime import datetime, timedelta
 from enum import Enum
-from threading import Lock
-from typing import Any, Callable, Optional, Type
+from typing import Any, Callable, Dict, List, Optional, Type
 
 logger = logging.getLogger(__name__)
 
@@ -27,58 +40,89 @@ class CircuitState(Enum):
     HALF_OPEN = "half_open"  # Testing recovery
 
 
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected by an open circuit"""
+
+
 class CircuitBreaker:
     """
     Circuit breaker to prevent cascading failures
 
     States:
     - CLOSED: Normal operation, requests pass through
-    - OPEN: Too many failures, requests rejected
+    - OPEN: Failure or slow-call rate too high, requests rejected
     - HALF_OPEN: Testing if service recovered
     """
 
     def __init__(
         self,
         failure_threshold: int = 5,
-        recovery_timeout: int = 60,
+        recovery_timeout: float = 60,
         expected_exception: Type[Exception] = Exception,
         name: Optional[str] = None,
+        failure_rate_threshold: float = 0.5,
+        slow_call_threshold: Optional[float] = None,
+        slow_call_rate_threshold: float = 0.8,
+        window_seconds: float = 60,
+        window_buckets: int = 10,
+        half_open_max_calls: int = 1,
     ):
         """
         Initialize circuit breaker
 
         Args:
-            failure_threshold: Number of failures before opening
+            failure_threshold: Calls the window must hold before rates can
+                open the circuit (so this many straight failures trip it)
             recovery_timeout: Seconds before attempting recovery
-            expected_exception: Exception type to catch
+            expected_exception: Exception type counted as a failure
             name: Optional name for logging
+            failure_rate_threshold: Failure rate (0-1) that opens the circuit
+            slow_call_threshold: Seconds after which a call counts as slow
+                (slow-call tracking is off when None)
+            slow_call_rate_threshold: Slow-call rate (0-1) that opens the circuit
+            window_seconds: Length of the sliding window
+            window_buckets: Time buckets the window is split into
+            half_open_max_calls: Probe calls allowed while half-open
         """
         self.failure_threshold = failure_threshold
         self.recovery_timeout = recovery_timeout
         self.expected_exception = expected_exception
         self.name = name or "CircuitBreaker"
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.half_open_max_calls = half_open_max_calls
+
+        # Sliding window: each bucket is [epoch, calls, failures, slow_calls]
+        self._bucket_count = window_buckets
+        self._bucket_seconds = window_seconds / window_buckets
+        self._buckets: List[List[int]] = []
+        self._clear_window()
 
         # State tracking
         self._state = CircuitState.CLOSED
+        self._state_lock = threading.Lock()
         self._failure_count = 0
-        self._last_failure_time = None
-        self._state_changed_at = datetime.now()
-
-        # Thread safety
-        self._lock = Lock()
+        self._opened_at = 0.0
+        self._probes = itertools.count()
+        self._state_changed_at = time.monotonic()
+        self._state_changed_wall = datetime.now()
 
         # Metrics
         self._total_calls = 0
         self._total_failures = 0
         self._total_successes = 0
+        self._total_slow_calls = 0
         self._rejected_calls = 0
 
     @property
     def state(self) -> CircuitState:
         """Get current circuit state"""
-        with self._lock:
-            self._check_recovery()
-            return self._state
+        if self._state is CircuitState.OPEN:
+            now = time.monotonic()
+            if now - self._opened_at >= self.recovery_timeout:
+                self._transition(CircuitState.OPEN, CircuitState.HALF_OPEN, now)
+        return self._state
 
     @property
     def is_closed(self) -> bool:
@@ -90,64 +134,153 @@ class CircuitBreaker:
         """Check if circuit is open (rejecting requests)"""
         return self.state == CircuitState.OPEN
 
-    def _check_recovery(self):
-        """Check if circuit should attempt recovery"""
-        if self._state == CircuitState.OPEN:
-            if self._last_failure_time:
-                time_since_failure = datetime.now() - self._last_failure_time
-                if time_since_failure > timedelta(seconds=self.recovery_timeout):
-                    logger.info(
-                        f"{self.name}: Attempting recovery (moving to HALF_OPEN)"
-                    )
-                    self._transition_to(CircuitState.HALF_OPEN)
-
-    def _transition_to(self, new_state: CircuitState):
-        """Transition to new state"""
-        old_state = self._state
-        self._state = new_state
-        self._state_changed_at = datetime.now()
+    # State transitions
 
-        if new_state == CircuitState.CLOSED:
+    def _transition(
+        self, expected: CircuitState, new_state: CircuitState, now: float
+    ) -> bool:
+        """Move to new_state if still in expected (losing racers do nothing)"""
+        with self._state_lock:
+            if self._state is not expected:
+                return False
+            self._set_state(new_state, now)
+        return True
+
+    def _set_state(self, new_state: CircuitState, now: float):
+        old_state = self._state
+        if new_state == CircuitState.OPEN:
+            self._opened_at = now
+        elif new_state == CircuitState.HALF_OPEN:
+            self._probes = itertools.count()
+        else:
             self._failure_count = 0
+            self._clear_window()
+
+        self._state = new_state
+        self._state_changed_at = now
+        self._state_changed_wall = datetime.now()
 
         logger.info(
             f"{self.name}: State transition {old_state.value} -> {new_state.value}"
         )
 
-    def _record_success(self):
+    # Sliding window
+
+    def _clear_window(self):
+        self._buckets = [[-1, 0, 0, 0] for _ in range(self._bucket_count)]
+
+    def _record(self, now: float, failed: bool, slow: bool):
+        epoch = int(now / self._bucket_seconds)
+        slot = epoch % self._bucket_count
+        bucket = self._buckets[slot]
+        if bucket[0] != epoch:
+            # Recycle a bucket that has slid out of the window
+            bucket = self._buckets[slot] = [epoch, 0, 0, 0]
+        bucket[1] += 1
+        if failed:
+            bucket[2] += 1
+        if slow:
+            bucket[3] += 1
+
+    def _window_counts(self, now: float) -> List[int]:
+        """Calls, failures and slow calls inside the window"""
+        oldest = int(now / self._bucket_seconds) - self._bucket_count
+        totals = [0, 0, 0]
+        for epoch, calls, failures, slow in self._buckets:
+            if epoch > oldest:
+                totals[0] += calls
+                totals[1] += failures
+                totals[2] += slow
+        return totals
+
+    def _evaluate(self, now: float):
+        """Open the circuit if a window rate crosses its threshold"""
+        calls, failures, slow = self._window_counts(now)
+        if calls < self.failure_threshold:
+            return
+
+        failure_rate = failures / calls
+        slow_rate = slow / calls
+        if (
+            failure_rate >= self.failure_rate_threshold
+            or slow_rate >= self.slow_call_rate_threshold
+        ):
+            if self._transition(CircuitState.CLOSED, CircuitState.OPEN, now):
+                logger.error(
+                    f"{self.name}: Opening circuit (failure rate "
+                    f"{failure_rate:.0%}, slow-call rate {slow_rate:.0%} "
+                    f"over {calls} calls)"
+                )
+
+    # Call path
+
+    def _reject(self):
+        self._rejected_calls += 1
+        raise CircuitOpenError(
+            f"{self.name}: Circuit breaker is OPEN - request rejected"
+        )
+
+    def _before_call(self) -> float:
+        """Admit or reject a call; returns its start time"""
+        now = time.monotonic()
+        state = self._state
+        if state is CircuitState.OPEN:
+            if now - self._opened_at < self.recovery_timeout:
+                self._reject()
+            if self._transition(CircuitState.OPEN, CircuitState.HALF_OPEN, now):
+                logger.info(f"{self.name}: Attempting recovery")
+            state = self._state
+        if state is CircuitState.HALF_OPEN:
+            if next(self._probes) >= self.half_open_max_calls:
+                self._reject()
+        return now
+
+    def _on_success(self, started: float):
         """Record successful call"""
-        with self._lock:
-            self._total_calls += 1
-            self._total_successes += 1
+        now = time.monotonic()
+        slow = (
+            self.slow_call_threshold is not None
+            and now - started >= self.slow_call_threshold
+        )
+        self._record(now, False, slow)
+        self._total_calls += 1
+        self._total_successes += 1
+        self._failure_count = 0
+        if slow:
+            self._total_slow_calls += 1
 
-            if self._state == CircuitState.HALF_OPEN:
-                # Success in half-open state means recovery
+        if self._state is CircuitState.HALF_OPEN:
+            # Success in half-open state means recovery
+            if self._transition(CircuitState.HALF_OPEN, CircuitState.CLOSED, now):
                 logger.info(f"{self.name}: Recovery successful, closing circuit")
-                self._transition_to(CircuitState.CLOSED)
-
-            # Reset failure count on success
-            self._failure_count = 0
+        elif slow:
+            self._evaluate(now)
 
-    def _record_failure(self):
+    def _on_failure(self, started: float):
         """Record failed call"""
-        with self._lock:
-            self._total_calls += 1
-            self._total_failures += 1
-            self._failure_count += 1
-            self._last_failure_time = datetime.now()
-
-            if self._state == CircuitState.HALF_OPEN:
-                # Failure in half-open means still broken
+        now = time.monotonic()
+        slow = (
+            self.slow_call_threshold is not None
+            and now - started >= self.slow_call_threshold
+        )
+        self._record(now, True, slow)
+        self._total_calls += 1
+        self._total_failures += 1
+        self._failure_count += 1
+        if slow:
+            self._total_slow_calls += 1
+
+        if self._state is CircuitState.HALF_OPEN:
+            # Failure in half-open means still broken
+            if self._transition(CircuitState.HALF_OPEN, CircuitState.OPEN, now):
                 logger.warning(f"{self.name}: Recovery failed, reopening circuit")
-                self._transition_to(CircuitState.OPEN)
+        else:
+            self._evaluate(now)
 
-            elif self._state == CircuitState.CLOSED:
-                if self._failure_count >= self.failure_threshold:
-                    logger.error(
-                        f"{self.name}: Failure threshold reached "
-                        f"({self._failure_count}/{self.failure_threshold}), opening circuit"
-                    )
-                    self._transition_to(CircuitState.OPEN)
+    def _on_ignored(self):
+        """Give back a half-open probe slot used by an unexpected exception"""
+        if self._state is CircuitState.HALF_OPEN:
+            self._probes = itertools.count()
 
     def call(self, func: Callable, *args, **kwargs) -> Any:
         """
@@ -162,22 +295,20 @@ class CircuitBreaker:
             Function result
 
         Raises:
-            Exception: If circuit is open or function fails
+            CircuitOpenError: If circuit is open
+            Exception: If function fails
         """
-        # Check state
-        if self.state == CircuitState.OPEN:
-            self._rejected_calls += 1
-            raise Exception(f"{self.name}: Circuit breaker is OPEN - request rejected")
-
-        # Attempt call
+        started = self._before_call()
         try:
             result = func(*args, **kwargs)
-            self._record_success()
-            return result
-
-        except self.expected_exception as e:
-            self._record_failure()
+        except self.expected_exception:
+            self._on_failure(started)
+            raise
+        except BaseException:
+            self._on_ignored()
             raise
+        self._on_success(started)
+        return result
 
     async def call_async(self, func: Callable, *args, **kwargs) -> Any:
         """
@@ -192,58 +323,177 @@ class CircuitBreaker:
             Function result
 
         Raises:
-            Exception: If circuit is open or function fails
+            CircuitOpenError: If circuit is open
+            Exception: If function fails
         """
-        # Check state
-        if self.state == CircuitState.OPEN:
-            self._rejected_calls += 1
-            raise Exception(f"{self.name}: Circuit breaker is OPEN - request rejected")
-
-        # Attempt call
+        started = self._before_call()
         try:
-            if asyncio.iscoroutinefunction(func):
-                result = await func(*args, **kwargs)
-            else:
-                result = func(*args, **kwargs)
-
-            self._record_success()
-            return result
-
-        except self.expected_exception as e:
-            self._record_failure()
+            result = func(*args, **kwargs)
+            if asyncio.iscoroutine(result) or isinstance(result, asyncio.Future):
+                result = await result
+        except self.expected_exception:
+            self._on_failure(started)
             raise
+        except BaseException:
+            self._on_ignored()
+            raise
+        self._on_success(started)
+        return result
 
     def get_stats(self) -> dict:
         """Get circuit breaker statistics"""
-        with self._lock:
-            success_rate = 0
-            if self._total_calls > 0:
-                success_rate = (self._total_successes / self._total_calls) * 100
-
-            return {
-                "name": self.name,
-                "state": self._state.value,
-                "failure_count": self._failure_count,
-                "total_calls": self._total_calls,
-                "total_successes": self._total_successes,
-                "total_failures": self._total_failures,
-                "rejected_calls": self._rejected_calls,
-                "success_rate": round(success_rate, 2),
-                "state_changed_at": self._state_changed_at.isoformat(),
-                "time_in_state": str(datetime.now() - self._state_changed_at),
-            }
+        now = time.monotonic()
+        state = self.state
+        calls, failures, slow = self._window_counts(now)
+
+        success_rate = 0
+        if self._total_calls > 0:
+            success_rate = (self._total_successes / self._total_calls) * 100
+
+        return {
+            "name": self.name,
+            "state": state.value,
+            "failure_count": self._failure_count,
+            "total_calls": self._total_calls,
+            "total_successes": self._total_successes,
+            "total_failures": self._total_failures,
+            "total_slow_calls": self._total_slow_calls,
+            "rejected_calls": self._rejected_calls,
+            "success_rate": round(success_rate, 2),
+            "window_calls": calls,
+            "window_failure_rate": round(failures / calls, 4) if calls else 0.0,
+            "window_slow_call_rate": round(slow / calls, 4) if calls else 0.0,
+            "state_changed_at": self._state_changed_wall.isoformat(),
+            "time_in_state": str(timedelta(seconds=now - self._state_changed_at)),
+        }
 
     def reset(self):
         """Reset circuit breaker to closed state"""
-        with self._lock:
-            logger.info(f"{self.name}: Manual reset to CLOSED state")
-            self._transition_to(CircuitState.CLOSED)
-            self._failure_count = 0
-            self._last_failure_time = None
+        logger.info(f"{self.name}: Manual reset to CLOSED state")
+        with self._state_lock:
+            self._set_state(CircuitState.CLOSED, time.monotonic())
 
     def trip(self):
         """Manually trip the circuit breaker to open state"""
-        with self._lock:
-            logger.warning(f"{self.name}: Manual trip to OPEN state")
-            self._transition_to(CircuitState.OPEN)
-            self._last_failure_time = datetime.now()
+        logger.warning(f"{self.name}: Manual trip to OPEN state")
+        with self._state_lock:
+            self._set_state(CircuitState.OPEN, time.monotonic())
+
+
+class CircuitBreakerRegistry:
+    """Named circuit breakers, sharded so hot lookups never contend"""
+
+    def __init__(self, shards: int = 16, **defaults):
+        """
+        Args:
+            shards: Number of independently locked shards
+            **defaults: CircuitBreaker settings for breakers created here
+        """
+        self.defaults = defaults
+        self._shards: List[Dict[str, CircuitBreaker]] = [{} for _ in range(shards)]
+        self._locks = [threading.Lock() for _ in range(shards)]
+
+    def _shard(self, name: str) -> int:
+        return hash(name) % len(self._shards)
+
+    def get(self, name: str) -> Optional[CircuitBreaker]:
+        """Get a breaker by name, if it exists"""
+        return self._shards[self._shard(name)].get(name)
+
+    def get_or_create(self, name: str, **kwargs) -> CircuitBreaker:
+        """
+        Get a breaker by name, creating it on first use.
+
+        Settings in kwargs override the registry defaults and only apply
+        when the breaker is created.
+        """
+        index = self._shard(name)
+        breaker = self._shards[index].get(name)
+        if breaker is not None:
+            return breaker
+
+        # Only creation takes the shard lock
+        with self._locks[index]:
+            breaker = self._shards[index].get(name)
+            if breaker is None:
+                breaker = CircuitBreaker(name=name, **{**self.defaults, **kwargs})
+                self._shards[index][name] = breaker
+            return breaker
+
+    def remove(self, name: str):
+        """Forget a breaker"""
+        index = self._shard(name)
+        with self._locks[index]:
+            self._shards[index].pop(name, None)
+
+    def names(self) -> List[str]:
+        """Names of all registered breakers"""
+        return sorted(name for shard in self._shards for name in list(shard))
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Statistics for every breaker, keyed by name"""
+        return {
+            name: breaker.get_stats()
+            for shard in self._shards
+            for name, breaker in list(shard.items())
+        }
+
+    def open_circuits(self) -> List[str]:
+        """Names of breakers currently rejecting calls"""
+        return sorted(
+            name
+            for shard in self._shards
+            for name, breaker in list(shard.items())
+            if breaker.is_open
+        )
+
+    def reset_all(self):
+        """Close every breaker"""
+        for shard in self._shards:
+            for breaker in list(shard.values()):
+                breaker.reset()
+
+
+_registry: Optional[CircuitBreakerRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_circuit_breaker_registry() -> CircuitBreakerRegistry:
+    """Get the process-wide circuit breaker registry"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = CircuitBreakerRegistry()
+        return _registry
+
+
+def circuit_breaker(
+    name: str, registry: Optional[CircuitBreakerRegistry] = None, **kwargs
+):
+    """
+    Decorator guarding a function with a named breaker from a registry
+
+    Args:
+        name: Breaker name, shared by every function using it
+        registry: Registry to use (the process-wide one by default)
+        **kwargs: CircuitBreaker settings used if the breaker is created
+    """
+
+    def decorator(func):
+        breaker = (registry or get_circuit_breaker_registry()).get_or_create(
+            name, **kwargs
+        )
+
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kw):
+            return await breaker.call_async(func, *args, **kw)
+
+        @functools.wraps(func)
+        def sync_wrapper(*args, **kw):
+            return breaker.call(func, *args, **kw)
+
+        if asyncio.iscoroutinefunction(func):
+            return async_wrapper
+        return sync_wrapper
+
+    return decorator
@@ -18,7 +18,7 @@ from datetime import datetime, timedelta
 from enum import Enum
 from typing import Any, Callable, Dict, List, Optional
 
-from .circuit_breaker import CircuitBreaker
+from .circuit_breaker import CircuitBreaker, get_circuit_breaker_registry
 from .resource_manager import ResourceManager, ResourceStatus, ResourceType
 from .retry_policies import ExponentialBackoff, RetryPolicy
 
@@ -82,8 +82,8 @@ class FallbackProtocol:
             ],
         }
 
-        # Circuit breakers per resource
-        self._circuit_breakers = {}
+        # Circuit breakers per resource, shared process-wide
+        self._circuit_registry = get_circuit_breaker_registry()
 
         # Request queue
         self._request_queue = asyncio.Queue(maxsize=1000)
@@ -93,11 +93,12 @@ class FallbackProtocol:
 
     def get_circuit_breaker(self, resource_type: ResourceType) -> CircuitBreaker:
         """Get or create circuit breaker for resource"""
-        if resource_type not in self._circuit_breakers:
-            self._circuit_breakers[resource_type] = CircuitBreaker(
-                failure_threshold=5, recovery_timeout=60, expected_exception=Exception
-            )
-        return self._circuit_breakers[resource_type]
+        return self._circuit_registry.get_or_create(
+            f"fallback.{resource_type.value}",
+            failure_threshold=5,
+            recovery_timeout=60,
+            expected_exception=Exception,
+        )
 
     async def execute_with_fallback(
         self,
@@ -129,7 +129,7 @@ class ResilienceManager:
                     await self.fallback_protocol.execute_fallback(state)
 
             # Execute with circuit breaker
-            return await breaker.call(func, *args, **kwargs)
+            return await breaker.call_async(func, *args, **kwargs)
 
         # Execute with retry
         return await retry_policy.execute(wrapped)
@@ -181,7 +181,7 @@ class ResilienceManager:
                 }
                 for name, state in self.resource_manager.resources.items()
             },
-            "circuits": self.circuit_registry.get_all_stats(),
+            "circuits": self.circuit_registry.snapshot(),
         }
 
 
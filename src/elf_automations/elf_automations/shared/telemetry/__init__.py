@@ -3,5 +3,11 @@ Lightweight telemetry module for tracking communication patterns
 """
 
 from .telemetry_client import TelemetryClient, telemetry_client
+from .write_behind import PartialWriteError, WriteBehindQueue
 
-__all__ = ["TelemetryClient", "telemetry_client"]
+__all__ = [
+    "TelemetryClient",
+    "telemetry_client",
+    "WriteBehindQueue",
+    "PartialWriteError",
+]
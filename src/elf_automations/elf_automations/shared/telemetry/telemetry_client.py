@@ -1,17 +1,23 @@
 """
 Lightweight telemetry client for fire-and-forget communication tracking
+
+Events are queued in a write-behind buffer and bulk inserted by a single
+writer thread, so recording never waits on Supabase or ties up executor
+threads. Tune with TELEMETRY_BUFFER_SIZE, TELEMETRY_BATCH_SIZE,
+TELEMETRY_FLUSH_INTERVAL and TELEMETRY_SPILL_DIR.
 """
 
-import asyncio
 import logging
 import os
+import threading
 import time
 import uuid
-from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from supabase import Client, create_client
 
+from .write_behind import PartialWriteError, WriteBehindQueue, queue_settings_from_env
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,6 +33,9 @@ class TelemetryClient:
 
         self._client: Optional[Client] = None
         self._enabled = bool(self.supabase_url and self.supabase_key)
+        self._queue: Optional[WriteBehindQueue] = None
+        # Producers on several threads may race to create the client and queue
+        self._lock = threading.Lock()
 
         if not self._enabled:
             logger.info("Telemetry disabled - no Supabase credentials")
@@ -35,11 +44,15 @@ class TelemetryClient:
     def client(self) -> Optional[Client]:
         """Lazy load Supabase client"""
         if self._enabled and not self._client:
-            try:
-                self._client = create_client(self.supabase_url, self.supabase_key)
-            except Exception as e:
-                logger.error(f"Failed to create Supabase client: {e}")
-                self._enabled = False
+            with self._lock:
+                if self._enabled and not self._client:
+                    try:
+                        self._client = create_client(
+                            self.supabase_url, self.supabase_key
+                        )
+                    except Exception as e:
+                        logger.error(f"Failed to create Supabase client: {e}")
+                        self._enabled = False
         return self._client
 
     async def record_a2a(
@@ -68,16 +81,16 @@ class TelemetryClient:
                 "operation": operation,
                 "status": status,
                 "duration_ms": duration_ms,
-                "task_description": task_description[:500]
-                if task_description
-                else None,
+                "task_description": (
+                    task_description[:500] if task_description else None
+                ),
                 "error_message": error_message,
                 "correlation_id": correlation_id or str(uuid.uuid4()),
                 "metadata": metadata or {},
             }
 
-            # Fire and forget - don't await
-            asyncio.create_task(self._insert_telemetry(data))
+            # Fire and forget - queued for the next bulk insert
+            self._enqueue(data)
 
         except Exception as e:
             logger.debug(f"Telemetry error (ignored): {e}")
@@ -117,8 +130,8 @@ class TelemetryClient:
                 "metadata": metadata or {},
             }
 
-            # Fire and forget
-            asyncio.create_task(self._insert_telemetry(data))
+            # Fire and forget - queued for the next bulk insert
+            self._enqueue(data)
 
         except Exception as e:
             logger.debug(f"Telemetry error (ignored): {e}")
@@ -158,26 +171,61 @@ class TelemetryClient:
                 "metadata": metadata or {},
             }
 
-            # Fire and forget
-            asyncio.create_task(self._insert_telemetry(data))
+            # Fire and forget - queued for the next bulk insert
+            self._enqueue(data)
 
         except Exception as e:
             logger.debug(f"Telemetry error (ignored): {e}")
 
-    async def _insert_telemetry(self, data: Dict[str, Any]):
-        """Insert telemetry data to Supabase"""
-        try:
-            if self.client:
-                # Use execute() for async operation
-                await asyncio.get_event_loop().run_in_executor(
-                    None,
-                    lambda: self.client.table("communication_telemetry")
-                    .insert(data)
-                    .execute(),
-                )
-        except Exception as e:
-            # Silently fail - telemetry should not break the application
-            logger.debug(f"Failed to insert telemetry: {e}")
+    @property
+    def queue(self) -> WriteBehindQueue:
+        """Lazily start the write-behind queue"""
+        if self._queue is None:
+            with self._lock:
+                if self._queue is None:
+                    self._queue = WriteBehindQueue(
+                        "communication_telemetry",
+                        self._insert_batch,
+                        **queue_settings_from_env("TELEMETRY"),
+                    )
+        return self._queue
+
+    def _enqueue(self, data: Dict[str, Any]):
+        """Buffer a telemetry row, dropping the oldest if the buffer is full"""
+        self.queue.put(data)
+
+    def _insert_batch(self, rows: List[Dict[str, Any]]):
+        """Bulk insert telemetry rows to Supabase"""
+        client = self.client
+        if not client:
+            raise ConnectionError("Supabase client unavailable")
+
+        # Bulk inserts need matching keys, and each protocol sends its own set
+        groups: Dict[frozenset, List[Dict[str, Any]]] = {}
+        for row in rows:
+            groups.setdefault(frozenset(row), []).append(row)
+        failed: List[Dict[str, Any]] = []
+        error: Optional[Exception] = None
+        for group in groups.values():
+            try:
+                client.table("communication_telemetry").insert(group).execute()
+            except Exception as e:
+                failed.extend(group)
+                error = e
+        if failed:
+            # Only the groups that failed are spilled and retried
+            raise PartialWriteError(failed, error)
+
+    def flush(self):
+        """Write all buffered telemetry now"""
+        if self._queue is not None:
+            self._queue.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Write-behind queue counters"""
+        if self._queue is None:
+            return {"enabled": self._enabled}
+        return {"enabled": self._enabled, **self._queue.get_stats()}
 
     def start_timer(self) -> float:
         """Start a timer for duration tracking"""
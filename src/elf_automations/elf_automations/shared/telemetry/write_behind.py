@@ -0,0 +1,276 @@
+"""
+Write-behind batching queue for fire-and-forget records
+
+Producers append records to a bounded in-memory ring buffer and return
+immediately. A single writer thread drains the buffer into bulk inserts:
+- Flushes when a batch fills up or the flush interval elapses
+- Spills batches to a local JSONL file while the sink is unavailable and
+  replays them once it recovers; a sink that writes part of a batch raises
+  PartialWriteError so only the rest is spilled
+- Drops the oldest records (or makes producers wait) when the buffer is full
+- Counts everything it enqueues, writes, spills, replays and drops
+"""
+
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+Record = Dict[str, Any]
+
+
+class PartialWriteError(Exception):
+    """Raised by a sink that wrote only part of a batch"""
+
+    def __init__(self, failed: List[Record], cause: Optional[Exception] = None):
+        super().__init__(str(cause) if cause else "partial write")
+        self.failed = failed
+        self.cause = cause
+
+
+class WriteBehindQueue:
+    """Bounded buffer drained into bulk inserts by a background thread"""
+
+    def __init__(
+        self,
+        name: str,
+        sink: Callable[[List[Record]], None],
+        capacity: int = 10000,
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+        spill_dir: Optional[str] = None,
+        max_spill_bytes: int = 50 * 1024 * 1024,
+        retry_interval: float = 30.0,
+    ):
+        """
+        Args:
+            name: Queue name, used for the writer thread and spill file
+            sink: Writes a batch; raising marks the sink unavailable, and
+                raising PartialWriteError spills only its failed records
+            capacity: Maximum buffered records
+            batch_size: Records per bulk insert; a full batch flushes at once
+            flush_interval: Maximum seconds a record waits in the buffer
+            spill_dir: Directory for the spill file (defaults to a temp dir)
+            max_spill_bytes: Records beyond this spill size are dropped
+            retry_interval: Seconds between sink retries while unavailable
+        """
+        self.name = name
+        self.sink = sink
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_spill_bytes = max_spill_bytes
+        self.retry_interval = retry_interval
+
+        spill_root = Path(spill_dir or Path(tempfile.gettempdir()) / "elf-spill")
+        spill_root.mkdir(parents=True, exist_ok=True)
+        self.spill_file = spill_root / f"{name}.jsonl"
+
+        self._buffer: Deque[Record] = deque()
+        self._lock = threading.Lock()
+        self._not_full = threading.Condition(self._lock)
+        self._wake = threading.Event()
+        self._write_lock = threading.Lock()
+        self._sink_down_until = 0.0
+        self._closed = False
+
+        self.stats = {
+            "enqueued": 0,
+            "written": 0,
+            "batches": 0,
+            "dropped": 0,
+            "spilled": 0,
+            "replayed": 0,
+            "sink_errors": 0,
+            "backpressure_waits": 0,
+            "max_depth": 0,
+        }
+
+        self._writer = threading.Thread(
+            target=self._write_loop, name=f"write-behind-{name}", daemon=True
+        )
+        self._writer.start()
+        atexit.register(self.close)
+
+    @property
+    def depth(self) -> int:
+        return len(self._buffer)
+
+    def put(self, record: Record, block: bool = False, timeout: float = 1.0) -> bool:
+        """
+        Queue a record without touching the sink.
+
+        With block=False a full buffer drops its oldest record; with
+        block=True the caller waits up to `timeout` for room and the new
+        record is dropped if none frees up. Returns False if a record was
+        dropped.
+        """
+        with self._lock:
+            accepted = True
+            if len(self._buffer) >= self.capacity:
+                if block:
+                    self.stats["backpressure_waits"] += 1
+                    self._wake.set()
+                    self._not_full.wait_for(
+                        lambda: len(self._buffer) < self.capacity, timeout
+                    )
+                if len(self._buffer) >= self.capacity:
+                    self.stats["dropped"] += 1
+                    if block:
+                        return False
+                    self._buffer.popleft()
+                    accepted = False
+
+            self._buffer.append(record)
+            self.stats["enqueued"] += 1
+            depth = len(self._buffer)
+            if depth > self.stats["max_depth"]:
+                self.stats["max_depth"] = depth
+
+        if depth >= self.batch_size:
+            self._wake.set()
+        return accepted
+
+    def _take_batch(self) -> List[Record]:
+        with self._lock:
+            count = min(self.batch_size, len(self._buffer))
+            batch = [self._buffer.popleft() for _ in range(count)]
+            if batch:
+                self._not_full.notify_all()
+            return batch
+
+    def _write_loop(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Write-behind queue {self.name} failed to flush: {e}")
+
+    def flush(self):
+        """Write everything buffered now, spilling if the sink is down"""
+        with self._write_lock:
+            if self._sink_available():
+                self._replay_spill()
+
+            while True:
+                batch = self._take_batch()
+                if not batch:
+                    return
+                if not self._sink_available():
+                    self._spill(batch)
+                    continue
+                failed = self._write(batch)
+                if failed:
+                    self._spill(failed)
+
+    def _sink_available(self) -> bool:
+        return time.monotonic() >= self._sink_down_until
+
+    def _write(self, batch: List[Record]) -> List[Record]:
+        """Send a batch to the sink, returning the records it did not write"""
+        try:
+            self.sink(batch)
+            failed: List[Record] = []
+        except PartialWriteError as e:
+            failed, error = e.failed, e
+        except Exception as e:
+            failed, error = batch, e
+
+        if failed:
+            self.stats["sink_errors"] += 1
+            self._sink_down_until = time.monotonic() + self.retry_interval
+            logger.warning(
+                f"Write-behind sink {self.name} failed {len(failed)} of "
+                f"{len(batch)} records, spilling to disk: {error}"
+            )
+        if len(failed) < len(batch):
+            self.stats["written"] += len(batch) - len(failed)
+            self.stats["batches"] += 1
+        return failed
+
+    def _spill(self, batch: List[Record], replaying: bool = False):
+        try:
+            size = self.spill_file.stat().st_size if self.spill_file.exists() else 0
+            if size >= self.max_spill_bytes:
+                self.stats["dropped"] += len(batch)
+                return
+            with open(self.spill_file, "a") as f:
+                f.write("".join(json.dumps(r, default=str) + "\n" for r in batch))
+            if not replaying:
+                self.stats["spilled"] += len(batch)
+        except OSError as e:
+            self.stats["dropped"] += len(batch)
+            logger.error(f"Failed to spill {len(batch)} records for {self.name}: {e}")
+
+    def _replay_spill(self):
+        """Send spilled records back through the sink, oldest first"""
+        if not self.spill_file.exists():
+            return
+
+        # Claim the file first so new spills go to a fresh one
+        replay_file = self.spill_file.with_suffix(".replay")
+        if not replay_file.exists():
+            self.spill_file.replace(replay_file)
+
+        with open(replay_file, "r") as f:
+            records = []
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+
+        for start in range(0, len(records), self.batch_size):
+            batch = records[start : start + self.batch_size]
+            failed = self._write(batch)
+            self.stats["replayed"] += len(batch) - len(failed)
+            if failed:
+                # Keep the failed records and the rest for the next attempt
+                self._spill(failed + records[start + len(batch) :], replaying=True)
+                break
+
+        replay_file.unlink(missing_ok=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue counters plus current depth and sink state"""
+        stats = dict(self.stats)
+        stats["depth"] = self.depth
+        stats["capacity"] = self.capacity
+        stats["sink_available"] = self._sink_available()
+        return stats
+
+    def close(self):
+        """Flush what is buffered and stop the writer"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Write-behind queue {self.name} failed to flush: {e}")
+
+
+def queue_settings_from_env(prefix: str) -> Dict[str, Any]:
+    """Read WriteBehindQueue settings from <PREFIX>_* environment variables"""
+    settings: Dict[str, Any] = {}
+    for key, env, cast in (
+        ("capacity", "BUFFER_SIZE", int),
+        ("batch_size", "BATCH_SIZE", int),
+        ("flush_interval", "FLUSH_INTERVAL", float),
+        ("spill_dir", "SPILL_DIR", str),
+    ):
+        value = os.getenv(f"{prefix}_{env}")
+        if value:
+            settings[key] = cast(value)
+    return settings
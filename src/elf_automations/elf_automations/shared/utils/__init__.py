@@ -3,15 +3,37 @@ Utility functions for ElfAutomations teams
 """
 
 from .config import get_env_var, load_team_config
+from .http_transport import (
+    BackgroundLoop,
+    SharedTransport,
+    TransportConfig,
+    create_http_client,
+    get_pool_stats,
+    get_shared_transport,
+    run_sync,
+    shutdown_http_transport,
+)
+from .llm_cache import LLMResponseCache, get_response_cache
 from .llm_factory import LLMFactory
 from .llm_with_quota import QuotaTrackedLLM
-from .logging import get_team_logger, setup_team_logging
+from .logging import get_logger, get_team_logger, setup_team_logging
 
 __all__ = [
     "setup_team_logging",
     "get_team_logger",
+    "get_logger",
     "load_team_config",
     "get_env_var",
     "LLMFactory",
     "QuotaTrackedLLM",
+    "LLMResponseCache",
+    "get_response_cache",
+    "SharedTransport",
+    "TransportConfig",
+    "BackgroundLoop",
+    "create_http_client",
+    "get_shared_transport",
+    "get_pool_stats",
+    "run_sync",
+    "shutdown_http_transport",
 ]
@@ -0,0 +1,382 @@
+"""
+Response cache for LLM calls
+
+Opt-in cache consulted by FallbackLLM and QuotaTrackedLLM before a provider
+is called:
+- Exact-match keys over the normalized prompt, model, temperature and call
+  options
+- Optional embedding-similarity lookups above a threshold, scoped to the
+  same model, temperature and options
+- TTL expiry with a size-bounded in-memory LRU in front of a local SQLite
+  store shared across processes
+- Hit/miss statistics; QuotaTrackedLLM journals hits as zero-cost usage
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.messages import messages_from_dict, messages_to_dict
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(input: Any) -> str:
+    """Canonical text for a prompt: whitespace collapsed, roles kept"""
+    if isinstance(input, str):
+        return _WHITESPACE.sub(" ", input).strip()
+
+    parts = []
+    for message in input:
+        role = getattr(message, "type", None) or type(message).__name__
+        content = getattr(message, "content", message)
+        if not isinstance(content, str):
+            content = json.dumps(content, sort_keys=True, default=str)
+        parts.append(f"{role}: {_WHITESPACE.sub(' ', content).strip()}")
+    return "\n".join(parts)
+
+
+class LLMResponseCache:
+    """Exact and semantic response cache with TTL and size-bounded eviction"""
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        ttl_seconds: float = 24 * 3600,
+        max_entries: int = 5000,
+        similarity_threshold: Optional[float] = None,
+        embedding_service=None,
+    ):
+        """
+        Args:
+            cache_dir: Directory for the SQLite store (memory only if None)
+            ttl_seconds: How long a response stays valid
+            max_entries: Entries kept in memory and on disk
+            similarity_threshold: Cosine similarity (0-1) for near-match hits;
+                None disables semantic lookups
+            embedding_service: Service with embed_one(text); required when
+                similarity_threshold is set
+        """
+        if similarity_threshold is not None and embedding_service is None:
+            raise ValueError("similarity_threshold requires an embedding_service")
+
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.embedding_service = embedding_service
+
+        self._lru: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.RLock()
+        # scope -> (keys, vectors) for semantic lookups, and key -> scope in
+        # insertion order so at most max_entries vectors are held
+        self._vectors: Dict[str, Tuple[List[str], List[Any]]] = {}
+        self._vector_scopes: "OrderedDict[str, str]" = OrderedDict()
+
+        self._conn: Optional[sqlite3.Connection] = None
+        if cache_dir:
+            path = Path(cache_dir)
+            path.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(
+                str(path / "llm_responses.db"), check_same_thread=False, timeout=30
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, scope TEXT, response TEXT, "
+                "embedding BLOB, created_at REAL, last_used REAL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_scope ON responses(scope)"
+            )
+            self._conn.commit()
+
+        self.stats = {"hits": 0, "semantic_hits": 0, "misses": 0, "stores": 0}
+
+    # Keys
+
+    @staticmethod
+    def _scope(model: str, temperature: Optional[float], options: Dict) -> str:
+        signature = json.dumps(
+            {"model": model, "temperature": temperature, "options": options},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(signature.encode()).hexdigest()
+
+    @staticmethod
+    def _key(scope: str, prompt: str) -> str:
+        return hashlib.sha256(f"{scope}\0{prompt}".encode()).hexdigest()
+
+    # Lookup
+
+    def get(
+        self,
+        input: Any,
+        model: str,
+        temperature: Optional[float] = None,
+        options: Optional[Dict] = None,
+    ) -> Optional[Any]:
+        """Cached response for a prompt, or None"""
+        prompt = normalize_prompt(input)
+        scope = self._scope(model, temperature, options or {})
+        key = self._key(scope, prompt)
+
+        payload = self._get_exact(key)
+        if payload is not None:
+            self.stats["hits"] += 1
+            return self._decode(payload)
+
+        if self.similarity_threshold is not None:
+            payload = self._get_similar(scope, prompt)
+            if payload is not None:
+                self.stats["semantic_hits"] += 1
+                return self._decode(payload)
+
+        self.stats["misses"] += 1
+        return None
+
+    def _get_exact(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None:
+                created_at, payload = entry
+                if now - created_at <= self.ttl_seconds:
+                    self._lru.move_to_end(key)
+                    return payload
+                del self._lru[key]
+
+            if not self._conn:
+                return None
+
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if not row or now - row[1] > self.ttl_seconds:
+                return None
+
+            self._conn.execute(
+                "UPDATE responses SET last_used = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self._remember(key, row[1], row[0])
+            return row[0]
+
+    def _get_similar(self, scope: str, prompt: str) -> Optional[str]:
+        import numpy as np
+
+        keys, vectors = self._scope_vectors(scope)
+        if not keys:
+            return None
+
+        query = self.embedding_service.embed_one(prompt)
+        matrix = np.stack(vectors)
+        norms = np.linalg.norm(matrix, axis=1) * (np.linalg.norm(query) or 1.0)
+        scores = matrix @ query / np.where(norms == 0, 1.0, norms)
+
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity_threshold:
+            return None
+        return self._get_exact(keys[best])
+
+    def _scope_vectors(self, scope: str) -> Tuple[List[str], List[Any]]:
+        """Embeddings of cached prompts in a scope, loaded from disk once"""
+        import numpy as np
+
+        with self._lock:
+            if scope not in self._vectors:
+                self._vectors[scope] = ([], [])
+                if self._conn:
+                    cutoff = time.time() - self.ttl_seconds
+                    for key, blob in self._conn.execute(
+                        "SELECT key, embedding FROM responses "
+                        "WHERE scope = ? AND embedding IS NOT NULL "
+                        "AND created_at >= ?",
+                        (scope, cutoff),
+                    ):
+                        self._add_vector(
+                            scope, key, np.frombuffer(blob, dtype=np.float32)
+                        )
+            return self._vectors[scope]
+
+    def _add_vector(self, scope: str, key: str, vector: Any):
+        """Index a prompt embedding, dropping the oldest past max_entries"""
+        if key in self._vector_scopes:
+            return
+        keys, vectors = self._vectors.setdefault(scope, ([], []))
+        keys.append(key)
+        vectors.append(vector)
+        self._vector_scopes[key] = scope
+
+        while len(self._vector_scopes) > self.max_entries:
+            old_key, old_scope = self._vector_scopes.popitem(last=False)
+            old_keys, old_vectors = self._vectors[old_scope]
+            index = old_keys.index(old_key)
+            del old_keys[index]
+            del old_vectors[index]
+
+    # Storage
+
+    def put(
+        self,
+        input: Any,
+        model: str,
+        response: Any,
+        temperature: Optional[float] = None,
+        options: Optional[Dict] = None,
+    ):
+        """Cache a response for a prompt"""
+        try:
+            payload = json.dumps(messages_to_dict([response]))
+        except Exception as e:
+            logger.debug(f"Not caching unserializable LLM response: {e}")
+            return
+
+        prompt = normalize_prompt(input)
+        scope = self._scope(model, temperature, options or {})
+        key = self._key(scope, prompt)
+        now = time.time()
+
+        vector = None
+        if self.similarity_threshold is not None:
+            try:
+                vector = self.embedding_service.embed_one(prompt)
+            except Exception as e:
+                logger.warning(f"Failed to embed prompt for the LLM cache: {e}")
+
+        with self._lock:
+            self._remember(key, now, payload)
+            if vector is not None:
+                self._scope_vectors(scope)
+                self._add_vector(scope, key, vector)
+
+            if self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses "
+                    "(key, scope, response, embedding, created_at, last_used) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        key,
+                        scope,
+                        payload,
+                        vector.tobytes() if vector is not None else None,
+                        now,
+                        now,
+                    ),
+                )
+                self._conn.commit()
+            self.stats["stores"] += 1
+
+            if self.stats["stores"] % 100 == 0:
+                self.evict()
+
+    def _remember(self, key: str, created_at: float, payload: str):
+        with self._lock:
+            self._lru[key] = (created_at, payload)
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    @staticmethod
+    def _decode(payload: str) -> Any:
+        response = messages_from_dict(json.loads(payload))[0]
+        response.response_metadata = {
+            **(response.response_metadata or {}),
+            "cache_hit": True,
+        }
+        return response
+
+    def evict(self) -> int:
+        """Drop expired entries and trim the store to max_entries"""
+        if not self._conn:
+            return 0
+
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            removed = self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (cutoff,)
+            ).rowcount
+            removed += self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY last_used DESC "
+                "LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+            self._conn.commit()
+            if removed:
+                # Reload semantic candidates lazily
+                self._vectors.clear()
+                self._vector_scopes.clear()
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        lookups = (
+            self.stats["hits"] + self.stats["semantic_hits"] + self.stats["misses"]
+        )
+        hits = self.stats["hits"] + self.stats["semantic_hits"]
+        return {
+            **self.stats,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._lru),
+        }
+
+    def clear(self):
+        """Drop every cached response"""
+        with self._lock:
+            self._lru.clear()
+            self._vectors.clear()
+            self._vector_scopes.clear()
+            if self._conn:
+                self._conn.execute("DELETE FROM responses")
+                self._conn.commit()
+
+
+_default_cache: Optional[LLMResponseCache] = None
+_default_lock = threading.Lock()
+
+
+def get_response_cache() -> LLMResponseCache:
+    """
+    Get the process-wide LLM response cache.
+
+    Configured from the environment:
+        LLM_CACHE_DIR: Directory for the on-disk store
+            (default ~/.elf_automations/llm_cache)
+        LLM_CACHE_TTL: Seconds a response stays valid (default 86400)
+        LLM_CACHE_MAX_ENTRIES: Size bound (default 5000)
+        LLM_CACHE_SIMILARITY_THRESHOLD: Enables semantic hits, e.g. 0.95,
+            using the memory system's shared embedding service
+    """
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            threshold = os.getenv("LLM_CACHE_SIMILARITY_THRESHOLD")
+            embedding_service = None
+            if threshold:
+                from ..memory.embedding_service import get_embedding_service
+
+                embedding_service = get_embedding_service()
+            _default_cache = LLMResponseCache(
+                cache_dir=Path(
+                    os.getenv(
+                        "LLM_CACHE_DIR",
+                        str(Path.home() / ".elf_automations" / "llm_cache"),
+                    )
+                ),
+                ttl_seconds=float(os.getenv("LLM_CACHE_TTL", 24 * 3600)),
+                max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", 5000)),
+                similarity_threshold=float(threshold) if threshold else None,
+                embedding_service=embedding_service,
+            )
+        return _default_cache
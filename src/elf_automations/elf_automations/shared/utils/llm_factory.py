@@ -13,6 +13,7 @@ from langchain_anthropic import ChatAnthropic
 from langchain_openai import ChatOpenAI
 
 from ..quota import QuotaManager
+from .llm_cache import LLMResponseCache, get_response_cache
 from .llm_with_quota import QuotaTrackedLLM
 from .llm_wrapper import FallbackLLM
 from .providers import ChatLocalModel, ChatOpenRouter
@@ -51,6 +52,7 @@ class LLMFactory:
         temperature: float = 0.7,
         team_name: Optional[str] = None,
         enable_fallback: bool = True,
+        response_cache: Union[bool, LLMResponseCache, None] = None,
     ) -> Union[ChatOpenAI, ChatAnthropic, FallbackLLM]:
         """
         Create an LLM with automatic fallback on quota errors
@@ -61,10 +63,14 @@ class LLMFactory:
             temperature: Temperature for generation
             team_name: Team name for logging
             enable_fallback: Whether to enable runtime fallback (default: True)
+            response_cache: LLMResponseCache to answer repeated prompts from,
+                or True for the process-wide cache (used with fallback enabled)
 
         Returns:
             Configured LLM instance (with fallback wrapper if enabled)
         """
+        response_cache = cls._resolve_cache(response_cache)
+
         if enable_fallback:
             # Return wrapper that handles runtime quota errors
             return FallbackLLM(
@@ -73,6 +79,7 @@ class LLMFactory:
                 preferred_provider=preferred_provider,
                 preferred_model=preferred_model,
                 temperature=temperature,
+                response_cache=response_cache,
             )
 
         # Original behavior - try to create without runtime fallback
@@ -103,6 +110,14 @@ class LLMFactory:
             "All LLM options exhausted. No API keys available or all quotas exceeded."
         )
 
+    @staticmethod
+    def _resolve_cache(
+        response_cache: Union[bool, LLMResponseCache, None],
+    ) -> Optional[LLMResponseCache]:
+        if response_cache is True:
+            return get_response_cache()
+        return response_cache or None
+
     @classmethod
     def _create_single_llm(cls, provider: str, model: str, temperature: float):
         """Create a single LLM instance"""
@@ -161,6 +176,7 @@ class LLMFactory:
         quota_manager: Optional[QuotaManager] = None,
         enable_fallback: bool = True,
         supabase_client: Optional["Client"] = None,
+        response_cache: Union[bool, LLMResponseCache, None] = None,
     ) -> QuotaTrackedLLM:
         """
         Create LLM with integrated quota tracking and fallback
@@ -179,6 +195,8 @@ class LLMFactory:
             quota_manager: Optional QuotaManager instance
             enable_fallback: Whether to enable runtime fallback
             supabase_client: Optional Supabase client for cost monitoring
+            response_cache: LLMResponseCache to answer repeated prompts from,
+                or True for the process-wide cache; hits cost nothing
 
         Returns:
             QuotaTrackedLLM instance with full tracking
@@ -206,4 +224,5 @@ class LLMFactory:
             temperature=temperature,
             quota_manager=quota_manager,
             supabase_client=supabase_client,
+            response_cache=cls._resolve_cache(response_cache),
         )
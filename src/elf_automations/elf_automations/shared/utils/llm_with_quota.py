@@ -1,13 +1,17 @@
 """
 LLM wrapper with integrated quota tracking
 
-Combines LLM fallback with quota management.
+Combines LLM fallback with quota management. Every call reserves its
+estimated cost before it starts and settles the actual usage afterwards, so
+concurrent calls (threads or asyncio tasks) cannot overspend the budget
+together.
 """
 
+import asyncio
 import logging
 import os
 from pathlib import Path
-from typing import Any, Optional, Union
+from typing import Any, AsyncIterator, Iterator, List, Optional, Tuple, Union
 
 from langchain_anthropic import ChatAnthropic
 from langchain_core.messages import BaseMessage
@@ -29,6 +33,9 @@ except ImportError:
         "Supabase not available - cost monitoring will use local storage only"
     )
 
+# Output tokens reserved when neither the call nor the model sets max_tokens
+DEFAULT_OUTPUT_TOKENS = 1000
+
 
 class QuotaTrackedLLM(FallbackLLM):
     """LLM wrapper that tracks quota usage automatically"""
@@ -42,6 +49,7 @@ class QuotaTrackedLLM(FallbackLLM):
         temperature: float = 0.7,
         quota_manager: Optional[QuotaManager] = None,
         supabase_client: Optional["Client"] = None,
+        response_cache=None,
     ):
         """
         Initialize quota-tracked LLM
@@ -54,9 +62,16 @@ class QuotaTrackedLLM(FallbackLLM):
             temperature: Temperature setting
             quota_manager: Optional QuotaManager instance (creates one if not provided)
             supabase_client: Optional Supabase client for cost monitoring
+            response_cache: Optional LLMResponseCache; hits cost nothing and
+                are reported as cache hits in usage reports
         """
         super().__init__(
-            llm_factory, team_name, preferred_provider, preferred_model, temperature
+            llm_factory,
+            team_name,
+            preferred_provider,
+            preferred_model,
+            temperature,
+            response_cache=response_cache,
         )
 
         # Initialize quota manager if not provided
@@ -82,102 +97,267 @@ class QuotaTrackedLLM(FallbackLLM):
                     logger.warning(f"Failed to initialize Supabase client: {e}")
                     self.supabase_client = None
 
+    def _estimate_input_tokens(self, input: Union[str, list[BaseMessage]]) -> int:
+        # Rough estimation: ~4 chars per token
+        if isinstance(input, str):
+            return len(input) // 4
+        return sum(len(str(msg)) for msg in input) // 4
+
+    def _switch_to_model(self, model_name: str):
+        """Move the fallback chain to a specific model"""
+        for i, (provider, model, temp) in enumerate(self.models_to_try):
+            if model == model_name:
+                self._current_index = i - 1  # Will be incremented by _get_next_llm
+                self._get_next_llm()
+                break
+
+    def _begin_request(
+        self, input: Union[str, list[BaseMessage]], kwargs: dict
+    ) -> Tuple[str, str]:
+        """
+        Reserve the estimated cost of a call and start tracking it
+
+        Returns:
+            (request_id, reservation_id)
+        """
+        output_tokens = (
+            kwargs.get("max_tokens")
+            or getattr(self._current_llm, "max_tokens", None)
+            or DEFAULT_OUTPUT_TOKENS
+        )
+        reservation_id, alt_model = self.quota_manager.reserve(
+            self.team_name,
+            self.model_name,
+            self._estimate_input_tokens(input),
+            output_tokens,
+        )
+
+        if reservation_id is None:
+            logger.error(f"Team {self.team_name} has exceeded quota")
+            raise Exception(f"Quota exceeded for team {self.team_name}")
+
+        # Use alternative model if suggested
+        if alt_model and alt_model != self.model_name:
+            logger.info(
+                f"Quota manager suggests using {alt_model} instead of {self.model_name}"
+            )
+            self._switch_to_model(alt_model)
+
+        request_id = self.usage_tracker.track_request(self.team_name, self.model_name)
+        return request_id, reservation_id
+
+    def _extract_usage(
+        self, result: Any, input: Union[str, list[BaseMessage]]
+    ) -> Tuple[int, int]:
+        """Token usage reported by the provider, or an estimate"""
+        input_tokens = 0
+        output_tokens = 0
+
+        # Try to get usage from result
+        if hasattr(result, "_response") and hasattr(result._response, "usage"):
+            usage = result._response.usage
+            if hasattr(usage, "prompt_tokens"):
+                input_tokens = usage.prompt_tokens
+            if hasattr(usage, "completion_tokens"):
+                output_tokens = usage.completion_tokens
+        elif getattr(result, "usage_metadata", None):
+            input_tokens = result.usage_metadata.get("input_tokens", 0)
+            output_tokens = result.usage_metadata.get("output_tokens", 0)
+        elif hasattr(result, "response_metadata"):
+            metadata = result.response_metadata
+            if "token_usage" in metadata:
+                input_tokens = metadata["token_usage"].get("prompt_tokens", 0)
+                output_tokens = metadata["token_usage"].get("completion_tokens", 0)
+            elif "usage" in metadata:
+                input_tokens = metadata["usage"].get("input_tokens", 0)
+                output_tokens = metadata["usage"].get("output_tokens", 0)
+
+        # If we couldn't get exact counts, estimate
+        if input_tokens == 0 and output_tokens == 0:
+            input_tokens = self._estimate_input_tokens(input)
+
+            if hasattr(result, "content"):
+                output_tokens = len(result.content) // 4
+            else:
+                output_tokens = 100  # Default estimate
+
+        return input_tokens, output_tokens
+
+    def _finish_request(
+        self,
+        request_id: str,
+        reservation_id: str,
+        result: Any,
+        input: Union[str, list[BaseMessage]],
+        model: str,
+    ) -> Tuple[int, int, float]:
+        """
+        Settle the reservation with actual usage; returns (in, out, cost)
+
+        `model` is the model that served the call, which a concurrent
+        fallback may have moved self.model_name away from.
+        """
+        input_tokens, output_tokens = self._extract_usage(result, input)
+
+        # Update tracking
+        self.usage_tracker.update_tokens(
+            request_id, input_tokens, output_tokens, model=model
+        )
+        request_data = self.usage_tracker.complete_request(request_id, reservation_id)
+        total_cost = request_data.get("cost", 0.0)
+
+        logger.info(
+            f"Team {self.team_name} used {model}: "
+            f"{input_tokens + output_tokens} tokens (${total_cost:.4f})"
+        )
+        return input_tokens, output_tokens, total_cost
+
+    def _abort_request(self, request_id: str, reservation_id: str):
+        """Complete tracking for a failed call, releasing its reservation"""
+        self.usage_tracker.complete_request(request_id, reservation_id)
+
+    def _record_cache_hit(self):
+        """Journal a zero-cost cache hit so it shows up in usage reports"""
+        self.quota_manager.track_cache_hit(self.team_name, self.model_name)
+        logger.info(f"Team {self.team_name} served {self.model_name} from cache")
+
     def invoke(self, input: Union[str, list[BaseMessage]], **kwargs) -> Any:
         """Invoke with quota tracking"""
-        # Start tracking
-        request_id = self.usage_tracker.track_request(self.team_name, self.model_name)
+        cached = self._cache_lookup(input, kwargs)
+        if cached is not None:
+            self._record_cache_hit()
+            return cached
+
+        request_id, reservation_id = self._begin_request(input, kwargs)
 
         try:
-            # Check quota before proceeding
-            can_proceed, alt_model = self.quota_manager.can_make_request(
-                self.team_name,
-                self.model_name,
-                estimated_tokens=1000,  # Conservative estimate
-            )
+            # Invoke the LLM
+            result, model = self._invoke_with_fallback(input, **kwargs)
+        except BaseException:
+            # Complete tracking even on error or interruption
+            self._abort_request(request_id, reservation_id)
+            raise
 
-            if not can_proceed:
-                logger.error(f"Team {self.team_name} has exceeded quota")
-                raise Exception(f"Quota exceeded for team {self.team_name}")
+        input_tokens, output_tokens, total_cost = self._finish_request(
+            request_id, reservation_id, result, input, model
+        )
 
-            # Use alternative model if suggested
-            if alt_model and alt_model != self.model_name:
-                logger.info(
-                    f"Quota manager suggests using {alt_model} instead of {self.model_name}"
-                )
-                # Try to switch to alternative model
-                for i, (provider, model, temp) in enumerate(self.models_to_try):
-                    if model == alt_model:
-                        self._current_index = (
-                            i - 1
-                        )  # Will be incremented by _get_next_llm
-                        self._get_next_llm()
-                        break
+        # Record to Supabase if available
+        if self.supabase_client:
+            self._record_to_supabase(model, input_tokens, output_tokens, total_cost)
 
-            # Invoke the LLM
-            result = super().invoke(input, **kwargs)
-
-            # Extract token usage
-            input_tokens = 0
-            output_tokens = 0
-
-            # Try to get usage from result
-            if hasattr(result, "_response") and hasattr(result._response, "usage"):
-                usage = result._response.usage
-                if hasattr(usage, "prompt_tokens"):
-                    input_tokens = usage.prompt_tokens
-                if hasattr(usage, "completion_tokens"):
-                    output_tokens = usage.completion_tokens
-            elif hasattr(result, "response_metadata"):
-                metadata = result.response_metadata
-                if "token_usage" in metadata:
-                    input_tokens = metadata["token_usage"].get("prompt_tokens", 0)
-                    output_tokens = metadata["token_usage"].get("completion_tokens", 0)
-                elif "usage" in metadata:
-                    input_tokens = metadata["usage"].get("input_tokens", 0)
-                    output_tokens = metadata["usage"].get("output_tokens", 0)
-
-            # If we couldn't get exact counts, estimate
-            if input_tokens == 0 and output_tokens == 0:
-                # Rough estimation: ~4 chars per token
-                if isinstance(input, str):
-                    input_tokens = len(input) // 4
-                else:
-                    input_tokens = sum(len(str(msg)) for msg in input) // 4
-
-                if hasattr(result, "content"):
-                    output_tokens = len(result.content) // 4
-                else:
-                    output_tokens = 100  # Default estimate
-
-            # Update tracking
-            self.usage_tracker.update_tokens(request_id, input_tokens, output_tokens)
-            self.usage_tracker.complete_request(request_id)
-
-            # Log usage
-            cost = self.quota_manager.MODEL_COSTS.get(
-                self.model_name, self.quota_manager.MODEL_COSTS["gpt-3.5-turbo"]
-            )
-            total_cost = (
-                input_tokens * cost["input"] + output_tokens * cost["output"]
-            ) / 1000
+        self._cache_store(input, kwargs, result)
+        return result
 
-            logger.info(
-                f"Team {self.team_name} used {self.model_name}: "
-                f"{input_tokens + output_tokens} tokens (${total_cost:.4f})"
+    async def ainvoke(self, input: Union[str, list[BaseMessage]], **kwargs) -> Any:
+        """Invoke with quota tracking without blocking the event loop"""
+        if self.response_cache is not None:
+            cached = await asyncio.to_thread(self._cache_lookup, input, kwargs)
+            if cached is not None:
+                self._record_cache_hit()
+                return cached
+
+        request_id, reservation_id = self._begin_request(input, kwargs)
+
+        try:
+            result, model = await self._ainvoke_with_fallback(input, **kwargs)
+        except BaseException:
+            # Cancellation must release the reservation too
+            self._abort_request(request_id, reservation_id)
+            raise
+
+        input_tokens, output_tokens, total_cost = self._finish_request(
+            request_id, reservation_id, result, input, model
+        )
+
+        # The Supabase client is synchronous; keep it off the event loop
+        if self.supabase_client:
+            await asyncio.to_thread(
+                self._record_to_supabase,
+                model,
+                input_tokens,
+                output_tokens,
+                total_cost,
             )
 
-            # Record to Supabase if available
-            if self.supabase_client:
-                self._record_to_supabase(
-                    self.model_name, input_tokens, output_tokens, total_cost
-                )
+        if self.response_cache is not None:
+            await asyncio.to_thread(self._cache_store, input, kwargs, result)
+        return result
 
-            return result
+    async def abatch(
+        self,
+        inputs: List[Union[str, list[BaseMessage]]],
+        max_concurrency: Optional[int] = None,
+        return_exceptions: bool = False,
+        **kwargs,
+    ) -> List[Any]:
+        """Invoke concurrently for several inputs, each with its own reservation"""
+        return await super().abatch(
+            inputs,
+            max_concurrency=max_concurrency,
+            return_exceptions=return_exceptions,
+            **kwargs,
+        )
 
-        except Exception as e:
-            # Complete tracking even on error
-            self.usage_tracker.complete_request(request_id)
-            raise
+    @staticmethod
+    def _add_chunk(aggregate: Any, chunk: Any) -> Any:
+        """Accumulate streamed message chunks (usage metadata included)"""
+        if aggregate is None:
+            return chunk
+        try:
+            return aggregate + chunk
+        except TypeError:
+            return chunk
+
+    def stream(self, input: Union[str, list[BaseMessage]], **kwargs) -> Iterator[Any]:
+        """Stream with quota tracking; usage is settled when the stream ends"""
+        request_id, reservation_id = self._begin_request(input, kwargs)
+        aggregate = None
+        model = None
+
+        try:
+            for model, chunk in self._stream_with_fallback(input, **kwargs):
+                aggregate = self._add_chunk(aggregate, chunk)
+                yield chunk
+        finally:
+            if aggregate is None:
+                self._abort_request(request_id, reservation_id)
+            else:
+                input_tokens, output_tokens, total_cost = self._finish_request(
+                    request_id, reservation_id, aggregate, input, model
+                )
+                if self.supabase_client:
+                    self._record_to_supabase(
+                        model, input_tokens, output_tokens, total_cost
+                    )
+
+    async def astream(
+        self, input: Union[str, list[BaseMessage]], **kwargs
+    ) -> AsyncIterator[Any]:
+        """Stream asynchronously with quota tracking"""
+        request_id, reservation_id = self._begin_request(input, kwargs)
+        aggregate = None
+        model = None
+
+        try:
+            async for model, chunk in self._astream_with_fallback(input, **kwargs):
+                aggregate = self._add_chunk(aggregate, chunk)
+                yield chunk
+        finally:
+            if aggregate is None:
+                self._abort_request(request_id, reservation_id)
+            else:
+                input_tokens, output_tokens, total_cost = self._finish_request(
+                    request_id, reservation_id, aggregate, input, model
+                )
+                if self.supabase_client:
+                    await asyncio.to_thread(
+                        self._record_to_supabase,
+                        model,
+                        input_tokens,
+                        output_tokens,
+                        total_cost,
+                    )
 
     def get_usage_report(self, days: int = 7) -> dict:
         """Get usage report for this team"""
@@ -1,11 +1,14 @@
 """
 LLM Wrapper with runtime fallback support
 
-Wraps LLM instances to handle quota errors during invoke.
+Wraps LLM instances to handle quota errors during invoke, on both the
+synchronous and the asyncio paths. Optionally answers repeated prompts from
+an LLMResponseCache.
 """
 
+import asyncio
 import logging
-from typing import Any, List, Optional, Union
+from typing import Any, AsyncIterator, Iterator, List, Optional, Tuple, Union
 
 from langchain_anthropic import ChatAnthropic
 from langchain_core.messages import BaseMessage
@@ -24,12 +27,14 @@ class FallbackLLM:
         preferred_provider: str = "openai",
         preferred_model: str = "gpt-4",
         temperature: float = 0.7,
+        response_cache=None,
     ):
         self.llm_factory = llm_factory
         self.team_name = team_name
         self.preferred_provider = preferred_provider
         self.preferred_model = preferred_model
         self.temperature = temperature
+        self.response_cache = response_cache
         self._current_llm = None
         self._current_index = -1
         self._initialize_llm()
@@ -73,16 +78,80 @@ class FallbackLLM:
 
         return False
 
+    @staticmethod
+    def _is_quota_error(error: Exception) -> bool:
+        error_str = str(error)
+        return "quota" in error_str.lower() or "429" in error_str
+
+    def _fall_back_from(self, llm, error: Exception) -> bool:
+        """
+        Move past an LLM that hit its quota.
+
+        Concurrent calls can fail on the same model; only the first one
+        advances the chain, the rest simply retry on its replacement.
+        """
+        logger.warning(f"Quota error with current model: {error}")
+        if self._current_llm is not llm:
+            return self._current_llm is not None
+        return self._get_next_llm()
+
+    def _cache_lookup(self, input: Union[str, List[BaseMessage]], kwargs: dict):
+        """Cached response for this prompt on the current model, if any"""
+        if self.response_cache is None:
+            return None
+        try:
+            return self.response_cache.get(
+                input, self.model_name, self.temperature, kwargs
+            )
+        except Exception as e:
+            logger.warning(f"LLM cache lookup failed: {e}")
+            return None
+
+    def _cache_store(
+        self, input: Union[str, List[BaseMessage]], kwargs: dict, result: Any
+    ):
+        if self.response_cache is None:
+            return
+        try:
+            self.response_cache.put(
+                input, self.model_name, result, self.temperature, kwargs
+            )
+        except Exception as e:
+            logger.warning(f"LLM cache store failed: {e}")
+
     def invoke(self, input: Union[str, List[BaseMessage]], **kwargs) -> Any:
         """Invoke with automatic fallback on quota errors"""
+        cached = self._cache_lookup(input, kwargs)
+        if cached is not None:
+            return cached
+
+        result, _ = self._invoke_with_fallback(input, **kwargs)
+        self._cache_store(input, kwargs, result)
+        return result
+
+    async def ainvoke(self, input: Union[str, List[BaseMessage]], **kwargs) -> Any:
+        """Invoke without blocking the event loop, with fallback on quota errors"""
+        if self.response_cache is not None:
+            cached = await asyncio.to_thread(self._cache_lookup, input, kwargs)
+            if cached is not None:
+                return cached
+
+        result, _ = await self._ainvoke_with_fallback(input, **kwargs)
+        if self.response_cache is not None:
+            await asyncio.to_thread(self._cache_store, input, kwargs, result)
+        return result
+
+    def _invoke_with_fallback(
+        self, input: Union[str, List[BaseMessage]], **kwargs
+    ) -> Tuple[Any, str]:
+        """Returns the result and the model that produced it"""
         while self._current_llm is not None:
+            llm = self._current_llm
             try:
-                return self._current_llm.invoke(input, **kwargs)
+                return llm.invoke(input, **kwargs), self._model_of(llm)
             except Exception as e:
-                error_str = str(e)
-                if "quota" in error_str.lower() or "429" in error_str:
-                    logger.warning(f"Quota error with current model: {e}")
-                    if self._get_next_llm():
+                if self._is_quota_error(e):
+                    if self._fall_back_from(llm, e):
                         logger.info("Retrying with fallback model...")
                         continue
                     else:
@@ -93,6 +162,100 @@ class FallbackLLM:
 
         raise Exception("No LLM available")
 
+    async def _ainvoke_with_fallback(
+        self, input: Union[str, List[BaseMessage]], **kwargs
+    ) -> Tuple[Any, str]:
+        """Returns the result and the model that produced it"""
+        while self._current_llm is not None:
+            llm = self._current_llm
+            try:
+                return await llm.ainvoke(input, **kwargs), self._model_of(llm)
+            except Exception as e:
+                if self._is_quota_error(e):
+                    if self._fall_back_from(llm, e):
+                        logger.info("Retrying with fallback model...")
+                        continue
+                    else:
+                        raise Exception("All LLM options exhausted due to quota limits")
+                else:
+                    raise
+
+        raise Exception("No LLM available")
+
+    async def abatch(
+        self,
+        inputs: List[Union[str, List[BaseMessage]]],
+        max_concurrency: Optional[int] = None,
+        return_exceptions: bool = False,
+        **kwargs,
+    ) -> List[Any]:
+        """Invoke concurrently for several inputs, preserving order"""
+        semaphore = asyncio.Semaphore(max_concurrency or len(inputs) or 1)
+
+        async def run(item):
+            async with semaphore:
+                return await self.ainvoke(item, **kwargs)
+
+        return await asyncio.gather(
+            *(run(item) for item in inputs), return_exceptions=return_exceptions
+        )
+
+    def stream(self, input: Union[str, List[BaseMessage]], **kwargs) -> Iterator[Any]:
+        """Stream chunks; falls back only if no chunk has been produced yet"""
+        for _, chunk in self._stream_with_fallback(input, **kwargs):
+            yield chunk
+
+    async def astream(
+        self, input: Union[str, List[BaseMessage]], **kwargs
+    ) -> AsyncIterator[Any]:
+        """Stream chunks asynchronously with the same fallback rules as stream()"""
+        async for _, chunk in self._astream_with_fallback(input, **kwargs):
+            yield chunk
+
+    def _stream_with_fallback(
+        self, input: Union[str, List[BaseMessage]], **kwargs
+    ) -> Iterator[Tuple[str, Any]]:
+        """Yields (model, chunk) pairs from the model serving the stream"""
+        while self._current_llm is not None:
+            llm = self._current_llm
+            model = self._model_of(llm)
+            started = False
+            try:
+                for chunk in llm.stream(input, **kwargs):
+                    started = True
+                    yield model, chunk
+                return
+            except Exception as e:
+                if started or not self._is_quota_error(e):
+                    raise
+                if not self._fall_back_from(llm, e):
+                    raise Exception("All LLM options exhausted due to quota limits")
+                logger.info("Retrying with fallback model...")
+
+        raise Exception("No LLM available")
+
+    async def _astream_with_fallback(
+        self, input: Union[str, List[BaseMessage]], **kwargs
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Async version of _stream_with_fallback"""
+        while self._current_llm is not None:
+            llm = self._current_llm
+            model = self._model_of(llm)
+            started = False
+            try:
+                async for chunk in llm.astream(input, **kwargs):
+                    started = True
+                    yield model, chunk
+                return
+            except Exception as e:
+                if started or not self._is_quota_error(e):
+                    raise
+                if not self._fall_back_from(llm, e):
+                    raise Exception("All LLM options exhausted due to quota limits")
+                logger.info("Retrying with fallback model...")
+
+        raise Exception("No LLM available")
+
     def __getattr__(self, name):
         """Proxy other attributes to the current LLM"""
         if self._current_llm:
@@ -104,10 +267,11 @@ class FallbackLLM:
     @property
     def model_name(self):
         """Return the current model name"""
-        if self._current_llm and hasattr(self._current_llm, "model_name"):
-            return self._current_llm.model_name
-        elif self._current_llm and hasattr(self._current_llm, "model"):
-            return self._current_llm.model
+        if self._current_llm and (
+            hasattr(self._current_llm, "model_name")
+            or hasattr(self._current_llm, "model")
+        ):
+            return self._model_of(self._current_llm)
         else:
             # Return the current model from our tracking
             if self._current_index >= 0 and self._current_index < len(
@@ -117,6 +281,13 @@ class FallbackLLM:
                 return model
             return "unknown"
 
+    @staticmethod
+    def _model_of(llm) -> str:
+        """Model name of an LLM instance (the current one can change mid-call)"""
+        if hasattr(llm, "model_name"):
+            return llm.model_name
+        return getattr(llm, "model", "unknown")
+
     def bind(self, **kwargs):
         """Bind arguments to the LLM (for compatibility)"""
         if self._current_llm and hasattr(self._current_llm, "bind"):
@@ -86,3 +86,8 @@ def setup_logger(name: str, level: int = logging.INFO) -> logging.Logger:
     logger.addHandler(handler)
 
     return logger
+
+
+def get_logger(name: str, level: int = logging.INFO) -> logging.Logger:
+    """Get a module logger (alias of setup_logger used across shared modules)"""
+    return setup_logger(name, level)
@@ -0,0 +1,15 @@
+"""
+Shared pytest configuration for unit tests
+
+Puts the elf_automations package and the context-as-a-service tree on the
+import path so their modules can be tested in place.
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+for path in (ROOT / "src" / "elf_automations", ROOT / "context-as-a-service"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
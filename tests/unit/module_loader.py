@@ -0,0 +1,70 @@
+"""
+Load a standalone module by file path for unit tests
+
+Some packages pull in services (Supabase, Qdrant, Neo4j) or sibling modules
+from their __init__ that a test of one self-contained module does not need.
+"""
+
+import importlib.util
+import re
+import sys
+import types
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def stub_module(name: str, **attrs) -> types.ModuleType:
+    """Build a stand-in module exposing only the given attributes"""
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    return module
+
+
+@contextmanager
+def installed(stubs: Dict[str, types.ModuleType]):
+    """Put stub modules in sys.modules, restoring the originals afterwards"""
+    missing = object()
+    saved = {name: sys.modules.get(name, missing) for name in stubs}
+    sys.modules.update(stubs)
+    try:
+        yield
+    finally:
+        for name, original in saved.items():
+            if original is missing:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = original
+
+
+def load_module(
+    relative_path: str, stubs: Optional[Dict[str, types.ModuleType]] = None
+):
+    """
+    Import a module by path, skipping its package __init__
+
+    Relative imports resolve against a bare package for the module's
+    directory, so sibling modules are loaded without the __init__ as well.
+    `stubs` stand in for unavailable imports while the module executes.
+    """
+    path = ROOT / relative_path
+    package = "_unit_" + re.sub(r"\W", "_", str(Path(relative_path).parent))
+    if package not in sys.modules:
+        bare = types.ModuleType(package)
+        bare.__path__ = [str(path.parent)]
+        sys.modules[package] = bare
+    name = f"{package}.{path.stem}"
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        with installed(stubs or {}):
+            spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
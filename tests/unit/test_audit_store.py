@@ -0,0 +1,106 @@
+"""
+Unit tests for the partitioned, indexed credential audit store
+"""
+
+import json
+from datetime import date, datetime, timedelta
+
+from elf_automations.shared.credentials.audit_store import AuditStore
+
+
+def event(timestamp, team="team-a", kind="access", credential="api-key"):
+    return {
+        "timestamp": timestamp,
+        "event": kind,
+        "team": team,
+        "credential": credential,
+    }
+
+
+def test_query_filters_and_time_range(tmp_path):
+    store = AuditStore(tmp_path, buffered=False)
+    store.append(event("2025-01-01T10:00:00"))
+    store.append(event("2025-01-01T11:00:00", team="team-b"))
+    store.append(event("2025-01-01T12:00:00", kind="denied"))
+    store.append(event("2025-01-02T09:00:00"))
+
+    team_a = list(store.iter_events(team="team-a", newest_first=False))
+    assert [e["timestamp"][:13] for e in team_a] == [
+        "2025-01-01T10",
+        "2025-01-01T12",
+        "2025-01-02T09",
+    ]
+
+    in_range = store.iter_events(
+        start=datetime(2025, 1, 1, 10, 30),
+        end=datetime(2025, 1, 1, 23),
+        event_type="access",
+    )
+    assert [e["team"] for e in in_range] == ["team-b"]
+
+
+def test_unbuffered_flush_defers_index_until_rotation(tmp_path):
+    store = AuditStore(tmp_path, buffered=False)
+    day_one = store._index_file(date(2025, 1, 1))
+
+    for hour in range(5):
+        store.append(event(f"2025-01-01T{hour:02d}:00:00"))
+    assert not day_one.exists()
+
+    store.append(event("2025-01-02T00:00:00"))
+    assert len(json.loads(day_one.read_text())["offsets"]) == 5
+    assert not store._index_file(date(2025, 1, 2)).exists()
+
+    store.close()
+    assert store._index_file(date(2025, 1, 2)).exists()
+
+
+def test_stale_index_catches_up_from_log(tmp_path):
+    store = AuditStore(tmp_path, buffered=False)
+    store.append(event("2025-01-01T10:00:00"))
+    store.close()
+    # Written after the index was saved, as if the process had crashed
+    store.append(event("2025-01-01T11:00:00", team="team-b"))
+
+    reopened = AuditStore(tmp_path, buffered=False)
+
+    assert [e["team"] for e in reopened.iter_events()] == ["team-b", "team-a"]
+    assert list(reopened.iter_events(team="team-b"))[0]["timestamp"].startswith(
+        "2025-01-01T11"
+    )
+
+
+def test_buffered_events_are_visible_to_queries(tmp_path):
+    store = AuditStore(tmp_path, flush_interval=3600)
+    store.append(event("2025-01-01T10:00:00"))
+
+    assert not store._log_file(date(2025, 1, 1)).exists()
+    assert len(list(store.iter_events())) == 1
+    store.close()
+
+
+def test_out_of_order_events_are_returned_sorted(tmp_path):
+    store = AuditStore(tmp_path, buffered=False)
+    store.append(event("2025-01-01T12:00:00"))
+    store.append(event("2025-01-01T08:00:00"))
+
+    events = list(store.iter_events(end=datetime(2025, 1, 1, 13), newest_first=False))
+
+    assert [e["timestamp"][11:13] for e in events] == ["08", "12"]
+
+
+def test_compacted_segment_answers_the_same_queries(tmp_path):
+    store = AuditStore(tmp_path, buffered=False)
+    day = (datetime.now() - timedelta(days=3)).replace(hour=9, minute=0, second=0)
+    store.append(event(day.isoformat()))
+    store.append(event((day + timedelta(hours=1)).isoformat(), team="team-b"))
+    store.append({"timestamp": (day + timedelta(hours=2)).isoformat(), "event": "x"})
+    expected = list(store.iter_events())
+
+    assert store.compact_older_than(1) == 1
+    assert not store._log_file(day.date()).exists()
+    assert store._segment_file(day.date()).exists()
+
+    assert list(store.iter_events()) == expected
+    assert [e["team"] for e in store.iter_events(team="team-b")] == ["team-b"]
+    assert "team" not in list(store.iter_events(event_type="x"))[0]
@@ -0,0 +1,198 @@
+"""
+Unit tests for the sliding-window circuit breaker and its registry
+"""
+
+import importlib
+import threading
+
+import pytest
+
+# The package re-exports the circuit_breaker decorator under the module's name
+cb = importlib.import_module("elf_automations.shared.resilience.circuit_breaker")
+CircuitBreaker = cb.CircuitBreaker
+CircuitBreakerRegistry = cb.CircuitBreakerRegistry
+CircuitOpenError = cb.CircuitOpenError
+CircuitState = cb.CircuitState
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cb.time, "monotonic", clock)
+    return clock
+
+
+def fail():
+    raise ValueError("boom")
+
+
+def test_consecutive_failures_open_the_circuit(clock):
+    breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=10)
+
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            breaker.call(fail)
+
+    assert breaker.is_open
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "ok")
+    assert breaker.get_stats()["rejected_calls"] == 1
+
+
+def test_failure_rate_below_threshold_stays_closed(clock):
+    breaker = CircuitBreaker(failure_threshold=4, failure_rate_threshold=0.5)
+
+    for _ in range(3):
+        breaker.call(lambda: "ok")
+    with pytest.raises(ValueError):
+        breaker.call(fail)
+
+    assert breaker.is_closed
+    assert breaker.get_stats()["window_failure_rate"] == 0.25
+
+
+def test_old_buckets_slide_out_of_the_window(clock):
+    breaker = CircuitBreaker(failure_threshold=2, window_seconds=10, window_buckets=5)
+    with pytest.raises(ValueError):
+        breaker.call(fail)
+
+    clock.now += 11
+    breaker.call(lambda: "ok")
+    with pytest.raises(ValueError):
+        breaker.call(fail)
+
+    assert breaker.get_stats()["window_calls"] == 2
+    assert breaker.is_open
+
+
+def test_slow_calls_open_the_circuit(clock):
+    breaker = CircuitBreaker(
+        failure_threshold=2, slow_call_threshold=1.0, slow_call_rate_threshold=1.0
+    )
+
+    def slow():
+        clock.now += 2
+
+    breaker.call(slow)
+    breaker.call(slow)
+
+    assert breaker.is_open
+
+
+def test_half_open_admits_limited_probes_then_closes(clock):
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=10)
+    with pytest.raises(ValueError):
+        breaker.call(fail)
+
+    clock.now += 10
+    assert breaker.state == CircuitState.HALF_OPEN
+
+    def probe():
+        # A second caller arriving while the probe is in flight is rejected
+        with pytest.raises(CircuitOpenError):
+            breaker.call(lambda: "ok")
+        return "ok"
+
+    assert breaker.call(probe) == "ok"
+    assert breaker.is_closed
+
+
+def test_failed_probe_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=10)
+    with pytest.raises(ValueError):
+        breaker.call(fail)
+    clock.now += 10
+
+    with pytest.raises(ValueError):
+        breaker.call(fail)
+
+    assert breaker.is_open
+
+
+def test_unexpected_exception_does_not_count(clock):
+    breaker = CircuitBreaker(failure_threshold=1, expected_exception=ValueError)
+
+    with pytest.raises(KeyError):
+        breaker.call(lambda: {}["missing"])
+
+    assert breaker.is_closed
+    assert breaker.get_stats()["total_calls"] == 0
+
+
+def test_racing_transitions_apply_once(clock):
+    breaker = CircuitBreaker(recovery_timeout=10)
+    breaker.trip()
+    clock.now += 10
+    barrier = threading.Barrier(16)
+    results = []
+
+    def race():
+        barrier.wait()
+        results.append(
+            breaker._transition(CircuitState.OPEN, CircuitState.HALF_OPEN, clock.now)
+        )
+
+    threads = [threading.Thread(target=race) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results.count(True) == 1
+    assert breaker._state is CircuitState.HALF_OPEN
+
+
+@pytest.mark.asyncio
+async def test_call_async(clock):
+    breaker = CircuitBreaker(failure_threshold=1)
+
+    async def ok():
+        return 42
+
+    async def broken():
+        raise ValueError("boom")
+
+    assert await breaker.call_async(ok) == 42
+    with pytest.raises(ValueError):
+        await breaker.call_async(broken)
+    assert breaker.is_open
+
+
+def test_registry_shares_breakers_and_reports_open_ones():
+    registry = CircuitBreakerRegistry(shards=4, failure_threshold=1)
+
+    first = registry.get_or_create("svc")
+    assert registry.get_or_create("svc", failure_threshold=99) is first
+    assert first.failure_threshold == 1
+
+    first.trip()
+    registry.get_or_create("other")
+    assert registry.names() == ["other", "svc"]
+    assert registry.open_circuits() == ["svc"]
+    assert registry.snapshot()["svc"]["state"] == "open"
+
+    registry.reset_all()
+    assert registry.open_circuits() == []
+    registry.remove("svc")
+    assert registry.get("svc") is None
+
+
+def test_decorator_uses_named_breaker():
+    registry = CircuitBreakerRegistry(failure_threshold=1)
+
+    @cb.circuit_breaker("decorated", registry=registry)
+    def flaky():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flaky()
+    with pytest.raises(CircuitOpenError):
+        flaky()
@@ -0,0 +1,137 @@
+"""
+Unit tests for LSH near-duplicate detection
+"""
+
+from difflib import SequenceMatcher
+from itertools import combinations
+
+import numpy as np
+import pytest
+from module_loader import load_module
+
+# The package __init__ pulls in the health monitor and its settings
+dedup = load_module("src/elf_automations/elf_automations/shared/rag/dedup.py")
+NameDeduplicator = dedup.NameDeduplicator
+UnionFind = dedup.UnionFind
+VectorDeduplicator = dedup.VectorDeduplicator
+
+
+def brute_force_vector_pairs(vectors, threshold):
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    similarity = unit @ unit.T
+    return {
+        (i, j)
+        for i, j in combinations(range(len(vectors)), 2)
+        if similarity[i, j] > threshold
+    }
+
+
+@pytest.fixture
+def planted_vectors():
+    """200 random vectors plus near copies of the first 20"""
+    rng = np.random.default_rng(7)
+    base = rng.standard_normal((200, 32))
+    copies = base[:20] + rng.standard_normal((20, 32)) * 0.01
+    return np.concatenate((base, copies))
+
+
+def test_union_find_groups():
+    union_find = UnionFind(6)
+
+    assert union_find.union(0, 1)
+    assert union_find.union(1, 2)
+    assert not union_find.union(0, 2)
+    union_find.union(4, 5)
+
+    assert union_find.groups() == [[0, 1, 2], [4, 5]]
+    assert union_find.groups(min_size=1) == [[0, 1, 2], [3], [4, 5]]
+
+
+def test_tables_for_recall():
+    assert VectorDeduplicator.tables_for_recall(1.0, 20, 0.99) == 1
+    strict = VectorDeduplicator.tables_for_recall(0.95, 20, 0.99)
+    assert VectorDeduplicator.tables_for_recall(0.95, 20, 0.999) > strict
+    assert VectorDeduplicator.tables_for_recall(0.8, 20, 0.99) > strict
+
+    with pytest.raises(ValueError):
+        VectorDeduplicator(bits_per_table=64)
+
+
+def test_vector_duplicates_match_brute_force(planted_vectors):
+    deduplicator = VectorDeduplicator(threshold=0.95, bits_per_table=12)
+    for start in range(0, len(planted_vectors), 64):
+        deduplicator.add(planted_vectors[start : start + 64])
+
+    result = deduplicator.run()
+
+    expected = brute_force_vector_pairs(planted_vectors, 0.95)
+    assert {tuple(pair) for pair in result.pairs.tolist()} == expected
+    assert result.groups == [[i, 200 + i] for i in range(20)]
+    assert result.total_items == 220
+    assert result.redundant_items == 20
+    assert result.avg_similarity > 0.95
+    assert result.candidate_pairs < 220 * 219 // 2
+
+
+def test_large_buckets_are_verified_as_blocks(planted_vectors):
+    pairwise = VectorDeduplicator(threshold=0.95, bits_per_table=4, num_tables=8)
+    blocked = VectorDeduplicator(
+        threshold=0.95, bits_per_table=4, num_tables=8, max_pairwise_bucket=2
+    )
+    pairwise.add(planted_vectors)
+    blocked.add(planted_vectors)
+
+    expected = pairwise.run()
+    result = blocked.run()
+
+    assert result.pairs.tolist() == expected.pairs.tolist()
+    np.testing.assert_allclose(result.similarities, expected.similarities, rtol=1e-5)
+
+
+def test_too_few_vectors():
+    deduplicator = VectorDeduplicator()
+    assert deduplicator.run().pair_count == 0
+
+    deduplicator.add(np.ones((1, 4)))
+    deduplicator.add(np.empty((0, 4)))
+    assert deduplicator.count == 1
+    assert deduplicator.run().groups == []
+
+
+def test_name_duplicates_match_brute_force():
+    names = [
+        "Acme Corporation",
+        "Acme Corporaton",
+        "Globex",
+        "Initech Software",
+        "Acme Corporation",
+        "Initech Softwares",
+        "Umbrella",
+        None,
+        "",
+        "Hooli",
+    ]
+
+    result = NameDeduplicator(threshold=0.9).run(names)
+
+    expected = {
+        (i, j)
+        for i, j in combinations(range(len(names)), 2)
+        if names[i]
+        and names[j]
+        and SequenceMatcher(None, names[i], names[j]).ratio() > 0.9
+    }
+    # Exact copies are linked to the first occurrence only
+    assert {tuple(pair) for pair in result.pairs.tolist()} == expected - {(1, 4)}
+    assert result.groups == [[0, 1, 4], [3, 5]]
+
+
+def test_name_signatures_are_deterministic():
+    first = NameDeduplicator(seed=3).signatures(["alpha", "beta"])
+    second = NameDeduplicator(seed=3).signatures(["alpha", "beta"])
+
+    assert first.shape == (2, 64)
+    np.testing.assert_array_equal(first, second)
+
+    with pytest.raises(ValueError):
+        NameDeduplicator(num_perm=10, band_rows=3)
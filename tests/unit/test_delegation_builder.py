@@ -0,0 +1,98 @@
+"""
+Unit tests for incremental delegation analysis
+"""
+
+import elf_automations.shared.a2a as a2a
+from module_loader import installed, stub_module
+
+# delegation_builder imports TaskRequest, which shared.a2a does not define
+A2A_WITH_TASK_REQUEST = stub_module(
+    a2a.__name__,
+    **{name: value for name, value in vars(a2a).items() if not name.startswith("__")},
+    TaskRequest=type("TaskRequest", (), {}),
+)
+
+with installed({a2a.__name__: A2A_WITH_TASK_REQUEST}):
+    from elf_automations.shared.chat.delegation_builder import (
+        DelegationBuilder,
+        TaskPriority,
+    )
+
+
+CONVERSATION = [
+    {"role": "user", "content": "Hi"},
+    {"role": "assistant", "content": "Hello, how can I help?"},
+    {
+        "role": "user",
+        "content": "I need a new API endpoint for customer invoices\n"
+        "It must support pagination",
+    },
+    {"role": "assistant", "content": "We will build it on the billing service."},
+    {"role": "user", "content": "This is urgent, we need it by tomorrow"},
+    {"role": "user", "content": "Don't change the database schema"},
+    {"role": "user", "content": "Done when finance can export a month of invoices"},
+]
+
+
+def comparable(spec):
+    data = spec.to_dict()
+    data.pop("created_at", None)
+    data.pop("updated_at", None)
+    data.pop("deadline", None)
+    return data
+
+
+def test_incremental_analysis_matches_full_analysis():
+    incremental = DelegationBuilder()
+    for count in range(1, len(CONVERSATION) + 1):
+        spec = incremental.analyze_conversation(CONVERSATION[:count], "s1")
+
+    full = DelegationBuilder().analyze_conversation(CONVERSATION, "s1")
+
+    assert comparable(spec) == comparable(full)
+    assert spec.title == "a new API endpoint for customer invoices"
+    assert spec.priority == TaskPriority.URGENT
+    assert spec.deadline is not None
+    assert spec.constraints == ["Don't change the database schema"]
+    assert "engineering-team" in spec.suggested_teams
+
+
+def test_only_new_messages_are_scanned(monkeypatch):
+    builder = DelegationBuilder()
+    builder.analyze_conversation(CONVERSATION[:4], "s1")
+
+    folded = []
+    original = builder._fold_message
+    monkeypatch.setattr(
+        builder,
+        "_fold_message",
+        lambda analysis, msg: folded.append(msg) or original(analysis, msg),
+    )
+    builder.analyze_conversation(CONVERSATION, "s1")
+
+    assert folded == CONVERSATION[4:]
+
+
+def test_edited_history_starts_over():
+    builder = DelegationBuilder()
+    builder.analyze_conversation(CONVERSATION, "s1")
+
+    edited = [dict(CONVERSATION[0], content="Please draft a marketing campaign")]
+    spec = builder.analyze_conversation(edited, "s1")
+
+    assert spec.title == "draft a marketing campaign"
+    assert spec.requirements == []
+    assert spec.suggested_teams == ["marketing-team"]
+
+
+def test_sessions_are_independent_and_forgettable():
+    builder = DelegationBuilder()
+    builder.analyze_conversation(CONVERSATION, "s1")
+    other = builder.analyze_conversation(CONVERSATION[:1], "s2")
+
+    assert other.title == "Hi"
+    assert other.requirements == []
+
+    builder.forget("s1")
+    assert "s1" not in builder.specs
+    assert "s1" not in builder._analyses
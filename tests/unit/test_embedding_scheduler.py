@@ -0,0 +1,157 @@
+"""
+Unit tests for the rate-limited RAG embedding scheduler
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from module_loader import load_module
+
+embedding_scheduler = load_module(
+    "context-as-a-service/shared/rag/embedding_scheduler.py"
+)
+EmbeddingScheduler = embedding_scheduler.EmbeddingScheduler
+SchedulerConfig = embedding_scheduler.SchedulerConfig
+TokenBucket = embedding_scheduler.TokenBucket
+
+
+class FakeEmbeddings:
+    """Stands in for AsyncOpenAI().embeddings, tracking concurrency"""
+
+    def __init__(self, fail_on=None, delay=0.01):
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fail_on = fail_on
+        self.delay = delay
+
+    async def create(self, input, model):
+        self.calls.append(list(input))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.fail_on and self.fail_on in input:
+                raise RuntimeError("boom")
+            data = [
+                SimpleNamespace(index=i, embedding=[float(len(text)), float(i)])
+                for i, text in reversed(list(enumerate(input)))
+            ]
+            return SimpleNamespace(data=data)
+        finally:
+            self.in_flight -= 1
+
+
+def make_scheduler(embeddings, **config):
+    config.setdefault("requests_per_minute", 60_000)
+    config.setdefault("tokens_per_minute", 10_000_000)
+    client = SimpleNamespace(embeddings=embeddings)
+    scheduler = EmbeddingScheduler(SchedulerConfig(**config), client=client)
+    scheduler._encoder = False  # use the character estimate
+    return scheduler
+
+
+def test_batches_are_bounded_by_tokens_and_items():
+    scheduler = make_scheduler(FakeEmbeddings(), max_batch_tokens=10, max_batch_items=3)
+    texts = ["x" * 15, "x" * 15, "x" * 35, "a", "b", "c", "d", "e"]
+
+    batches = scheduler._make_batches(texts)
+
+    # Character estimate: len // 4 + 1 tokens per text
+    assert [indices for indices, _ in batches] == [[0, 1], [2, 3], [4, 5, 6], [7]]
+    assert [tokens for _, tokens in batches] == [8, 10, 3, 1]
+
+
+@pytest.mark.asyncio
+async def test_embed_preserves_order_and_deduplicates():
+    embeddings = FakeEmbeddings()
+    scheduler = make_scheduler(embeddings, max_batch_items=2)
+
+    result = await scheduler.embed(["aa", "b", "aa", "cccc"], "model")
+
+    assert [vector[0] for vector in result] == [2.0, 1.0, 2.0, 4.0]
+    assert sorted(text for call in embeddings.calls for text in call) == [
+        "aa",
+        "b",
+        "cccc",
+    ]
+
+    await scheduler.embed(["aa", "cccc"], "model")
+    assert len(embeddings.calls) == 2
+    assert scheduler.cache.hits == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_is_respected():
+    embeddings = FakeEmbeddings(delay=0.02)
+    scheduler = make_scheduler(embeddings, max_batch_items=1, max_concurrency=3)
+
+    await scheduler.embed([f"text {i}" for i in range(10)], "model")
+
+    assert len(embeddings.calls) == 10
+    assert embeddings.max_in_flight == 3
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_returns_none_and_is_not_cached():
+    embeddings = FakeEmbeddings(fail_on="bad")
+    scheduler = make_scheduler(embeddings, max_batch_items=1)
+
+    result = await scheduler.embed(["good", "bad"], "model")
+
+    assert result[0] is not None
+    assert result[1] is None
+    assert scheduler.stats["failed_batches"] == 1
+    await scheduler.embed(["bad"], "model")
+    assert embeddings.calls.count(["bad"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_texts_carry_the_error_message():
+    scheduler = make_scheduler(FakeEmbeddings(fail_on="bad"), max_batch_items=1)
+
+    vectors, errors = await scheduler.embed_with_errors(["good", "bad"], "model")
+
+    assert vectors[1] is None
+    assert errors == [None, "boom"]
+
+
+def test_scheduler_is_reusable_across_event_loops():
+    embeddings = FakeEmbeddings()
+    scheduler = make_scheduler(embeddings, max_batch_items=1, max_concurrency=1)
+
+    async def embed_concurrently(prefix):
+        texts = [f"{prefix} {i}" for i in range(3)]
+        return await asyncio.gather(*(scheduler.embed([t], "model") for t in texts))
+
+    # Each asyncio.run uses a new loop; contended locks must not be reused
+    first = asyncio.run(embed_concurrently("a"))
+    second = asyncio.run(embed_concurrently("b"))
+
+    assert all(result[0] is not None for result in first + second)
+    assert len(embeddings.calls) == 6
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(per_minute=600, capacity=1)
+    await bucket.acquire()
+
+    start = time.monotonic()
+    await bucket.acquire()
+
+    # 600/minute refills one token every 0.1s
+    assert time.monotonic() - start >= 0.08
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_pause_blocks_acquire():
+    bucket = TokenBucket(per_minute=60_000)
+    bucket.pause(0.1)
+
+    start = time.monotonic()
+    await bucket.acquire()
+
+    assert time.monotonic() - start >= 0.08
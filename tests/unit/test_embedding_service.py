@@ -0,0 +1,106 @@
+"""
+Unit tests for the cached, batched memory EmbeddingService
+"""
+
+import asyncio
+import hashlib
+
+import numpy as np
+import pytest
+from module_loader import load_module
+
+embedding_service = load_module(
+    "src/elf_automations/elf_automations/shared/memory/embedding_service.py"
+)
+EmbeddingService = embedding_service.EmbeddingService
+HashEmbeddingProvider = embedding_service.HashEmbeddingProvider
+
+
+class CountingProvider(HashEmbeddingProvider):
+    """Hash provider that records every batch it is asked to embed"""
+
+    def __init__(self):
+        super().__init__(dimension=16, repeat=2)
+        self.batches = []
+
+    def embed(self, texts):
+        self.batches.append(list(texts))
+        return super().embed(texts)
+
+
+def legacy_hash_embedding(text):
+    """The per-float placeholder embedding the memory mixin used to build"""
+    digest = hashlib.sha256(text.encode()).digest()
+    embedding = []
+    for i in range(192):
+        value = int.from_bytes(digest[i % 32 : (i % 32) + 1], "big") / 255.0
+        embedding.extend([value] * 8)
+    return embedding
+
+
+def test_hash_provider_matches_legacy_vectors():
+    vectors = HashEmbeddingProvider().embed(["alpha", "beta"])
+
+    assert vectors.shape == (2, 1536)
+    assert vectors.dtype == np.float32
+    np.testing.assert_allclose(vectors[0], legacy_hash_embedding("alpha"), rtol=1e-6)
+    np.testing.assert_allclose(vectors[1], legacy_hash_embedding("beta"), rtol=1e-6)
+
+
+def test_embed_batches_and_deduplicates():
+    provider = CountingProvider()
+    service = EmbeddingService(provider, batch_size=2)
+
+    vectors = service.embed(["a", "b", "a", "c"])
+
+    assert vectors.shape == (4, 16)
+    np.testing.assert_array_equal(vectors[0], vectors[2])
+    assert provider.batches == [["a", "b"], ["c"]]
+    assert service.stats["misses"] == 3
+
+
+def test_lru_hits_and_eviction():
+    provider = CountingProvider()
+    service = EmbeddingService(provider, cache_size=2)
+
+    service.embed(["a", "b"])
+    service.embed(["a"])
+    assert service.stats["hits"] == 1
+    assert len(provider.batches) == 1
+
+    service.embed(["c"])
+    service.embed(["b"])
+    assert provider.batches[-1] == ["b"]
+
+
+def test_disk_cache_survives_new_service(tmp_path):
+    first = EmbeddingService(CountingProvider(), cache_dir=tmp_path)
+    expected = first.embed_one("persisted")
+
+    provider = CountingProvider()
+    second = EmbeddingService(provider, cache_dir=tmp_path)
+    np.testing.assert_array_equal(second.embed_one("persisted"), expected)
+    assert provider.batches == []
+    assert second.stats["disk_hits"] == 1
+
+
+def test_embed_json_is_key_order_independent():
+    service = EmbeddingService(CountingProvider())
+
+    np.testing.assert_array_equal(
+        service.embed_json({"a": 1, "b": 2}), service.embed_json({"b": 2, "a": 1})
+    )
+
+
+@pytest.mark.asyncio
+async def test_aembed_coalesces_concurrent_requests():
+    provider = CountingProvider()
+    service = EmbeddingService(provider, max_wait_ms=20)
+
+    results = await asyncio.gather(
+        service.aembed("x"), service.aembed("y"), service.aembed("x")
+    )
+
+    assert len(provider.batches) == 1
+    assert sorted(provider.batches[0]) == ["x", "y"]
+    np.testing.assert_array_equal(results[0], results[2])
@@ -0,0 +1,187 @@
+"""
+Unit tests for the incremental episode rollups
+"""
+
+import json
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+from module_loader import installed, load_module, stub_module
+
+episode_analytics = load_module(
+    "src/elf_automations/elf_automations/shared/memory/episode_analytics.py"
+)
+EpisodeRollups = episode_analytics.EpisodeRollups
+RollupBucket = episode_analytics.RollupBucket
+TeamIdResolver = episode_analytics.TeamIdResolver
+
+
+class FakeQuery:
+    """Just enough of the Supabase query builder for the rollup tail"""
+
+    def __init__(self, table):
+        self.table = table
+        self.filters = []
+        self.bounds = None
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda row: row[column] >= value)
+        return self
+
+    def order(self, column):
+        return self
+
+    def range(self, start, end):
+        self.bounds = (start, end)
+        return self
+
+    def execute(self):
+        self.table.queries += 1
+        rows = [r for r in self.table.rows if all(f(r) for f in self.filters)]
+        rows.sort(key=lambda row: (row.get("created_at"), row.get("id")))
+        if self.bounds:
+            rows = rows[self.bounds[0] : self.bounds[1] + 1]
+        return SimpleNamespace(data=rows)
+
+
+class FakeSupabase:
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.queries = 0
+
+    def table(self, name):
+        return FakeQuery(self)
+
+
+def episode_row(episode_id, created_at, success=True, duration=10, task="Fix bug"):
+    content = {
+        "task_description": task,
+        "success": success,
+        "duration": duration,
+        "agent_contributions": {"dev": ["Wrote patch ", "ran tests"]},
+    }
+    return {
+        "id": episode_id,
+        "team_id": "t1",
+        "entry_type": "experience",
+        "created_at": created_at,
+        "content": json.dumps(content),
+    }
+
+
+def test_categorize_task():
+    assert episode_analytics.categorize_task("Fix the login bug") == "debugging"
+    assert episode_analytics.categorize_task(None) == "general"
+
+
+def test_bucket_aggregates_successes_and_agents():
+    bucket = RollupBucket()
+    for i, (success, duration) in enumerate([(True, 4), (False, 40), (True, 8)]):
+        row = episode_row(f"e{i}", "2025-01-01", success, duration)
+        bucket.add(row["id"], json.loads(row["content"]))
+
+    assert (bucket.total, bucket.successes) == (3, 2)
+    assert bucket.success_rate == pytest.approx(2 / 3)
+    assert bucket.average_duration == pytest.approx(52 / 3)
+    assert bucket.agent_successes == {"dev": 2}
+    assert bucket.agent_actions["dev"]["wrote patch"] == 2
+    assert bucket.success_ids == ["e0", "e2"]
+    assert 5 <= RollupBucket.histogram_median(bucket.success_durations) <= 10
+
+
+def test_refresh_pages_past_rows_sharing_a_timestamp():
+    rows = [episode_row(f"e{i}", "2025-01-01T10:00:00") for i in range(5)]
+    supabase = FakeSupabase(rows)
+    rollups = EpisodeRollups(page_size=2)
+
+    rollups.refresh(supabase, "t1", force=True)
+    assert rollups.merged().total == 5
+
+    supabase.rows.append(episode_row("e5", "2025-01-01T10:00:00"))
+    supabase.rows.append(episode_row("e6", "2025-01-02T08:00:00", success=False))
+    rollups.refresh(supabase, "t1", force=True)
+
+    assert rollups.merged().total == 7
+    assert rollups.merged(since=date(2025, 1, 2)).successes == 0
+
+
+def test_local_records_are_not_counted_twice():
+    row = episode_row("e1", "2025-01-01T10:00:00")
+    supabase = FakeSupabase([row])
+    rollups = EpisodeRollups()
+
+    rollups.record_local([row])
+    rollups.refresh(supabase, "t1", force=True)
+
+    assert rollups.merged().total == 1
+
+
+def test_refresh_is_rate_limited():
+    supabase = FakeSupabase()
+    rollups = EpisodeRollups(refresh_interval=60)
+
+    rollups.refresh(supabase, "t1")
+    rollups.refresh(supabase, "t1")
+
+    assert supabase.queries == 1
+
+
+def test_query_filters_by_day_and_task_type():
+    rollups = EpisodeRollups()
+    for episode_id, created_at, task in [
+        ("e1", "2025-01-01", "Fix bug"),
+        ("e2", "2025-01-02", "Deploy service"),
+        ("e3", "2025-01-03", "Fix crash"),
+    ]:
+        row = episode_row(episode_id, created_at, task=task)
+        rollups.record(row["id"], row["created_at"], json.loads(row["content"]))
+
+    assert rollups.merged(task_type="debugging").total == 2
+    assert list(rollups.query(since=date(2025, 1, 2), until=date(2025, 1, 3))) == [
+        (date(2025, 1, 2), "deployment")
+    ]
+
+
+def test_team_id_resolver_caches_hits_and_misses():
+    supabase = FakeSupabase([{"name": "alpha", "id": "t1"}])
+    resolver = TeamIdResolver()
+
+    assert resolver.resolve(supabase, "alpha") == "t1"
+    assert resolver.resolve(supabase, "alpha") == "t1"
+    assert resolver.resolve(supabase, "missing") is None
+    assert resolver.resolve(supabase, "missing") is None
+    assert supabase.queries == 2
+
+    resolver.invalidate("alpha")
+    resolver.resolve(supabase, "alpha")
+    assert supabase.queries == 3
+
+
+def test_task_type_stats_survive_a_supabase_outage(caplog):
+    # The memory package imports a Supabase helper that is not in this tree
+    with installed(
+        {
+            "elf_automations.shared.utils.supabase_client": stub_module(
+                "supabase_client", get_supabase_client=lambda: None
+            )
+        }
+    ):
+        from elf_automations.shared.memory.team_memory import TeamMemory
+
+    class DownSupabase:
+        def table(self, name):
+            raise ConnectionError("supabase down")
+
+    memory = TeamMemory("outage-team")
+    memory.supabase = DownSupabase()
+
+    assert memory.get_task_type_stats("bug_fix") == {"total_episodes": 0}
+    assert "supabase down" in caplog.text
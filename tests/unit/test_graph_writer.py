@@ -0,0 +1,75 @@
+"""
+Unit tests for batched Neo4j UNWIND writes
+"""
+
+import pytest
+from module_loader import load_module
+
+graph_writer = load_module("context-as-a-service/shared/rag/graph_writer.py")
+GraphBatchWriter = graph_writer.GraphBatchWriter
+
+
+class FakeResult:
+    def __init__(self, records):
+        self.records = records
+
+    async def data(self):
+        return self.records
+
+
+class FakeTransaction:
+    """Records each statement and echoes back one record per row"""
+
+    def __init__(self):
+        self.runs = []
+
+    async def run(self, query, **params):
+        self.runs.append((query, params))
+        return FakeResult([{"id": row["id"]} for row in params["rows"]])
+
+
+def test_labels_are_backtick_quoted():
+    assert graph_writer.quote_label("Person") == "`Person`"
+    assert graph_writer.quote_label("a`b") == "`a``b`"
+    assert graph_writer.label_expression(["Entity", "Org Unit"]) == (
+        ":`Entity`:`Org Unit`"
+    )
+    assert graph_writer.label_expression([]) == ""
+
+
+def test_batch_size_scales_with_volume():
+    writer = GraphBatchWriter(min_batch_size=100, max_batch_size=2000)
+
+    assert writer.batch_size(10) == 100
+    assert writer.batch_size(1000) == 250
+    assert writer.batch_size(100_000) == 2000
+
+
+def test_env_override_fixes_the_batch_size(monkeypatch):
+    monkeypatch.setenv("RAG_GRAPH_BATCH_SIZE", "7")
+
+    writer = GraphBatchWriter()
+
+    assert writer.batch_size(10) == writer.batch_size(100_000) == 7
+
+
+@pytest.mark.asyncio
+async def test_write_splits_rows_and_collects_records():
+    tx = FakeTransaction()
+    rows = [{"id": i} for i in range(5)]
+
+    records = await GraphBatchWriter().write(
+        tx, "UNWIND $rows AS row", rows, batch_size=2, document_id="d1"
+    )
+
+    assert records == rows
+    assert [len(params["rows"]) for _, params in tx.runs] == [2, 2, 1]
+    assert all(params["document_id"] == "d1" for _, params in tx.runs)
+
+
+@pytest.mark.asyncio
+async def test_empty_write_runs_nothing():
+    tx = FakeTransaction()
+
+    assert await GraphBatchWriter().write(tx, "UNWIND $rows AS row", []) == []
+    assert tx.runs == []
@@ -0,0 +1,180 @@
+"""
+Unit tests for the shared, pooled HTTP transport
+"""
+
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+from elf_automations.shared.utils.http_transport import (
+    BackgroundLoop,
+    SharedTransport,
+    TransportConfig,
+)
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    delay = threading.Event()
+
+    def do_GET(self):
+        if self.path == "/slow":
+            self.delay.wait(1)
+        body = self.path.encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    Handler.delay.set()
+    httpd.shutdown()
+    Handler.delay.clear()
+
+
+def make_client(transport, base_url):
+    return httpx.AsyncClient(base_url=base_url, transport=transport)
+
+
+@pytest.mark.asyncio
+async def test_clients_share_one_pool_per_origin(server):
+    transport = SharedTransport(TransportConfig(http2=False))
+    try:
+        for path in ("/a", "/b"):
+            async with make_client(transport, server) as client:
+                response = await client.get(path)
+                assert response.text == path
+
+        stats = transport.get_stats()
+        assert list(stats) == [server]
+        assert stats[server]["requests"] == 2
+        assert stats[server]["errors"] == 0
+        # Closing the first client kept its keep-alive connection for the second
+        assert stats[server]["connections"] == 1
+        assert stats[server]["idle_connections"] == 1
+    finally:
+        await transport.close_pools()
+
+    assert transport.get_stats() == {}
+
+
+@pytest.mark.asyncio
+async def test_per_host_concurrency_limit(server):
+    transport = SharedTransport(TransportConfig(http2=False, per_host_concurrency=1))
+    client = make_client(transport, server)
+    try:
+        slow = asyncio.create_task(client.get("/slow"))
+        await asyncio.sleep(0.1)
+        fast = asyncio.create_task(client.get("/fast"))
+        await asyncio.sleep(0.1)
+
+        stats = transport.get_stats()[server]
+        assert (stats["in_flight"], stats["waiting"]) == (1, 1)
+
+        Handler.delay.set()
+        assert (await fast).text == "/fast"
+        assert (await slow).text == "/slow"
+    finally:
+        Handler.delay.clear()
+        await client.aclose()
+        await transport.close_pools()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_is_not_counted_as_waiting(server):
+    transport = SharedTransport(TransportConfig(http2=False, per_host_concurrency=1))
+    client = make_client(transport, server)
+    try:
+        slow = asyncio.create_task(client.get("/slow"))
+        await asyncio.sleep(0.1)
+        waiter = asyncio.create_task(client.get("/fast"))
+        await asyncio.sleep(0.1)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        assert transport.get_stats()[server]["waiting"] == 0
+        Handler.delay.set()
+        await slow
+        assert (await client.get("/again")).text == "/again"
+    finally:
+        Handler.delay.clear()
+        await client.aclose()
+        await transport.close_pools()
+
+
+def test_close_all_pools_drains_every_loop(server):
+    transport = SharedTransport(TransportConfig(http2=False))
+    background = BackgroundLoop()
+
+    async def fetch():
+        async with make_client(transport, server) as client:
+            return (await client.get("/a")).text
+
+    try:
+        assert background.run(fetch(), timeout=5) == "/a"
+        loop = asyncio.new_event_loop()
+        assert loop.run_until_complete(fetch()) == "/a"
+        assert transport.get_stats()[server]["connections"] == 2
+
+        transport.close_all_pools()
+
+        assert transport.get_stats() == {}
+        loop.close()
+    finally:
+        background.stop()
+
+
+@pytest.mark.asyncio
+async def test_close_all_pools_refuses_to_block_a_running_loop():
+    with pytest.raises(RuntimeError):
+        SharedTransport(TransportConfig(http2=False)).close_all_pools()
+
+
+@pytest.mark.asyncio
+async def test_connection_errors_are_counted():
+    transport = SharedTransport(TransportConfig(http2=False))
+    client = make_client(transport, "http://127.0.0.1:1")
+    try:
+        with pytest.raises(Exception):
+            await client.get("/")
+        assert transport.get_stats()["http://127.0.0.1:1"]["errors"] == 1
+    finally:
+        await transport.close_pools()
+
+
+def test_config_from_env(monkeypatch):
+    monkeypatch.setenv("HTTP_POOL_MAX_CONNECTIONS", "7")
+    monkeypatch.setenv("HTTP_PER_HOST_CONCURRENCY", "3")
+    monkeypatch.setenv("HTTP_ENABLE_HTTP2", "false")
+
+    config = TransportConfig.from_env()
+
+    assert (config.max_connections, config.per_host_concurrency) == (7, 3)
+    assert config.max_keepalive_connections == 20
+    assert config.http2 is False
+
+
+def test_background_loop_reuses_one_loop():
+    background = BackgroundLoop()
+
+    async def current_loop():
+        return asyncio.get_running_loop()
+
+    first = background.run(current_loop(), timeout=5)
+    second = background.run(current_loop(), timeout=5)
+
+    assert first is second
+    assert first.is_running()
+    background.stop()
@@ -0,0 +1,135 @@
+"""
+Unit tests for the LLM response cache
+"""
+
+import numpy as np
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from module_loader import load_module
+
+llm_cache = load_module("src/elf_automations/elf_automations/shared/utils/llm_cache.py")
+LLMResponseCache = llm_cache.LLMResponseCache
+normalize_prompt = llm_cache.normalize_prompt
+
+
+class KeywordEmbeddings:
+    """Embeds a prompt as keyword counts, so similarity is predictable"""
+
+    VOCABULARY = ["summarize", "report", "weather", "today", "please"]
+
+    def embed_one(self, text):
+        words = text.lower().split()
+        return np.array(
+            [words.count(word) for word in self.VOCABULARY], dtype=np.float32
+        )
+
+
+def test_normalize_prompt_collapses_whitespace_and_keeps_roles():
+    messages = [SystemMessage(content="Be  brief"), HumanMessage(content=" hi\n")]
+
+    assert normalize_prompt("  a \n\t b ") == "a b"
+    assert normalize_prompt(messages) == "system: Be brief\nhuman: hi"
+
+
+def test_exact_hit_is_scoped_by_model_temperature_and_options():
+    cache = LLMResponseCache()
+    cache.put("Hello  world", "gpt-4", AIMessage(content="hi"), temperature=0.0)
+
+    hit = cache.get("Hello world", "gpt-4", temperature=0.0)
+    assert hit.content == "hi"
+    assert hit.response_metadata["cache_hit"] is True
+
+    assert cache.get("Hello world", "gpt-4", temperature=0.7) is None
+    assert cache.get("Hello world", "gpt-3.5-turbo", temperature=0.0) is None
+    assert cache.get("Hello world", "gpt-4", 0.0, options={"stop": ["x"]}) is None
+    assert cache.get_stats()["hit_rate"] == pytest.approx(0.25)
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    cache = LLMResponseCache(ttl_seconds=10)
+    cache.put("prompt", "gpt-4", AIMessage(content="old"))
+
+    now[0] += 11
+
+    assert cache.get("prompt", "gpt-4") is None
+
+
+def test_lru_is_bounded():
+    cache = LLMResponseCache(max_entries=2)
+    for prompt in ("a", "b", "c"):
+        cache.put(prompt, "gpt-4", AIMessage(content=prompt))
+
+    assert cache.get("a", "gpt-4") is None
+    assert cache.get("c", "gpt-4").content == "c"
+    assert cache.get_stats()["memory_entries"] == 2
+
+
+def test_disk_store_is_shared_between_instances(tmp_path):
+    LLMResponseCache(cache_dir=tmp_path).put(
+        "prompt", "gpt-4", AIMessage(content="persisted")
+    )
+
+    assert LLMResponseCache(cache_dir=tmp_path).get("prompt", "gpt-4").content == (
+        "persisted"
+    )
+
+
+def test_evict_trims_disk_store(tmp_path):
+    cache = LLMResponseCache(cache_dir=tmp_path, max_entries=2)
+    for prompt in ("a", "b", "c"):
+        cache.put(prompt, "gpt-4", AIMessage(content=prompt))
+
+    assert cache.evict() == 1
+    assert LLMResponseCache(cache_dir=tmp_path).get("a", "gpt-4") is None
+
+
+def test_semantic_hit_above_threshold(tmp_path):
+    cache = LLMResponseCache(
+        cache_dir=tmp_path,
+        similarity_threshold=0.9,
+        embedding_service=KeywordEmbeddings(),
+    )
+    cache.put("summarize the report", "gpt-4", AIMessage(content="summary"))
+
+    assert cache.get("please summarize report", "gpt-4") is None
+    assert cache.get("summarize report", "gpt-4").content == "summary"
+    assert cache.get("weather today", "gpt-4") is None
+    assert cache.stats["semantic_hits"] == 1
+
+    reloaded = LLMResponseCache(
+        cache_dir=tmp_path,
+        similarity_threshold=0.9,
+        embedding_service=KeywordEmbeddings(),
+    )
+    assert reloaded.get("report summarize", "gpt-4").content == "summary"
+
+
+def test_semantic_lookups_require_an_embedding_service():
+    with pytest.raises(ValueError):
+        LLMResponseCache(similarity_threshold=0.9)
+
+
+def test_memory_only_vectors_are_bounded():
+    cache = LLMResponseCache(
+        max_entries=2,
+        similarity_threshold=0.9,
+        embedding_service=KeywordEmbeddings(),
+    )
+    for prompt in ("summarize report", "weather today", "please"):
+        cache.put(prompt, "gpt-4", AIMessage(content=prompt))
+
+    [(keys, vectors)] = cache._vectors.values()
+    assert len(keys) == len(vectors) == 2
+    assert cache.get("report summarize", "gpt-4") is None
+    assert cache.get("today weather", "gpt-4").content == "weather today"
+
+
+def test_unserializable_response_is_not_cached():
+    cache = LLMResponseCache()
+
+    cache.put("prompt", "gpt-4", object())
+
+    assert cache.get("prompt", "gpt-4") is None
+    assert cache.stats["stores"] == 0
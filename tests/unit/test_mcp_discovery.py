@@ -0,0 +1,155 @@
+"""
+Unit tests for cached MCP server discovery
+"""
+
+import importlib
+import json
+import threading
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+discovery_module = importlib.import_module("elf_automations.shared.mcp.discovery")
+MCPDiscovery = discovery_module.MCPDiscovery
+
+
+class FakeGateway:
+    """Stands in for httpx.get against AgentGateway's /mcp/servers"""
+
+    def __init__(self, servers, etag="v1"):
+        self.servers = servers
+        self.etag = etag
+        self.requests = []
+        # When set, the next request blocks until release is set
+        self.hold = False
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append((url, dict(headers or {})))
+        if not url.startswith("http://gateway"):
+            raise httpx.ConnectError("unreachable")
+        if (headers or {}).get("If-None-Match") == self.etag:
+            response = SimpleNamespace(status_code=304, headers={})
+        else:
+            servers = self.servers
+            response = SimpleNamespace(
+                status_code=200, headers={"ETag": self.etag}, json=lambda: servers
+            )
+
+        if self.hold:
+            self.hold = False
+            self.entered.set()
+            self.release.wait(5)
+        return response
+
+
+@pytest.fixture
+def gateway(monkeypatch, tmp_path):
+    # Keep the default config paths, env and kubectl out of the picture
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("MCP_SERVERS", raising=False)
+    monkeypatch.setenv("AGENTGATEWAY_URL", "http://gateway:3000")
+    monkeypatch.setattr(discovery_module, "_k8s_available", False)
+
+    gateway = FakeGateway([{"name": "search", "tools": ["web_search", "fetch"]}])
+    monkeypatch.setattr(httpx, "get", gateway.get)
+    return gateway
+
+
+def test_gateway_servers_are_indexed_by_tool(gateway):
+    discovery = MCPDiscovery()
+
+    servers = discovery.discover_all()
+
+    assert list(servers) == ["search"]
+    assert [s.name for s in discovery.get_servers_with_tool("fetch")] == ["search"]
+    assert discovery.list_tools() == {"web_search", "fetch"}
+
+
+def test_recent_snapshot_is_served_without_refetching(gateway):
+    discovery = MCPDiscovery(max_age=60)
+    discovery.discover_all()
+    requests = len(gateway.requests)
+
+    discovery.discover_all()
+
+    assert len(gateway.requests) == requests
+
+
+def test_forced_refresh_revalidates_with_etag(gateway):
+    discovery = MCPDiscovery()
+    discovery.discover_all()
+
+    servers = discovery.discover_all(force=True)
+
+    assert gateway.requests[-1] == (
+        "http://gateway:3000/mcp/servers",
+        {"If-None-Match": "v1"},
+    )
+    assert list(servers) == ["search"]
+
+
+def test_lock_is_not_held_during_gateway_calls(gateway):
+    discovery = MCPDiscovery(max_age=60)
+    discovery.discover_all()
+
+    gateway.hold = True
+    refresh = threading.Thread(target=discovery.discover_all, kwargs={"force": True})
+    refresh.start()
+    try:
+        assert gateway.entered.wait(5)
+        # The snapshot stays readable while the refresh waits on the gateway
+        assert discovery._lock.acquire(timeout=1)
+        discovery._lock.release()
+        assert list(discovery.discover_all()) == ["search"]
+    finally:
+        gateway.release.set()
+        refresh.join(5)
+
+
+def test_older_discovery_does_not_replace_newer_snapshot(gateway):
+    discovery = MCPDiscovery()
+    discovery.discover_all()
+
+    gateway.hold = True
+    slow = threading.Thread(target=discovery.discover_all, kwargs={"force": True})
+    slow.start()
+    assert gateway.entered.wait(5)
+
+    # A newer discovery finishes first with a different server list
+    gateway.servers = ["other"]
+    gateway.etag = "v2"
+    newer = discovery.discover_all(force=True)
+    gateway.release.set()
+    slow.join(5)
+
+    assert list(newer) == ["other"]
+    assert discovery.list_servers() == ["other"]
+
+
+def test_config_files_are_reparsed_only_when_changed(gateway, tmp_path):
+    config = tmp_path / "mcp.json"
+    config.write_text(json.dumps({"mcpServers": {"files": {"command": "run"}}}))
+    discovery = MCPDiscovery(config_paths=[str(config)], use_agentgateway=False)
+
+    assert discovery.discover_all(force=True)["files"].command == "run"
+    cached = discovery._file_cache[str(config)]
+
+    discovery.discover_all(force=True)
+    assert discovery._file_cache[str(config)] is cached
+
+    config.write_text(json.dumps({"mcpServers": {"files": {"command": "rerun"}}}))
+    assert discovery.discover_all(force=True)["files"].command == "rerun"
+
+
+def test_unreachable_gateway_clears_cached_state(gateway, monkeypatch):
+    discovery = MCPDiscovery()
+    discovery.discover_all()
+
+    monkeypatch.setenv("AGENTGATEWAY_URL", "http://down:3000")
+    discovery._gateway_url = "http://down:3000"
+
+    assert discovery.discover_all(force=True) == {}
+    assert discovery._gateway_etag is None
@@ -0,0 +1,152 @@
+"""
+Unit tests for the embedded MockQdrantClient vector store
+"""
+
+import numpy as np
+import pytest
+from module_loader import load_module
+
+mock_qdrant = load_module(
+    "src/elf_automations/elf_automations/shared/memory/mock_qdrant.py"
+)
+Distance = mock_qdrant.Distance
+FieldCondition = mock_qdrant.FieldCondition
+Filter = mock_qdrant.Filter
+MatchAny = mock_qdrant.MatchAny
+MatchValue = mock_qdrant.MatchValue
+MockQdrantClient = mock_qdrant.MockQdrantClient
+PointStruct = mock_qdrant.PointStruct
+Range = mock_qdrant.Range
+VectorParams = mock_qdrant.VectorParams
+
+DIM = 8
+
+
+def random_points(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        PointStruct(
+            id=f"p{i}",
+            vector=rng.normal(size=DIM).tolist(),
+            payload={"team": "a" if i % 2 else "b", "rank": i, "tags": [f"t{i % 3}"]},
+        )
+        for i in range(count)
+    ]
+
+
+def brute_force_cosine(points, query):
+    q = np.asarray(query) / np.linalg.norm(query)
+    scored = []
+    for point in points:
+        v = np.asarray(point.vector)
+        scored.append((float(v @ q / np.linalg.norm(v)), point.id))
+    return sorted(scored, reverse=True)
+
+
+@pytest.fixture
+def client():
+    client = MockQdrantClient()
+    client.create_collection("memories", VectorParams(size=DIM))
+    return client
+
+
+def test_search_matches_brute_force(client):
+    points = random_points(50)
+    client.upsert("memories", points)
+    query = points[7].vector
+
+    results = client.search("memories", query_vector=query, limit=5)
+    expected = brute_force_cosine(points, query)[:5]
+
+    assert [r.id for r in results] == [pid for _, pid in expected]
+    assert results[0].id == "p7"
+    assert results[0].score == pytest.approx(1.0, abs=1e-5)
+    for result, (score, _) in zip(results, expected):
+        assert result.score == pytest.approx(score, abs=1e-5)
+
+
+def test_upsert_overwrites_existing_ids(client):
+    client.upsert("memories", random_points(3))
+    replacement = PointStruct(id="p1", vector=[1.0] + [0.0] * (DIM - 1))
+    client.upsert("memories", [replacement])
+
+    assert client.count("memories").count == 3
+    top = client.search("memories", query_vector=replacement.vector, limit=1)
+    assert top[0].id == "p1"
+    assert top[0].payload == {}
+
+
+def test_filters_and_threshold_apply_before_top_k(client):
+    points = random_points(40)
+    client.upsert("memories", points)
+    query = points[0].vector
+
+    team_filter = Filter(must=[FieldCondition(key="team", match=MatchValue("a"))])
+    results = client.search(
+        "memories", query_vector=query, query_filter=team_filter, limit=5
+    )
+    assert len(results) == 5
+    assert all(r.payload["team"] == "a" for r in results)
+
+    range_filter = Filter(
+        must=[FieldCondition(key="rank", range=Range(gte=10, lt=12))],
+        must_not=[FieldCondition(key="tags", match=MatchAny(any=["t2"]))],
+    )
+    results = client.search(
+        "memories", query_vector=query, query_filter=range_filter, limit=10
+    )
+    assert [r.payload["rank"] for r in results] == [10]
+
+    results = client.search(
+        "memories", query_vector=query, score_threshold=0.999, limit=10
+    )
+    assert [r.id for r in results] == ["p0"]
+
+
+def test_delete_tombstones_points(client):
+    points = random_points(5)
+    client.upsert("memories", points)
+    client.delete("memories", points_selector=["p2"])
+
+    assert client.count("memories").count == 4
+    assert client.retrieve("memories", ["p2"]) == []
+    results = client.search("memories", query_vector=points[2].vector, limit=5)
+    assert "p2" not in [r.id for r in results]
+
+
+def test_dimension_mismatch_raises(client):
+    client.upsert("memories", random_points(1))
+    with pytest.raises(ValueError):
+        client.upsert("memories", [PointStruct(id="x", vector=[1.0, 2.0])])
+    with pytest.raises(ValueError):
+        client.search("memories", query_vector=[1.0, 2.0])
+
+
+def test_euclid_scores_are_distances():
+    client = MockQdrantClient()
+    client.create_collection("points", VectorParams(size=2, distance=Distance.EUCLID))
+    client.upsert(
+        "points",
+        [
+            PointStruct(id="near", vector=[1.0, 1.0]),
+            PointStruct(id="far", vector=[5.0, 5.0]),
+        ],
+    )
+
+    results = client.search("points", query_vector=[0.0, 0.0], limit=2)
+    assert [r.id for r in results] == ["near", "far"]
+    assert results[0].score == pytest.approx(np.sqrt(2), abs=1e-5)
+
+
+def test_persisted_collections_reload(tmp_path):
+    points = random_points(1500)
+    client = MockQdrantClient(path=str(tmp_path))
+    client.create_collection("memories", VectorParams(size=DIM))
+    client.upsert("memories", points)
+    client.delete("memories", points_selector=["p3"])
+
+    reopened = MockQdrantClient(path=str(tmp_path))
+    assert reopened.count("memories").count == 1499
+    results = reopened.search("memories", query_vector=points[1200].vector, limit=1)
+    assert results[0].id == "p1200"
+    assert results[0].payload["rank"] == 1200
@@ -0,0 +1,291 @@
+"""
+Unit tests for in-flight quota reservations
+"""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+from elf_automations.shared.quota import QuotaManager, UsageTracker
+from elf_automations.shared.utils.llm_with_quota import QuotaTrackedLLM
+
+
+@pytest.fixture
+def manager(tmp_path):
+    # One gpt-4 request of 1000 input + 1000 output tokens costs $0.09
+    return QuotaManager(storage_path=tmp_path, default_daily_budget=0.2)
+
+
+def test_reservations_count_against_the_budget(manager):
+    first, alternative = manager.reserve("team-a", "gpt-4", 1000, 1000)
+    second, _ = manager.reserve("team-a", "gpt-4", 1000, 1000)
+
+    assert first and second and alternative is None
+    assert manager.reserved_cost("team-a") == pytest.approx(0.18)
+    assert manager.can_make_request("team-a", "gpt-3.5-turbo", 100_000) == (
+        False,
+        None,
+    )
+    # Other teams are unaffected
+    assert manager.reserved_cost("team-b") == 0
+
+
+def test_reserve_falls_back_to_cheaper_model(manager):
+    manager.reserve("team-a", "gpt-4", 1000, 1000)
+    manager.reserve("team-a", "gpt-4", 1000, 1000)
+
+    reservation_id, alternative = manager.reserve("team-a", "gpt-4", 1000, 1000)
+
+    assert reservation_id is not None
+    assert alternative == "gpt-3.5-turbo"
+
+
+def test_reserve_refuses_when_nothing_fits(manager):
+    assert manager.reserve("team-a", "claude-3-sonnet", 100_000, 0) == (None, None)
+    assert manager.reserved_cost("team-a") == 0
+
+
+def test_release_returns_the_hold(manager):
+    reservation_id, _ = manager.reserve("team-a", "gpt-4", 1000, 1000)
+
+    manager.release("team-a", reservation_id)
+    manager.release("team-a", reservation_id)
+
+    assert manager.reserved_cost("team-a") == 0
+    assert manager.get_usage_report("team-a", days=1)["total_cost"] == 0
+
+
+def test_settle_replaces_hold_with_actual_usage(manager):
+    reservation_id, _ = manager.reserve("team-a", "gpt-4", 1000, 1000)
+
+    cost = manager.settle("team-a", reservation_id, "gpt-4", 500, 100)
+
+    assert cost == pytest.approx(manager.estimate_cost("gpt-4", 500, 100))
+    assert manager.reserved_cost("team-a") == 0
+    assert manager._committed_cost("team-a") == pytest.approx(cost)
+
+
+def test_concurrent_reservations_never_overspend(manager):
+    granted = []
+    barrier = threading.Barrier(8)
+
+    def reserve():
+        barrier.wait()
+        reservation_id, alternative = manager.reserve("team-a", "gpt-4", 1000, 1000)
+        if reservation_id and alternative is None:
+            granted.append(reservation_id)
+
+    threads = [threading.Thread(target=reserve) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(granted) == 2
+    assert manager.reserved_cost("team-a") <= manager.default_daily_budget
+
+
+def test_tracker_settles_reservation_with_served_model(manager):
+    tracker = UsageTracker(manager)
+    reservation_id, _ = manager.reserve("team-a", "gpt-4", 1000, 1000)
+    request_id = tracker.track_request("team-a", "gpt-4")
+
+    tracker.update_tokens(request_id, 1000, 1000, model="gpt-3.5-turbo")
+    result = tracker.complete_request(request_id, reservation_id)
+
+    assert result["model"] == "gpt-3.5-turbo"
+    assert result["cost"] == pytest.approx(
+        manager.estimate_cost("gpt-3.5-turbo", 1000, 1000)
+    )
+    assert manager.reserved_cost("team-a") == 0
+
+
+def test_tracker_request_ids_are_unique(manager):
+    tracker = UsageTracker(manager)
+
+    ids = {tracker.track_request("team-a", "gpt-4") for _ in range(100)}
+
+    assert len(ids) == 100
+
+
+class FakeLLM:
+    """Chat model stand-in; `behaviour` decides what each call does"""
+
+    def __init__(self, model_name, behaviour):
+        self.model_name = model_name
+        self.behaviour = behaviour
+
+    def _result(self):
+        return SimpleNamespace(
+            content="ok", usage_metadata={"input_tokens": 100, "output_tokens": 50}
+        )
+
+    def invoke(self, input, **kwargs):
+        self.behaviour(self)
+        return self._result()
+
+    async def ainvoke(self, input, **kwargs):
+        result = self.behaviour(self)
+        if asyncio.iscoroutine(result):
+            await result
+        return self._result()
+
+    def stream(self, input, **kwargs):
+        self.behaviour(self)
+        yield SimpleNamespace(content="o", usage_metadata=None)
+        yield self._result()
+
+    async def astream(self, input, **kwargs):
+        result = self.behaviour(self)
+        if asyncio.iscoroutine(result):
+            await result
+        yield SimpleNamespace(content="o", usage_metadata=None)
+        yield self._result()
+
+
+class FakeFactory:
+    FALLBACK_CHAIN = [("openai", "gpt-4", 0.7), ("openai", "gpt-3.5-turbo", 0.7)]
+
+    def __init__(self, behaviours):
+        self.behaviours = behaviours
+
+    def _create_single_llm(self, provider, model, temperature):
+        return FakeLLM(model, self.behaviours.get(model, lambda llm: None))
+
+
+def make_llm(manager, monkeypatch, **behaviours):
+    monkeypatch.delenv("SUPABASE_URL", raising=False)
+    return QuotaTrackedLLM(FakeFactory(behaviours), "team-a", quota_manager=manager)
+
+
+def models_charged(manager):
+    [today] = manager.get_usage_report("team-a", days=1)["days"].values()
+    return set(today["models"])
+
+
+def assert_released(llm, manager):
+    assert manager.reserved_cost("team-a") == 0
+    assert llm.usage_tracker.active_requests == {}
+
+
+def quota_error(llm):
+    raise RuntimeError("429 quota exceeded")
+
+
+def broken(llm):
+    raise ValueError("bad request")
+
+
+@pytest.mark.asyncio
+async def test_ainvoke_settles_actual_usage(manager, monkeypatch):
+    llm = make_llm(manager, monkeypatch)
+
+    result = await llm.ainvoke("hello")
+
+    assert result.content == "ok"
+    assert_released(llm, manager)
+    assert manager._committed_cost("team-a") == pytest.approx(
+        manager.estimate_cost("gpt-4", 100, 50)
+    )
+
+
+@pytest.mark.asyncio
+async def test_ainvoke_failure_releases_reservation(manager, monkeypatch):
+    llm = make_llm(manager, monkeypatch, **{"gpt-4": broken})
+
+    with pytest.raises(ValueError):
+        await llm.ainvoke("hello")
+
+    assert_released(llm, manager)
+    assert manager._committed_cost("team-a") == 0
+
+
+@pytest.mark.asyncio
+async def test_ainvoke_fallback_charges_the_serving_model(manager, monkeypatch):
+    llm = make_llm(manager, monkeypatch, **{"gpt-4": quota_error})
+
+    await llm.ainvoke("hello")
+
+    assert models_charged(manager) == {"gpt-3.5-turbo"}
+    assert_released(llm, manager)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_fallback_does_not_change_the_charged_model(
+    manager, monkeypatch
+):
+    def other_call_falls_back(fake):
+        # Another request moves the shared chain on while this one is in flight
+        llm._get_next_llm()
+
+    llm = make_llm(manager, monkeypatch, **{"gpt-4": other_call_falls_back})
+
+    await llm.ainvoke("hello")
+
+    assert llm.model_name == "gpt-3.5-turbo"
+    assert models_charged(manager) == {"gpt-4"}
+
+
+@pytest.mark.asyncio
+async def test_cancelled_ainvoke_releases_reservation(manager, monkeypatch):
+    started = asyncio.Event()
+
+    async def hang(fake):
+        started.set()
+        await asyncio.Event().wait()
+
+    llm = make_llm(manager, monkeypatch, **{"gpt-4": hang})
+    task = asyncio.create_task(llm.ainvoke("hello"))
+    await started.wait()
+    assert manager.reserved_cost("team-a") > 0
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert_released(llm, manager)
+
+
+def test_stream_settles_with_the_serving_model(manager, monkeypatch):
+    llm = make_llm(manager, monkeypatch, **{"gpt-4": quota_error})
+
+    chunks = list(llm.stream("hello"))
+
+    assert [chunk.content for chunk in chunks] == ["o", "ok"]
+    assert models_charged(manager) == {"gpt-3.5-turbo"}
+    assert_released(llm, manager)
+
+
+@pytest.mark.asyncio
+async def test_astream_failure_releases_reservation(manager, monkeypatch):
+    llm = make_llm(manager, monkeypatch, **{"gpt-4": broken})
+
+    with pytest.raises(ValueError):
+        async for _ in llm.astream("hello"):
+            pass
+
+    assert_released(llm, manager)
+    assert manager._committed_cost("team-a") == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_astream_releases_reservation(manager, monkeypatch):
+    started = asyncio.Event()
+
+    async def hang(fake):
+        started.set()
+        await asyncio.Event().wait()
+
+    llm = make_llm(manager, monkeypatch, **{"gpt-4": hang})
+
+    async def consume():
+        return [chunk async for chunk in llm.astream("hello")]
+
+    task = asyncio.create_task(consume())
+    await started.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert_released(llm, manager)
@@ -0,0 +1,182 @@
+"""
+Unit tests for the cached, coalescing team registry client
+"""
+
+import asyncio
+
+import pytest
+from elf_automations.shared.registry.client import TeamRegistryClient
+
+TEAMS = [
+    {"id": "1", "name": "executive", "type": "executive"},
+    {"id": "2", "name": "engineering", "type": "engineering", "parent_id": "1"},
+    {"id": "3", "name": "backend", "type": "engineering", "parent_id": "2"},
+    {"id": "4", "name": "marketing", "type": "marketing", "parent_id": "1"},
+]
+
+
+def member(agent, manager=False):
+    return {
+        "agent_name": agent,
+        "role": "lead" if manager else "dev",
+        "capabilities": ["python"],
+        "is_manager": manager,
+    }
+
+
+class FakeRegistry:
+    """Stands in for MCPClient talking to the team-registry server"""
+
+    def __init__(self, batch=True):
+        self.batch = batch
+        self.calls = []
+
+    async def call_tool(self, server, tool, arguments):
+        self.calls.append((tool, arguments))
+        await asyncio.sleep(0.01)
+        if tool == "query_teams":
+            if "capability" in arguments:
+                return {"success": True, "teams": TEAMS[1:3]}
+            if "type" in arguments:
+                teams = [t for t in TEAMS if t["type"] == arguments["type"]]
+                return {"success": True, "teams": teams}
+            return {"success": True, "teams": TEAMS}
+        if tool == "get_teams_members":
+            if not self.batch:
+                return {"success": False, "error": "unknown tool"}
+            return {
+                "success": True,
+                "members": {
+                    n: [member(f"{n}-lead", True)] for n in arguments["team_names"]
+                },
+            }
+        if tool == "get_team_members":
+            name = arguments["team_name"]
+            return {"success": True, "members": [member(f"{name}-lead", True)]}
+        if tool == "register_team":
+            return {"success": True, "team": {"id": "5", "name": arguments["name"]}}
+        return {"success": False}
+
+    def count(self, tool):
+        return sum(1 for called, _ in self.calls if called == tool)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_lookups_share_one_call():
+    registry = FakeRegistry()
+    client = TeamRegistryClient(mcp_client=registry)
+
+    results = await asyncio.gather(
+        *(client.find_teams_by_capability("python") for _ in range(5))
+    )
+
+    assert all(
+        [t.name for t in teams] == ["engineering", "backend"] for teams in results
+    )
+    assert registry.count("query_teams") == 1
+    assert registry.count("get_teams_members") == 1
+    # Four waiters on the team query and four on the member batch
+    assert client.get_cache_stats()["coalesced"] == 8
+
+
+@pytest.mark.asyncio
+async def test_cached_lookups_expire_after_ttl():
+    registry = FakeRegistry()
+    client = TeamRegistryClient(mcp_client=registry, cache_ttl=0.05)
+
+    await client.find_teams_by_type("marketing")
+    await client.find_teams_by_type("marketing")
+    assert registry.count("query_teams") == 1
+
+    await asyncio.sleep(0.06)
+    await client.find_teams_by_type("marketing")
+    assert registry.count("query_teams") == 2
+
+
+@pytest.mark.asyncio
+async def test_members_are_fetched_in_one_batch():
+    registry = FakeRegistry()
+    client = TeamRegistryClient(mcp_client=registry)
+
+    teams = await client.find_teams_by_type("engineering")
+
+    assert [t.manager.agent_name for t in teams] == ["engineering-lead", "backend-lead"]
+    assert registry.count("get_teams_members") == 1
+    assert registry.count("get_team_members") == 0
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_per_team_members_without_batch_tool():
+    registry = FakeRegistry(batch=False)
+    client = TeamRegistryClient(mcp_client=registry)
+
+    teams = await client.find_teams_by_type("engineering")
+    await client.find_teams_by_type("executive")
+    client._cache.invalidate("members:")
+    await client.find_teams_by_type("engineering")
+
+    assert [t.manager.agent_name for t in teams] == ["engineering-lead", "backend-lead"]
+    # The missing batch tool is only probed once
+    assert registry.count("get_teams_members") == 1
+    assert registry.count("get_team_members") == 5
+
+
+@pytest.mark.asyncio
+async def test_hierarchy_comes_from_the_materialized_tree():
+    registry = FakeRegistry()
+    client = TeamRegistryClient(mcp_client=registry)
+
+    hierarchy = await client.get_team_hierarchy("engineering")
+    await client.get_team_hierarchy("marketing")
+
+    assert hierarchy.parent.name == "executive"
+    assert [t.name for t in hierarchy.children] == ["backend"]
+    assert [t.name for t in hierarchy.get_all_descendants()] == ["backend"]
+    assert registry.count("query_teams") == 1
+    assert registry.count("get_team_hierarchy") == 0
+
+
+@pytest.mark.asyncio
+async def test_register_team_invalidates_cached_queries():
+    registry = FakeRegistry()
+    client = TeamRegistryClient(mcp_client=registry)
+    await client.find_teams_by_type("marketing")
+    await client.get_team_hierarchy("marketing")
+
+    await client.register_team("growth", "marketing", parent_name="marketing")
+    await client.find_teams_by_type("marketing")
+    await client.get_team_hierarchy("marketing")
+
+    assert registry.count("query_teams") == 4
+
+
+@pytest.mark.asyncio
+async def test_invalidation_during_load_discards_stale_result():
+    registry = FakeRegistry()
+    client = TeamRegistryClient(mcp_client=registry)
+
+    lookup = asyncio.create_task(client.find_teams_by_capability("python"))
+    await asyncio.sleep(0)
+    await client.update_team_capabilities("engineering", "dev", ["go"])
+    await lookup
+    await client.find_teams_by_capability("python")
+
+    assert registry.count("query_teams") == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_lookup_is_not_cached():
+    registry = FakeRegistry()
+    client = TeamRegistryClient(mcp_client=registry)
+    original = registry.call_tool
+
+    async def failing(server, tool, arguments):
+        raise ConnectionError("registry down")
+
+    registry.call_tool = failing
+    assert await client.find_teams_by_type("marketing") == []
+
+    registry.call_tool = original
+    assert [t.name for t in await client.find_teams_by_type("marketing")] == [
+        "marketing"
+    ]
@@ -0,0 +1,226 @@
+"""
+Unit tests for hybrid retrieval and its result cache
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from module_loader import load_module
+
+retrieval = load_module("context-as-a-service/shared/rag/retrieval.py")
+BM25Index = retrieval.BM25Index
+HybridRetriever = retrieval.HybridRetriever
+ResultCache = retrieval.ResultCache
+RetrievalConfig = retrieval.RetrievalConfig
+
+CHUNKS = [
+    {"id": 1, "document_id": "d1", "chunk_index": 0, "content": "invoice totals"},
+    {"id": 2, "document_id": "d1", "chunk_index": 1, "content": "shipping rates"},
+    {"id": 3, "document_id": "d2", "chunk_index": 0, "content": "invoice due dates"},
+]
+
+
+class FakeEmbedder:
+    default_model = "test-embedding"
+
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+        self.block = None
+
+    async def generate_query_embedding(self, query):
+        self.calls += 1
+        await asyncio.sleep(0)
+        if self.block is not None:
+            block, self.block = self.block, None
+            await block.wait()
+        if self.fail:
+            raise RuntimeError("embedding service down")
+        return [1.0, 0.0]
+
+
+class FakeStorage:
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+
+    async def search_similar_chunks(
+        self, embedding, tenant_id, limit, filters, raise_errors=False
+    ):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("qdrant down")
+        return [
+            {
+                "id": "d1_0",
+                "score": 0.9,
+                "document_id": "d1",
+                "chunk_index": 0,
+                "content": "invoice totals",
+                "metadata": {},
+            }
+        ]
+
+
+class FakeSupabase:
+    """Serves rag_document_chunks for the keyword index and hydration"""
+
+    def __init__(self):
+        self.fail = False
+
+    def table(self, name):
+        return FakeChunkQuery(self)
+
+
+class FakeChunkQuery:
+    def __init__(self, db):
+        self.db = db
+        self.rows = list(CHUNKS)
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        return self
+
+    def in_(self, column, values):
+        self.rows = [row for row in self.rows if row[column] in values]
+        return self
+
+    def order(self, column):
+        return self
+
+    def range(self, start, end):
+        self.rows = self.rows[start : end + 1]
+        return self
+
+    def execute(self):
+        if self.db.fail:
+            raise RuntimeError("supabase down")
+        return SimpleNamespace(data=self.rows)
+
+
+@pytest.fixture
+def retriever():
+    return HybridRetriever(
+        FakeEmbedder(), FakeStorage(), RetrievalConfig(), supabase=FakeSupabase()
+    )
+
+
+def test_bm25_ranks_and_forgets_documents():
+    index = BM25Index()
+    index.add("a", "invoice invoice totals")
+    index.add("b", "shipping invoice")
+    index.add("c", "shipping rates")
+
+    assert [key for key, _ in index.search("invoice")] == ["a", "b"]
+    index.remove("a")
+    assert [key for key, _ in index.search("invoice")] == ["b"]
+    assert len(index) == 2
+
+
+def test_result_cache_ttl_and_generations():
+    now = [0.0]
+    cache = ResultCache(ttl_seconds=10, clock=lambda: now[0])
+
+    generation = cache.generation("t1")
+    cache.invalidate("t1")
+    cache.put("t1", "k", ["stale"], generation)
+    assert cache.get("t1", "k") is None
+
+    cache.put("t1", "k", ["fresh"], cache.generation("t1"))
+    assert cache.get("t1", "k") == ["fresh"]
+    now[0] += 11
+    assert cache.get("t1", "k") is None
+
+
+def test_defaults_bound_cross_process_staleness(monkeypatch):
+    config = RetrievalConfig()
+    assert config.result_cache_ttl + config.index_refresh_seconds <= 600
+
+    monkeypatch.setenv("RAG_RETRIEVAL_INDEX_REFRESH", "30")
+    assert RetrievalConfig.from_env().index_refresh_seconds == 30
+
+
+@pytest.mark.asyncio
+async def test_hybrid_search_fuses_and_hydrates(retriever):
+    response = await retriever.search("invoice", "t1")
+
+    results = {(r["document_id"], r["chunk_index"]): r for r in response["results"]}
+    assert results[("d1", 0)]["source"] == "hybrid"
+    assert results[("d2", 0)]["source"] == "keyword"
+    assert results[("d2", 0)]["content"] == "invoice due dates"
+    assert response["degraded"] is False
+    assert {"embedding", "vector", "keyword", "fusion", "total"} <= set(
+        response["timings"]
+    )
+
+
+@pytest.mark.asyncio
+async def test_repeat_search_is_served_from_cache(retriever):
+    await retriever.search("Invoice ", "t1")
+    response = await retriever.search("invoice", "t1")
+
+    assert response["cached"] is True
+    assert retriever.storage.calls == 1
+    assert retriever.embedder.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_invalidation_drops_cached_results(retriever):
+    await retriever.search("invoice", "t1")
+
+    retrieval.invalidate_retrieval_cache("t1", "d1")
+    response = await retriever.search("invoice", "t1")
+
+    assert response["cached"] is False
+    assert retriever.storage.calls == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("failing", ["embedder", "storage", "supabase"])
+async def test_degraded_search_is_not_cached(retriever, failing):
+    dependency = {
+        "embedder": retriever.embedder,
+        "storage": retriever.storage,
+        "supabase": retriever._supabase,
+    }[failing]
+    dependency.fail = True
+
+    degraded = await retriever.search("invoice", "t1")
+    dependency.fail = False
+    recovered = await retriever.search("invoice", "t1")
+
+    assert degraded["degraded"] is True
+    assert degraded["total"] > 0
+    assert recovered["cached"] is False
+    assert recovered["degraded"] is False
+    assert retriever.stats["degraded"] == 1
+    assert (await retriever.search("invoice", "t1"))["cached"] is True
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_queries_share_one_embedding(retriever):
+    await asyncio.gather(
+        *(retriever.search("invoice", "t1", use_cache=False) for _ in range(5))
+    )
+
+    assert retriever.embedder.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_waiters_recover_when_the_first_caller_is_cancelled(retriever):
+    retriever.embedder.block = asyncio.Event()
+    first = asyncio.create_task(retriever.embed_query("invoice"))
+    await asyncio.sleep(0.01)
+    waiters = [asyncio.create_task(retriever.embed_query("invoice")) for _ in range(3)]
+    await asyncio.sleep(0.01)
+
+    first.cancel()
+    results = await asyncio.wait_for(asyncio.gather(*waiters), timeout=5)
+
+    assert first.cancelled()
+    assert results == [[1.0, 0.0]] * 3
+    assert retriever.embedder.calls == 2
+    assert retriever._pending_embeddings == {}
@@ -0,0 +1,111 @@
+"""
+Unit tests for the A2A gateway routing engine
+"""
+
+import random
+from dataclasses import dataclass
+from typing import Optional
+
+from module_loader import load_module
+
+routing_engine = load_module("a2a_gateway/src/routing_engine.py")
+RoutingEngine = routing_engine.RoutingEngine
+
+
+@dataclass
+class Team:
+    team_id: str
+    is_available: bool = True
+    in_flight: int = 0
+    ewma_response_time: Optional[float] = None
+
+
+def make_engine(registrations):
+    engine = RoutingEngine(rng=random.Random(0))
+    teams = {}
+    for team_id, capabilities in registrations.items():
+        engine.add_team(team_id, capabilities)
+        teams[team_id] = Team(team_id)
+    return engine, teams
+
+
+def test_capability_match_requires_all_capabilities():
+    engine, _ = make_engine(
+        {"a": ["python", "sql"], "b": ["python"], "c": ["sql", "python", "go"]}
+    )
+
+    assert sorted(engine._teams_in(engine.match_capabilities(["python", "sql"]))) == [
+        "a",
+        "c",
+    ]
+    assert engine.match_capabilities(["python", "rust"]) == 0
+
+
+def test_remove_team_frees_slot_and_updates_index():
+    engine, _ = make_engine({"a": ["python"], "b": ["python", "sql"]})
+
+    engine.remove_team("a")
+    assert engine.capability_index == {"python": {"b"}, "sql": {"b"}}
+
+    engine.add_team("c", ["go"])
+    assert engine._slot_of["c"] == 0
+    assert engine._teams_in(engine.match_capabilities(["python"])) == ["b"]
+
+    engine.remove_team("b")
+    assert "sql" not in engine.capability_index
+    assert engine.match_capabilities(["sql"]) == 0
+
+
+def test_reregistering_replaces_capabilities():
+    engine, _ = make_engine({"a": ["python"]})
+
+    engine.add_team("a", ["go"])
+
+    assert engine.match_capabilities(["python"]) == 0
+    assert engine._teams_in(engine.match_capabilities(["go"])) == ["a"]
+
+
+def test_select_prefers_less_loaded_team():
+    engine, teams = make_engine({"a": ["python"], "b": ["python"]})
+    teams["a"].in_flight = 5
+    teams["b"].ewma_response_time = 200.0
+
+    decision = engine.select(teams, required_capabilities=["python"])
+
+    assert decision.team_id == "b"
+    assert decision.strategy == "capability"
+    assert decision.candidate_count == 2
+
+
+def test_select_skips_unavailable_and_excluded_teams():
+    engine, teams = make_engine({"a": ["python"], "b": ["python"], "c": ["python"]})
+    teams["a"].is_available = False
+
+    decision = engine.select(teams, required_capabilities=["python", "not:b"])
+
+    assert decision.team_id == "c"
+
+
+def test_select_falls_back_to_keywords_then_none():
+    engine, teams = make_engine({"sales-team": ["sales"], "dev": ["python"]})
+
+    keyword = engine.select(
+        teams, required_capabilities=["unknown"], task_description="Sales pitch"
+    )
+    assert (keyword.team_id, keyword.strategy) == ("sales-team", "keyword")
+
+    none = engine.select(teams, task_description="write a poem")
+    assert (none.team_id, none.strategy) == (None, "none")
+
+
+def test_direct_routing_and_stats():
+    engine, teams = make_engine({"a": ["python"]})
+
+    assert engine.select(teams, to_team="a").strategy == "direct"
+    teams["a"].is_available = False
+    assert engine.select(teams, to_team="a").team_id is None
+
+    stats = engine.get_stats()
+    assert stats["decisions"] == 2
+    assert stats["strategies"] == {"direct": 1, "none": 1}
+    assert stats["indexed_teams"] == 1
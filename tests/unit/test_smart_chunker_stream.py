@@ -0,0 +1,90 @@
+"""
+Unit tests for the smart chunker's streaming mode
+"""
+
+import re
+
+import pytest
+from module_loader import load_module, stub_module
+
+smart_chunker = load_module(
+    "context-as-a-service/core/rag_processor/processors/smart_chunker.py",
+    stubs={
+        "shared.utils": stub_module("shared.utils", get_supabase_client=lambda: None)
+    },
+)
+
+
+class WordTokenizer:
+    """Reversible stand-in for tiktoken when its encoding cannot be fetched"""
+
+    def encode(self, text, **kwargs):
+        return re.findall(r"\s*\S+|\s+", text)
+
+    def decode(self, tokens):
+        return "".join(tokens)
+
+
+try:
+    TOKENIZER = smart_chunker.tiktoken.get_encoding("cl100k_base")
+except Exception:  # the encoding is downloaded on first use
+    TOKENIZER = WordTokenizer()
+
+
+@pytest.fixture
+def chunker():
+    # Skip __init__, which opens a Supabase client the chunker does not use
+    agent = object.__new__(smart_chunker.RAGSmartChunkerAgent)
+    agent.tokenizer = TOKENIZER
+    return agent
+
+
+def pieces(text, size):
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+async def collect(chunker, source, strategy):
+    return [chunk async for chunk in chunker.chunk_stream(source, strategy)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("strategy", ["semantic", "sliding_window"])
+async def test_stream_matches_in_memory_chunking(chunker, strategy):
+    document = "\n\n".join(
+        f"# Section {i}\n" + " ".join(f"word{j}" for j in range(80)) for i in range(30)
+    )
+    config = {"primary_strategy": strategy, "chunk_size": 200, "overlap": 20}
+
+    expected = (await chunker.chunk(document, config))["chunks"]
+    streamed = await collect(chunker, pieces(document, 97), config)
+
+    assert [c["content"] for c in streamed] == [c["content"] for c in expected]
+    assert [c["chunk_index"] for c in streamed] == list(range(len(expected)))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("strategy", ["semantic", "structural"])
+async def test_text_without_separators_is_split_at_max_chunk_size(chunker, strategy):
+    document = "lorem " * 20_000
+    config = {"primary_strategy": strategy, "chunk_size": 500}
+
+    chunks = await collect(chunker, pieces(document, 1000), config)
+
+    assert len(chunks) > 1
+    max_chars = smart_chunker.RAGChunkConfig(strategy).max_chunk_size * 4
+    assert all(c["char_count"] <= max_chars for c in chunks)
+    assert sum(c["word_count"] for c in chunks) == 20_000
+
+
+@pytest.mark.asyncio
+async def test_stream_reads_file_paths_and_bytes(chunker, tmp_path):
+    document = "First paragraph.\n\nSecond paragraph with ünïcode."
+    path = tmp_path / "doc.txt"
+    path.write_text(document, encoding="utf-8")
+    config = {"primary_strategy": "semantic", "chunk_size": 1000}
+
+    from_path = await collect(chunker, str(path), config)
+    from_bytes = await collect(chunker, pieces(document.encode(), 5), config)
+
+    assert [c["content"] for c in from_path] == [document]
+    assert [c["content"] for c in from_bytes] == [document]
@@ -0,0 +1,135 @@
+"""
+Unit tests for the multiplexed stdio MCP transport
+"""
+
+import asyncio
+import os
+import sys
+import textwrap
+
+import pytest
+from elf_automations.shared.mcp.stdio_transport import (
+    StdioConnection,
+    StdioProcessPool,
+)
+
+# Echo server: answers "sleep" requests after params["seconds"], so responses
+# to concurrent requests come back out of order
+SERVER = textwrap.dedent(
+    """
+    import asyncio, json, os, sys
+
+    async def handle(message):
+        params = message.get("params", {})
+        await asyncio.sleep(params.get("seconds", 0))
+        if message["method"] == "exit":
+            os._exit(1)
+        reply = {"id": message["id"], "result": {"pid": os.getpid(), **params}}
+        sys.stdout.write("not json\\n" + json.dumps(reply) + "\\n")
+        sys.stdout.flush()
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        tasks = set()
+        while True:
+            line = await loop.run_in_executor(None, sys.stdin.readline)
+            if not line:
+                return
+            task = asyncio.create_task(handle(json.loads(line)))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+    asyncio.run(main())
+    """
+)
+
+
+@pytest.fixture
+def command(tmp_path):
+    script = tmp_path / "server.py"
+    script.write_text(SERVER)
+    return [sys.executable, str(script)]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_matched_by_id(command):
+    connection = StdioConnection("echo", command, dict(os.environ))
+    await connection.start()
+    try:
+        results = await asyncio.gather(
+            connection.request("sleep", {"seconds": 0.2, "n": 1}),
+            connection.request("sleep", {"seconds": 0.0, "n": 2}),
+            connection.request("sleep", {"seconds": 0.1, "n": 3}),
+        )
+    finally:
+        await connection.close()
+
+    assert [r["result"]["n"] for r in results] == [1, 2, 3]
+    assert connection.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_request_times_out_and_is_forgotten(command):
+    connection = StdioConnection("echo", command, dict(os.environ))
+    await connection.start()
+    try:
+        with pytest.raises(asyncio.TimeoutError):
+            await connection.request("sleep", {"seconds": 1}, timeout=0.05)
+        assert connection.in_flight == 0
+    finally:
+        await connection.close()
+
+
+@pytest.mark.asyncio
+async def test_pending_requests_fail_when_process_exits(command):
+    connection = StdioConnection("echo", command, dict(os.environ))
+    await connection.start()
+    try:
+        with pytest.raises(ConnectionError):
+            await connection.request("exit", {}, timeout=5)
+        await asyncio.sleep(0.05)
+        assert not connection.is_alive
+        with pytest.raises(ConnectionError):
+            await connection.request("sleep", {})
+    finally:
+        await connection.close()
+
+
+@pytest.mark.asyncio
+async def test_pool_dispatches_to_least_loaded_worker(command):
+    pool = StdioProcessPool("echo", command, dict(os.environ), size=2)
+    await pool.start(startup_grace=0.1)
+    try:
+        slow = asyncio.create_task(pool.request("sleep", {"seconds": 0.3}))
+        await asyncio.sleep(0.05)
+        fast = await pool.request("sleep", {})
+        assert pool.in_flight == 1
+        assert fast["result"]["pid"] != (await slow)["result"]["pid"]
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_pool_restarts_dead_workers(command):
+    pool = StdioProcessPool("echo", command, dict(os.environ), size=2)
+    await pool.start(startup_grace=0.1)
+    try:
+        with pytest.raises(ConnectionError):
+            await pool.connections[0].request("exit", {}, timeout=5)
+        await asyncio.sleep(0.05)
+        assert pool.is_healthy
+
+        assert await pool.restart_dead() == 1
+        assert all(c.is_alive for c in pool.connections)
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_pool_start_fails_if_process_exits(tmp_path):
+    script = tmp_path / "crash.py"
+    script.write_text("import sys; sys.stderr.write('bad config'); sys.exit(2)")
+    pool = StdioProcessPool("crash", [sys.executable, str(script)], dict(os.environ))
+
+    with pytest.raises(Exception, match="bad config"):
+        await pool.start(startup_grace=0.3)
@@ -0,0 +1,121 @@
+"""
+Unit tests for batched vector storage and payload limits
+"""
+
+import pytest
+from module_loader import load_module, stub_module
+
+# The shared.rag package __init__ and shared.utils pull in services and
+# config modules this tree does not ship; the agent needs one function of each
+storage_coordinator = load_module(
+    "context-as-a-service/core/rag_processor/processors/storage_coordinator.py",
+    stubs={
+        "shared.rag": stub_module(
+            "shared.rag", invalidate_retrieval_cache=lambda *args: None
+        ),
+        "shared.utils": stub_module("shared.utils", get_supabase_client=lambda: None),
+    },
+)
+
+StorageConfig = storage_coordinator.StorageConfig
+
+
+class FakeQdrant:
+    def __init__(self):
+        self.upserts = []
+
+    async def upsert(self, collection_name, points):
+        self.upserts.append((collection_name, points))
+
+
+class FakeSupabase:
+    def __init__(self):
+        self.upserts = []
+
+    def table(self, name):
+        return self
+
+    def upsert(self, rows, on_conflict=None):
+        self.upserts.append(rows)
+        return self
+
+    def execute(self):
+        return None
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    supabase = FakeSupabase()
+    monkeypatch.setattr(storage_coordinator, "get_supabase_client", lambda: supabase)
+    monkeypatch.setattr(
+        storage_coordinator, "invalidate_retrieval_cache", lambda *args: None
+    )
+    agent = storage_coordinator.RAGStorageCoordinatorAgent(
+        StorageConfig(
+            upsert_batch_size=2, chunk_sync_page_size=3, payload_max_entities=4
+        )
+    )
+    agent.qdrant_client = FakeQdrant()
+    return agent
+
+
+def test_from_env_reads_every_limit(monkeypatch):
+    monkeypatch.setenv("RAG_QDRANT_BATCH_SIZE", "64")
+    monkeypatch.setenv("RAG_QDRANT_CONCURRENCY", "2")
+    monkeypatch.setenv("RAG_CHUNK_SYNC_PAGE_SIZE", "250")
+    monkeypatch.setenv("RAG_PAYLOAD_TRUNCATION", "word")
+    monkeypatch.setenv("RAG_PAYLOAD_CONTENT_CHARS", "500")
+    monkeypatch.setenv("RAG_PAYLOAD_MAX_ENTITIES", "5")
+
+    assert StorageConfig.from_env() == StorageConfig(
+        upsert_batch_size=64,
+        upsert_concurrency=2,
+        chunk_sync_page_size=250,
+        payload_truncation="word",
+        payload_content_chars=500,
+        payload_max_entities=5,
+    )
+
+
+@pytest.mark.parametrize(
+    "mode, text, expected",
+    [
+        ("chars", "alpha beta gamma", ("alpha beta", True)),
+        ("word", "alpha beta gamma", ("alpha", True)),
+        ("word", "alpha\nbeta\tgamma", ("alpha", True)),
+        ("word", "alphabetagamma", ("alphabetag", True)),
+        ("none", "alpha beta gamma", ("alpha beta gamma", False)),
+        ("word", "short", ("short", False)),
+    ],
+)
+def test_truncate_content(mode, text, expected):
+    config = StorageConfig(payload_truncation=mode, payload_content_chars=10)
+
+    assert config.truncate_content(text) == expected
+
+
+def test_unknown_truncation_mode_is_rejected(monkeypatch):
+    monkeypatch.setattr(storage_coordinator, "get_supabase_client", lambda: None)
+
+    with pytest.raises(ValueError):
+        storage_coordinator.RAGStorageCoordinatorAgent(
+            StorageConfig(payload_truncation="middle")
+        )
+
+
+@pytest.mark.asyncio
+async def test_store_embeddings_batches_points_and_chunk_rows(agent):
+    chunks = [
+        {"id": f"c{i}", "chunk_index": i, "content": "text", "entities": ["e"] * 30}
+        for i in range(5)
+    ]
+    embeddings = [{"embedding": [0.1, 0.2]} for _ in chunks]
+
+    result = await agent.store_embeddings("t1", "d1", chunks, embeddings)
+
+    assert result["total_stored"] == 5
+    assert [len(points) for _, points in agent.qdrant_client.upserts] == [2, 2, 1]
+    payload = agent.qdrant_client.upserts[0][1][0].payload
+    assert len(payload["entities"]) == 4
+    assert [len(rows) for rows in agent.supabase.upserts] == [3, 2]
+    assert agent.supabase.upserts[0][0]["vector_id"] == "d1_0"
@@ -0,0 +1,119 @@
+"""
+Unit tests for the append-only quota usage journal
+"""
+
+import json
+from datetime import datetime
+
+import pytest
+from elf_automations.shared.quota import QuotaManager
+from elf_automations.shared.quota.usage_journal import UsageJournal
+
+
+def usage(team="team-a", date="2025-01-01", model="gpt-4", cost=0.5, tokens=100):
+    return {
+        "team": team,
+        "date": date,
+        "model": model,
+        "cost": cost,
+        "tokens": tokens,
+    }
+
+
+def test_append_updates_aggregate_without_snapshot(tmp_path):
+    journal = UsageJournal(tmp_path)
+    journal.append(usage())
+    journal.append(usage(cost=0.25, tokens=50))
+
+    day = journal.data["team-a"]["2025-01-01"]
+    assert day["total_cost"] == pytest.approx(0.75)
+    assert day["token_count"] == 150
+    assert day["models"]["gpt-4"] == {"cost": pytest.approx(0.75), "calls": 2}
+    assert not journal.snapshot_file.exists()
+    assert len(journal.journal_file.read_text().splitlines()) == 2
+
+
+def test_reader_picks_up_appends_from_other_writer(tmp_path):
+    writer = UsageJournal(tmp_path)
+    reader = UsageJournal(tmp_path)
+
+    writer.append(usage())
+    reader.refresh()
+    assert reader.data["team-a"]["2025-01-01"]["total_cost"] == pytest.approx(0.5)
+
+    writer.append(usage(cost=1.0))
+    reader.refresh()
+    assert reader.data["team-a"]["2025-01-01"]["total_cost"] == pytest.approx(1.5)
+
+
+def test_partial_tail_line_is_read_once_complete(tmp_path):
+    journal = UsageJournal(tmp_path)
+    line = json.dumps(usage())
+    with open(journal.journal_file, "w") as f:
+        f.write(line[:10])
+    journal.refresh()
+    assert "team-a" not in journal.data
+
+    with open(journal.journal_file, "a") as f:
+        f.write(line[10:] + "\n")
+    journal.refresh()
+    assert journal.data["team-a"]["2025-01-01"]["total_cost"] == pytest.approx(0.5)
+
+
+def test_append_after_torn_write_drops_the_partial_line(tmp_path):
+    journal = UsageJournal(tmp_path)
+    journal.append(usage())
+    with open(journal.journal_file, "a") as f:
+        f.write(json.dumps(usage(cost=9.0))[:10])
+
+    journal.append(usage(cost=0.25))
+    journal.append(usage(cost=0.125))
+
+    lines = journal.journal_file.read_text().splitlines()
+    assert [json.loads(line)["cost"] for line in lines] == [0.5, 0.25, 0.125]
+    assert journal._journal_offset == journal.journal_file.stat().st_size
+    reloaded = UsageJournal(tmp_path)
+    assert reloaded.data["team-a"]["2025-01-01"]["total_cost"] == pytest.approx(0.875)
+
+
+def test_compaction_folds_journal_into_snapshot(tmp_path):
+    journal = UsageJournal(tmp_path, compact_threshold_bytes=300)
+    reader = UsageJournal(tmp_path)
+    for _ in range(5):
+        journal.append(usage(cost=0.1))
+
+    assert journal.snapshot_file.exists()
+    assert journal.journal_file.stat().st_size < 300
+
+    reader.refresh()
+    fresh = UsageJournal(tmp_path)
+    for view in (journal, reader, fresh):
+        day = view.data["team-a"]["2025-01-01"]
+        assert day["total_cost"] == pytest.approx(0.5)
+        assert day["models"]["gpt-4"]["calls"] == 5
+
+
+def test_budget_and_cache_hit_records(tmp_path):
+    journal = UsageJournal(tmp_path)
+    journal.append({"type": "budget", "team": "team-a", "budget": 3.0})
+    journal.append(
+        {"type": "cache_hit", "team": "team-a", "date": "2025-01-01", "model": "m"}
+    )
+
+    assert journal.data["budgets"] == {"team-a": 3.0}
+    day = journal.data["team-a"]["2025-01-01"]
+    assert day["cache_hits"] == 1
+    assert day["total_cost"] == 0
+
+
+def test_quota_manager_report_survives_restart(tmp_path):
+    manager = QuotaManager(storage_path=tmp_path, default_daily_budget=5.0)
+    cost = manager.track_usage("team-a", "gpt-4", 1000, 1000)
+    manager.set_team_budget("team-a", 2.0)
+
+    restarted = QuotaManager(storage_path=tmp_path, default_daily_budget=5.0)
+    today = datetime.now().strftime("%Y-%m-%d")
+    report = restarted.get_usage_report("team-a", days=1)
+
+    assert report["days"][today]["total_cost"] == pytest.approx(cost)
+    assert restarted.get_team_budget("team-a") == 2.0
@@ -0,0 +1,148 @@
+"""
+Unit tests for the lease-based RAG work queue (SQLite backend)
+"""
+
+import asyncio
+
+import pytest
+from module_loader import load_module
+
+work_queue = load_module("context-as-a-service/shared/rag/work_queue.py")
+LeaseHeartbeat = work_queue.LeaseHeartbeat
+SQLiteWorkQueue = work_queue.SQLiteWorkQueue
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def queues(tmp_path, clock):
+    path = str(tmp_path / "queue.db")
+    opened = []
+
+    def open_queue(worker_id, lease_seconds=30):
+        queue = SQLiteWorkQueue(path, worker_id, lease_seconds, clock=clock)
+        opened.append(queue)
+        return queue
+
+    yield open_queue
+    for queue in opened:
+        queue.close()
+
+
+@pytest.mark.asyncio
+async def test_claim_orders_by_priority_and_leases_items(queues):
+    queue = queues("w1")
+    low = queue.enqueue("doc-low", "t1", priority=1)
+    high = queue.enqueue("doc-high", "t1", priority=9)
+
+    items = await queue.claim(batch_size=5)
+
+    assert [item.id for item in items] == [high, low]
+    assert all(item.attempts == 1 for item in items)
+    assert queue.get(low)["lease_owner"] == "w1"
+    assert await queue.claim() == []
+
+
+@pytest.mark.asyncio
+async def test_concurrent_workers_claim_disjoint_items(queues):
+    workers = [queues(f"w{i}") for i in range(4)]
+    ids = {workers[0].enqueue(f"doc-{i}", "t1") for i in range(10)}
+
+    batches = await asyncio.gather(*(w.claim(batch_size=3) for w in workers))
+
+    claimed = [item.id for batch in batches for item in batch]
+    assert len(claimed) == len(set(claimed)) == 10
+    assert set(claimed) == ids
+
+
+@pytest.mark.asyncio
+async def test_expired_lease_is_reclaimed_and_old_owner_is_fenced(queues, clock):
+    first, second = queues("w1"), queues("w2")
+    first.enqueue("doc", "t1")
+    [item] = await first.claim()
+
+    clock.now += 31
+    [reclaimed] = await second.claim()
+
+    assert reclaimed.id == item.id
+    assert reclaimed.attempts == 2
+    assert await first.complete(item) is False
+    assert await first.renew([item.id]) == set()
+    assert await second.complete(reclaimed) is True
+    assert second.get(item.id)["status"] == "completed"
+
+
+@pytest.mark.asyncio
+async def test_expired_lease_without_attempts_left_fails(queues, clock):
+    queue = queues("w1")
+    queue_id = queue.enqueue("doc", "t1", max_attempts=1)
+    await queue.claim()
+
+    clock.now += 31
+
+    assert await queue.claim() == []
+    row = queue.get(queue_id)
+    assert (row["status"], row["last_error"]) == ("failed", "Lease expired")
+
+
+@pytest.mark.asyncio
+async def test_release_requeues_with_delay_then_fails(queues, clock):
+    queue = queues("w1")
+    queue_id = queue.enqueue("doc", "t1", max_attempts=2)
+
+    [item] = await queue.claim()
+    assert await queue.release(item, "boom", delay_seconds=10) == "pending"
+    assert await queue.claim() == []
+
+    clock.now += 10
+    [item] = await queue.claim()
+    assert await queue.release(item, "boom again") == "failed"
+    assert queue.get(queue_id)["last_error"].endswith("boom again")
+
+
+@pytest.mark.asyncio
+async def test_release_without_consuming_an_attempt(queues):
+    queue = queues("w1")
+    queue_id = queue.enqueue("doc", "t1", max_attempts=1)
+    [item] = await queue.claim()
+
+    assert await queue.release(item, consume_attempt=False) == "pending"
+    assert queue.get(queue_id)["attempts"] == 0
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_renews_and_reports_lost_leases(queues, clock):
+    first, second = queues("w1"), queues("w2")
+    first.enqueue("a", "t1")
+    first.enqueue("b", "t1")
+    items = await first.claim(batch_size=2)
+    lost = []
+    heartbeat = LeaseHeartbeat(first, interval=60, on_lost=lost.append)
+    for item in items:
+        heartbeat.items[item.id] = item
+
+    clock.now += 20
+    assert await heartbeat.beat() == set()
+    assert first.get(items[0].id)["lease_expires_at"] == clock.now + 30
+
+    # The second lease expires and is taken over
+    first._conn.execute(
+        "UPDATE rag_processing_queue SET lease_expires_at = 0 WHERE id = ?",
+        (items[1].id,),
+    )
+    await second.claim()
+
+    assert await heartbeat.beat() == {items[1].id}
+    assert lost == [items[1]]
+    assert list(heartbeat.items) == [items[0].id]
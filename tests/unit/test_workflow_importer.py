@@ -0,0 +1,185 @@
+"""
+Unit tests for batch workflow import storage
+"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+from elf_automations.shared.n8n import workflow_importer
+from elf_automations.shared.n8n.workflow_importer import WorkflowImporter
+
+
+class FakeSupabase:
+    """In-memory tables behind the supabase query builder calls we use"""
+
+    def __init__(self, reject=None):
+        self.tables = {}
+        self.next_id = 0
+        # table -> predicate marking rows the table refuses
+        self.reject = reject or {}
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+
+class FakeQuery:
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.action = None
+
+    def insert(self, rows):
+        self.action = ("insert", rows if isinstance(rows, list) else [rows])
+        return self
+
+    def upsert(self, rows, on_conflict=None):
+        self.action = ("insert", rows)
+        return self
+
+    def delete(self):
+        self.action = ("delete", None)
+        return self
+
+    def in_(self, column, values):
+        self.action = ("delete", (column, set(values)))
+        return self
+
+    def execute(self):
+        kind, arg = self.action
+        rows = self.db.tables.setdefault(self.table, [])
+        if kind == "delete":
+            column, values = arg
+            rows[:] = [row for row in rows if row.get(column) not in values]
+            return SimpleNamespace(data=[])
+
+        reject = self.db.reject.get(self.table)
+        if reject and any(reject(row) for row in arg):
+            raise RuntimeError(f"{self.table} rejected the write")
+        written = []
+        for row in arg:
+            self.db.next_id += 1
+            written.append({"id": f"uuid-{self.db.next_id}", **row})
+        rows.extend(written)
+        return SimpleNamespace(data=written)
+
+
+def source(name):
+    return (
+        json.dumps(
+            {
+                "name": name,
+                "nodes": [{"type": "n8n-nodes-base.code", "name": "run"}],
+                "connections": {},
+                "settings": {"errorWorkflow": "errors"},
+            }
+        ),
+        "json",
+    )
+
+
+@pytest.fixture(autouse=True)
+def no_llm(monkeypatch):
+    monkeypatch.setattr(
+        workflow_importer.LLMFactory, "create_llm", staticmethod(lambda **_: None)
+    )
+
+
+def plain_importer(db):
+    """Importer that stores workflows as given, without the LLM pass"""
+    importer = WorkflowImporter(db, chunk_size=2)
+
+    async def plain(workflow, report, auto_fix):
+        return workflow
+
+    importer._process_workflow = plain
+    return importer
+
+
+async def import_batch(db, names):
+    return await plain_importer(db).import_batch([source(name) for name in names])
+
+
+@pytest.mark.asyncio
+async def test_batch_writes_every_table():
+    db = FakeSupabase()
+
+    results = await import_batch(db, ["a", "b", "c"])
+
+    uuids = [workflow_uuid for workflow_uuid, _ in results]
+    assert all(uuids)
+    assert [row["name"] for row in db.tables["workflows"]] == ["a", "b", "c"]
+    workflow_ids = {row["workflow_id"] for row in db.tables["workflows"]}
+    assert len(workflow_ids) == 3
+    # The full uuid, so upserting on workflow_id never hits another import
+    assert all(len(workflow_id) == 41 for workflow_id in workflow_ids)
+    for table in workflow_importer._LINKED_TABLES:
+        assert [row["workflow_id"] for row in db.tables[table]] == uuids
+
+
+@pytest.mark.asyncio
+async def test_failed_linked_write_removes_the_partial_import():
+    db = FakeSupabase(
+        reject={"workflow_metadata": lambda row: row["ai_detected_patterns"] == ["x"]}
+    )
+    importer = plain_importer(db)
+    extract = importer._extract_metadata
+    importer._extract_metadata = lambda wf: {
+        **extract(wf),
+        "detected_patterns": ["x"] if wf["name"] == "b" else [],
+    }
+
+    results = await importer.import_batch([source(n) for n in ["a", "b", "c"]])
+
+    assert results[1][0] is None
+    assert "Database error" in results[1][1].errors[0].message
+    kept = [results[0][0], results[2][0]]
+    assert [row["id"] for row in db.tables["workflows"]] == kept
+    for table in workflow_importer._LINKED_TABLES:
+        assert sorted(row["workflow_id"] for row in db.tables[table]) == kept
+
+
+@pytest.mark.asyncio
+async def test_failed_workflow_write_isolates_the_item():
+    db = FakeSupabase(reject={"workflows": lambda row: row["name"] == "b"})
+
+    results = await import_batch(db, ["a", "b", "c"])
+
+    assert [workflow_uuid is None for workflow_uuid, _ in results] == [
+        False,
+        True,
+        False,
+    ]
+    assert len(db.tables["workflow_versions"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_single_import_removes_rows_when_a_linked_write_fails():
+    db = FakeSupabase(reject={"workflow_import_export_log": lambda row: True})
+    importer = WorkflowImporter(db)
+
+    workflow_uuid, report = await importer.import_workflow(
+        source("a")[0], process=False
+    )
+
+    assert workflow_uuid is None
+    assert "Database error" in report.errors[0].message
+    for table in ("workflows", *workflow_importer._LINKED_TABLES):
+        assert db.tables.get(table, []) == []
+
+
+@pytest.mark.asyncio
+async def test_unloadable_and_invalid_sources_get_error_reports():
+    db = FakeSupabase()
+    importer = WorkflowImporter(db)
+    progress = []
+
+    results = await importer.import_batch(
+        [("{broken", "json"), (json.dumps({"name": "no nodes"}), "json")],
+        progress_callback=lambda p: progress.append(p.stage),
+    )
+
+    assert [workflow_uuid for workflow_uuid, _ in results] == [None, None]
+    assert results[1][1].errors[0].field == "nodes"
+    assert "workflows" not in db.tables
+    assert "load" in progress
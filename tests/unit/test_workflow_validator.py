@@ -0,0 +1,124 @@
+"""
+Unit tests for single-pass, memoized n8n workflow validation
+"""
+
+import pytest
+from elf_automations.shared.n8n.workflow_validator import (
+    ValidationLevel,
+    ValidationStatus,
+    WorkflowValidator,
+    validate_workflow_json,
+)
+
+
+def workflow(**overrides):
+    data = {
+        "name": "notify",
+        "nodes": [
+            {"type": "n8n-nodes-base.webhook", "name": "hook", "parameters": {}},
+            {
+                "type": "n8n-nodes-base.slack",
+                "name": "post",
+                "credentials": {"slackApi": {}},
+            },
+        ],
+        "connections": {},
+    }
+    data.update(overrides)
+    return data
+
+
+def test_missing_required_fields_are_reported_by_name():
+    report = WorkflowValidator().validate({"name": "x"}, ValidationLevel.BASIC)
+
+    assert not report.is_valid_schema
+    assert [(e.field, e.message) for e in report.errors] == [
+        ("nodes", "Required field 'nodes' is missing"),
+        ("connections", "Required field 'connections' is missing"),
+    ]
+
+
+def test_malformed_nodes_and_connections():
+    report = WorkflowValidator().validate(
+        workflow(nodes=["not a node", {"name": "untyped"}], connections=[]),
+        ValidationLevel.BASIC,
+    )
+
+    assert [e.field for e in report.errors] == ["nodes[0]", "nodes[1]", "connections"]
+    assert report.status == ValidationStatus.FAILED
+
+
+def test_security_checks_find_secrets_and_open_webhooks():
+    wf = workflow()
+    wf["nodes"][1]["parameters"] = {"text": "password=hunter2"}
+
+    report = WorkflowValidator().validate(wf, ValidationLevel.SECURITY)
+
+    assert [issue["type"] for issue in report.security_issues] == ["password"]
+    assert ("node.hook", "Webhook without authentication") in [
+        (w.field, w.message) for w in report.warnings
+    ]
+
+
+def test_compatibility_reports_missing_nodes_and_credentials():
+    wf = workflow()
+    wf["nodes"].append({"type": "custom.node", "name": "odd"})
+
+    report = WorkflowValidator().validate(wf, ValidationLevel.COMPATIBILITY)
+
+    assert report.missing_nodes == ["custom.node"]
+    [requirement] = report.credential_requirements
+    assert (requirement.type, requirement.is_available) == ("slackApi", True)
+    assert report.compatibility_score < 100
+
+
+def test_reports_are_memoized_by_content_and_level(monkeypatch):
+    validator = WorkflowValidator()
+    calls = []
+    original = validator._validate
+    monkeypatch.setattr(
+        validator, "_validate", lambda *args: calls.append(args[1]) or original(*args)
+    )
+
+    first = validator.validate(workflow())
+    first.errors.append("mutated")
+    second = validator.validate(workflow())
+    validator.validate(workflow(), ValidationLevel.BASIC)
+
+    assert calls == [ValidationLevel.FULL, ValidationLevel.BASIC]
+    assert "mutated" not in second.errors
+
+
+def test_batch_validates_identical_workflows_once(monkeypatch):
+    validator = WorkflowValidator(cache_size=1)
+    calls = []
+    original = validator._validate
+    monkeypatch.setattr(
+        validator, "_validate", lambda *args: calls.append(args) or original(*args)
+    )
+
+    reports = validator.validate_batch(
+        [workflow(), workflow(name="other"), workflow()], ValidationLevel.BASIC
+    )
+
+    assert len(reports) == 3
+    assert len(calls) == 2
+    assert reports[0] is not reports[2]
+
+
+def test_validate_workflow_json_rejects_invalid_json():
+    report = validate_workflow_json("{not json")
+
+    assert report.status == ValidationStatus.FAILED
+    assert report.errors[0].field == "json"
+
+
+@pytest.mark.parametrize("level", list(ValidationLevel))
+def test_every_level_validates_a_clean_workflow(level):
+    wf = workflow()
+    wf["nodes"][0]["parameters"] = {"authentication": "headerAuth"}
+
+    report = WorkflowValidator().validate(wf, level)
+
+    assert report.is_valid_schema
+    assert report.validation_level == level
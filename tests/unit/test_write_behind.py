@@ -0,0 +1,188 @@
+"""
+Unit tests for the write-behind batching queue
+"""
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+from elf_automations.shared.telemetry.telemetry_client import TelemetryClient
+from elf_automations.shared.telemetry.write_behind import (
+    PartialWriteError,
+    WriteBehindQueue,
+    queue_settings_from_env,
+)
+
+
+class RecordingSink:
+    """Sink that records batches and can be switched off"""
+
+    def __init__(self):
+        self.batches = []
+        self.available = True
+        self.lock = threading.Lock()
+
+    def __call__(self, batch):
+        if not self.available:
+            raise ConnectionError("sink down")
+        with self.lock:
+            self.batches.append(list(batch))
+
+    @property
+    def records(self):
+        return [record for batch in self.batches for record in batch]
+
+
+@pytest.fixture
+def sink():
+    return RecordingSink()
+
+
+def make_queue(sink, tmp_path, **kwargs):
+    kwargs.setdefault("flush_interval", 3600)
+    return WriteBehindQueue("test", sink, spill_dir=str(tmp_path), **kwargs)
+
+
+def test_flush_writes_in_batches(sink, tmp_path):
+    wbq = make_queue(sink, tmp_path, batch_size=3)
+    for i in range(7):
+        wbq.put({"i": i})
+    wbq.flush()
+
+    assert [len(batch) for batch in sink.batches] == [3, 3, 1]
+    assert [r["i"] for r in sink.records] == list(range(7))
+    assert wbq.get_stats()["written"] == 7
+    wbq.close()
+
+
+def test_full_buffer_drops_oldest(sink, tmp_path):
+    wbq = make_queue(sink, tmp_path, capacity=3, batch_size=100)
+    results = [wbq.put({"i": i}) for i in range(5)]
+    wbq.flush()
+
+    assert results == [True, True, True, False, False]
+    assert [r["i"] for r in sink.records] == [2, 3, 4]
+    assert wbq.get_stats()["dropped"] == 2
+    wbq.close()
+
+
+def test_blocking_put_drops_new_record_on_timeout(sink, tmp_path):
+    wbq = make_queue(sink, tmp_path, capacity=1, batch_size=100)
+    # Keep the writer from draining while the buffer is full
+    with wbq._write_lock:
+        assert wbq.put({"i": 0})
+        assert not wbq.put({"i": 1}, block=True, timeout=0.05)
+
+    assert wbq.get_stats()["backpressure_waits"] == 1
+    wbq.flush()
+    assert [r["i"] for r in sink.records] == [0]
+    wbq.close()
+
+
+def test_spills_while_sink_down_and_replays(sink, tmp_path):
+    wbq = make_queue(sink, tmp_path, batch_size=2, retry_interval=0)
+    sink.available = False
+    for i in range(3):
+        wbq.put({"i": i})
+    wbq.flush()
+
+    assert sink.records == []
+    assert wbq.spill_file.exists()
+    assert wbq.get_stats()["spilled"] == 3
+
+    sink.available = True
+    wbq.put({"i": 3})
+    wbq.flush()
+
+    assert [r["i"] for r in sink.records] == [0, 1, 2, 3]
+    assert wbq.get_stats()["replayed"] == 3
+    assert not wbq.spill_file.exists()
+    wbq.close()
+
+
+def test_partial_write_spills_only_failed_records(tmp_path):
+    written = []
+
+    def sink(batch):
+        written.extend(r for r in batch if r["i"] % 2 == 0)
+        raise PartialWriteError([r for r in batch if r["i"] % 2])
+
+    wbq = make_queue(sink, tmp_path, batch_size=10, retry_interval=0)
+    for i in range(4):
+        wbq.put({"i": i})
+    wbq.flush()
+
+    stats = wbq.get_stats()
+    assert (stats["written"], stats["spilled"], stats["sink_errors"]) == (2, 2, 1)
+    spilled = wbq.spill_file.read_text().splitlines()
+    assert spilled == ['{"i": 1}', '{"i": 3}']
+    wbq.close()
+
+
+class FakeTelemetryTable:
+    """Rejects inserts of rows carrying a tool_name column"""
+
+    def __init__(self, inserted):
+        self.inserted = inserted
+        self.rows = None
+
+    def insert(self, rows):
+        self.rows = rows
+        return self
+
+    def execute(self):
+        if "tool_name" in self.rows[0]:
+            raise ConnectionError("mcp insert failed")
+        self.inserted.extend(self.rows)
+
+
+def test_telemetry_insert_reports_only_failed_groups():
+    inserted = []
+    telemetry = TelemetryClient("http://supabase", "key")
+    telemetry._client = SimpleNamespace(table=lambda name: FakeTelemetryTable(inserted))
+    a2a = [{"protocol": "a2a", "i": i} for i in range(2)]
+    mcp = [{"protocol": "mcp", "tool_name": "t", "i": i} for i in range(2)]
+
+    with pytest.raises(PartialWriteError) as error:
+        telemetry._insert_batch([a2a[0], mcp[0], a2a[1], mcp[1]])
+
+    assert inserted == a2a
+    assert error.value.failed == mcp
+
+
+def test_telemetry_queue_is_created_once_across_threads(monkeypatch, tmp_path):
+    monkeypatch.setenv("TELEMETRY_SPILL_DIR", str(tmp_path))
+    telemetry = TelemetryClient("http://supabase", "key")
+    barrier = threading.Barrier(8)
+    queues = []
+
+    def get_queue():
+        barrier.wait()
+        queues.append(telemetry.queue)
+
+    threads = [threading.Thread(target=get_queue) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(queue) for queue in queues}) == 1
+    telemetry.queue.close()
+
+
+def test_close_flushes_buffer(sink, tmp_path):
+    wbq = make_queue(sink, tmp_path)
+    wbq.put({"i": 1})
+    wbq.close()
+
+    assert sink.records == [{"i": 1}]
+
+
+def test_queue_settings_from_env(monkeypatch):
+    monkeypatch.setenv("TEST_LOG_BUFFER_SIZE", "50")
+    monkeypatch.setenv("TEST_LOG_FLUSH_INTERVAL", "0.5")
+
+    assert queue_settings_from_env("TEST_LOG") == {
+        "capacity": 50,
+        "flush_interval": 0.5,
+    }
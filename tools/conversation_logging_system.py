@@ -13,6 +13,7 @@ import threading
 from contextlib import contextmanager
 from datetime import datetime
 from enum import Enum
+from functools import partial
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
@@ -25,6 +26,18 @@ except ImportError:
     SUPABASE_AVAILABLE = False
     print("Warning: Supabase not available. Logging to files only.")
 
+# Shared write-behind queue for batched Supabase writes
+try:
+    from elf_automations.shared.telemetry.write_behind import (
+        WriteBehindQueue,
+        queue_settings_from_env,
+    )
+
+    WRITE_BEHIND_AVAILABLE = True
+except Exception:
+    # Any failure importing the shared package falls back to direct inserts
+    WRITE_BEHIND_AVAILABLE = False
+
 
 class MessageType(Enum):
     """Types of messages in team conversations"""
@@ -49,6 +62,10 @@ class ConversationLogger:
     Logs to both local files and Supabase for analysis
     """
 
+    # team name -> write-behind queue shared by that team's loggers
+    _queues: Dict[str, "WriteBehindQueue"] = {}
+    _queues_lock = threading.Lock()
+
     def __init__(self, team_name: str, log_dir: str = "logs/conversations"):
         self.team_name = team_name
         self.log_dir = Path(log_dir)
@@ -58,19 +75,23 @@ class ConversationLogger:
         self.log_file = self.log_dir / f"{team_name}_conversations.jsonl"
         self.natural_log_file = self.log_dir / f"{team_name}_natural.log"
 
-        # Structured logging queue for async Supabase writes
-        self.log_queue = queue.Queue()
+        # Write-behind queue for batched Supabase writes, or a plain queue
+        # drained by a background thread when write-behind is unavailable
+        self.log_queue = None
         self.supabase_client = None
 
         # Initialize Supabase if available
         if SUPABASE_AVAILABLE:
             try:
                 self.supabase_client = get_supabase_client()
-                # Start background thread for Supabase writes
-                self.supabase_thread = threading.Thread(
-                    target=self._supabase_writer, daemon=True
-                )
-                self.supabase_thread.start()
+                if WRITE_BEHIND_AVAILABLE:
+                    self.log_queue = self._get_team_queue(team_name)
+                else:
+                    self.log_queue = queue.Queue()
+                    self.supabase_thread = threading.Thread(
+                        target=self._direct_supabase_writer, daemon=True
+                    )
+                    self.supabase_thread.start()
             except Exception as e:
                 print(f"Failed to initialize Supabase: {e}")
                 self.supabase_client = None
@@ -164,7 +185,7 @@ class ConversationLogger:
         self._write_to_file(log_entry)
 
         # Queue for Supabase (asynchronous)
-        if self.supabase_client:
+        if self.log_queue is not None:
             self.log_queue.put(log_entry)
 
         # Write natural language version
@@ -189,32 +210,59 @@ class ConversationLogger:
         with open(self.natural_log_file, "a") as f:
             f.write(log_line)
 
-    def _supabase_writer(self):
-        """Background thread to write logs to Supabase"""
+    def _get_team_queue(self, team_name: str) -> "WriteBehindQueue":
+        """Get the write-behind queue shared by every logger for a team"""
+        with ConversationLogger._queues_lock:
+            log_queue = ConversationLogger._queues.get(team_name)
+            if log_queue is None:
+                # The queue outlives this logger, so its sink holds only the
+                # Supabase client, not the logger that happened to create it
+                log_queue = WriteBehindQueue(
+                    f"team_conversations_{team_name}",
+                    partial(ConversationLogger._supabase_writer, self.supabase_client),
+                    **queue_settings_from_env("CONVERSATION_LOG"),
+                )
+                ConversationLogger._queues[team_name] = log_queue
+            return log_queue
+
+    @staticmethod
+    def _supabase_row(log_entry: Dict) -> Dict:
+        """Select the team_conversations columns from a log entry"""
+        return {
+            "team_name": log_entry["team_name"],
+            "task_id": log_entry["task_id"],
+            "agent_name": log_entry["agent_name"],
+            "message": log_entry["message"],
+            "message_type": log_entry["message_type"],
+            "to_agent": log_entry["to_agent"],
+            "metadata": log_entry["metadata"],
+            "timestamp": log_entry["timestamp"],
+        }
+
+    @staticmethod
+    def _supabase_writer(supabase_client, log_entries: List[Dict]):
+        """Bulk insert a batch of queued log entries into Supabase"""
+        supabase_client.table("team_conversations").insert(
+            [ConversationLogger._supabase_row(log_entry) for log_entry in log_entries]
+        ).execute()
+
+    def _direct_supabase_writer(self):
+        """Background thread writing logs one at a time without write-behind"""
         while True:
             try:
-                # Get log entries from queue (blocking)
                 log_entry = self.log_queue.get(timeout=1)
-
-                # Write to Supabase
                 self.supabase_client.table("team_conversations").insert(
-                    {
-                        "team_name": log_entry["team_name"],
-                        "task_id": log_entry["task_id"],
-                        "agent_name": log_entry["agent_name"],
-                        "message": log_entry["message"],
-                        "message_type": log_entry["message_type"],
-                        "to_agent": log_entry["to_agent"],
-                        "metadata": log_entry["metadata"],
-                        "timestamp": log_entry["timestamp"],
-                    }
+                    self._supabase_row(log_entry)
                 ).execute()
-
             except queue.Empty:
                 continue
             except Exception as e:
                 print(f"Error writing to Supabase: {e}")
-                # Could implement retry logic here
+
+    def flush(self):
+        """Write all queued log entries to Supabase now"""
+        if WRITE_BEHIND_AVAILABLE and self.log_queue is not None:
+            self.log_queue.flush()
 
     def _analyze_sentiment(self, message: str) -> str:
         """Simple sentiment analysis (could be enhanced with NLP)"""
@@ -272,7 +320,10 @@ class ConversationLogger:
 
     def get_metrics(self) -> Dict:
         """Get current conversation metrics"""
-        return self.conversation_metrics.copy()
+        metrics = self.conversation_metrics.copy()
+        if WRITE_BEHIND_AVAILABLE and self.log_queue is not None:
+            metrics["supabase_queue"] = self.log_queue.get_stats()
+        return metrics
 
     def get_recent_conversations(self, limit: int = 100) -> List[Dict]:
         """Get recent conversations from local log"""